@@ -10,7 +10,7 @@ import { useAuthStore } from "@/store/authStore";
 import { STORAGE_KEYS } from "@/lib/constants";
 import "./ChatUI.css";
 import QuickActions from "@/components/chat/QuickActions";
-import { sendToRasaREST } from "./rasa/restClient.js";
+import { sendToRasaStream } from "./rasa/restClient.js";
 import useRasaStatus from "../../hooks/useRasaStatus";
 // import ChatbotStatusBar from "../ChatbotStatusBar";
 
@@ -309,13 +309,33 @@ export default function ChatUI({ embed = false, placeholder = "Escribe tu mensaj
         setInput("");
         setShowQuick(false);
 
+        // Burbuja temporal con el texto parcial del LLM (se reemplaza por la respuesta final)
+        const streamId = `b-${Date.now()}-stream`;
+        const dropStream = () => setMessages((m) => m.filter((x) => x.id !== streamId));
+
         try {
-            const rsp = await sendToRasaREST(senderId, text, {
-                authToken: authToken || undefined,
-                isEmbed: embed,
-            });
+            const rsp = await sendToRasaStream(
+                senderId,
+                text,
+                {
+                    authToken: authToken || undefined,
+                    isEmbed: embed,
+                },
+                {
+                    onDelta: (chunk) =>
+                        setMessages((m) => {
+                            const i = m.findIndex((x) => x.id === streamId);
+                            if (i === -1) return [...m, { id: streamId, role: "bot", text: chunk }];
+                            const copy = m.slice();
+                            copy[i] = { ...copy[i], text: copy[i].text + chunk };
+                            return copy;
+                        }),
+                }
+            );
+            dropStream();
             await appendBotMessages(rsp);
         } catch (e) {
+            dropStream();
             console.error("Error enviando al bot:", e);
 
             // Mensaje base genérico
@@ -32,3 +32,66 @@ export async function sendToRasaREST(senderId, text, token) {
     }
     return await res.json();
 }
+
+// Igual que sendToRasaREST, pero por SSE (POST /api/chat/stream): llama a onDelta
+// con el texto parcial del LLM y devuelve la lista final de Rasa.
+// Si el endpoint de streaming no está disponible, usa sendToRasaREST.
+export async function sendToRasaStream(senderId, text, token, { onDelta } = {}) {
+    const base = (import.meta.env.VITE_CHAT_REST_URL || "/api/chat").replace(/\/$/, "");
+    const authToken = typeof token === "string" ? token : token?.authToken;
+
+    let res;
+    try {
+        res = await fetch(`${base}/stream`, {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json",
+                Accept: "text/event-stream",
+                ...(authToken ? { Authorization: `Bearer ${authToken}` } : {}),
+            },
+            body: JSON.stringify({
+                sender: senderId || "web",
+                message: text,
+                metadata: { auth: { hasToken: !!authToken } },
+            }),
+            credentials: "include",
+        });
+    } catch {
+        return sendToRasaREST(senderId, text, token);
+    }
+
+    const ctype = res.headers.get("content-type") || "";
+    if (!res.ok || !res.body || !ctype.includes("text/event-stream")) {
+        return sendToRasaREST(senderId, text, token);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let result = [];
+
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let sep;
+        while ((sep = buffer.indexOf("\n\n")) !== -1) {
+            const block = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+
+            let event = "message";
+            let data = "";
+            for (const line of block.split("\n")) {
+                if (line.startsWith("event:")) event = line.slice(6).trim();
+                else if (line.startsWith("data:")) data += line.slice(5).trim();
+            }
+            const payload = data ? JSON.parse(data) : null;
+
+            if (event === "delta" && payload?.text) onDelta?.(payload.text);
+            else if (event === "message") result = Array.isArray(payload) ? payload : [];
+            else if (event === "error") throw new Error(payload?.detail || "Error en el streaming del chat");
+        }
+    }
+    return result;
+}
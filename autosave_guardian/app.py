@@ -9,7 +9,7 @@ from typing import Optional, Any, Dict, List
 
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-from pymongo import MongoClient, errors
+from pymongo import MongoClient, ReturnDocument, UpdateOne, errors
 import jwt  # PyJWT
 from pydantic import BaseModel, Field, ValidationError
 
@@ -35,6 +35,9 @@ ALLOWED_ORIGINS = os.getenv(
 ADMIN_USER = os.getenv("GUARDIAN_ADMIN_USER", "admin")
 ADMIN_PASS = os.getenv("GUARDIAN_ADMIN_PASS", "admin123")
 
+# Máximo de elementos por petición en los endpoints por lotes
+MAX_BATCH = int(os.getenv("GUARDIAN_MAX_BATCH", "500"))
+
 # -----------------------------
 # App & CORS
 # -----------------------------
@@ -78,6 +81,11 @@ class LoginRequest(BaseModel):
 class AutosaveIn(BaseModel):
     sender_id: str = Field(..., min_length=1)
     data: Dict[str, Any] = Field(default_factory=dict)
+    # Modo diferencial (opcional): rutas relativas a ``data`` ("slots.tema")
+    changes: Dict[str, Any] = Field(default_factory=dict)
+    removed: List[str] = Field(default_factory=list)
+    # 0 = crear; n = actualizar solo si el documento sigue en la versión n
+    expected_version: Optional[int] = Field(default=None, ge=0)
 
 class LogEventIn(BaseModel):
     event_type: str = Field(..., min_length=1)
@@ -163,37 +171,148 @@ def auth_verify():
 # -----------------------------
 # Autosaves
 # -----------------------------
+def _valid_path(path: str) -> bool:
+    return bool(path) and all(p and not p.startswith("$") for p in path.split("."))
+
+def _current_version(sender_id: str) -> int:
+    doc = col_autosaves.find_one({"sender_id": sender_id, "version": {"$gte": 1}}, {"version": 1})
+    return int(doc["version"]) if doc else 0
+
+def _log_autosaves(saved: List[Dict[str, Any]]) -> None:
+    # log de seguridad (no bloqueante), un solo insert para todo el lote
+    try:
+        if col_sec_logs is not None and saved:
+            now = datetime.utcnow()
+            col_sec_logs.insert_many(
+                [{"event_type": "autosave_saved", **item, "ts": now} for item in saved],
+                ordered=False,
+            )
+    except Exception:
+        pass
+
+def _parse_batch(raw: Any, model):
+    """Lista de ``model`` a partir del cuerpo; devuelve (items, respuesta_error)."""
+    if not raw:
+        return None, (jsonify(error="validation_error", details="empty_batch"), 400)
+    if len(raw) > MAX_BATCH:
+        return None, (jsonify(error="batch_too_large", max=MAX_BATCH), 413)
+    try:
+        return [model(**item) for item in raw], None
+    except (ValidationError, TypeError) as ve:
+        details = ve.errors() if isinstance(ve, ValidationError) else str(ve)
+        return None, (jsonify(error="validation_error", details=details), 400)
+
+def _create_autosaves_bulk(raw: List[Any]):
+    """Lote de snapshots completos: un ``bulk_write`` (upsert por sender_id)."""
+    items, error = _parse_batch(raw, AutosaveIn)
+    if error:
+        return error
+    if any(i.expected_version is not None or i.changes or i.removed for i in items):
+        return jsonify(error="validation_error", details="bulk_only_full_snapshots"), 400
+
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {"sender_id": i.sender_id, "version": {"$gte": 1}},
+            {"$set": {"data": i.data, "timestamp": now}, "$inc": {"version": 1}},
+            upsert=True,
+        )
+        for i in items
+    ]
+    try:
+        res = col_autosaves.bulk_write(ops, ordered=False)
+    except Exception as e:
+        log.exception("Error guardando lote de autosaves")
+        return jsonify(error="insert_failed", details=str(e)), 500
+
+    _log_autosaves([{"sender_id": i.sender_id} for i in items])
+    return jsonify(ok=True, count=len(items), upserted=res.upserted_count, modified=res.modified_count)
+
 @app.post("/autosaves")
 @auth_required
 def create_autosave():
+    """
+    Un documento por ``sender_id`` con ``version``:
+      - sin ``expected_version``: reemplaza ``data`` completo (clientes antiguos)
+      - ``expected_version`` = 0: crea el documento; 409 si ya existe
+      - ``expected_version`` = n: aplica ``changes``/``removed`` con $set/$unset
+        (o reemplaza ``data`` si ambos vienen vacíos) solo si la versión sigue
+        siendo n; si no, 409 con la versión actual
+    Un arreglo de snapshots completos se guarda en lote.
+    """
     if col_autosaves is None:
         return jsonify(error="mongo_unavailable"), 503
+    raw = request.get_json(force=True)
+    if isinstance(raw, list):
+        return _create_autosaves_bulk(raw)
     try:
-        body = AutosaveIn(**request.get_json(force=True))
+        body = AutosaveIn(**raw)
     except ValidationError as ve:
         return jsonify(error="validation_error", details=ve.errors()), 400
 
-    doc = {
-        "sender_id": body.sender_id,
-        "data": body.data,
-        "timestamp": datetime.utcnow(),
-    }
+    bad = [p for p in list(body.changes) + body.removed if not _valid_path(p)]
+    if bad:
+        return jsonify(error="invalid_path", details=bad), 400
+
+    now = datetime.utcnow()
+    selector = {"sender_id": body.sender_id, "version": {"$gte": 1}}
     try:
-        res = col_autosaves.insert_one(doc)
-        # log de seguridad (no bloqueante)
-        try:
-            col_sec_logs and col_sec_logs.insert_one({
-                "event_type": "autosave_created",
-                "sender_id": body.sender_id,
-                "ts": datetime.utcnow(),
-            })
-        except Exception:
-            pass
-        return jsonify(ok=True, inserted_id=str(res.inserted_id))
+        if body.expected_version is None:
+            doc = col_autosaves.find_one_and_update(
+                selector,
+                {"$set": {"data": body.data, "timestamp": now}, "$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+                projection={"version": 1},
+            )
+            version = int(doc["version"])
+        elif body.expected_version == 0:
+            res = col_autosaves.update_one(
+                selector,
+                {"$setOnInsert": {"sender_id": body.sender_id, "data": body.data, "version": 1, "timestamp": now}},
+                upsert=True,
+            )
+            if res.upserted_id is None:
+                return jsonify(error="version_conflict", version=_current_version(body.sender_id)), 409
+            version = 1
+        else:
+            if body.changes or body.removed:
+                sets = {f"data.{k}": v for k, v in body.changes.items()}
+            else:
+                sets = {"data": body.data}
+            update: Dict[str, Any] = {"$set": {**sets, "timestamp": now}, "$inc": {"version": 1}}
+            if body.removed:
+                update["$unset"] = {f"data.{k}": "" for k in body.removed}
+            res = col_autosaves.update_one(
+                {"sender_id": body.sender_id, "version": body.expected_version}, update
+            )
+            if res.matched_count == 0:
+                return jsonify(error="version_conflict", version=_current_version(body.sender_id)), 409
+            version = body.expected_version + 1
     except Exception as e:
-        log.exception("Error insertando autosave")
+        log.exception("Error guardando autosave")
         return jsonify(error="insert_failed", details=str(e)), 500
 
+    _log_autosaves([{"sender_id": body.sender_id, "version": version}])
+    return jsonify(ok=True, version=version)
+
+@app.get("/autosaves/by-sender/<sender_id>")
+@auth_required
+def get_autosave(sender_id: str):
+    if col_autosaves is None:
+        return jsonify(error="mongo_unavailable"), 503
+    try:
+        doc = col_autosaves.find_one(
+            {"sender_id": sender_id, "version": {"$gte": 1}},
+            {"_id": 0, "sender_id": 1, "data": 1, "version": 1, "timestamp": 1},
+        )
+    except Exception as e:
+        log.exception("Error consultando autosave")
+        return jsonify(error="query_failed", details=str(e)), 500
+    if doc is None:
+        return jsonify(error="not_found"), 404
+    return jsonify(ok=True, **doc)
+
 @app.get("/autosaves/latest")
 @auth_required
 def get_latest_autosaves():
@@ -218,23 +337,33 @@ def get_latest_autosaves():
 @app.post("/events/log")
 @auth_required
 def log_event():
+    """Un evento (objeto) o un lote (arreglo, escrito con ``insert_many``)."""
     if col_sec_logs is None:
         return jsonify(error="mongo_unavailable"), 503
-    try:
-        body = LogEventIn(**request.get_json(force=True))
-    except ValidationError as ve:
-        return jsonify(error="validation_error", details=ve.errors()), 400
+    raw = request.get_json(force=True)
+    if isinstance(raw, list):
+        bodies, error = _parse_batch(raw, LogEventIn)
+        if error:
+            return error
+    else:
+        try:
+            bodies = [LogEventIn(**raw)]
+        except ValidationError as ve:
+            return jsonify(error="validation_error", details=ve.errors()), 400
 
-    doc = {
-        "event_type": body.event_type,
-        "payload": body.payload or {},
-        "ts": datetime.utcnow(),
-        # opcional: quién (del token)
-        "by": getattr(request, "jwt_claims", {}).get("sub"),
-    }
+    now = datetime.utcnow()
+    # opcional: quién (del token)
+    by = getattr(request, "jwt_claims", {}).get("sub")
+    docs = [
+        {"event_type": b.event_type, "payload": b.payload or {}, "ts": now, "by": by}
+        for b in bodies
+    ]
     try:
-        res = col_sec_logs.insert_one(doc)
-        return jsonify(ok=True, inserted_id=str(res.inserted_id))
+        if not isinstance(raw, list):
+            res = col_sec_logs.insert_one(docs[0])
+            return jsonify(ok=True, inserted_id=str(res.inserted_id))
+        res = col_sec_logs.insert_many(docs, ordered=False)
+        return jsonify(ok=True, inserted=len(res.inserted_ids))
     except Exception as e:
         log.exception("Error insertando evento")
         return jsonify(error="insert_failed", details=str(e)), 500
@@ -85,6 +85,14 @@ class Settings(BaseSettings):
     mongo_url: Optional[str] = Field(default=None, alias="MONGO_URL")
     mongo_db: Optional[str] = Field(default=None, alias="MONGO_DB")
 
+    # 🗂️ Índices (backend/db/indexes.py) y colecciones del action server
+    mongo_indexes_on_startup: bool = Field(default=True, alias="MONGO_INDEXES_ON_STARTUP")
+    autosave_mongo_db: str = Field(default="chatbot_tutor_virtual", alias="AUTOSAVE_MONGO_DB")
+    autosave_collection: str = Field(default="autosaves", alias="MONGO_AUTOSAVE_COLLECTION")
+    security_logs_collection: str = Field(default="seguridad_logs", alias="MONGO_SECURITY_LOGS_COLLECTION")
+    autosave_ttl_days: int = Field(default=30, alias="AUTOSAVE_TTL_DAYS")
+    security_logs_ttl_days: int = Field(default=90, alias="SECURITY_LOGS_TTL_DAYS")
+
     # 🔐 JWT (HS* y compat RS*)
     secret_key: Optional[str] = Field(default=None, alias="SECRET_KEY") 
     jwt_public_key: Optional[str] = Field(default=None, alias="JWT_PUBLIC_KEY")  
@@ -98,6 +106,12 @@ class Settings(BaseSettings):
     jwt_leeway_seconds: int = Field(default=0, alias="JWT_LEEWAY_SECONDS")
     jwt_accept_typeless: bool = Field(default=True, alias="JWT_ACCEPT_TYPELESS")
 
+    # Caché de verificación (claims por hash de token) y llaves JWKS en memoria
+    jwt_cache_size: int = Field(default=4096, alias="JWT_CACHE_SIZE")
+    jwt_cache_max_ttl: int = Field(default=300, alias="JWT_CACHE_MAX_TTL")
+    jwt_jwks_refresh_seconds: int = Field(default=600, alias="JWT_JWKS_REFRESH_SECONDS")
+    jwt_jwks_min_refetch_seconds: int = Field(default=30, alias="JWT_JWKS_MIN_REFETCH_SECONDS")
+
     # ⏳ Refresh cookie (nombre configurable)
     refresh_cookie_name: str = Field(default="rt", alias="REFRESH_COOKIE_NAME")
     refresh_token_expire_days: int = Field(default=7, alias="REFRESH_TOKEN_EXPIRE_DAYS")
@@ -112,6 +126,37 @@ class Settings(BaseSettings):
     rasa_model_path: str = Field(default="rasa/models", alias="RASA_MODEL_PATH")
     rasa_train_command: str = Field(default="rasa train", alias="RASA_TRAIN_COMMAND")
     RASA_BASE_URL: str = "http://rasa:5005"
+
+    # 🔌 Pool HTTP compartido hacia Rasa (backend/services/rasa_client.py)
+    rasa_http_timeout: float = Field(default=30.0, alias="RASA_HTTP_TIMEOUT")
+    rasa_http_max_connections: int = Field(default=100, alias="RASA_HTTP_MAX_CONNECTIONS")
+    rasa_http_max_keepalive: int = Field(default=20, alias="RASA_HTTP_MAX_KEEPALIVE")
+    rasa_http_keepalive_expiry: float = Field(default=30.0, alias="RASA_HTTP_KEEPALIVE_EXPIRY")
+    rasa_http2: bool = Field(default=False, alias="RASA_HTTP2")
+
+    # 🔀 Varias réplicas de Rasa con afinidad por sender (backend/services/rasa_router.py)
+    rasa_upstreams: Optional[str] = Field(default=None, alias="RASA_UPSTREAMS")
+    rasa_ring_vnodes: int = Field(default=64, alias="RASA_RING_VNODES")
+    rasa_replica_max_failures: int = Field(default=3, alias="RASA_REPLICA_MAX_FAILURES")
+    rasa_health_interval: float = Field(default=10.0, alias="RASA_HEALTH_INTERVAL_SECONDS")
+
+    # ⚡ Circuit breaker hacia Rasa (backend/services/rasa_breaker.py)
+    rasa_breaker_failure_rate: float = Field(default=0.5, alias="RASA_BREAKER_FAILURE_RATE")
+    rasa_breaker_slow_rate: float = Field(default=0.8, alias="RASA_BREAKER_SLOW_RATE")
+    rasa_breaker_slow_ms: float = Field(default=10000.0, alias="RASA_BREAKER_SLOW_MS")
+    rasa_breaker_min_calls: int = Field(default=10, alias="RASA_BREAKER_MIN_CALLS")
+    rasa_breaker_window_sec: float = Field(default=30.0, alias="RASA_BREAKER_WINDOW_SECONDS")
+    rasa_breaker_open_sec: float = Field(default=15.0, alias="RASA_BREAKER_OPEN_SECONDS")
+    rasa_degraded_reply: str = Field(
+        default="⚠️ El asistente no está disponible en este momento. Intenta de nuevo en unos minutos.",
+        alias="RASA_DEGRADED_REPLY",
+    )
+
+    # 🌊 Streaming de respuestas LLM (POST /api/chat/stream, Redis pub/sub)
+    chat_stream_enabled: bool = Field(default=True, alias="CHAT_STREAM_ENABLED")
+    chat_stream_redis_url: Optional[str] = Field(default=None, alias="CHAT_STREAM_REDIS_URL")
+    chat_stream_channel_prefix: str = Field(default="chat:stream:", alias="CHAT_STREAM_CHANNEL_PREFIX")
+
     # 📧 SMTP
     smtp_server: str = Field(default="localhost", alias="SMTP_SERVER")
     smtp_port: int = Field(default=587, alias="SMTP_PORT")
@@ -130,6 +175,26 @@ class Settings(BaseSettings):
     template_dir: str = Field(default="backend/templates", alias="TEMPLATE_DIR")
     favicon_path: str = Field(default="backend/static/favicon.ico", alias="FAVICON_PATH")
 
+    # 🧾 Access log en lote (backend/services/batch_writer.py)
+    access_log_batch_size: int = Field(default=200, alias="ACCESS_LOG_BATCH_SIZE")
+    access_log_flush_ms: int = Field(default=1000, alias="ACCESS_LOG_FLUSH_MS")
+    access_log_queue_max: int = Field(default=10000, alias="ACCESS_LOG_QUEUE_MAX")
+    access_log_overflow: Literal["drop", "block"] = Field(default="drop", alias="ACCESS_LOG_OVERFLOW")
+    access_log_skip_paths: JsonOrCsv = Field(
+        default="/health,/api/health,/static/,/favicon.ico", alias="ACCESS_LOG_SKIP_PATHS"
+    )
+
+    # 💬 Transcripciones de chat (write-behind hacia logs/messages)
+    chat_log_batch_size: int = Field(default=100, alias="CHAT_LOG_BATCH_SIZE")
+    chat_log_flush_ms: int = Field(default=500, alias="CHAT_LOG_FLUSH_MS")
+    chat_log_queue_max: int = Field(default=5000, alias="CHAT_LOG_QUEUE_MAX")
+    chat_log_max_retries: int = Field(default=3, alias="CHAT_LOG_MAX_RETRIES")
+
+    # 📊 Rollups diarios de estadísticas (backend/services/stats_rollup.py)
+    stats_rollup_enabled: bool = Field(default=True, alias="STATS_ROLLUP_ENABLED")
+    stats_rollup_interval_seconds: int = Field(default=900, alias="STATS_ROLLUP_INTERVAL_SECONDS")
+    stats_rollup_grace_seconds: int = Field(default=300, alias="STATS_ROLLUP_GRACE_SECONDS")
+
     # 🌐 CORS/EMBED/CSP (aceptamos JSON o CSV en .env)
     allowed_origins: JsonOrCsv = Field(default='["http://localhost:5173"]', alias="ALLOWED_ORIGINS")
     embed_allowed_origins: JsonOrCsv = Field(
@@ -150,6 +215,21 @@ class Settings(BaseSettings):
     aws_s3_region: str = Field(default="us-east-1", alias="AWS_S3_REGION")
     aws_s3_endpoint_url: str = Field(default="https://s3.amazonaws.com", alias="AWS_S3_ENDPOINT_URL")
 
+    # 📤 Exportaciones CSV en streaming (cursor por lotes + multipart S3)
+    export_batch_size: int = Field(default=1000, alias="EXPORT_BATCH_SIZE")
+    export_s3_part_mb: int = Field(default=8, alias="EXPORT_S3_PART_MB")
+    export_s3_concurrency: int = Field(default=4, alias="EXPORT_S3_CONCURRENCY")
+
+    # 🔑 Hashing de contraseñas (bcrypt en pool acotado)
+    password_bcrypt_rounds: int = Field(default=12, alias="PASSWORD_BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(default=2, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_queue: int = Field(default=32, alias="PASSWORD_HASH_MAX_QUEUE")
+    password_hash_executor: Literal["thread", "process"] = Field(default="thread", alias="PASSWORD_HASH_EXECUTOR")
+
+    # 🔒 Bloqueo por intentos fallidos de login (Redis si RATE_LIMIT_BACKEND=redis)
+    login_attempt_window_sec: int = Field(default=900, alias="LOGIN_ATTEMPT_WINDOW_SECONDS")
+    login_lockout_shards: int = Field(default=16, alias="LOGIN_LOCKOUT_SHARDS")
+
     # 🚦 Rate limiting
     rate_limit_enabled: bool = Field(default=True, alias="RATE_LIMIT_ENABLED")
     rate_limit_backend: Literal["memory", "redis"] = Field(default="memory", alias="RATE_LIMIT_BACKEND")
@@ -163,6 +243,7 @@ class Settings(BaseSettings):
     rate_limit_provider: Optional[Literal["builtin", "slowapi", "fastapi-limiter"]] = Field(
         default=None, alias="RATE_LIMIT_PROVIDER"
     )
+    rate_limit_shards: int = Field(default=16, alias="RATE_LIMIT_SHARDS")
 
     # 📞 Helpdesk / Escalada a humano
     helpdesk_kind: Literal["webhook", "zendesk", "freshdesk", "jira", "zoho"] = Field(
@@ -247,6 +328,11 @@ class Settings(BaseSettings):
     def _norm_embed_allowed_origins(cls, v):
         return cls._parse_json_or_csv(v, default=["'self'", "http://localhost:5173", "http://localhost:8080"])
 
+    @field_validator("access_log_skip_paths", mode="before")
+    @classmethod
+    def _norm_access_log_skip_paths(cls, v):
+        return cls._parse_json_or_csv(v, default=[])
+
     @field_validator("frame_ancestors", mode="before")
     @classmethod
     def _norm_frame_ancestors(cls, v):
@@ -0,0 +1,275 @@
+# backend/db/indexes.py
+"""
+Registro declarativo de índices MongoDB.
+
+Cada colección declara sus ``IndexModel`` en ``INDEX_REGISTRY``; el lifespan
+de la app los aplica al arrancar (``MONGO_INDEXES_ON_STARTUP``) y también se
+pueden aplicar o auditar a mano:
+
+    python -m backend.db.indexes --apply            # crea lo que falte
+    python -m backend.db.indexes --apply --dry-run  # solo muestra el plan
+    python -m backend.db.indexes --report           # faltantes / sin uso / COLLSCAN
+
+Un índice se considera presente si existe otro con la misma clave (sin importar
+el nombre), así que los índices creados antes con otros nombres no se duplican.
+Para índices TTL con un ``expireAfterSeconds`` distinto se usa ``collMod``.
+
+Los autosaves y security logs del action server viven en otra base
+(``AUTOSAVE_MONGO_DB``); su retención la hacen índices TTL en lugar del
+barrido ``limpiar_autosaves``. Todos los writers de security logs sellan
+``ts``; ``fecha_hora`` queda con su propio TTL para los documentos viejos.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+from backend.config.settings import settings
+from backend.db import mongodb as _mongodb
+
+DAY = 86400
+
+# (base, colección) -> índices. Base "app" = MONGO_DB_NAME; "autosave" = AUTOSAVE_MONGO_DB
+INDEX_REGISTRY: Dict[Tuple[str, str], List[IndexModel]] = {
+    ("app", "users"): [
+        IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+    ],
+    ("app", "user_settings"): [
+        IndexModel([("user_id", ASCENDING)], name="user_id_1", unique=True),
+    ],
+    ("app", "logs"): [
+        IndexModel([("timestamp", DESCENDING)], name="timestamp_-1"),
+        IndexModel([("tipo", ASCENDING), ("timestamp", DESCENDING)], name="tipo_timestamp"),
+        IndexModel([("intent", ASCENDING), ("timestamp", DESCENDING)], name="intent_timestamp"),
+        IndexModel([("user_id", ASCENDING), ("leido", ASCENDING)], name="user_id_leido"),
+    ],
+    ("app", "messages"): [
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)], name="user_id_timestamp"),
+    ],
+    ("app", "helpdesk_tickets"): [
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created_at"),
+        IndexModel([("conversation_id", ASCENDING)], name="conversation_id_1", sparse=True),
+    ],
+    ("autosave", settings.autosave_collection): [
+        IndexModel(
+            [("timestamp", ASCENDING)],
+            name="ttl_timestamp",
+            expireAfterSeconds=int(settings.autosave_ttl_days) * DAY,
+        ),
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)], name="user_id_timestamp"),
+        IndexModel([("sender_id", ASCENDING), ("timestamp", DESCENDING)], name="sender_id_timestamp"),
+        # un documento versionado por remitente (MongoAutosaveWriter); los
+        # autosaves viejos sin ``version`` quedan fuera del filtro parcial
+        IndexModel(
+            [("sender_id", ASCENDING)],
+            name="sender_id_version",
+            unique=True,
+            partialFilterExpression={"version": {"$exists": True}},
+        ),
+    ],
+    ("autosave", settings.security_logs_collection): [
+        IndexModel(
+            [("ts", ASCENDING)],
+            name="ttl_ts",
+            expireAfterSeconds=int(settings.security_logs_ttl_days) * DAY,
+        ),
+        # documentos escritos antes de unificar el campo en ``ts``
+        IndexModel(
+            [("fecha_hora", ASCENDING)],
+            name="ttl_fecha_hora",
+            expireAfterSeconds=int(settings.security_logs_ttl_days) * DAY,
+        ),
+    ],
+}
+
+
+# =========================
+# Helpers
+# =========================
+def _database(alias: str, client: Any = None):
+    client = client if client is not None else _mongodb.client
+    if client is None:
+        raise RuntimeError("❌ Conexión a la base de datos fallida.")
+    if alias == "autosave":
+        return client[settings.autosave_mongo_db]
+    return client[settings.mongo_db_name or settings.mongo_db_name_effective]
+
+
+def _key(spec: Any) -> Tuple[Tuple[str, Any], ...]:
+    """Clave normalizada de un índice (IndexModel.document o index_information())."""
+    items = spec.items() if hasattr(spec, "items") else spec
+    return tuple((str(k), int(v) if isinstance(v, (int, float)) else v) for k, v in items)
+
+
+def _existentes(col) -> Dict[Tuple[Tuple[str, Any], ...], Dict[str, Any]]:
+    try:
+        info = col.index_information()
+    except OperationFailure:
+        return {}  # la colección aún no existe
+    return {_key(meta["key"]): {"name": name, **meta} for name, meta in info.items()}
+
+
+def planificar(client: Any = None) -> List[Dict[str, Any]]:
+    """
+    Compara el registro contra la base y devuelve las acciones pendientes:
+    ``create`` (falta la clave) o ``ttl`` (existe con otro expireAfterSeconds).
+    """
+    acciones: List[Dict[str, Any]] = []
+    for (alias, coleccion), modelos in INDEX_REGISTRY.items():
+        col = _database(alias, client)[coleccion]
+        existentes = _existentes(col)
+        for modelo in modelos:
+            doc = modelo.document
+            actual = existentes.get(_key(doc["key"]))
+            base = {"alias": alias, "db": col.database.name, "collection": coleccion, "name": doc["name"]}
+            if actual is None:
+                acciones.append({**base, "action": "create", "model": modelo})
+            elif "expireAfterSeconds" in doc and actual.get("expireAfterSeconds") != doc["expireAfterSeconds"]:
+                acciones.append({
+                    **base,
+                    "action": "ttl",
+                    "existing": actual["name"],
+                    "expireAfterSeconds": doc["expireAfterSeconds"],
+                })
+    return acciones
+
+
+def aplicar_indices(client: Any = None, dry_run: bool = False) -> Dict[str, Any]:
+    """Crea los índices faltantes y ajusta TTL. Nunca lanza: los errores van al reporte."""
+    reporte: Dict[str, Any] = {"created": [], "ttl_updated": [], "errors": [], "dry_run": dry_run}
+    try:
+        acciones = planificar(client)
+    except (RuntimeError, PyMongoError) as e:
+        reporte["errors"].append({"error": str(e)})
+        return reporte
+
+    for a in acciones:
+        etiqueta = f"{a['db']}.{a['collection']}.{a['name']}"
+        if dry_run:
+            reporte["created" if a["action"] == "create" else "ttl_updated"].append(etiqueta)
+            continue
+        db = _database(a["alias"], client)
+        try:
+            if a["action"] == "create":
+                db[a["collection"]].create_indexes([a["model"]])
+                reporte["created"].append(etiqueta)
+            else:
+                db.command({
+                    "collMod": a["collection"],
+                    "index": {"name": a["existing"], "expireAfterSeconds": a["expireAfterSeconds"]},
+                })
+                reporte["ttl_updated"].append(etiqueta)
+        except PyMongoError as e:
+            reporte["errors"].append({"index": etiqueta, "error": str(e)})
+    return reporte
+
+
+# =========================
+# Auditoría
+# =========================
+def indices_sin_uso(client: Any = None) -> List[Dict[str, Any]]:
+    """
+    Índices con 0 accesos según ``$indexStats`` (contadores desde el último
+    reinicio de mongod). Se omiten ``_id_`` y los TTL, que usa el monitor TTL.
+    """
+    resultado: List[Dict[str, Any]] = []
+    for alias, coleccion in INDEX_REGISTRY:
+        col = _database(alias, client)[coleccion]
+        try:
+            stats = list(col.aggregate([{"$indexStats": {}}]))
+        except PyMongoError:
+            continue
+        ttl = {m["name"] for m in _existentes(col).values() if "expireAfterSeconds" in m}
+        for s in stats:
+            if s["name"] == "_id_" or s["name"] in ttl:
+                continue
+            if int(s.get("accesses", {}).get("ops", 0)) == 0:
+                resultado.append({
+                    "db": col.database.name,
+                    "collection": coleccion,
+                    "name": s["name"],
+                    "since": str(s.get("accesses", {}).get("since", "")),
+                })
+    return resultado
+
+
+def consultas_collscan(client: Any = None, limit: int = 20) -> Dict[str, Any]:
+    """
+    Formas de consulta resueltas con COLLSCAN según ``system.profile``.
+    Requiere el profiler activo (p. ej. ``db.setProfilingLevel(1, {slowms: 50})``).
+    """
+    shapes: List[Dict[str, Any]] = []
+    profiler_off: List[str] = []
+    for alias in sorted({a for a, _ in INDEX_REGISTRY}):
+        db = _database(alias, client)
+        try:
+            if int(db.command({"profile": -1}).get("was", 0)) == 0:
+                profiler_off.append(db.name)
+            pipeline = [
+                {"$match": {"planSummary": "COLLSCAN", "ns": {"$not": {"$regex": r"\.system\."}}}},
+                {
+                    "$group": {
+                        "_id": {"ns": "$ns", "shape": {"$ifNull": ["$queryHash", "$planCacheShapeHash"]}},
+                        "count": {"$sum": 1},
+                        "max_ms": {"$max": "$millis"},
+                        "docs_examined": {"$max": "$docsExamined"},
+                        "example": {"$first": {"$ifNull": ["$command.filter", "$command.query"]}},
+                    }
+                },
+                {"$sort": {"count": -1}},
+                {"$limit": int(limit)},
+            ]
+            for r in db["system.profile"].aggregate(pipeline):
+                shapes.append({
+                    "ns": r["_id"]["ns"],
+                    "shape": r["_id"]["shape"],
+                    "count": r["count"],
+                    "max_ms": r["max_ms"],
+                    "docs_examined": r["docs_examined"],
+                    "example": r["example"],
+                })
+        except PyMongoError:
+            continue
+    return {"shapes": shapes, "profiler_off": profiler_off}
+
+
+def reporte_indices(client: Any = None) -> Dict[str, Any]:
+    faltantes = [
+        f"{a['db']}.{a['collection']}.{a['name']}" + (" (ttl)" if a["action"] == "ttl" else "")
+        for a in planificar(client)
+    ]
+    return {
+        "missing": faltantes,
+        "unused": indices_sin_uso(client),
+        "collscan": consultas_collscan(client),
+    }
+
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Registro de índices MongoDB")
+    parser.add_argument("--apply", action="store_true", help="Crea índices faltantes / ajusta TTL")
+    parser.add_argument("--dry-run", action="store_true", help="Con --apply: solo muestra el plan")
+    parser.add_argument("--report", action="store_true", help="Faltantes, sin uso y consultas COLLSCAN")
+    args = parser.parse_args(argv)
+
+    if not (args.apply or args.report):
+        args.report = True
+
+    salida: Dict[str, Any] = {}
+    if args.apply:
+        salida["apply"] = aplicar_indices(dry_run=args.dry_run)
+    if args.report:
+        salida["report"] = reporte_indices()
+    print(json.dumps(salida, indent=2, ensure_ascii=False, default=str))
+    return 1 if salida.get("apply", {}).get("errors") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
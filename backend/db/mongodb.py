@@ -19,19 +19,7 @@ try:
     client.admin.command("ping")
     print(f"✅ Conexión exitosa a MongoDB: {MONGO_URI}")
 
-    # 🟩 Índice único en email (users)
-    try:
-        client[MONGO_DB_NAME]["users"].create_index("email", unique=True)
-        print("✅ Índice único en 'email' creado/verificado")
-    except Exception as idx_e:
-        print(f"⚠️ No se pudo crear/verificar índice de email: {idx_e}")
-
-    # 🟩 Índice único en user_settings.user_id (preferencias por usuario)
-    try:
-        client[MONGO_DB_NAME]["user_settings"].create_index("user_id", unique=True)
-        print("✅ Índice único en 'user_settings.user_id' creado/verificado")
-    except Exception as idx_e2:
-        print(f"⚠️ No se pudo crear/verificar índice de user_settings.user_id: {idx_e2}")
+    # Índices: registro declarativo en backend/db/indexes.py (aplicado en el lifespan)
 
 except errors.ServerSelectionTimeoutError as e:
     print("❌ Error: No se pudo conectar a MongoDB (timeout)")
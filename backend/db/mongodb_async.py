@@ -0,0 +1,98 @@
+# backend/db/mongodb_async.py
+"""
+Capa de acceso a MongoDB no bloqueante (motor) para handlers async.
+
+``backend/db/mongodb.py`` sigue exponiendo el ``MongoClient`` síncrono para
+código sync (scripts, servicios legacy). Desde coroutines (rutas async,
+middlewares, servicios ``async def``) usar los accesores de este módulo para
+no detener el event loop en cada round trip a Mongo.
+
+El cliente es único por proceso, lo abre el lifespan de la app y se crea
+perezosamente si alguien lo usa antes (tests sin lifespan). Si el ping de
+arranque de la capa sync falló, se falla rápido igual que ``get_database()``
+en lugar de esperar el server selection timeout en cada operación.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase,
+)
+
+from backend.config.settings import settings
+from backend.db import mongodb as _sync_mongodb
+
+# === Configuración de conexión (mismas variantes que la capa sync) ===
+MONGO_URI = settings.mongo_uri_effective
+MONGO_DB_NAME = settings.mongo_db_name or settings.mongo_db_name_effective
+
+# Singleton holder (motor queda ligado al event loop donde se crea)
+_client: Optional[AsyncIOMotorClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_async_client() -> AsyncIOMotorClient:
+    global _client, _client_loop
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if _client is None or (loop is not None and loop is not _client_loop):
+        _client = AsyncIOMotorClient(
+            MONGO_URI,
+            serverSelectionTimeoutMS=5000,
+            connectTimeoutMS=5000,
+            socketTimeoutMS=5000,
+            retryWrites=True,
+        )
+        _client_loop = loop
+    return _client
+
+
+def close_async_client() -> None:
+    """Cierra el cliente compartido (shutdown del lifespan)."""
+    global _client, _client_loop
+    if _client is None:
+        return
+    try:
+        _client.close()
+    finally:
+        _client = None
+        _client_loop = None
+
+
+# 📦 DB handle
+def get_async_database() -> AsyncIOMotorDatabase:
+    if _sync_mongodb.client is None:
+        raise RuntimeError("❌ Conexión a la base de datos fallida.")
+    return get_async_client()[MONGO_DB_NAME]
+
+
+# 🔍 Accesos a colecciones
+def get_async_users_collection() -> AsyncIOMotorCollection:
+    return get_async_database()["users"]
+
+
+def get_async_logs_collection() -> AsyncIOMotorCollection:
+    return get_async_database()["logs"]
+
+
+def get_async_messages_collection() -> AsyncIOMotorCollection:
+    return get_async_database()["messages"]
+
+
+def get_async_stats_collection() -> AsyncIOMotorCollection:
+    return get_async_database()["statistics"]
+
+
+def get_async_user_settings_collection() -> AsyncIOMotorCollection:
+    return get_async_database()["user_settings"]
+
+
+def get_async_stats_daily_collection() -> AsyncIOMotorCollection:
+    return get_async_database()["stats_daily"]
@@ -5,7 +5,6 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
-import httpx
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
@@ -15,6 +14,7 @@ from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError as J
 # Mantén disponible para otros módulos que lo importan indirectamente
 from backend.db.mongodb import get_users_collection  # noqa: F401
 from backend.config.settings import settings  # Config centralizada
+from backend.services.jwt_cache import jwks_store, token_cache
 
 # ============================
 # 🔐 CONFIGURACIÓN JWT
@@ -35,6 +35,9 @@ JWT_ACCEPT_TYPELESS: bool = bool(getattr(settings, "jwt_accept_typeless", True))
 JWT_JWKS_URL: Optional[str] = getattr(settings, "jwt_jwks_url", os.getenv("JWT_JWKS_URL", None))
 JWT_PUBLIC_KEY: Optional[str] = getattr(settings, "jwt_public_key", os.getenv("JWT_PUBLIC_KEY", None))
 
+# Espacio de la caché de claims para este verificador (python-jose + reglas)
+_TOKEN_CACHE_NS = f"jose|{ALGORITHM}|aud={JWT_AUDIENCE or ''}|iss={JWT_ISSUER or ''}"
+
 
 # ============================
 # 🎟️ CREAR TOKEN
@@ -79,17 +82,10 @@ def _resolve_key_for_decode(token: str, algorithm: str) -> Any:
         return SECRET_KEY
 
     if alg.startswith("RS"):
-        # 1) JWKS
+        # 1) JWKS (llaves en memoria; solo se descarga ante un kid desconocido)
         if JWT_JWKS_URL:
             unverified_header = jose_jwt.get_unverified_header(token)
-            kid = unverified_header.get("kid")
-            with httpx.Client(timeout=5.0) as client:
-                jwks = client.get(JWT_JWKS_URL).json()
-            key_to_use = None
-            for key in jwks.get("keys", []):
-                if kid is None or key.get("kid") == kid:
-                    key_to_use = key
-                    break
+            key_to_use = jwks_store.get_jwk(unverified_header.get("kid"))
             if not key_to_use:
                 raise JoseCoreJWTError("No se encontró una JWK compatible (kid) en JWKS.")
             return key_to_use
@@ -106,7 +102,12 @@ def _resolve_key_for_decode(token: str, algorithm: str) -> Any:
 def _decode(token: str) -> Dict[str, Any]:
     """
     Decodifica el JWT aplicando la configuración disponible.
+    Un token ya verificado (y no expirado) se resuelve desde la caché.
     """
+    cached = token_cache.get(token, _TOKEN_CACHE_NS)
+    if cached is not None:
+        return dict(cached)
+
     options = {
         "verify_signature": True,
         "verify_aud": bool(JWT_AUDIENCE),
@@ -130,6 +131,7 @@ def _decode(token: str) -> Dict[str, Any]:
             if typ not in (None, "access", "bearer", "JWT"):
                 pass
 
+        token_cache.put(token, dict(claims), _TOKEN_CACHE_NS)
         return claims
 
     except (ExpiredSignatureError, JWTClaimsError, JoseCoreJWTError, JWTError):
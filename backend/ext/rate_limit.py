@@ -5,7 +5,7 @@ import logging
 from typing import Optional, List
 from fastapi import FastAPI, Depends
 
-# Try to use fastapi-limiter if available; otherwise fall back to no-op
+# Try to use fastapi-limiter if available; otherwise fall back to the built-in limiter
 try:
     from fastapi_limiter import FastAPILimiter  # type: ignore
     from fastapi_limiter.depends import RateLimiter  # type: ignore
@@ -15,6 +15,7 @@ except Exception:  # pragma: no cover
     RateLimiter = None  # type: ignore
     _HAS_FASTAPI_LIMITER = False
 
+from .rate_limit_engine import limit_dependency, native_enabled
 from .redis_client import get_redis, redis_enabled
 
 logger = logging.getLogger(__name__)
@@ -44,20 +45,22 @@ async def init_rate_limit(app: FastAPI) -> None:
 
 def limiter(times: int = 30, seconds: int = 60) -> List:
     """
-    Returns a list with a RateLimiter dependency when available; otherwise [].
+    Returns a list with a rate limit dependency: fastapi-limiter's RateLimiter
+    when it was initialized, otherwise the built-in GCRA limiter
+    (memory or Redis, see backend.ext.rate_limit_engine); [] when disabled.
     Usage in routes:
         @router.post("/chat", dependencies=limiter(30, 60))
     """
-    if not _HAS_FASTAPI_LIMITER:
-        return []
+    if _HAS_FASTAPI_LIMITER:
+        try:
+            # If FastAPILimiter.init() wasn't called (no redis), don't attach a dead dep
+            if getattr(FastAPILimiter, "redis", None) is not None:  # type: ignore[attr-defined]
+                return [Depends(RateLimiter(times=times, seconds=seconds))]  # type: ignore[misc]
+        except Exception as exc:
+            logger.debug("[rate-limit] fastapi-limiter unavailable: %s", exc)
 
-    try:
-        # If FastAPILimiter.init() wasn't called (no redis), don't attach a dead dep
-        if getattr(FastAPILimiter, "redis", None) is None:  # type: ignore[attr-defined]
-            return []
-        return [Depends(RateLimiter(times=times, seconds=seconds))]  # type: ignore[misc]
-    except Exception as exc:
-        logger.debug("[rate-limit] fallback to no-op: %s", exc)
-        return []
+    if native_enabled():
+        return [Depends(limit_dependency(times, seconds))]
+    return []
 
 __all__ = ["init_rate_limit", "limiter"]
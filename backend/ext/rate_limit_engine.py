@@ -0,0 +1,315 @@
+# backend/ext/rate_limit_engine.py
+"""
+Limitador nativo (GCRA) detrás de ``backend.rate_limit.limit`` y
+``backend.ext.rate_limit.limiter``.
+
+GCRA guarda un solo número por clave (TAT, "theoretical arrival time"):
+permite ráfagas de hasta ``limit`` peticiones y luego una cada
+``window / limit`` segundos, equivalente a una ventana deslizante sin guardar
+cada timestamp.
+
+Backends:
+  - memoria (por defecto): dicts repartidos en shards con su propio lock;
+    las claves vencidas se purgan cada ``purge_interval`` segundos al pasar.
+    Es por proceso (con N workers el límite efectivo es N veces mayor).
+  - redis (``RATE_LIMIT_BACKEND=redis``): script Lua, un round trip por
+    petición, reloj del servidor Redis (compartido entre réplicas). Si Redis
+    falla se usa la memoria local en lugar de dejar pasar todo.
+
+Claves: ``<scope>|<identidad>``. El scope es la ruta; la identidad sale de
+``RATE_LIMIT_KEY_STRATEGY`` (usuario del JWT o IP) y, con ``per="sender"``,
+se le suma el ``sender``/``sender_id`` del body (p. ej. /api/chat):
+``ip:1.2.3.4|s:abc``. Así rotar el sender no esquiva el límite de otro
+cliente ni un cliente agota el de un sender ajeno; ``skip_admin`` sigue
+eximiendo a los admins también en estas rutas.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import math
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+from backend.config.settings import settings
+from backend.utils.logging import get_logger
+
+from .redis_client import get_redis
+
+log = get_logger(__name__)
+
+_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_RULE_RE = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d*)\s*(second|minute|hour|day)s?\s*$", re.IGNORECASE)
+
+# KEYS[1]=clave · ARGV: intervalo_ms, ventana_ms → 0 si pasa, si no ms a esperar
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - window
+if now < allow_at then return allow_at - now end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return 0
+"""
+
+
+def parse_rule(rule: str) -> Tuple[int, float]:
+    """``"60/minute"`` → (60, 60.0). También ``"10 per 5 seconds"``."""
+    m = _RULE_RE.match(rule or "")
+    if not m:
+        raise ValueError(f"Regla de rate limit inválida: {rule!r}")
+    times, mult, unit = int(m.group(1)), int(m.group(2) or 1), m.group(3).lower()
+    return max(1, times), float(mult * _UNITS[unit])
+
+
+# ─────────────────────────────
+# Memoria
+# ─────────────────────────────
+class _Shard:
+    __slots__ = ("lock", "tat", "last_purge")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.tat: Dict[str, float] = {}
+        self.last_purge = time.monotonic()
+
+
+class MemoryGCRA:
+    def __init__(self, shards: int = 16, purge_interval: float = 60.0) -> None:
+        self._shards: List[_Shard] = [_Shard() for _ in range(max(1, int(shards)))]
+        self.purge_interval = purge_interval
+
+    def hit(self, key: str, limit: int, window: float, now: Optional[float] = None) -> float:
+        """Registra una petición; 0.0 si pasa, si no segundos hasta poder reintentar."""
+        now = time.monotonic() if now is None else now
+        interval = window / limit
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            if now - shard.last_purge >= self.purge_interval:
+                shard.tat = {k: v for k, v in shard.tat.items() if v > now}
+                shard.last_purge = now
+            tat = max(shard.tat.get(key, now), now)
+            new_tat = tat + interval
+            allow_at = new_tat - window
+            if now < allow_at:
+                return allow_at - now
+            shard.tat[key] = new_tat
+            return 0.0
+
+    def __len__(self) -> int:
+        return sum(len(s.tat) for s in self._shards)
+
+
+# ─────────────────────────────
+# Motor
+# ─────────────────────────────
+class RateLimitEngine:
+    def __init__(
+        self,
+        backend: str = "memory",
+        *,
+        shards: int = 16,
+        prefix: str = "rl:",
+        redis_retry_sec: float = 30.0,
+        get_redis_client: Callable[[], Any] = get_redis,
+    ) -> None:
+        self.backend = backend
+        self.prefix = prefix
+        self.redis_retry_sec = redis_retry_sec
+        self.memory = MemoryGCRA(shards=shards)
+        self._get_redis_client = get_redis_client
+        self._script: Optional[Any] = None
+        self._script_client: Optional[Any] = None
+        self._redis_down_until = 0.0
+        self.allowed = 0
+        self.rejected: Dict[str, int] = {}
+        self.redis_errors = 0
+
+    async def _redis_hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        if self.backend != "redis" or time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            client = await self._get_redis_client()
+            if client is None:
+                self._redis_down_until = time.monotonic() + self.redis_retry_sec
+                return None
+            if self._script_client is not client:
+                self._script = client.register_script(_GCRA_SCRIPT)
+                self._script_client = client
+            wait_ms = await self._script(
+                keys=[self.prefix + key],
+                args=[max(1, int(window * 1000 / limit)), int(window * 1000)],
+            )
+            return int(wait_ms) / 1000.0
+        except Exception as e:
+            self.redis_errors += 1
+            self._redis_down_until = time.monotonic() + self.redis_retry_sec
+            log.warning(f"[rate-limit] Redis no disponible ({e}); límite en memoria {self.redis_retry_sec:.0f}s")
+            return None
+
+    async def hit(self, scope: str, identity: str, limit: int, window: float) -> float:
+        key = f"{scope}|{identity}"
+        wait = await self._redis_hit(key, limit, window)
+        if wait is None:
+            wait = self.memory.hit(key, limit, window)
+        if wait > 0:
+            self.rejected[scope] = self.rejected.get(scope, 0) + 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "allowed": self.allowed,
+            "rejected": sum(self.rejected.values()),
+            "rejected_by_route": dict(self.rejected),
+            "memory_keys": len(self.memory),
+            "redis_errors": self.redis_errors,
+        }
+
+
+engine = RateLimitEngine(
+    backend=settings.rate_limit_backend,
+    shards=settings.rate_limit_shards,
+)
+
+
+def rate_limit_stats() -> Dict[str, Any]:
+    return engine.stats()
+
+
+def native_enabled() -> bool:
+    return bool(settings.rate_limit_enabled) and settings.rate_limit_provider in (None, "builtin")
+
+
+# ─────────────────────────────
+# Claves
+# ─────────────────────────────
+def _client_ip(request: Request) -> str:
+    ip = getattr(request.state, "ip", None)
+    if ip:
+        return str(ip)
+    return request.client.host if request.client else "-"
+
+
+def client_identity(request: Request) -> Optional[str]:
+    """Identidad según RATE_LIMIT_KEY_STRATEGY; None = no limitar (admin con skip_admin)."""
+    strategy = settings.rate_limit_key_strategy
+    claims = getattr(request.state, "user", None) or {}
+    if strategy == "skip_admin" and (claims.get("rol") or claims.get("role")) == "admin":
+        return None
+    if strategy != "ip":
+        sub = claims.get("sub") or claims.get("email")
+        if sub:
+            return f"u:{sub}"
+    return f"ip:{_client_ip(request)}"
+
+
+def _sender_identity(kwargs: Dict[str, Any]) -> Optional[str]:
+    for name in ("sender_id", "sender"):
+        if isinstance(kwargs.get(name), str) and kwargs[name]:
+            return kwargs[name]
+    for value in kwargs.values():
+        sender = getattr(value, "sender_id", None) or getattr(value, "sender", None)
+        if isinstance(sender, str) and sender:
+            return sender
+    return None
+
+
+def _reject(wait: float, limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Demasiadas solicitudes, intenta de nuevo en unos segundos.",
+        headers={"Retry-After": str(max(1, math.ceil(wait))), "X-RateLimit-Limit": str(limit)},
+    )
+
+
+async def enforce(request: Request, scope: str, limit: int, window: float, identity: Optional[str] = None) -> None:
+    identity = identity or client_identity(request)
+    if identity is None:
+        return
+    wait = await engine.hit(scope, identity, limit, window)
+    if wait > 0:
+        raise _reject(wait, limit)
+
+
+# ─────────────────────────────
+# Integración con FastAPI
+# ─────────────────────────────
+def _typed_signature(fn: Callable[..., Any]) -> inspect.Signature:
+    # Resuelve anotaciones en string (from __future__ import annotations) con
+    # los globals del endpoint: el wrapper vive en otro módulo.
+    try:
+        from fastapi.dependencies.utils import get_typed_signature
+
+        sig = get_typed_signature(fn)
+        ret = inspect.signature(fn).return_annotation
+        if isinstance(ret, str):
+            ret = getattr(fn, "__globals__", {}).get(ret, inspect.Signature.empty)
+        return sig.replace(return_annotation=ret)
+    except Exception:
+        return inspect.signature(fn)
+
+
+def limit_decorator(rule: str, per: str = "client") -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorador para endpoints (sync o async); agrega ``Request`` si el endpoint no lo recibe."""
+    times, window = parse_rule(rule)
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        scope = f"{fn.__module__}.{fn.__qualname__}"
+        sig = _typed_signature(fn)
+        request_param = next(
+            (p.name for p in sig.parameters.values() if p.annotation is Request), None
+        )
+        injected = request_param is None
+        if injected:
+            request_param = "_rl_request"
+            params = list(sig.parameters.values())
+            extra = inspect.Parameter(request_param, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            # los keyword-only van después de todo lo posicional y antes de **kwargs
+            idx = next((i for i, p in enumerate(params) if p.kind is inspect.Parameter.VAR_KEYWORD), len(params))
+            params.insert(idx, extra)
+            sig = sig.replace(parameters=params)
+        is_async = inspect.iscoroutinefunction(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request = kwargs.pop(request_param) if injected else kwargs.get(request_param)
+            if request is not None:
+                identity = client_identity(request)
+                if identity is not None:  # None = admin exento (skip_admin)
+                    sender = _sender_identity(kwargs) if per == "sender" else None
+                    if sender:
+                        identity = f"{identity}|s:{sender}"
+                    await enforce(request, scope, times, window, identity)
+            if is_async:
+                return await fn(*args, **kwargs)
+            return await run_in_threadpool(fn, *args, **kwargs)
+
+        wrapper.__signature__ = sig  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+def limit_dependency(times: int, seconds: int) -> Callable[..., Any]:
+    """Dependencia ``Depends(...)`` con clave por ruta + cliente."""
+    window = float(max(1, seconds))
+    times = max(1, times)
+
+    async def _dependency(request: Request) -> None:
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or request.url.path
+        await enforce(request, f"{request.method} {path}", times, window)
+
+    return _dependency
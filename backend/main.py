@@ -3,7 +3,9 @@ from __future__ import annotations
 from dotenv import load_dotenv
 load_dotenv()
 
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request, APIRouter
@@ -17,11 +19,7 @@ log = get_logger(__name__)
 
 from backend.config.settings import settings
 
-from backend.middleware.request_id import RequestIdMiddleware
-from backend.middleware.request_meta_middleware import request_meta_middleware
-from backend.middleware.log_middleware import LoggingMiddleware
-from backend.middleware.access_log_middleware import AccessLogMiddleware
-from backend.middleware.auth_middleware import AuthMiddleware
+from backend.middleware.http_pipeline import HttpPipelineMiddleware
 
 from backend.routes import router as api_router
 from backend.controllers import admin_controller as admin_ctrl
@@ -33,15 +31,22 @@ from backend.routes.chat import router as root_router, chat_router as chat_api_r
 
 from backend.ext.rate_limit import init_rate_limit
 from backend.ext.redis_client import close_redis
+from backend.services.rasa_client import get_rasa_client, close_rasa_client
+from backend.services.rasa_router import rasa_router
+from backend.services.chat_stream import close_chat_stream
+from backend.services.jwt_cache import jwks_store
+from backend.services.log_service import access_log_sink
+from backend.services.message_logger import chat_log_sink, messages_sink
+from backend.services.password_hasher import HashingOverloaded, password_hasher
+from backend.services.stats_rollup import stats_rollup_job
 
 from backend.db.mongodb import get_database 
+from backend.db.mongodb_async import get_async_client, close_async_client
+from backend.db.indexes import aplicar_indices
 
-from backend.middleware.cors_csp import add_cors_and_csp
-from backend.middleware.permissions_policy import add_permissions_policy
 from pymongo import MongoClient
 
 from fastapi.openapi.docs import get_swagger_ui_oauth2_redirect_html
-from starlette.middleware.base import BaseHTTPMiddleware
 from backend.routes.chat_proxy import router as chat_proxy_router
 
 # ─────────────────────────────────────────
@@ -60,37 +65,40 @@ STATIC_DIR = Path(settings.static_dir).resolve()
 logger = log
 
 
-def _parse_csv_or_space(v: str):
-    s = (v or "").strip()
-    if not s:
-        return []
-    if "," in s:
-        return [x.strip() for x in s.split(",") if x.strip()]
-    return [x.strip() for x in s.split() if x.strip()]
-
-
-class CSPMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response: Response = await call_next(request)
-
-        csp = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline'; "   
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data: blob:; "
-            "font-src 'self'; "
-            "connect-src 'self'; "
-            "frame-ancestors 'self'; "
-            "base-uri 'self'; "
-            "form-action 'self';"
-        )
-
-        response.headers["Content-Security-Policy"] = csp
-        return response
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Recursos compartidos de larga vida (pools de conexiones)
+    get_rasa_client()
+    rasa_router.start()
+    get_async_client()
+    if settings.mongo_indexes_on_startup:
+        reporte = await asyncio.to_thread(aplicar_indices)
+        if reporte["created"] or reporte["ttl_updated"]:
+            log.info(f"🗂️ Índices creados: {reporte['created']} · TTL ajustados: {reporte['ttl_updated']}")
+        for err in reporte["errors"]:
+            log.warning(f"⚠️ Índices: {err}")
+    for sink in (access_log_sink, chat_log_sink, messages_sink):
+        sink.start()
+    jwks_store.start()
+    stats_rollup_job.start()
+    try:
+        yield
+    finally:
+        await stats_rollup_job.stop()
+        await jwks_store.stop()
+        for sink in (access_log_sink, chat_log_sink, messages_sink):
+            await sink.stop()
+        await rasa_router.stop()
+        await close_rasa_client()
+        await close_chat_stream()
+        close_async_client()
+        await close_redis()
+        password_hasher.shutdown()
 
 
 def create_app() -> FastAPI:
     app = FastAPI(
+        lifespan=lifespan,
         debug=settings.debug,
         title="Zajuna Chat Backend",
         description="Backend para intents, autenticación, logs y estadísticas",
@@ -99,33 +107,30 @@ def create_app() -> FastAPI:
         redoc_url=None,  
     )
 
-    # Permissions-Policy
-    app_env = (getattr(settings, "app_env", None) or os.getenv("APP_ENV") or "prod").lower()
-    add_permissions_policy(app, preset="relaxed" if app_env == "dev" else "strict")
-    add_permissions_policy(
-        app,
-        policy=getattr(settings, "permissions_policy_effective", None),
-        add_legacy_feature_policy=True,
-    )
-
-    # CORS
+    # CORS (union ALLOWED_ORIGINS + EMBED_ALLOWED_ORIGINS)
+    cors_origins = settings.allowed_origins_list or ["*"]
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=getattr(settings, "allowed_origins_list", settings.allowed_origins),
+        allow_origins=cors_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Request-ID"],
+        max_age=86400,
     )
- 
-    add_cors_and_csp(app)
-    app.add_middleware(CSPMiddleware)
 
-    # Middlewares varios
-    app.add_middleware(RequestIdMiddleware, header_name="X-Request-ID")
-    app.middleware("http")(request_meta_middleware)
-    app.add_middleware(LoggingMiddleware)
-    app.add_middleware(AccessLogMiddleware)
-    app.add_middleware(AuthMiddleware)
+    # IP/UA, request-id, claims, cabeceras de seguridad, timing y access log
+    # en un único middleware ASGI (sin BaseHTTPMiddleware; no rompe streaming)
+    app.add_middleware(HttpPipelineMiddleware, header_name="X-Request-ID")
+
+    # Pool de hashing saturado (ráfaga de logins): 503 inmediato con Retry-After
+    @app.exception_handler(HashingOverloaded)
+    async def hashing_overloaded(request: Request, exc: HashingOverloaded):
+        return JSONResponse(
+            {"detail": "Servicio de autenticación saturado, reintenta en unos segundos."},
+            status_code=503,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
 
     # Static
     Path(STATIC_DIR).mkdir(parents=True, exist_ok=True)
@@ -153,18 +158,6 @@ def create_app() -> FastAPI:
  
     app.include_router(api)
 
-    # CSP adicional para frame-ancestors
-    @app.middleware("http")
-    async def _csp_headers(request: Request, call_next):
-        resp = await call_next(request)
-        if "Content-Security-Policy" not in resp.headers:
-            raw_env = os.getenv("EMBED_ALLOWED_ORIGINS", "")
-            env_anc = _parse_csv_or_space(raw_env)
-            ancestors = env_anc if env_anc else (settings.frame_ancestors or ["'self'"])
-            resp.headers["Content-Security-Policy"] = f"frame-ancestors {' '.join(ancestors)};"
-            resp.headers["X-Frame-Options"] = "SAMEORIGIN"
-        return resp
-
     FRONT_BASE = (settings.frontend_site_url or "").rstrip("/")
 
     @app.get("/health", include_in_schema=False)
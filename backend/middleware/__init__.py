@@ -1,6 +1,7 @@
 # backend/middleware/__init__.py
 from .access_log_middleware import AccessLogMiddleware
 from .auth_middleware import AuthMiddleware
+from .http_pipeline import HttpPipelineMiddleware
 from .log_middleware import LoggingMiddleware
 from .request_id import RequestIdMiddleware, get_request_id
 from .request_meta_middleware import request_meta_middleware  # ✅ nombre real del archivo
@@ -8,6 +9,7 @@ from .request_meta_middleware import request_meta_middleware  # ✅ nombre real
 __all__ = [
     "AccessLogMiddleware",
     "AuthMiddleware",
+    "HttpPipelineMiddleware",
     "LoggingMiddleware",
     "RequestIdMiddleware",
     "get_request_id",
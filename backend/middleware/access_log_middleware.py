@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from backend.services.log_service import log_access_middleware
+from backend.services.log_service import log_access_middleware_async
 
 class AccessLogMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -14,7 +14,7 @@ class AccessLogMiddleware(BaseHTTPMiddleware):
         ua = getattr(request.state, "user_agent", None) or request.headers.get("user-agent")
 
         try:
-            log_access_middleware(
+            await log_access_middleware_async(
                 endpoint=str(request.url.path),
                 method=request.method,
                 status=response.status_code,
@@ -1,6 +1,8 @@
 # backend/middleware/auth_middleware.py
 from __future__ import annotations
 
+from typing import Any, Dict, Optional
+
 from fastapi import Request
 from fastapi.security.utils import get_authorization_scheme_param
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -10,15 +12,9 @@ from backend.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
-# Probamos primero jwt_manager
+# Un único decodificador por petición: jwt_service (HS*/RS*/JWKS con caché de
+# claims verificados). jwt_manager queda solo como respaldo si no se puede importar.
 _decode_funcs = []
-try:
-    from backend.utils.jwt_manager import decode_token as _jm_decode  # type: ignore
-    _decode_funcs.append(("jwt_manager.decode_token", _jm_decode))
-except Exception:
-    pass
-
-# Luego jwt_service (si existe)
 try:
     from backend.services import jwt_service  # type: ignore
     _decode_funcs.append(("jwt_service.decode_token", getattr(jwt_service, "decode_token")))
@@ -31,6 +27,16 @@ try:
     })
 except Exception:
     jwt_service = None  # type: ignore
+    try:
+        from backend.utils.jwt_manager import decode_token as _jm_decode  # type: ignore
+
+        def _jm_decode_header(auth_header: str) -> Optional[Dict[str, Any]]:
+            _, raw = get_authorization_scheme_param(auth_header or "")
+            return _jm_decode(raw)
+
+        _decode_funcs.append(("jwt_manager.decode_token", _jm_decode_header))
+    except Exception:
+        pass
     FAKE_TOKEN = "FAKE_TOKEN_ZAJUNA"
     FAKE_CLAIMS = {
         "sub": "demo_user",
@@ -40,39 +46,45 @@ except Exception:
     }
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+def resolve_user_claims(auth_header: str) -> Optional[Dict[str, Any]]:
     """
-    Middleware de identificación:
-      - Si DEMO_MODE y token == FAKE_TOKEN_ZAJUNA → asigna claims de demo.
-      - Si hay Authorization Bearer → intenta decodificar con jwt_manager / jwt_service.
-      - Nunca bloquea: autorización se hace en endpoints con require_role/Depends.
+    Claims del usuario a partir del header Authorization (o None).
+      - Si DEMO_MODE y token == FAKE_TOKEN_ZAJUNA → claims de demo.
+      - Si hay Authorization Bearer → una verificación con jwt_service (cacheada por token).
     """
-    async def dispatch(self, request: Request, call_next):
-        auth_header = request.headers.get("Authorization", "")
-        scheme, token = get_authorization_scheme_param(auth_header)
+    scheme, token = get_authorization_scheme_param(auth_header or "")
+
+    # DEMO
+    if settings.demo_mode and token == FAKE_TOKEN:
+        return FAKE_CLAIMS
 
-        # DEMO
-        if settings.demo_mode and token == FAKE_TOKEN:
-            request.state.user = FAKE_CLAIMS
-            return await call_next(request)
+    # Bearer real
+    if (scheme or "").lower() == "bearer" and token:
+        for name, fn in _decode_funcs:
+            try:
+                result = fn(auth_header)  # tus funciones suelen aceptar el header completo
+                claims = None
+                if isinstance(result, tuple) and len(result) == 2:
+                    is_valid, payload = result
+                    claims = payload if is_valid else None
+                else:
+                    claims = result  # algunas devuelven directamente el dict
 
-        # Bearer real
-        if (scheme or "").lower() == "bearer" and token:
-            for name, fn in _decode_funcs:
-                try:
-                    result = fn(auth_header)  # tus funciones suelen aceptar el header completo
-                    claims = None
-                    if isinstance(result, tuple) and len(result) == 2:
-                        is_valid, payload = result
-                        claims = payload if is_valid else None
-                    else:
-                        claims = result  # algunas devuelven directamente el dict
+                if isinstance(claims, dict) and claims:
+                    logger.debug(f"[auth] Token válido por {name} ({claims.get('email')})")
+                    return claims
+            except Exception as e:
+                logger.debug(f"[auth] {name} falló: {e}")
+    return None
 
-                    if isinstance(claims, dict) and claims:
-                        request.state.user = claims
-                        logger.debug(f"[auth] Token válido por {name} ({claims.get('email')})")
-                        break
-                except Exception as e:
-                    logger.debug(f"[auth] {name} falló: {e}")
 
+class AuthMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware de identificación (ver resolve_user_claims).
+    Nunca bloquea: autorización se hace en endpoints con require_role/Depends.
+    """
+    async def dispatch(self, request: Request, call_next):
+        claims = resolve_user_claims(request.headers.get("Authorization", ""))
+        if claims is not None:
+            request.state.user = claims
         return await call_next(request)
@@ -0,0 +1,145 @@
+# backend/middleware/http_pipeline.py
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.middleware.auth_middleware import resolve_user_claims
+from backend.middleware.request_id import REQUEST_ID_CTX_KEY
+from backend.services.log_service import log_access_middleware_async
+from backend.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# CSP efectiva del stack anterior (CSPMiddleware era la última en escribirla)
+DEFAULT_CSP = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline'; "
+    "style-src 'self' 'unsafe-inline'; "
+    "img-src 'self' data: blob:; "
+    "font-src 'self'; "
+    "connect-src 'self'; "
+    "frame-ancestors 'self'; "
+    "base-uri 'self'; "
+    "form-action 'self';"
+)
+
+SECURITY_HEADERS: Dict[str, str] = {
+    "Content-Security-Policy": DEFAULT_CSP,
+    "X-Frame-Options": "SAMEORIGIN",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "X-Content-Type-Options": "nosniff",
+    "X-XSS-Protection": "0",
+    "Permissions-Policy": "geolocation=(), microphone=(), camera=(), payment=()",
+}
+
+
+def _best_ip(headers: Dict[bytes, bytes], client: Optional[Tuple[str, int]]) -> Optional[str]:
+    xff = headers.get(b"x-forwarded-for")
+    if xff:
+        return xff.decode("latin-1").split(",")[0].strip()
+    real = headers.get(b"x-real-ip")
+    if real:
+        return real.decode("latin-1")
+    return client[0] if client else None
+
+
+class HttpPipelineMiddleware:
+    """
+    Middleware ASGI puro que reemplaza la cadena de BaseHTTPMiddleware
+    (RequestId, request_meta, Logging, AccessLog, Auth, CSP, Permissions-Policy)
+    en una sola pasada:
+      - request.state.ip / request.state.user_agent
+      - X-Request-ID (reutiliza el del cliente o genera UUID4) + ContextVar
+      - request.state.user con los claims del Authorization (nunca bloquea)
+      - cabeceras de seguridad en la respuesta
+      - log de método/ruta/status/duración y encolado del access log
+
+    No envuelve el body: las respuestas streaming pasan sin buffering.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        header_name: str = "X-Request-ID",
+        security_headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.app = app
+        self.header_name = header_name
+        self._rid_key = header_name.lower().encode("latin-1")
+        headers = SECURITY_HEADERS if security_headers is None else security_headers
+        self._static_headers: List[Tuple[bytes, bytes]] = [
+            (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()
+        ]
+        self._override = {k for k, _ in self._static_headers} | {self._rid_key}
+
+    def _response_headers(self, current: Iterable[Tuple[bytes, bytes]], rid: str) -> List[Tuple[bytes, bytes]]:
+        raw = [(k, v) for k, v in current if k.lower() not in self._override]
+        raw.extend(self._static_headers)
+        raw.append((self._rid_key, rid.encode("latin-1")))
+        return raw
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers: Dict[bytes, bytes] = {}
+        for k, v in scope.get("headers") or []:
+            headers.setdefault(k, v)
+
+        rid_raw = headers.get(self._rid_key)
+        rid = rid_raw.decode("latin-1") if rid_raw else str(uuid4())
+
+        ip = _best_ip(headers, scope.get("client"))
+        ua = headers.get(b"user-agent", b"").decode("latin-1")
+        auth = headers.get(b"authorization", b"").decode("latin-1")
+
+        state = scope.setdefault("state", {})
+        state["ip"] = ip
+        state["user_agent"] = ua
+        user = resolve_user_claims(auth) if auth else None
+        if user is not None:
+            state["user"] = user
+
+        method = scope.get("method", "")
+        path = scope.get("path", "")
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = self._response_headers(message.get("headers") or [], rid)
+            await send(message)
+
+        token = REQUEST_ID_CTX_KEY.set(rid)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            dur_ms = int((time.perf_counter() - start) * 1000)
+            logger.exception(f"[{rid}] {method} {path} -> 500 ({dur_ms}ms) ip={ip} ua={ua}")
+            raise
+        else:
+            dur_ms = int((time.perf_counter() - start) * 1000)
+            user = state.get("user")
+            email = user.get("email") if isinstance(user, dict) else getattr(user, "email", None)
+            logger.info(f"[{rid}] {method} {path} -> {status} ({dur_ms}ms) ip={ip} ua={ua} user={email or '-'}")
+            try:
+                await log_access_middleware_async(
+                    endpoint=path,
+                    method=method,
+                    status=status,
+                    ip=ip,
+                    user_agent=ua,
+                    user=user,
+                )
+            except Exception:
+                # Nunca romper respuesta por fallo de logging
+                pass
+        finally:
+            REQUEST_ID_CTX_KEY.reset(token)
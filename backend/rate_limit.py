@@ -4,8 +4,11 @@ Lightweight adapter for request rate limiting.
 
 - set_limiter(limiter): register an object that implements .limit(rule) -> decorator.
 - get_limiter(): returns the currently registered limiter (or None).
-- limit(rule): returns a decorator. If a real limiter is set and exposes .limit,
-  that decorator is used; otherwise a no-op decorator is returned.
+- limit(rule, per="client"): returns a decorator. If a real limiter is set and
+  exposes .limit, that decorator is used; otherwise the built-in GCRA limiter
+  (backend.ext.rate_limit_engine) is applied, or a no-op when
+  RATE_LIMIT_ENABLED=false / RATE_LIMIT_PROVIDER is an external provider.
+  per="sender" keys the limit by the body's sender/sender_id instead of the client.
 """
 
 import functools
@@ -27,12 +30,16 @@ def _noop_limit(rule: str) -> Callable[[F], F]:
         return fn
     return _decorator  # type: ignore[return-value]
 
-def limit(rule: str) -> Callable[[F], F]:
+def limit(rule: str, per: str = "client") -> Callable[[F], F]:
     if _limiter is not None and hasattr(_limiter, "limit"):
         try:
             return _limiter.limit(rule)  # type: ignore[return-value]
         except Exception:
             return _noop_limit(rule)
+    from backend.ext.rate_limit_engine import limit_decorator, native_enabled
+
+    if native_enabled():
+        return limit_decorator(rule, per=per)  # type: ignore[return-value]
     return _noop_limit(rule)
 
 __all__ = ["set_limiter", "get_limiter", "limit"]
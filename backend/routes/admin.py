@@ -7,7 +7,6 @@ import os
 import subprocess
 from typing import Optional
 
-import httpx
 from bson.son import SON
 from fastapi import (
     APIRouter,
@@ -40,6 +39,7 @@ from backend.services.log_service import (
 )
 from backend.config.settings import settings
 from backend.middleware.request_id import get_request_id
+from backend.services.rasa_client import get_rasa_client
 
 router = APIRouter()
 
@@ -81,10 +81,9 @@ async def verificar_estado_rasa(current_user=Depends(require_role(["admin"]))):
 
     headers = {"X-Request-ID": get_request_id() or "-"}
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            res = await client.get(url, headers=headers)
-            res.raise_for_status()
-            data = res.json()
+        res = await get_rasa_client().get(url, headers=headers, timeout=10)
+        res.raise_for_status()
+        data = res.json()
 
         logger.info("✅ Rasa respondió /status ok")
 
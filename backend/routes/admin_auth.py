@@ -18,42 +18,19 @@ import jwt
 from backend.rate_limit import limit
 
 # ─────────────────────────────────────────────────────────────
-# Hashing: bcrypt → passlib → error (en ese orden)
+# Hashing: bcrypt en pool acotado (saturado → HashingOverloaded → 503)
 # ─────────────────────────────────────────────────────────────
-_HASH_IMPL = "none"
-try:
-    import bcrypt as _bcrypt  # pip install bcrypt
-    _HASH_IMPL = "bcrypt"
-
-    def _hash_password(pw: str) -> str:
-        return _bcrypt.hashpw(pw.encode("utf-8"), _bcrypt.gensalt()).decode("utf-8")
+from backend.services.password_hasher import password_hasher
 
-    def _verify_password(pw: str, pw_hash: str) -> bool:
-        try:
-            return _bcrypt.checkpw(pw.encode("utf-8"), pw_hash.encode("utf-8"))
-        except Exception:
-            return False
-except Exception:
-    try:
-        from passlib.hash import bcrypt as _pbcrypt  # pip install passlib[bcrypt]
-        _HASH_IMPL = "passlib"
+_HASH_IMPL = "bcrypt"
 
-        def _hash_password(pw: str) -> str:
-            return _pbcrypt.hash(pw)
 
-        def _verify_password(pw: str, pw_hash: str) -> bool:
-            try:
-                return _pbcrypt.verify(pw, pw_hash)
-            except Exception:
-                return False
-    except Exception:
-        _HASH_IMPL = "none"
+def _hash_password(pw: str) -> str:
+    return password_hasher.hash(pw)
 
-        def _hash_password(pw: str) -> str:  # pragma: no cover
-            raise RuntimeError("Instala 'bcrypt' o 'passlib[bcrypt]' para hashing")
 
-        def _verify_password(pw: str, pw_hash: str) -> bool:  # pragma: no cover
-            return False
+def _verify_password(pw: str, pw_hash: str) -> bool:
+    return password_hasher.verify(pw, pw_hash)
 
 # ─────────────────────────────────────────────────────────────
 # Mongo: preferimos helpers; si faltan, fallback PyMongo
@@ -89,10 +66,6 @@ def _col_refresh_tokens():
     return _db()["admin_refresh_tokens"]
 
 
-def _col_attempts():
-    return _db()["auth_attempts"]
-
-
 def _col_resets():
     return _db()["admin_password_resets"]
 
@@ -125,37 +98,8 @@ except Exception:
         return ok, ([] if ok else ["La contraseña debe tener al menos 8 caracteres."])
 
 
-try:
-    from backend.services.security import (  # type: ignore
-        register_failed_attempt, reset_attempts, is_locked
-    )
-except Exception:
-    # Fallbacks simples sobre la colección auth_attempts
-    def register_failed_attempt(email: str, ip: str, lock_minutes: int, max_attempts: int):
-        col = _col_attempts()
-        now = datetime.now(timezone.utc)
-        doc = col.find_one({"email": email})
-        if not doc:
-            col.insert_one({"email": email, "fail_count": 1, "ip": ip, "lock_until": None, "updated_at": now})
-            return
-        cnt = int(doc.get("fail_count", 0)) + 1
-        lock_until = doc.get("lock_until")
-        if cnt >= max_attempts:
-            lock_until = now + timedelta(minutes=lock_minutes)
-            cnt = 0  # reinicia contador tras bloquear
-        col.update_one({"email": email}, {"$set": {"fail_count": cnt, "ip": ip, "lock_until": lock_until, "updated_at": now}})
-
-    def reset_attempts(email: str):
-        _col_attempts().update_one({"email": email}, {"$set": {"fail_count": 0, "lock_until": None}})
-
-    def is_locked(email: str) -> bool:
-        doc = _col_attempts().find_one({"email": email})
-        if not doc:
-            return False
-        until = doc.get("lock_until")
-        if not until:
-            return False
-        return datetime.now(timezone.utc) < until
+# Intentos fallidos / bloqueo: Redis (INCR atómico) o memoria, sin Mongo
+from backend.services.security import register_failed_attempt, reset_attempts, is_locked
 
 
 # ─────────────────────────────────────────────────────────────
@@ -358,10 +302,6 @@ async def ensure_admin_indexes():
         _col_refresh_tokens().create_index("user_id", name="user_idx")
     except Exception:
         pass
-    try:
-        _col_attempts().create_index("email", name="attempts_email_idx", unique=True)
-    except Exception:
-        pass
     try:
         _col_resets().create_index([("expires_at", 1)], expireAfterSeconds=0, name="ttl_pwresets")
         _col_resets().create_index("token_hash", name="token_hash_pwreset", unique=True)
@@ -421,10 +361,17 @@ def _core_login(payload: AdminLoginIn, request: Request, response: Response) ->
 
     users = _users()
     doc = users.find_one({"email": email})
-    if not doc or not _verify_password(payload.password, doc.get("password_hash") or ""):
+    stored_hash = (doc or {}).get("password_hash") or ""
+    ok, new_hash = password_hasher.verify_and_update(payload.password, stored_hash) if doc else (False, None)
+    if not ok:
         register_failed_attempt(email=email, ip=ip, lock_minutes=LOGIN_BLOCK_MINUTES, max_attempts=LOGIN_MAX_ATTEMPTS)
         raise HTTPException(status_code=401, detail="Credenciales inválidas")
 
+    if new_hash:
+        # Cambió PASSWORD_BCRYPT_ROUNDS: se guarda el hash con el costo nuevo
+        # (condicionado al hash anterior por si cambió la contraseña en paralelo)
+        users.update_one({"_id": doc["_id"], "password_hash": stored_hash}, {"$set": {"password_hash": new_hash}})
+
     if not doc.get("active", True):
         raise HTTPException(status_code=403, detail="Usuario inactivo")
 
@@ -3,15 +3,18 @@ from __future__ import annotations
 
 from typing import Any, Dict, Optional
 
-import httpx
 from fastapi import APIRouter, Request
 from pydantic import BaseModel
 
 from backend.config.settings import settings
 from backend.middleware.request_id import get_request_id
 from backend.services.jwt_service import decode_token
+from backend.services.chat_service import degraded_responses
+from backend.services.rasa_breaker import CircuitOpen
+from backend.services.rasa_router import rasa_router
 from backend.utils.logging import get_logger
 from backend.rate_limit import limit
+from backend.ext.rate_limit import limiter
 
 log = get_logger(__name__)
 router = APIRouter(prefix="/api", tags=["api-chat"])
@@ -23,8 +26,8 @@ class ChatPayload(BaseModel):
     metadata: Dict[str, Any] = {}
 
 
-@router.post("/chat")
-@limit("60/minute")
+@router.post("/chat", dependencies=limiter(times=60, seconds=60))
+@limit("60/minute", per="sender")
 async def chat_proxy(payload: ChatPayload, request: Request):
     # 1) JWT → claims
     auth_header = request.headers.get("Authorization")
@@ -48,10 +51,13 @@ async def chat_proxy(payload: ChatPayload, request: Request):
         raise RuntimeError("RASA_URL no está configurado en settings.")
 
     log.debug(f"Proxy → Rasa: {rasa_url} (rid={rid})")
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(rasa_url, json=body, headers=headers)
-        resp.raise_for_status()
-        data = resp.json()
+    try:
+        resp = await rasa_router.post(payload.sender, rasa_url, json=body, headers=headers, timeout=30)
+    except CircuitOpen as e:
+        log.warning(f"{e}; respuesta degradada (rid={rid})")
+        return degraded_responses(payload.message)
+    resp.raise_for_status()
+    data = resp.json()
 
     log.info(f"Rasa responded (count={len(data)}, rid={rid})")
     return data
\ No newline at end of file
@@ -1,18 +1,27 @@
 # backend/routes/chat.py
 from __future__ import annotations
+import asyncio
 from datetime import datetime
 from time import perf_counter
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, Set
 from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, ConfigDict
 from backend.config.settings import settings
 from backend.middleware.request_id import get_request_id
 from backend.services.jwt_service import decode_token
-from backend.db.mongodb import get_logs_collection
-from backend.services.chat_service import process_user_message
+from backend.services.chat_service import canned_reply, degraded_responses, process_user_message
+from backend.services.chat_stream import sse_event, stream_chat_events
+from backend.services.rasa_client import get_rasa_client, rasa_client_stats
+from backend.services.rasa_breaker import CircuitOpen, rasa_breaker_stats
+from backend.services.rasa_router import rasa_router, rasa_router_stats
+from backend.services.jwt_cache import jwt_cache_stats
+from backend.services.log_service import access_log_sink
+from backend.services.message_logger import log_chat_turn, transcript_stats
 from backend.utils.logging import get_logger
 from backend.rate_limit import limit
 from backend.ext.rate_limit import limiter
+from backend.ext.rate_limit_engine import rate_limit_stats
 import httpx
 import os
 
@@ -62,25 +71,9 @@ async def chat_debug(request: Request):
     summary="Enviar mensaje al chatbot y registrar en MongoDB",
     dependencies=limiter(times=60, seconds=60),
 )
-@limit("60/minute")
+@limit("60/minute", per="sender")
 async def send_message_to_bot(data: ChatRequest, request: Request):
-    ip = (
-        getattr(request.state, "ip", None)
-        or request.headers.get("x-forwarded-for")
-        or (request.client.host if request.client else "unknown")
-    )
-    user_agent = getattr(request.state, "user_agent", None) or request.headers.get("user-agent", "")
-    rid = get_request_id()
-
-    # Validar JWT
-    auth_header = request.headers.get("Authorization")
-    is_valid, claims = decode_token(auth_header)
-
-    enriched_meta: Dict[str, Any] = dict(data.metadata or {})
-    enriched_meta["auth"] = {"hasToken": bool(is_valid), "claims": claims if is_valid else {}}
-
-    if "url" not in enriched_meta and "referer" in request.headers:
-        enriched_meta["url"] = request.headers.get("referer")
+    enriched_meta = _enriched_metadata(data, request)
 
     # Comunicación con Rasa
     t0 = perf_counter()
@@ -91,11 +84,122 @@ async def send_message_to_bot(data: ChatRequest, request: Request):
             sender_id=data.sender_id,
             metadata=enriched_meta,
         )
+    except CircuitOpen as e:
+        log.warning(f"⚡ {e}; respuesta degradada (sender={data.sender_id})")
+        bot_responses = degraded_responses(data.message)
+        enriched_meta["degraded"] = True
     except Exception as e:
         log.error(f"❌ Error al comunicar con Rasa ({settings.rasa_url}): {e}", exc_info=True)
         raise HTTPException(status_code=502, detail=f"Error al comunicar con Rasa: {str(e)}")
     latency_ms = int((perf_counter() - t0) * 1000)
 
+    await _log_turn(data, request, enriched_meta, bot_responses, latency_ms)
+    return bot_responses
+
+
+@chat_router.post(
+    "/stream",
+    summary="Enviar mensaje al chatbot con respuesta en streaming (SSE)",
+    dependencies=limiter(times=60, seconds=60),
+)
+@limit("60/minute", per="sender")
+async def send_message_to_bot_stream(data: ChatRequest, request: Request):
+    """
+    Igual que ``POST /chat`` pero responde ``text/event-stream``:
+      - ``delta``: texto parcial del LLM (``{"text": ...}``) a medida que se genera
+      - ``message``: lista final de respuestas de Rasa (misma forma que ``POST /chat``)
+      - ``error``: fallo al comunicar con Rasa (``{"detail": ...}``)
+        (con el circuito abierto se emite ``message`` con la respuesta degradada)
+      - ``done``: fin del flujo
+    Sin Redis para streaming solo se emiten ``message`` y ``done``.
+
+    El turno se registra siempre (``finally``), también si Rasa falla o el
+    cliente se desconecta a mitad del flujo: Rasa pudo haber procesado el
+    mensaje igual. En esos casos ``metadata.stream_status`` queda en
+    ``error`` o ``disconnected``.
+    """
+    enriched_meta = _enriched_metadata(data, request)
+
+    async def _events():
+        t0 = perf_counter()
+        first_delta_ms: Optional[int] = None
+        bot_responses: List[Dict[str, Any]] = []
+        status = "disconnected"  # si Starlette cancela el generador antes de terminar
+        try:
+            try:
+                async for event, payload in stream_chat_events(data.message, data.sender_id, enriched_meta):
+                    if event == "delta" and first_delta_ms is None:
+                        first_delta_ms = int((perf_counter() - t0) * 1000)
+                    if event == "message":
+                        bot_responses = payload
+                        status = "ok"
+                    yield sse_event(event, payload)
+            except CircuitOpen as e:
+                log.warning(f"⚡ {e}; respuesta degradada (sender={data.sender_id})")
+                bot_responses = degraded_responses(data.message)
+                enriched_meta["degraded"] = True
+                status = "ok"
+                yield sse_event("message", bot_responses)
+            except Exception as e:
+                log.error(f"❌ Error al comunicar con Rasa ({settings.rasa_url}): {e}", exc_info=True)
+                status = "error"
+                yield sse_event("error", {"detail": f"Error al comunicar con Rasa: {str(e)}"})
+            yield sse_event("done", {})
+        finally:
+            enriched_meta["first_delta_ms"] = first_delta_ms
+            if status != "ok":
+                enriched_meta["stream_status"] = status
+            # shield: una cancelación del generador no corta la escritura del log
+            await asyncio.shield(
+                _spawn_log_turn(data, request, enriched_meta, bot_responses, int((perf_counter() - t0) * 1000))
+            )
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _enriched_metadata(data: ChatRequest, request: Request) -> Dict[str, Any]:
+    # Validar JWT
+    auth_header = request.headers.get("Authorization")
+    is_valid, claims = decode_token(auth_header)
+
+    enriched_meta: Dict[str, Any] = dict(data.metadata or {})
+    enriched_meta["auth"] = {"hasToken": bool(is_valid), "claims": claims if is_valid else {}}
+
+    if "url" not in enriched_meta and "referer" in request.headers:
+        enriched_meta["url"] = request.headers.get("referer")
+    return enriched_meta
+
+
+# Logs de turnos en vuelo: referencia fuerte para que terminen aunque el
+# generador SSE que los lanzó se haya cancelado
+_log_tasks: Set[asyncio.Task] = set()
+
+
+def _spawn_log_turn(*args: Any) -> asyncio.Task:
+    task = asyncio.ensure_future(_log_turn(*args))
+    _log_tasks.add(task)
+    task.add_done_callback(_log_tasks.discard)
+    return task
+
+
+async def _log_turn(
+    data: ChatRequest,
+    request: Request,
+    enriched_meta: Dict[str, Any],
+    bot_responses: List[Dict[str, Any]],
+    latency_ms: int,
+) -> None:
+    ip = (
+        getattr(request.state, "ip", None)
+        or request.headers.get("x-forwarded-for")
+        or (request.client.host if request.client else "unknown")
+    )
+    user_agent = getattr(request.state, "user_agent", None) or request.headers.get("user-agent", "")
+
     # Intent detectado
     intent = None
     try:
@@ -109,7 +213,7 @@ async def send_message_to_bot(data: ChatRequest, request: Request):
 
     # Guardar log
     log_doc = {
-        "request_id": rid,
+        "request_id": get_request_id(),
         "sender_id": data.sender_id,
         "user_message": data.message,
         "bot_response": [r.get("text") if isinstance(r, dict) else str(r) for r in (bot_responses or [])],
@@ -122,27 +226,16 @@ async def send_message_to_bot(data: ChatRequest, request: Request):
         "latency_ms": latency_ms,
     }
     try:
-        get_logs_collection().insert_one(log_doc)
+        await log_chat_turn(log_doc)
     except Exception as e:
-        log.warning(f"No se pudo guardar el log en Mongo: {e}")
-
-    return bot_responses
+        log.warning(f"No se pudo encolar el log de chat: {e}")
 
 
 # ==== Demo ====
 @chat_router.post("/demo", summary="Demo sin conexión Rasa")
 async def chat_demo(data: ChatRequest):
     """Respuesta local de prueba sin conexión a Rasa."""
-    user_message = data.message.lower().strip()
-    if "hola" in user_message:
-        bot_responses = [{"text": "👋 ¡Hola! Soy el bot tutor virtual de Zajuna. ¿En qué puedo ayudarte hoy?"}]
-    elif "gracias" in user_message:
-        bot_responses = [{"text": "😊 ¡De nada! Estoy aquí para ayudarte."}]
-    elif "adiós" in user_message or "chao" in user_message:
-        bot_responses = [{"text": "👋 ¡Hasta pronto! Que tengas un gran día."}]
-    else:
-        bot_responses = [{"text": "🤖 Esta es una respuesta de prueba del bot Zajuna."}]
-    return bot_responses
+    return [{"text": canned_reply(data.message) or "🤖 Esta es una respuesta de prueba del bot Zajuna."}]
 
 @chat_router.get("/health", summary="Healthcheck de chat (subrouter /chat)")
 async def chat_health_embed():
@@ -152,8 +245,7 @@ async def chat_health_embed():
     """
     rasa_url = f"{RASA_BASE_URL}/webhooks/rest/webhook"
     try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            r = await client.options(rasa_url)
+        r = await get_rasa_client().options(rasa_url, timeout=5)
         # Rasa suele responder 200/204/405 si el endpoint vive.
         ok = 200 <= r.status_code < 500
         return {"ok": bool(ok), "rasa_url": rasa_url}
@@ -170,9 +262,8 @@ async def chat_health_root():
     """
     status_url = f"{RASA_BASE_URL}/status"
     try:
-        async with httpx.AsyncClient(timeout=3.0) as client:
-            r = await client.get(status_url)
-            rasa_ok = r.status_code == 200
+        r = await get_rasa_client().get(status_url, timeout=3.0)
+        rasa_ok = r.status_code == 200
         return {"ok": rasa_ok, "rasa_url": status_url}
     except Exception as e:
         log.exception("chat_health_root error: %s", e)
@@ -192,10 +283,9 @@ async def rasa_rest_health():
     """
     status_url = f"{RASA_BASE_URL}/status"
     try:
-        async with httpx.AsyncClient(timeout=3.0) as client:
-            r = await client.get(status_url)
-            r.raise_for_status()
-            data = r.json()
+        r = await get_rasa_client().get(status_url, timeout=3.0)
+        r.raise_for_status()
+        data = r.json()
     except Exception as e:
         log.exception("rasa_rest_health error: %s", e)
         return {
@@ -229,8 +319,7 @@ async def rasa_rest_proxy(payload: dict, request: Request):
         pass
 
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.post(url, json=payload)
+        resp = await rasa_router.post(str(payload.get("sender") or ""), url, json=payload, timeout=15)
 
         # si upstream falla, queremos ver el texto de error del upstream
         try:
@@ -249,6 +338,10 @@ async def rasa_rest_proxy(payload: dict, request: Request):
             log.warning("rasa proxy non-list response: %r", data)
         return data
 
+    except CircuitOpen as e:
+        log.warning("proxy rasa: %s; respuesta degradada", e)
+        return degraded_responses(payload.get("message"))
+
     except httpx.RequestError as e:
         # problema de red / DNS / timeout
         log.exception("proxy network error: %s", e)
@@ -275,9 +368,8 @@ async def health():
     error = None
 
     try:
-        async with httpx.AsyncClient(timeout=3.0) as client:
-            r = await client.get(status_url)
-            rasa_ok = (r.status_code == 200)
+        r = await get_rasa_client().get(status_url, timeout=3.0)
+        rasa_ok = (r.status_code == 200)
     except Exception as e:
         error = str(e)
         log.exception("health: error consultando Rasa /status: %s", e)
@@ -287,6 +379,13 @@ async def health():
         "backend_ok": True,        # backend respondió 200
         "rasa_ok": bool(rasa_ok),
         "rasa_url": status_url,
+        "rasa_pool": rasa_client_stats(),
+        "rasa_replicas": rasa_router_stats(),
+        "rasa_breaker": rasa_breaker_stats(),
+        "access_log": access_log_sink.stats(),
+        "transcripts": transcript_stats(),
+        "jwt_cache": jwt_cache_stats(),
+        "rate_limit": rate_limit_stats(),
     }
     if error and not rasa_ok:
         response["error"] = error
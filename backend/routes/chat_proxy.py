@@ -9,6 +9,10 @@ from pydantic import BaseModel
 import httpx
 
 from backend.config.settings import settings
+from backend.services.rasa_client import get_rasa_client
+from backend.services.chat_service import degraded_responses
+from backend.services.rasa_breaker import CircuitOpen
+from backend.services.rasa_router import rasa_router
 from backend.utils.logging import get_logger
 
 log = get_logger(__name__)
@@ -65,15 +69,15 @@ def _get_user_from_request(request: Request) -> Optional[Dict[str, Any]]:
 async def chat_health() -> Dict[str, Any]:
     last_err: Optional[str] = None
     timeout = httpx.Timeout(RASA_TIMEOUT_MS / 1000.0)
+    client = get_rasa_client()
 
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-        for url in RASA_STATUS_URLS:
-            try:
-                r = await client.get(url)
-                if 200 <= r.status_code < 500:
-                    return {"ok": True, "target": url, "status": r.status_code}
-            except Exception as e:
-                last_err = str(e)
+    for url in RASA_STATUS_URLS:
+        try:
+            r = await client.get(url, timeout=timeout, follow_redirects=True)
+            if 200 <= r.status_code < 500:
+                return {"ok": True, "target": url, "status": r.status_code}
+        except Exception as e:
+            last_err = str(e)
 
     log.error("chat_proxy health: Rasa no responde. last_err=%s", last_err)
     raise HTTPException(status_code=503, detail=last_err or "Rasa no responde")
@@ -102,12 +106,16 @@ async def chat_send(body: ChatIn, request: Request) -> List[Dict[str, Any]]:
     }
 
     timeout = httpx.Timeout(RASA_TIMEOUT_MS / 1000.0)
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-        try:
-            r = await client.post(RASA_REST_URL, json=payload)
-        except Exception as e:
-            log.exception("Error conectando a Rasa en %s: %s", RASA_REST_URL, e)
-            raise HTTPException(status_code=502, detail=f"Error conectando a Rasa: {e}")
+    try:
+        r = await rasa_router.post(
+            payload["sender"], RASA_REST_URL, json=payload, timeout=timeout, follow_redirects=True
+        )
+    except CircuitOpen as e:
+        log.warning("chat_proxy: %s; respuesta degradada", e)
+        return degraded_responses(text)
+    except Exception as e:
+        log.exception("Error conectando a Rasa en %s: %s", RASA_REST_URL, e)
+        raise HTTPException(status_code=502, detail=f"Error conectando a Rasa: {e}")
 
     if not (200 <= r.status_code < 300):
         detail = r.text or "error al enviar mensaje"
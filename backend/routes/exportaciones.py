@@ -12,7 +12,7 @@ from backend.dependencies.auth import require_role
 from backend.services import stats_service
 from backend.services.log_service import exportar_logs_csv_filtrado, log_access
 from backend.db.mongodb import get_database
-from backend.utils.file_utils import save_csv_to_s3_and_get_url
+from backend.utils.file_utils import save_csv_s3_and_local
 
 # ✅ Rate limiting por endpoint (no-op si SlowAPI está deshabilitado)
 from backend.rate_limit import limit
@@ -33,6 +33,7 @@ def exportar_logs_csv(
     request: Request,
     desde: str = Query(None, description="Fecha inicio YYYY-MM-DD"),
     hasta: str = Query(None, description="Fecha fin YYYY-MM-DD"),
+    gzip: bool = Query(False, description="Comprimir la descarga (.csv.gz)"),
     user=Depends(require_role(["admin", "soporte"])),
 ):
     # Parseo defensivo de fechas
@@ -55,23 +56,23 @@ def exportar_logs_csv(
         tipo="descarga",
     )
 
-    # 1) Obtener CSV (texto) de logs
-    csv_text = exportar_logs_csv_filtrado(desde_dt, hasta_dt)
-    # 2) Subir/serializar y obtener bytes + URL
-    csv_bytes, archivo_url = save_csv_to_s3_and_get_url(csv_text, filename_prefix="logs")
+    # Registrar exportación cuando el archivo quede completo en S3/local
+    def _registrar(archivo_url: str) -> None:
+        db["exportaciones"].insert_one(
+            {
+                "usuario": user["email"],
+                "tipo": "logs",
+                "fecha": datetime.utcnow(),
+                "archivo": archivo_url,
+            }
+        )
 
-    # 3) Registrar exportación
-    db["exportaciones"].insert_one(
-        {
-            "usuario": user["email"],
-            "tipo": "logs",
-            "fecha": datetime.utcnow(),
-            "archivo": archivo_url,
-        }
-    )
+    # CSV generado por lotes desde el cursor y subido a la vez que se descarga
+    chunks, archivo_url = exportar_logs_csv_filtrado(desde_dt, hasta_dt, gzip=gzip, on_complete=_registrar)
 
     headers = {"Content-Disposition": f"attachment; filename={archivo_url.split('/')[-1]}"}
-    return StreamingResponse(csv_bytes, media_type="text/csv", headers=headers)
+    media_type = "application/gzip" if gzip else "text/csv"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
 
 
 @router.get(
@@ -150,7 +151,7 @@ async def exportar_estadisticas_csv(
         writer.writerow(["", f"{u['email']} ({u['rol']})"])
 
     csv_text = output.getvalue()
-    csv_bytes, archivo_url = save_csv_to_s3_and_get_url(csv_text, filename_prefix="estadisticas")
+    csv_bytes, archivo_url = save_csv_s3_and_local(csv_text, filename_prefix="estadisticas")
 
     db["exportaciones"].insert_one(
         {
@@ -6,7 +6,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 
 from backend.services.log_service import (
@@ -63,9 +63,9 @@ def export_logs_csv():
     """
     Stream a simple CSV of logs (columns: user_id, message, timestamp, sender, intent).
     """
-    sio = exportar_logs_csv_stream()
+    chunks = exportar_logs_csv_stream()
     headers = {"Content-Disposition": 'attachment; filename="logs.csv"'}
-    return StreamingResponse(sio, media_type="text/csv", headers=headers)
+    return StreamingResponse(chunks, media_type="text/csv", headers=headers)
 
 
 @router.get("/export/filtered.csv")
@@ -74,15 +74,15 @@ def export_logs_csv_filtered(
     hasta: Optional[str] = None,
 ):
     """
-    Generate a filtered CSV (string) for downloads or S3; returns CSV directly.
+    Stream a filtered CSV (tipo: descarga); the same bytes are uploaded to S3 as they are sent.
     Date format expected: ISO8601 (e.g., 2025-01-31T00:00:00).
     """
     dt_desde: Optional[datetime] = datetime.fromisoformat(desde) if desde else None
     dt_hasta: Optional[datetime] = datetime.fromisoformat(hasta) if hasta else None
 
-    csv_text = exportar_logs_csv_filtrado(dt_desde, dt_hasta)
+    chunks, _url = exportar_logs_csv_filtrado(dt_desde, dt_hasta)
     headers = {"Content-Disposition": 'attachment; filename="logs_filtered.csv"'}
-    return Response(content=csv_text, media_type="text/csv", headers=headers)
+    return StreamingResponse(chunks, media_type="text/csv", headers=headers)
 
 
 @router.post("/export/register")
@@ -4,7 +4,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, Request, Query
 from backend.dependencies.auth import require_role
 import backend.services.stats_service as stats_service
-from backend.services.log_service import log_access
+from backend.services.log_service import log_access_async
 from backend.models.stats_model import EstadisticasChatbotResponse
 
 # ✅ Rate limiting por endpoint (no-op si SlowAPI está deshabilitado)
@@ -33,7 +33,7 @@ async def get_stats(
     usuarios_por_rol = await stats_service.obtener_usuarios_por_rol()
     logs_por_dia = await stats_service.obtener_logs_por_dia(desde, hasta)
 
-    log_access(
+    await log_access_async(
         user_id=user["_id"],
         email=user["email"],
         rol=user["rol"],
@@ -0,0 +1,235 @@
+# =====================================================
+# 🧩 backend/services/batch_writer.py
+# =====================================================
+"""
+Escritor en lote (write-behind) hacia una colección Mongo async.
+
+Los documentos se encolan en memoria y una tarea de fondo los vuelca con
+``insert_many`` cuando se junta ``batch_size`` o pasa ``flush_interval``
+segundos desde el primer documento del lote. La cola es acotada:
+
+  - overflow="drop":  si está llena, el documento se descarta (contador ``dropped``)
+  - overflow="block": el productor espera hasta ``put_timeout`` (backpressure)
+                      y solo entonces descarta
+
+Errores transitorios de Mongo (red, failover, server selection) se reintentan
+hasta ``max_retries`` veces con backoff exponencial. Los ``_id`` se asignan en
+el primer intento, así que un reintento tras una escritura parcial solo
+produce duplicados de clave (11000) que se cuentan como escritos.
+
+``stop()`` drena lo pendiente antes de salir (shutdown del lifespan).
+"""
+from __future__ import annotations
+
+import asyncio
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Literal, Optional
+
+from pymongo.errors import BulkWriteError, ConnectionFailure
+
+from backend.utils.logging import get_logger
+
+log = get_logger(__name__)
+
+Overflow = Literal["drop", "block"]
+
+
+class BatchWriter:
+    def __init__(
+        self,
+        name: str,
+        get_collection: Callable[[], Any],
+        *,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_queue: int = 10_000,
+        overflow: Overflow = "drop",
+        put_timeout: float = 0.05,
+        max_retries: int = 0,
+        retry_backoff: float = 0.2,
+    ) -> None:
+        self.name = name
+        self._get_collection = get_collection
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.max_queue = max(1, int(max_queue))
+        self.overflow = overflow
+        self.put_timeout = put_timeout
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff = retry_backoff
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Lote en armado y volcado en curso (para no perderlos al detener)
+        self._pending: List[Dict[str, Any]] = []
+        self._flushing: Optional[asyncio.Future] = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.retries = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    # ─────────────────────────────
+    # Ciclo de vida
+    # ─────────────────────────────
+    def start(self) -> None:
+        """Arranca la tarea de volcado en el event loop actual (idempotente)."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._loop = loop
+        self._pending = []
+        self._flushing = None
+        self._task = loop.create_task(self._run(), name=f"batch-writer:{self.name}")
+
+    async def stop(self) -> None:
+        """Detiene la tarea y drena la cola pendiente."""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            if self._flushing is not None and not self._flushing.done():
+                await self._flushing
+            pending, self._pending = self._pending, []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            for i in range(0, len(pending), self.batch_size):
+                await self._flush(pending[i:i + self.batch_size])
+        self._queue = None
+        self._loop = None
+
+    # ─────────────────────────────
+    # Productores
+    # ─────────────────────────────
+    async def put(self, doc: Dict[str, Any]) -> bool:
+        """Encola un documento. Devuelve False si se descartó por saturación."""
+        self.start()
+        assert self._queue is not None
+        try:
+            self._queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            if self.overflow != "block":
+                self.dropped += 1
+                return False
+            try:
+                await asyncio.wait_for(self._queue.put(doc), timeout=self.put_timeout)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                return False
+        self.enqueued += 1
+        return True
+
+    def put_nowait(self, doc: Dict[str, Any]) -> bool:
+        """Variante síncrona (requiere event loop activo); nunca espera."""
+        self.start()
+        assert self._queue is not None
+        try:
+            self._queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    # ─────────────────────────────
+    # Consumidor
+    # ─────────────────────────────
+    async def _collect(self, batch: List[Dict[str, Any]]) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        batch.append(await queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        while True:
+            await self._collect(self._pending)
+            batch, self._pending = self._pending, []
+            # El volcado no se cancela a medias (evita duplicados al reintentar en stop)
+            self._flushing = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._flushing)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        t0 = perf_counter()
+        attempt = 0
+        while True:
+            try:
+                await self._get_collection().insert_many(batch, ordered=False)
+                self.written += len(batch)
+                break
+            except BulkWriteError as bwe:
+                errors = bwe.details.get("writeErrors", [])
+                dup = sum(1 for e in errors if e.get("code") == 11000)
+                self.written += len(batch) - len(errors) + dup
+                self.failed += len(errors) - dup
+                if len(errors) > dup:
+                    log.warning("[batch_writer:%s] %d documentos rechazados", self.name, len(errors) - dup)
+                break
+            except ConnectionFailure as e:
+                if attempt >= self.max_retries:
+                    self.failed += len(batch)
+                    log.warning("[batch_writer:%s] lote de %d perdido tras %d reintentos: %s",
+                                self.name, len(batch), attempt, e)
+                    break
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+            except Exception as e:
+                self.failed += len(batch)
+                log.warning("[batch_writer:%s] no se pudo volcar lote de %d: %s", self.name, len(batch), e)
+                break
+        elapsed_ms = (perf_counter() - t0) * 1000
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+    # ─────────────────────────────
+    # Métricas
+    # ─────────────────────────────
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "retries": self.retries,
+            "flush_ms": {
+                "last": round(self.last_flush_ms, 2),
+                "avg": round(self._total_flush_ms / self.flushes, 2) if self.flushes else None,
+                "max": round(self.max_flush_ms, 2),
+            },
+        }
+
+
+__all__ = ["BatchWriter"]
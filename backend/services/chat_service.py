@@ -10,10 +10,33 @@ from backend.config.settings import settings
 from backend.middleware.request_id import get_request_id
 from backend.utils.logging import get_logger
 from backend.services.rasa_endpoint import rasa_rest_endpoint
+from backend.services.rasa_client import USER_AGENT
+from backend.services.rasa_breaker import CircuitOpen
+from backend.services.rasa_router import rasa_router
 
 log = get_logger(__name__)
 
 
+def canned_reply(message: Optional[str]) -> Optional[str]:
+    """Respuestas fijas (saludo, gracias, despedida) que no necesitan a Rasa."""
+    text = _normalize_text(message).lower()
+    if "hola" in text:
+        return "👋 ¡Hola! Soy el bot tutor virtual de Zajuna. ¿En qué puedo ayudarte hoy?"
+    if "gracias" in text:
+        return "😊 ¡De nada! Estoy aquí para ayudarte."
+    if "adiós" in text or "chao" in text:
+        return "👋 ¡Hasta pronto! Que tengas un gran día."
+    return None
+
+
+def degraded_responses(message: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Respuesta inmediata cuando el circuito hacia Rasa está abierto:
+    la respuesta fija si aplica, si no ``RASA_DEGRADED_REPLY``.
+    """
+    return [{"text": canned_reply(message) or settings.rasa_degraded_reply}]
+
+
 def _normalize_text(s: Optional[str]) -> str:
     """
     Normaliza texto (quita espacios, evita None).
@@ -33,6 +56,7 @@ async def process_user_message(
     Envía el mensaje al webhook REST de Rasa y devuelve la lista de respuestas.
     Propaga X-Request-ID para correlación end-to-end.
     Mantiene la lógica de negocio original.
+    Con el circuito abierto lanza ``CircuitOpen`` sin llamar a Rasa.
     """
     # 1) Validaciones básicas (idéntico a tu implementación original)
     if not isinstance(message, str) or _normalize_text(message) == "":
@@ -53,26 +77,26 @@ async def process_user_message(
     headers = {
         "Content-Type": "application/json",
         "X-Request-ID": rid,  # 🔗 correlación end-to-end
-        "User-Agent": "chatbot-backend/1.0 (+rasa-proxy)",
+        "User-Agent": USER_AGENT,
     }
 
-    # 4) Endpoint robusto: siempre /webhooks/rest/webhook
+    # 4) Endpoint robusto: siempre /webhooks/rest/webhook. Con varias réplicas
+    #    la elige el router (y registra en debug la que usó realmente)
     url = rasa_rest_endpoint()
-    log.debug(f"[chat_service] → Rasa POST {url} (rid={rid})")
+    log.debug(f"[chat_service] → Rasa POST sender={sender_id} (rid={rid})")
 
-    # 5) Llamada HTTP (mismo comportamiento original)
+    # 5) Llamada HTTP por el pool compartido (keep-alive hacia Rasa)
     try:
-        timeout = httpx.Timeout(30.0)
-        limits = httpx.Limits(max_keepalive_connections=10, max_connections=50)
-        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
-            resp = await client.post(url, json=payload, headers=headers)
-            resp.raise_for_status()
-            try:
-                data = resp.json()
-            except ValueError as je:
-                # Respuesta sin JSON válido
-                raise ValueError(f"Respuesta de Rasa no es JSON válido: {je}") from je
+        resp = await rasa_router.post(sender_id, url, json=payload, headers=headers)
+        resp.raise_for_status()
+        try:
+            data = resp.json()
+        except ValueError as je:
+            # Respuesta sin JSON válido
+            raise ValueError(f"Respuesta de Rasa no es JSON válido: {je}") from je
 
+    except CircuitOpen:
+        raise
     except httpx.HTTPStatusError as he:
         log.error(
             f"[chat_service] HTTP {he.response.status_code} desde Rasa "
@@ -0,0 +1,142 @@
+# =====================================================
+# 🧩 backend/services/chat_stream.py
+# =====================================================
+"""
+Streaming de respuestas del bot hacia el widget (SSE).
+
+El action server publica el texto parcial del LLM en Redis pub/sub
+(canal ``<CHAT_STREAM_CHANNEL_PREFIX><sender_id>``, mensajes JSON
+``{"type": "delta", "text": ...}``). Esta capa se suscribe al canal ANTES de
+enviar el mensaje al webhook REST de Rasa, reenvía cada parcial como evento
+``delta`` y, cuando Rasa responde, emite la lista completa (``message``), que
+reemplaza el texto parcial en el cliente.
+
+Sin Redis configurado (``CHAT_STREAM_REDIS_URL`` o ``REDIS_URL``) el flujo
+degrada a un único evento ``message`` con la misma lista de ``POST /api/chat``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from backend.config.settings import settings
+from backend.services.chat_service import process_user_message
+from backend.utils.logging import get_logger
+
+log = get_logger(__name__)
+
+try:
+    import redis.asyncio as aioredis  # type: ignore
+except Exception:  # paquete redis no instalado
+    aioredis = None  # type: ignore
+
+_redis: Optional[Any] = None
+
+
+def _stream_url() -> Optional[str]:
+    url = settings.chat_stream_redis_url or settings.redis_url
+    return str(url).strip() if url and str(url).strip() else None
+
+
+def stream_enabled() -> bool:
+    return bool(settings.chat_stream_enabled and aioredis is not None and _stream_url())
+
+
+def _get_redis() -> Optional[Any]:
+    global _redis
+    if _redis is None and stream_enabled():
+        _redis = aioredis.from_url(_stream_url(), decode_responses=True)
+    return _redis
+
+
+async def close_chat_stream() -> None:
+    global _redis
+    if _redis is None:
+        return
+    try:
+        await _redis.aclose()
+    except Exception:
+        pass
+    finally:
+        _redis = None
+
+
+def channel_for(sender_id: str) -> str:
+    return f"{settings.chat_stream_channel_prefix}{sender_id}"
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Serializa un evento SSE (``data`` en JSON de una sola línea)."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode("utf-8")
+
+
+async def _subscribe(sender_id: str) -> Optional[Any]:
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel_for(sender_id))
+        return pubsub
+    except Exception as e:
+        log.warning(f"[chat_stream] Sin streaming (Redis no disponible): {e}")
+        return None
+
+
+async def _pump(pubsub: Any, queue: "asyncio.Queue[Dict[str, Any]]") -> None:
+    async for msg in pubsub.listen():
+        if msg.get("type") != "message":
+            continue
+        try:
+            await queue.put(json.loads(msg["data"]))
+        except (TypeError, ValueError):
+            continue
+
+
+async def stream_chat_events(
+    message: str,
+    sender_id: str,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Genera ``(evento, datos)``: cero o más ``delta`` y al final ``message``
+    con la lista de respuestas de Rasa. Los errores de Rasa se propagan.
+    """
+    pubsub = await _subscribe(sender_id)
+    rasa_task = asyncio.ensure_future(
+        process_user_message(message=message, sender_id=sender_id, metadata=metadata)
+    )
+    pump_task: Optional[asyncio.Task] = None
+    try:
+        if pubsub is not None:
+            queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+            pump_task = asyncio.ensure_future(_pump(pubsub, queue))
+            while not rasa_task.done():
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, rasa_task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    break
+                item = getter.result()
+                if item.get("type") == "delta" and item.get("text"):
+                    yield "delta", {"text": item["text"]}
+            # Parciales que llegaron junto con la respuesta final
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item.get("type") == "delta" and item.get("text"):
+                    yield "delta", {"text": item["text"]}
+
+        responses: List[Dict[str, Any]] = await rasa_task
+        yield "message", responses
+    finally:
+        if not rasa_task.done():
+            rasa_task.cancel()
+        if pump_task is not None:
+            pump_task.cancel()
+        if pubsub is not None:
+            try:
+                await pubsub.unsubscribe()
+                await pubsub.aclose()
+            except Exception:
+                pass
@@ -0,0 +1,279 @@
+# =====================================================
+# 🧩 backend/services/jwt_cache.py
+# =====================================================
+"""
+Caché en proceso para la verificación de JWT.
+
+  - ``JwksKeyStore``: mantiene en memoria las llaves públicas del JWKS
+    (``JWT_JWKS_URL``). Se refresca en segundo plano cada
+    ``JWT_JWKS_REFRESH_SECONDS``; si llega un ``kid`` desconocido (rotación)
+    la consulta devuelve None al instante y se despierta a la tarea de
+    refresco, como máximo una vez cada ``JWT_JWKS_MIN_REFETCH_SECONDS``.
+    La descarga nunca corre en el camino de la petición (ni en el loop).
+  - ``VerifiedTokenCache``: LRU de claims ya verificados, indexado por el
+    SHA-256 de (verificador, token) y válido hasta ``exp`` (acotado por
+    ``JWT_CACHE_MAX_TTL``). El verificador (``namespace``) identifica librería,
+    algoritmo, audience e issuer: un token aceptado por un verificador no se
+    sirve desde la caché a otro con reglas distintas.
+
+Con ambos, una petición autenticada hace como mucho una verificación de
+firma (la primera vez que se ve el token) y ninguna descarga de llaves.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from jwt import PyJWK
+
+from backend.config.settings import settings
+from backend.utils.logging import get_logger
+
+log = get_logger(__name__)
+
+
+# ============================================================
+# 🔑 LLAVES JWKS
+# ============================================================
+class JwksKeyStore:
+    def __init__(
+        self,
+        url: Optional[str],
+        *,
+        refresh_interval: float = 600.0,
+        min_refetch_interval: float = 30.0,
+        timeout: float = 5.0,
+    ) -> None:
+        self.url = (url or "").strip() or None
+        self.refresh_interval = max(1.0, float(refresh_interval))
+        self.min_refetch_interval = max(0.0, float(min_refetch_interval))
+        self.timeout = timeout
+
+        self._keys: Dict[Optional[str], Dict[str, Any]] = {}
+        self._first: Optional[Dict[str, Any]] = None
+        self._pyjwk: Dict[Optional[str], PyJWK] = {}
+        self._last_fetch = 0.0
+        self._lock = threading.Lock()  # solo protege el reemplazo de las llaves
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.refetch_throttled = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.url is not None
+
+    # ─────────────────────────────
+    # Descarga
+    # ─────────────────────────────
+    def refresh(self) -> bool:
+        """
+        Descarga el JWKS y reemplaza las llaves en memoria. False si falla.
+        Bloqueante: se llama desde la tarea de refresco vía ``asyncio.to_thread``.
+        """
+        if not self.enabled:
+            return False
+        self._last_fetch = time.monotonic()
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                resp = client.get(self.url)
+                resp.raise_for_status()
+                keys = resp.json().get("keys", [])
+        except Exception as e:
+            self.fetch_errors += 1
+            log.warning(f"[jwks] No se pudo descargar {self.url}: {e}")
+            return False
+
+        with self._lock:
+            self.fetches += 1
+            self._keys = {k.get("kid"): k for k in keys if isinstance(k, dict)}
+            self._first = keys[0] if keys and isinstance(keys[0], dict) else None
+            self._pyjwk = {}
+        return True
+
+    def _refetch_allowed(self) -> bool:
+        return time.monotonic() - self._last_fetch >= self.min_refetch_interval
+
+    # ─────────────────────────────
+    # Consulta
+    # ─────────────────────────────
+    def get_jwk(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        JWK (dict) para el ``kid`` dado; sin ``kid`` devuelve la primera llave.
+        Nunca hace red: un ``kid`` desconocido devuelve None y pide a la tarea
+        de refresco una descarga, limitada en frecuencia (un ``kid`` inventado
+        no puede frenar el loop).
+        """
+        if not self.enabled:
+            return None
+        jwk = self._first if kid is None else self._keys.get(kid)
+        if jwk is not None:
+            return jwk
+        if not self._refetch_allowed():
+            self.refetch_throttled += 1
+            return None
+        self._last_fetch = time.monotonic()  # reserva el turno hasta que corra la descarga
+        self._request_refetch()
+        return None
+
+    def _request_refetch(self) -> None:
+        # get_jwk puede llamarse desde el threadpool (dependencias ``def``)
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:  # loop cerrándose
+            pass
+
+    def get_signing_key(self, kid: Optional[str]) -> Any:
+        """Llave lista para PyJWT (``PyJWK.key``), cacheada por ``kid``."""
+        cached = self._pyjwk.get(kid)
+        if cached is not None:
+            return cached.key
+        jwk = self.get_jwk(kid)
+        if jwk is None:
+            return None
+        pyjwk = PyJWK(jwk)
+        self._pyjwk[kid] = pyjwk
+        return pyjwk.key
+
+    # ─────────────────────────────
+    # Refresco en segundo plano (lifespan)
+    # ─────────────────────────────
+    async def _run(self) -> None:
+        wake = self._wake
+        while True:
+            wake.clear()
+            await asyncio.to_thread(self.refresh)
+            try:
+                # despierta antes si llega un ``kid`` desconocido
+                await asyncio.wait_for(wake.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Arranca el refresco periódico (idempotente; no-op sin JWKS)."""
+        if not self.enabled:
+            return
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._run(), name="jwks-refresh")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        self._loop = self._wake = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "keys": len(self._keys),
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+            "refetch_throttled": self.refetch_throttled,
+            "age_s": round(time.monotonic() - self._last_fetch, 1) if self._last_fetch else None,
+        }
+
+
+# ============================================================
+# 🧠 CLAIMS VERIFICADOS (LRU)
+# ============================================================
+class VerifiedTokenCache:
+    def __init__(self, maxsize: int = 4096, max_ttl: float = 300.0) -> None:
+        self.maxsize = max(0, int(maxsize))
+        self.max_ttl = max(0.0, float(max_ttl))
+        self._data: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str, namespace: str = "") -> str:
+        return hashlib.sha256(f"{namespace}\x1f{token}".encode("utf-8")).hexdigest()
+
+    def get(self, token: str, namespace: str = "") -> Optional[Dict[str, Any]]:
+        if not self.maxsize or not token:
+            return None
+        key = self._key(token, namespace)
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, claims = item
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any], namespace: str = "") -> None:
+        """Guarda claims ya verificados. Tokens sin ``exp`` no se cachean."""
+        if not self.maxsize or not token or not isinstance(claims, dict):
+            return
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        now = time.time()
+        expires_at = min(float(exp), now + self.max_ttl)
+        if expires_at <= now:
+            return
+        key = self._key(token, namespace)
+        with self._lock:
+            self._data[key] = (expires_at, claims)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+# ============================================================
+# 🌐 INSTANCIAS COMPARTIDAS
+# ============================================================
+jwks_store = JwksKeyStore(
+    settings.jwt_jwks_url,
+    refresh_interval=settings.jwt_jwks_refresh_seconds,
+    min_refetch_interval=settings.jwt_jwks_min_refetch_seconds,
+)
+token_cache = VerifiedTokenCache(
+    maxsize=settings.jwt_cache_size,
+    max_ttl=settings.jwt_cache_max_ttl,
+)
+
+
+def jwt_cache_stats() -> Dict[str, Any]:
+    return {"claims": token_cache.stats(), "jwks": jwks_store.stats()}
+
+
+__all__ = [
+    "JwksKeyStore",
+    "VerifiedTokenCache",
+    "jwks_store",
+    "token_cache",
+    "jwt_cache_stats",
+]
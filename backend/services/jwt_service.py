@@ -6,9 +6,10 @@ from __future__ import annotations
 from typing import Optional, Tuple, Dict, Any
 import logging
 import jwt
-from jwt import InvalidTokenError, PyJWKClient
+from jwt import InvalidTokenError
 
 from backend.config.settings import settings
+from backend.services.jwt_cache import jwks_store, token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -98,8 +99,26 @@ def _jwt_decode_kwargs() -> Dict[str, Any]:
 def decode_raw_token(token: str) -> Tuple[bool, Dict[str, Any]]:
     """
     Decodifica/verifica un JWT crudo (sin 'Bearer ') usando HS* o RS*/JWKS.
-    Devuelve (ok, claims).
+    Devuelve (ok, claims). Los claims verificados se cachean hasta ``exp``.
     """
+    namespace = _token_cache_namespace()
+    cached = token_cache.get(token, namespace)
+    if cached is not None:
+        return True, dict(cached)
+
+    ok, claims = _verify_raw_token(token)
+    if ok:
+        token_cache.put(token, dict(claims), namespace)
+    return ok, claims
+
+
+def _token_cache_namespace() -> str:
+    """Espacio de la caché de claims para este verificador (PyJWT + reglas de settings)."""
+    kwargs = _jwt_decode_kwargs()
+    return f"pyjwt|{kwargs['algorithms'][0]}|aud={kwargs.get('audience', '')}|iss={kwargs.get('issuer', '')}"
+
+
+def _verify_raw_token(token: str) -> Tuple[bool, Dict[str, Any]]:
     alg = _as_str(getattr(settings, "jwt_algorithm", "HS256")).upper() or "HS256"
     kwargs = _jwt_decode_kwargs()
 
@@ -116,13 +135,13 @@ def decode_raw_token(token: str) -> Tuple[bool, Dict[str, Any]]:
         # RS* (llave pública PEM o JWKS)
         if alg.startswith("RS"):
             # 1) JWKS si se configuró
-            jwks_url = _as_str(getattr(settings, "jwt_jwks_url", "")).strip()
-            if jwks_url:
+            if jwks_store.enabled:
                 try:
-                    jwk_client = PyJWKClient(jwks_url)
-                    signing_key = jwk_client.get_signing_key_from_jwt(token)
-                    claims = jwt.decode(token, signing_key.key, **kwargs)
-                    return True, claims
+                    kid = jwt.get_unverified_header(token).get("kid")
+                    signing_key = jwks_store.get_signing_key(kid)
+                    if signing_key is not None:
+                        claims = jwt.decode(token, signing_key, **kwargs)
+                        return True, claims
                 except Exception:
                     # Si JWKS falla, intentamos con clave pública local si existe
                     pass
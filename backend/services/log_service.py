@@ -4,16 +4,17 @@
 from __future__ import annotations
 
 import os
-import csv
-from io import StringIO
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
 
 from bson import ObjectId  # noqa: F401 (compat / puede usarse en otros paths)
 
 from backend.db.mongodb import get_logs_collection
+from backend.db.mongodb_async import get_async_logs_collection
 from backend.config.settings import settings
-from backend.utils.file_utils import save_csv_to_s3_and_get_url
+from backend.services.batch_writer import BatchWriter
+from backend.utils.csv_stream import gzip_chunks, iter_csv
+from backend.utils.file_utils import open_export_writer, tee_export
 
 # ─────────────────────────────────────────────────────
 # LOG_DIR robusto (evita FieldInfo / tipos no-str)
@@ -43,22 +44,24 @@ def obtener_contenido_log(filename: str) -> Optional[str]:
     return ruta if os.path.exists(ruta) else None
 
 
-# 📤 Exportación CSV simple (stream en memoria)
-def exportar_logs_csv_stream() -> StringIO:
-    logs = get_logs_collection().find()
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["user_id", "message", "timestamp", "sender", "intent"])
-    for log in logs:
-        writer.writerow([
+# 📤 Exportación CSV simple (streaming por lotes desde el cursor)
+def exportar_logs_csv_stream() -> Iterator[bytes]:
+    cursor = get_logs_collection().find(
+        {},
+        {"_id": 0, "user_id": 1, "message": 1, "timestamp": 1, "sender": 1, "intent": 1},
+        batch_size=settings.export_batch_size,
+    )
+    rows = (
+        [
             log.get("user_id", ""),
             log.get("message", ""),
             log.get("timestamp", ""),
             log.get("sender", ""),
             log.get("intent", ""),
-        ])
-    output.seek(0)
-    return output
+        ]
+        for log in cursor
+    )
+    return iter_csv(rows, ["user_id", "message", "timestamp", "sender", "intent"])
 
 
 # 🔄 No leídos
@@ -83,7 +86,7 @@ def get_logs(limit: int = 100) -> List[Dict[str, Any]]:
 
 
 # 🟦 Registrar logs manualmente
-def log_access(
+def _build_access_doc(
     user_id: str,
     email: str,
     rol: str,
@@ -94,7 +97,7 @@ def log_access(
     user_agent: Optional[str] = None,
     tipo: str = "acceso",
     extra: Optional[Dict[str, Any]] = None,
-) -> None:
+) -> Dict[str, Any]:
     doc: Dict[str, Any] = {
         "user_id": str(user_id),
         "email": email,
@@ -112,18 +115,67 @@ def log_access(
         for k, v in extra.items():
             if k not in doc:
                 doc[k] = v
+    return doc
+
+
+def log_access(
+    user_id: str,
+    email: str,
+    rol: str,
+    endpoint: str,
+    method: str,
+    status: int,
+    ip: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    tipo: str = "acceso",
+    extra: Optional[Dict[str, Any]] = None,
+) -> None:
+    doc = _build_access_doc(user_id, email, rol, endpoint, method, status, ip, user_agent, tipo, extra)
     get_logs_collection().insert_one(doc)
 
 
+async def log_access_async(
+    user_id: str,
+    email: str,
+    rol: str,
+    endpoint: str,
+    method: str,
+    status: int,
+    ip: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    tipo: str = "acceso",
+    extra: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Igual que log_access, para handlers async (no bloquea el event loop)."""
+    doc = _build_access_doc(user_id, email, rol, endpoint, method, status, ip, user_agent, tipo, extra)
+    await get_async_logs_collection().insert_one(doc)
+
+
 # 🟨 Middleware automático
-def log_access_middleware(
+# Los accesos por request se encolan y se vuelcan con insert_many en segundo plano
+access_log_sink = BatchWriter(
+    "access_log",
+    get_async_logs_collection,
+    batch_size=settings.access_log_batch_size,
+    flush_interval=settings.access_log_flush_ms / 1000.0,
+    max_queue=settings.access_log_queue_max,
+    overflow=settings.access_log_overflow,
+)
+
+
+def debe_registrar_acceso(endpoint: str) -> bool:
+    """False para rutas de ruido (health, estáticos) según ACCESS_LOG_SKIP_PATHS."""
+    return not any(endpoint.startswith(p) for p in settings.access_log_skip_paths)
+
+
+def _build_access_middleware_doc(
     endpoint: str,
     method: str,
     status: int,
     ip: str,
     user_agent: str,
     user: Optional[dict] = None,
-) -> None:
+) -> Dict[str, Any]:
     doc: Dict[str, Any] = {
         "endpoint": endpoint,
         "method": method,
@@ -139,9 +191,35 @@ def log_access_middleware(
             "email": user.get("email", ""),
             "rol": user.get("rol", "usuario")
         })
+    return doc
+
+
+def log_access_middleware(
+    endpoint: str,
+    method: str,
+    status: int,
+    ip: str,
+    user_agent: str,
+    user: Optional[dict] = None,
+) -> None:
+    doc = _build_access_middleware_doc(endpoint, method, status, ip, user_agent, user)
     get_logs_collection().insert_one(doc)
 
 
+async def log_access_middleware_async(
+    endpoint: str,
+    method: str,
+    status: int,
+    ip: str,
+    user_agent: str,
+    user: Optional[dict] = None,
+) -> None:
+    if not debe_registrar_acceso(endpoint):
+        return
+    doc = _build_access_middleware_doc(endpoint, method, status, ip, user_agent, user)
+    await access_log_sink.put(doc)
+
+
 # 📊 Exportaciones estadísticas
 def get_export_stats() -> List[Dict[str, Any]]:
     pipeline = [
@@ -194,11 +272,11 @@ def get_top_failed_intents() -> List[Dict[str, Any]]:
 
 
 # ✅ FILTRADO Y SUBIDA A S3
-def exportar_logs_csv_filtrado(desde: datetime | None = None, hasta: datetime | None = None):
-    """
-    Genera CSV de logs (tipo: descarga) y lo sube a S3.
-    ➜ Retorna (csv_bytes, archivo_url) para usar directo con StreamingResponse.
-    """
+_DESCARGA_CSV_FIELDS = ["user_id", "email", "timestamp", "endpoint", "method", "status", "ip", "user_agent"]
+
+
+def iter_logs_descarga_csv(desde: datetime | None = None, hasta: datetime | None = None) -> Iterator[bytes]:
+    """CSV de logs (tipo: descarga) emitido por bloques; memoria constante."""
     query: Dict[str, Any] = {"tipo": "descarga"}
     if desde or hasta:
         query["timestamp"] = {}
@@ -207,14 +285,16 @@ def exportar_logs_csv_filtrado(desde: datetime | None = None, hasta: datetime |
         if hasta:
             query["timestamp"]["$lte"] = hasta
 
-    logs = get_logs_collection().find(query).sort("timestamp", -1)
+    projection = {"_id": 0, **{f: 1 for f in _DESCARGA_CSV_FIELDS}}
+    cursor = (
+        get_logs_collection()
+        .find(query, projection, batch_size=settings.export_batch_size)
+        .sort("timestamp", -1)
+    )
 
-    csv_str = StringIO()
-    writer = csv.writer(csv_str)
-    writer.writerow(["user_id", "email", "timestamp", "endpoint", "method", "status", "ip", "user_agent"])
-    for log in logs:
+    def _row(log: Dict[str, Any]) -> List[Any]:
         ts = log.get("timestamp")
-        writer.writerow([
+        return [
             log.get("user_id", ""),
             log.get("email", ""),
             ts.isoformat() if hasattr(ts, "isoformat") else ts or "",
@@ -222,13 +302,31 @@ def exportar_logs_csv_filtrado(desde: datetime | None = None, hasta: datetime |
             log.get("method", ""),
             log.get("status", ""),
             log.get("ip", ""),
-            log.get("user_agent", "")
-        ])
-    csv_text = csv_str.getvalue()
+            log.get("user_agent", ""),
+        ]
 
-    # ⬆️ Subir y obtener (bytes, url)
-    csv_bytes, archivo_url = save_csv_to_s3_and_get_url(csv_text, filename_prefix="logs")
-    return csv_bytes, archivo_url
+    return iter_csv((_row(log) for log in cursor), _DESCARGA_CSV_FIELDS)
+
+
+def exportar_logs_csv_filtrado(
+    desde: datetime | None = None,
+    hasta: datetime | None = None,
+    *,
+    gzip: bool = False,
+    on_complete: Optional[Callable[[str], None]] = None,
+) -> Tuple[Iterator[bytes], str]:
+    """
+    Genera CSV de logs (tipo: descarga) y lo sube a S3 (o static/exports)
+    mientras se entrega.
+    ➜ Retorna (chunks, archivo_url) para usar directo con StreamingResponse.
+       La subida termina cuando se consume el iterador; ``on_complete(url)``
+       se llama solo si el archivo quedó completo.
+    """
+    chunks = iter_logs_descarga_csv(desde, hasta)
+    if gzip:
+        chunks = gzip_chunks(chunks)
+    writer = open_export_writer("logs", gzip=gzip)
+    return tee_export(chunks, writer, on_complete), writer.url
 
 
 # ✅ NUEVA FUNCIÓN ÚNICA Y REUTILIZABLE (usa la de arriba)
@@ -237,7 +335,9 @@ def registrar_exportacion_csv(user: dict, desde: datetime | None = None, hasta:
     Genera y sube CSV a S3 (con filtros) y registra la descarga.
     Retorna la URL del archivo.
     """
-    _, url = exportar_logs_csv_filtrado(desde, hasta)
+    chunks, url = exportar_logs_csv_filtrado(desde, hasta)
+    for _ in chunks:  # sin cliente: solo se drena hacia el destino
+        pass
 
     log_access(
         user_id=user.get("_id") or user.get("id") or "",
@@ -0,0 +1,211 @@
+# =====================================================
+# 🧩 backend/services/login_lockout.py
+# =====================================================
+"""
+Conteo de intentos fallidos de login y bloqueo temporal por email.
+
+Semántica (la misma que tenía ``auth_attempts`` en Mongo):
+  - cada fallo suma 1; al llegar a ``max_attempts`` la cuenta queda bloqueada
+    ``lock_minutes`` y el contador vuelve a 0
+  - un login correcto borra contador y bloqueo
+  - los fallos cuentan dentro de una ventana de ``window_sec`` (antes no
+    expiraban nunca): deslizante en memoria; en Redis fija, contada desde el
+    primer fallo (un fallo nuevo no la alarga)
+
+Backends:
+  - Redis (``RATE_LIMIT_BACKEND=redis`` + ``REDIS_URL``, ver
+    ``backend.ext.redis_client``): un script Lua hace INCR (+ EXPIRE en el
+    primer fallo) + bloqueo en una sola operación atómica (un round trip por
+    fallo, uno por chequeo).
+  - Memoria: ventana deslizante por email, repartida en ``shards`` con su
+    propio lock para no serializar logins concurrentes. Es por proceso.
+
+Si Redis falla se usa la memoria durante ``redis_retry_sec`` segundos.
+Las rutas de login son ``def`` (threadpool), así que el cliente Redis es síncrono.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from backend.config.settings import settings
+from backend.ext.redis_client import get_redis_url, redis_enabled
+from backend.utils.logging import get_logger
+
+log = get_logger(__name__)
+
+try:
+    import redis as _redis  # type: ignore
+except Exception:  # paquete redis no instalado
+    _redis = None  # type: ignore
+
+# KEYS[1]=contador, KEYS[2]=bloqueo · ARGV: ventana_s, max_intentos, bloqueo_s
+# Devuelve el contador actual, o -1 si este fallo activó el bloqueo.
+_FAIL_SCRIPT = """
+local n = redis.call('INCR', KEYS[1])
+if n == 1 then
+  redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+if n >= tonumber(ARGV[2]) then
+  redis.call('SET', KEYS[2], '1', 'EX', ARGV[3])
+  redis.call('DEL', KEYS[1])
+  return -1
+end
+return n
+"""
+
+
+class _Shard:
+    __slots__ = ("lock", "fails", "locked")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.fails: Dict[str, Deque[float]] = {}
+        self.locked: Dict[str, float] = {}  # email -> bloqueado hasta (monotonic)
+
+
+class LoginLockout:
+    def __init__(
+        self,
+        *,
+        window_sec: float = 900.0,
+        shards: int = 16,
+        redis_client: Optional[Any] = None,
+        prefix: str = "login:",
+        redis_retry_sec: float = 30.0,
+        max_keys_per_shard: int = 10_000,
+    ) -> None:
+        self.window_sec = max(1.0, float(window_sec))
+        self.prefix = prefix
+        self.redis_retry_sec = redis_retry_sec
+        self.max_keys_per_shard = max(1, int(max_keys_per_shard))
+        self._shards: List[_Shard] = [_Shard() for _ in range(max(1, int(shards)))]
+        self._redis = redis_client
+        self._script = redis_client.register_script(_FAIL_SCRIPT) if redis_client is not None else None
+        self._redis_down_until = 0.0
+        self.redis_errors = 0
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "memory"
+
+    # ─────────────────────────────
+    # Redis
+    # ─────────────────────────────
+    def _keys(self, email: str) -> Tuple[str, str]:
+        return f"{self.prefix}fails:{email}", f"{self.prefix}lock:{email}"
+
+    def _use_redis(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, e: Exception) -> None:
+        self.redis_errors += 1
+        self._redis_down_until = time.monotonic() + self.redis_retry_sec
+        log.warning(f"[lockout] Redis no disponible ({e}); se usa memoria {self.redis_retry_sec:.0f}s")
+
+    # ─────────────────────────────
+    # Memoria
+    # ─────────────────────────────
+    def _shard(self, email: str) -> _Shard:
+        h = int.from_bytes(hashlib.blake2b(email.encode("utf-8"), digest_size=4).digest(), "little")
+        return self._shards[h % len(self._shards)]
+
+    def _prune(self, shard: _Shard, now: float) -> None:
+        # Solo cuando el shard crece: se quitan bloqueos vencidos y ventanas vacías
+        if len(shard.fails) + len(shard.locked) <= self.max_keys_per_shard:
+            return
+        shard.locked = {k: v for k, v in shard.locked.items() if v > now}
+        cutoff = now - self.window_sec
+        shard.fails = {k: q for k, q in shard.fails.items() if q and q[-1] > cutoff}
+
+    def _mem_fail(self, email: str, max_attempts: int, lock_sec: float) -> bool:
+        now = time.monotonic()
+        shard = self._shard(email)
+        with shard.lock:
+            q = shard.fails.setdefault(email, deque())
+            cutoff = now - self.window_sec
+            while q and q[0] <= cutoff:
+                q.popleft()
+            q.append(now)
+            if len(q) >= max_attempts:
+                shard.locked[email] = now + lock_sec
+                del shard.fails[email]
+                return True
+            self._prune(shard, now)
+            return False
+
+    def _mem_locked(self, email: str) -> bool:
+        shard = self._shard(email)
+        with shard.lock:
+            until = shard.locked.get(email)
+            if until is None:
+                return False
+            if time.monotonic() < until:
+                return True
+            del shard.locked[email]
+            return False
+
+    def _mem_reset(self, email: str) -> None:
+        shard = self._shard(email)
+        with shard.lock:
+            shard.fails.pop(email, None)
+            shard.locked.pop(email, None)
+
+    # ─────────────────────────────
+    # API
+    # ─────────────────────────────
+    def register_failure(self, email: str, max_attempts: int, lock_minutes: int) -> bool:
+        """Suma un fallo; True si con este fallo la cuenta quedó bloqueada."""
+        max_attempts = max(1, int(max_attempts))
+        lock_sec = max(1, int(lock_minutes * 60))
+        if self._use_redis():
+            fails_key, lock_key = self._keys(email)
+            try:
+                n = self._script(keys=[fails_key, lock_key], args=[int(self.window_sec), max_attempts, lock_sec])
+                return int(n) == -1
+            except Exception as e:
+                self._redis_failed(e)
+        return self._mem_fail(email, max_attempts, lock_sec)
+
+    def is_locked(self, email: str) -> bool:
+        if self._use_redis():
+            try:
+                return bool(self._redis.exists(self._keys(email)[1]))
+            except Exception as e:
+                self._redis_failed(e)
+        return self._mem_locked(email)
+
+    def reset(self, email: str) -> None:
+        self._mem_reset(email)
+        if self._use_redis():
+            try:
+                self._redis.delete(*self._keys(email))
+            except Exception as e:
+                self._redis_failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "redis_errors": self.redis_errors,
+            "memory_tracked": sum(len(s.fails) for s in self._shards),
+            "memory_locked": sum(len(s.locked) for s in self._shards),
+        }
+
+
+def _build() -> LoginLockout:
+    client = None
+    if redis_enabled() and _redis is not None:
+        client = _redis.Redis.from_url(
+            get_redis_url(), decode_responses=True, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return LoginLockout(
+        window_sec=settings.login_attempt_window_sec,
+        shards=settings.login_lockout_shards,
+        redis_client=client,
+    )
+
+
+login_lockout = _build()
@@ -3,9 +3,14 @@
 # =====================================================
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+from backend.config.settings import settings
+from backend.db.mongodb_async import get_async_logs_collection, get_async_messages_collection
+from backend.services.batch_writer import BatchWriter
+
 # 📦 Acceso a DB resiliente (evita fallar en import-time)
 try:
     from backend.db.mongodb import get_database
@@ -13,6 +18,23 @@ except Exception:  # fallback ultra defensivo si el módulo aún no carga
     get_database = None  # type: ignore
 
 
+# ✍️ Write-behind: el usuario recibe la respuesta de Rasa sin esperar a Mongo
+def _transcript_sink(name: str, get_collection) -> BatchWriter:
+    return BatchWriter(
+        name,
+        get_collection,
+        batch_size=settings.chat_log_batch_size,
+        flush_interval=settings.chat_log_flush_ms / 1000.0,
+        max_queue=settings.chat_log_queue_max,
+        overflow="block",
+        max_retries=settings.chat_log_max_retries,
+    )
+
+
+chat_log_sink = _transcript_sink("chat_log", get_async_logs_collection)
+messages_sink = _transcript_sink("messages", get_async_messages_collection)
+
+
 def _messages_collection():
     """
     Obtiene la colección 'messages' desde la DB en el momento de uso para
@@ -26,8 +48,9 @@ def _messages_collection():
 
 def log_message(user_id: str, text: str, sender: str, extra: Optional[Dict[str, Any]] = None) -> None:
     """
-    Inserta un mensaje en la colección 'messages'.
+    Registra un mensaje en la colección 'messages'.
     Mantiene firma original y agrega 'extra' opcional sin romper llamadas existentes.
+    Dentro del event loop se encola en ``messages_sink``; fuera, se inserta directo.
     """
     doc: Dict[str, Any] = {
         "user_id": str(user_id),
@@ -41,9 +64,26 @@ def log_message(user_id: str, text: str, sender: str, extra: Optional[Dict[str,
             if k not in doc:
                 doc[k] = v
 
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass  # sin event loop (scripts): inserción directa como antes
+    else:
+        messages_sink.put_nowait(doc)
+        return
+
     try:
         _messages_collection().insert_one(doc)
     except Exception:
         # No romper el flujo por problemas de registro
         # (puedes cambiar por logging si prefieres)
-        pass
\ No newline at end of file
+        pass
+
+
+async def log_chat_turn(doc: Dict[str, Any]) -> None:
+    """Encola el registro completo de un turno de chat (colección 'logs')."""
+    await chat_log_sink.put(doc)
+
+
+def transcript_stats() -> Dict[str, Any]:
+    return {"chat_log": chat_log_sink.stats(), "messages": messages_sink.stats()}
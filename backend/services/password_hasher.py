@@ -0,0 +1,212 @@
+# =====================================================
+# 🧩 backend/services/password_hasher.py
+# =====================================================
+"""
+Hash y verificación de contraseñas (bcrypt) en un pool acotado.
+
+bcrypt es CPU puro (decenas a cientos de ms por llamada según el costo). Al
+inicio de una clase llegan ráfagas de logins; si cada request hashea en su
+propio hilo del threadpool de Starlette, todos compiten por la CPU y la
+latencia crece para todos. Aquí:
+
+  - Las operaciones corren en un pool de ``workers`` hilos (bcrypt libera el
+    GIL) o procesos (``executor="process"``).
+  - Como máximo ``workers + max_queue`` operaciones admitidas a la vez; la
+    siguiente se rechaza al instante con ``HashingOverloaded`` (la app
+    responde 503 + Retry-After) en vez de encolarse sin límite.
+  - ``rounds`` es el factor de trabajo para hashes nuevos. ``verify_and_update``
+    devuelve un hash nuevo cuando el guardado usa otro costo, para rehashear
+    de forma transparente en el login.
+
+API síncrona (rutas ``def``) y asíncrona (``averify``/``ahash``/...).
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Literal, Optional, Tuple
+
+from backend.config.settings import settings
+from backend.utils.logging import get_logger
+
+log = get_logger(__name__)
+
+try:
+    import bcrypt as _bcrypt
+except ImportError:  # pragma: no cover - bcrypt viene en requirements
+    _bcrypt = None
+
+ExecutorKind = Literal["thread", "process"]
+
+_COST_RE = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class HashingOverloaded(Exception):
+    """El pool de hashing está saturado; el cliente debe reintentar luego."""
+
+    def __init__(self, retry_after: int = 1) -> None:
+        super().__init__("Servicio de autenticación saturado")
+        self.retry_after = retry_after
+
+
+# ─────────────────────────────
+# Trabajo (nivel módulo: serializable para ProcessPoolExecutor)
+# ─────────────────────────────
+def _do_hash(password: str, rounds: int) -> str:
+    if _bcrypt is None:  # pragma: no cover
+        from passlib.hash import bcrypt as _pbcrypt
+
+        return _pbcrypt.using(rounds=rounds).hash(password)
+    return _bcrypt.hashpw(password.encode("utf-8"), _bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _do_verify(password: str, hashed: str) -> bool:
+    try:
+        if _bcrypt is None:  # pragma: no cover
+            from passlib.hash import bcrypt as _pbcrypt
+
+            return _pbcrypt.verify(password, hashed)
+        return _bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except Exception:
+        return False
+
+
+def _do_verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    if not _do_verify(password, hashed):
+        return False, None
+    if hash_cost(hashed) == rounds:
+        return True, None
+    return True, _do_hash(password, rounds)
+
+
+def hash_cost(hashed: str) -> Optional[int]:
+    """Costo (log2 de rondas) de un hash bcrypt; None si no es bcrypt."""
+    m = _COST_RE.match(hashed or "")
+    return int(m.group(1)) if m else None
+
+
+# ─────────────────────────────
+# Pool
+# ─────────────────────────────
+class PasswordHasher:
+    def __init__(
+        self,
+        *,
+        rounds: int = 12,
+        workers: int = 2,
+        max_queue: int = 32,
+        executor: ExecutorKind = "thread",
+        retry_after: int = 1,
+    ) -> None:
+        self.rounds = min(31, max(4, int(rounds)))
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.executor_kind = executor
+        self.retry_after = retry_after
+
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+
+        self.submitted = 0
+        self.shed = 0
+        self.rehashed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+        return self._executor
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            self.shed += 1
+            raise HashingOverloaded(self.retry_after)
+        try:
+            fut = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.submitted += 1
+        fut.add_done_callback(lambda _f: self._slots.release())
+        return fut
+
+    # ─────────────────────────────
+    # API síncrona (desde rutas def / threadpool)
+    # ─────────────────────────────
+    def hash(self, password: str) -> str:
+        return self._submit(_do_hash, password, self.rounds).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        if not hashed:
+            return False
+        return self._submit(_do_verify, password, hashed).result()
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(válida, hash_nuevo) — hash_nuevo solo si hay que rehashear."""
+        if not hashed:
+            return False, None
+        ok, new_hash = self._submit(_do_verify_and_update, password, hashed, self.rounds).result()
+        if new_hash:
+            self.rehashed += 1
+        return ok, new_hash
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return hash_cost(hashed) != self.rounds
+
+    # ─────────────────────────────
+    # API asíncrona
+    # ─────────────────────────────
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_do_hash, password, self.rounds))
+
+    async def averify(self, password: str, hashed: str) -> bool:
+        if not hashed:
+            return False
+        return await asyncio.wrap_future(self._submit(_do_verify, password, hashed))
+
+    async def averify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        if not hashed:
+            return False, None
+        ok, new_hash = await asyncio.wrap_future(
+            self._submit(_do_verify_and_update, password, hashed, self.rounds)
+        )
+        if new_hash:
+            self.rehashed += 1
+        return ok, new_hash
+
+    # ─────────────────────────────
+    # Ciclo de vida / métricas
+    # ─────────────────────────────
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        capacity = self.workers + self.max_queue
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "executor": self.executor_kind,
+            "capacity": capacity,
+            "in_flight": capacity - self._slots._value,  # type: ignore[attr-defined]
+            "submitted": self.submitted,
+            "shed": self.shed,
+            "rehashed": self.rehashed,
+        }
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.password_bcrypt_rounds,
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+    executor=settings.password_hash_executor,
+)
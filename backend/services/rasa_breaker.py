@@ -0,0 +1,189 @@
+# =====================================================
+# 🧩 backend/services/rasa_breaker.py
+# =====================================================
+"""
+Circuit breaker para los mensajes hacia Rasa.
+
+Estados:
+  - closed: pasa todo; se miran los últimos ``window_sec`` segundos y, con al
+    menos ``min_calls`` llamadas, si la proporción de errores (excepción o 5xx)
+    o de llamadas lentas (> ``slow_call_ms``) supera su umbral, se abre
+  - open: se rechaza al instante con ``CircuitOpen`` durante ``open_sec``
+    (el chat responde con un mensaje degradado en lugar de apilar peticiones
+    esperando el timeout de un Rasa caído)
+  - half_open: pasado ``open_sec`` se dejan pasar ``half_open_calls``
+    mensajes de prueba; si salen bien se cierra, si uno falla se reabre.
+    ``before_call`` devuelve un token de prueba y solo los resultados con
+    ese token cuentan: una respuesta tardía de una llamada admitida antes de
+    abrir el circuito no lo cierra ni lo reabre
+
+Todo corre en el event loop (sin locks). Configuración: ``RASA_BREAKER_*``.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from backend.config.settings import settings
+from backend.utils.logging import get_logger
+
+log = get_logger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """El circuito está abierto: no se llamó a Rasa."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rasa no disponible (circuito abierto, reintento en {retry_after:.0f}s)")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        slow_call_rate: float = 0.8,
+        slow_call_ms: float = 10000.0,
+        min_calls: int = 10,
+        window_sec: float = 30.0,
+        open_sec: float = 15.0,
+        half_open_calls: int = 1,
+    ) -> None:
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_ms = slow_call_ms
+        self.min_calls = max(1, int(min_calls))
+        self.window_sec = window_sec
+        self.open_sec = open_sec
+        self.half_open_calls = max(1, int(half_open_calls))
+
+        self.state = CLOSED
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()  # (t, ok, lento)
+        self._opened_at = 0.0
+        self._probes = 0  # en vuelo en half_open
+        self._probe_ok = 0
+        self._probe_gen = 0  # cambia en cada paso a half_open (token de las pruebas)
+        self.times_opened = 0
+        self.rejected = 0
+        self.last_reason: Optional[str] = None
+
+    # ─────────────────────────────
+    # Transiciones
+    # ─────────────────────────────
+    def _open(self, now: float, reason: str) -> None:
+        if self.state != OPEN:
+            self.times_opened += 1
+            log.warning(f"[rasa_breaker] circuito abierto: {reason}")
+        self.state = OPEN
+        self._opened_at = now
+        self._probes = self._probe_ok = 0
+        self._calls.clear()
+        self.last_reason = reason
+
+    def _close(self) -> None:
+        log.info("[rasa_breaker] circuito cerrado: Rasa responde de nuevo")
+        self.state = CLOSED
+        self._probes = self._probe_ok = 0
+        self._calls.clear()
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_sec
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    # ─────────────────────────────
+    # API
+    # ─────────────────────────────
+    def before_call(self) -> Optional[int]:
+        """
+        Lanza ``CircuitOpen`` si no se debe llamar a Rasa ahora. Devuelve el
+        token de prueba (half_open) o None; se pasa tal cual a ``record``/``abandon``.
+        """
+        now = time.monotonic()
+        if self.state == OPEN:
+            wait = self._opened_at + self.open_sec - now
+            if wait > 0:
+                self.rejected += 1
+                raise CircuitOpen(wait)
+            self.state = HALF_OPEN
+            self._probes = self._probe_ok = 0
+            self._probe_gen += 1
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                self.rejected += 1
+                raise CircuitOpen(1.0)
+            self._probes += 1
+            return self._probe_gen
+        return None
+
+    def _is_probe(self, probe: Optional[int]) -> bool:
+        return self.state == HALF_OPEN and probe is not None and probe == self._probe_gen
+
+    def abandon(self, probe: Optional[int] = None) -> None:
+        """La llamada se canceló (cliente desconectado) sin resultado."""
+        if self._is_probe(probe) and self._probes > 0:
+            self._probes -= 1
+
+    def record(self, ok: bool, elapsed_ms: float, probe: Optional[int] = None) -> None:
+        now = time.monotonic()
+        slow = elapsed_ms > self.slow_call_ms
+        if self.state == HALF_OPEN:
+            if not self._is_probe(probe):
+                return  # respuesta tardía de una llamada que no es la prueba
+            if not ok or slow:
+                self._open(now, "falló el mensaje de prueba" if not ok else f"prueba lenta ({elapsed_ms:.0f} ms)")
+                return
+            self._probe_ok += 1
+            if self._probe_ok >= self.half_open_calls:
+                self._close()
+            return
+        if self.state == OPEN:
+            return  # respuesta tardía de una llamada previa a la apertura
+
+        self._calls.append((now, ok, slow))
+        self._prune(now)
+        total = len(self._calls)
+        if total < self.min_calls:
+            return
+        failures = sum(1 for _, o, _ in self._calls if not o)
+        slows = sum(1 for _, _, s in self._calls if s)
+        if failures / total >= self.failure_rate:
+            self._open(now, f"{failures}/{total} errores en {self.window_sec:.0f}s")
+        elif slows / total >= self.slow_call_rate:
+            self._open(now, f"{slows}/{total} respuestas > {self.slow_call_ms:.0f} ms")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._prune(now)
+        total = len(self._calls)
+        return {
+            "state": self.state,
+            "window_calls": total,
+            "failure_rate": round(sum(1 for _, o, _ in self._calls if not o) / total, 3) if total else 0.0,
+            "slow_rate": round(sum(1 for _, _, s in self._calls if s) / total, 3) if total else 0.0,
+            "retry_in_sec": round(max(0.0, self._opened_at + self.open_sec - now), 1) if self.state == OPEN else 0.0,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "last_reason": self.last_reason,
+        }
+
+
+rasa_breaker = CircuitBreaker(
+    failure_rate=settings.rasa_breaker_failure_rate,
+    slow_call_rate=settings.rasa_breaker_slow_rate,
+    slow_call_ms=settings.rasa_breaker_slow_ms,
+    min_calls=settings.rasa_breaker_min_calls,
+    window_sec=settings.rasa_breaker_window_sec,
+    open_sec=settings.rasa_breaker_open_sec,
+)
+
+
+def rasa_breaker_stats() -> Dict[str, Any]:
+    return rasa_breaker.stats()
+
+
+__all__ = ["CircuitBreaker", "CircuitOpen", "rasa_breaker", "rasa_breaker_stats"]
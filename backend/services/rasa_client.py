@@ -0,0 +1,184 @@
+# =====================================================
+# 🧩 backend/services/rasa_client.py
+# =====================================================
+"""
+Cliente HTTP compartido hacia Rasa.
+
+Un único ``httpx.AsyncClient`` de larga vida (propiedad del lifespan de la app)
+reutiliza conexiones keep-alive hacia ``rasa:5005`` en lugar de abrir un pool
+nuevo por cada mensaje. Todas las rutas que hablan con Rasa deben pasar por
+``get_rasa_client()``.
+
+Configuración (settings / .env):
+  - RASA_HTTP_TIMEOUT            timeout por defecto (s)
+  - RASA_HTTP_MAX_CONNECTIONS    conexiones máximas hacia el host de Rasa
+  - RASA_HTTP_MAX_KEEPALIVE      conexiones ociosas que se conservan
+  - RASA_HTTP_KEEPALIVE_EXPIRY   segundos antes de cerrar una conexión ociosa
+  - RASA_HTTP2                   habilita HTTP/2 (requiere el paquete 'h2')
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from time import perf_counter
+from typing import Any, Dict, Optional
+
+import httpx
+
+from backend.config.settings import settings
+from backend.utils.logging import get_logger
+
+log = get_logger(__name__)
+
+USER_AGENT = "chatbot-backend/1.0 (+rasa-proxy)"
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class RasaClient:
+    """
+    Envoltorio delgado sobre ``httpx.AsyncClient`` con contadores de uso.
+    Acepta URLs absolutas (cada ruta conserva su endpoint y su timeout).
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float,
+        max_connections: int,
+        max_keepalive: int,
+        keepalive_expiry: float,
+        http2: bool = False,
+    ) -> None:
+        if http2 and not _http2_available():
+            log.warning("[rasa_client] RASA_HTTP2=true pero 'h2' no está instalado; se usa HTTP/1.1.")
+            http2 = False
+
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout),
+            limits=self.limits,
+            http2=http2,
+            headers={"User-Agent": USER_AGENT},
+        )
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._total_ms = 0.0
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        self._requests += 1
+        self._in_flight += 1
+        t0 = perf_counter()
+        try:
+            return await self._client.request(method, url, **kwargs)
+        except Exception:
+            self._errors += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self._total_ms += (perf_counter() - t0) * 1000
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def options(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("OPTIONS", url, **kwargs)
+
+    def _pool_connections(self) -> Dict[str, int]:
+        """Inspección best-effort del pool de httpcore (no es API pública de httpx)."""
+        try:
+            pool = self._client._transport._pool  # type: ignore[attr-defined]
+            conns = list(pool.connections)
+        except Exception:
+            return {}
+        idle = sum(1 for c in conns if c.is_idle())
+        return {"open": len(conns), "idle": idle, "active": len(conns) - idle}
+
+    def stats(self) -> Dict[str, Any]:
+        done = self._requests - self._in_flight
+        return {
+            "requests": self._requests,
+            "errors": self._errors,
+            "in_flight": self._in_flight,
+            "avg_latency_ms": round(self._total_ms / done, 2) if done > 0 else None,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "pool": self._pool_connections(),
+        }
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+# Singleton holder (ligado al event loop donde se creó)
+_client: Optional[RasaClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _build_client() -> RasaClient:
+    return RasaClient(
+        timeout=settings.rasa_http_timeout,
+        max_connections=settings.rasa_http_max_connections,
+        max_keepalive=settings.rasa_http_max_keepalive,
+        keepalive_expiry=settings.rasa_http_keepalive_expiry,
+        http2=settings.rasa_http2,
+    )
+
+
+def get_rasa_client() -> RasaClient:
+    """
+    Devuelve el cliente compartido. Lo crea en el primer uso si el lifespan
+    no lo hizo, y lo recrea si cambió el event loop (tests, recarga).
+    """
+    global _client, _client_loop
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if _client is None or _client.is_closed or (loop is not None and loop is not _client_loop):
+        _client = _build_client()
+        _client_loop = loop
+        log.debug("[rasa_client] pool creado (http2=%s, limits=%s)", _client.http2, _client.limits)
+    return _client
+
+
+async def close_rasa_client() -> None:
+    """Cierra el cliente compartido (shutdown del lifespan)."""
+    global _client, _client_loop
+    if _client is None:
+        return
+    try:
+        await _client.aclose()
+    except Exception:
+        pass
+    finally:
+        _client = None
+        _client_loop = None
+
+
+def rasa_client_stats() -> Dict[str, Any]:
+    """Estadísticas del pool sin forzar la creación del cliente."""
+    if _client is None:
+        return {"initialized": False}
+    return {"initialized": True, **_client.stats()}
+
+
+__all__ = ["RasaClient", "get_rasa_client", "close_rasa_client", "rasa_client_stats"]
@@ -3,16 +3,24 @@
 # =====================================================
 from __future__ import annotations
 import os
+from typing import Optional
 from backend.config.settings import settings
 
 
-def rasa_rest_endpoint() -> str:
+def rasa_rest_endpoint(sender_id: Optional[str] = None) -> str:
     """
     Devuelve el endpoint REST de Rasa listo para usar.
+    - Con RASA_UPSTREAMS y sender_id => la réplica asignada a ese sender
     - Si existe RASA_REST_URL => se usa tal cual
     - Si solo hay RASA_URL => se completa con /webhooks/rest/webhook
     - Fallback: http://rasa:5005/webhooks/rest/webhook
     """
+    if sender_id:
+        from backend.services.rasa_router import rasa_router
+
+        if rasa_router.enabled:
+            return rasa_router.rest_url(sender_id)
+
     # Preferimos la propiedad inteligente ya definida en settings
     base = (getattr(settings, "rasa_rest_base", None) or "").strip()
     if not base:
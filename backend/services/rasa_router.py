@@ -0,0 +1,305 @@
+# =====================================================
+# 🧩 backend/services/rasa_router.py
+# =====================================================
+"""
+Enrutamiento por afinidad de ``sender_id`` entre varias réplicas de Rasa.
+
+Con ``RASA_UPSTREAMS=http://rasa-1:5005,http://rasa-2:5005`` cada conversación
+va siempre a la misma réplica (hash consistente con nodos virtuales), así no
+hacen falta lock store compartido y el tracker queda caliente en esa réplica.
+Al agregar o quitar una réplica solo se mueven ~1/N de las conversaciones.
+
+Salud:
+  - activa: una tarea del lifespan consulta ``/status`` de cada réplica cada
+    ``RASA_HEALTH_INTERVAL_SECONDS``
+  - pasiva: ``RASA_REPLICA_MAX_FAILURES`` errores seguidos la sacan del anillo
+    hasta que un probe (o un reintento tras el intervalo) vuelve a responder
+Failover: si la réplica dueña está caída o no acepta la conexión, el mensaje
+va a la siguiente del anillo. Solo se reintenta ante errores de conexión
+(el mensaje no llegó); un timeout de lectura o un 5xx no se reenvía para no
+procesar dos veces el mismo turno.
+
+Sin ``RASA_UPSTREAMS`` el router queda deshabilitado y cada ruta usa su URL de
+siempre (``rasa_rest_endpoint()``, ``RASA_REST_URL``...).
+
+Todos los envíos pasan por el circuit breaker (``rasa_breaker``): con el
+circuito abierto ``post`` lanza ``CircuitOpen`` sin tocar la red.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import hashlib
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from backend.config.settings import settings
+from backend.services.rasa_breaker import CircuitBreaker, rasa_breaker
+from backend.services.rasa_client import get_rasa_client
+from backend.utils.logging import get_logger
+
+log = get_logger(__name__)
+
+REST_PATH = "/webhooks/rest/webhook"
+
+# Errores en los que el request no llegó a Rasa: seguro reintentar en otra réplica
+_FAILOVER_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def parse_upstreams(raw: Optional[str]) -> List[str]:
+    """``"http://a:5005, http://b:5005/webhooks/rest/webhook"`` → bases sin duplicados."""
+    bases: List[str] = []
+    for item in (raw or "").split(","):
+        base = item.strip().rstrip("/")
+        if base.endswith(REST_PATH):
+            base = base[: -len(REST_PATH)]
+        if base and base not in bases:
+            bases.append(base)
+    return bases
+
+
+class Replica:
+    __slots__ = (
+        "base", "healthy", "down_until", "consecutive_failures",
+        "requests", "errors", "total_ms", "last_ms", "last_error", "last_probe",
+    )
+
+    def __init__(self, base: str) -> None:
+        self.base = base
+        self.healthy = True
+        self.down_until = 0.0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.last_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_probe: Optional[float] = None
+
+    def available(self, now: float) -> bool:
+        return self.healthy or now >= self.down_until
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "base": self.base,
+            "healthy": self.healthy,
+            "requests": self.requests,
+            "errors": self.errors,
+            "consecutive_failures": self.consecutive_failures,
+            "avg_latency_ms": round(self.total_ms / self.requests, 2) if self.requests else None,
+            "last_latency_ms": round(self.last_ms, 2) if self.last_ms is not None else None,
+            "last_error": self.last_error,
+            "last_probe": self.last_probe,
+        }
+
+
+class RasaRouter:
+    def __init__(
+        self,
+        upstreams: Iterable[str],
+        *,
+        vnodes: int = 64,
+        max_failures: int = 3,
+        health_interval: float = 10.0,
+        probe_timeout: float = 3.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.breaker = breaker
+        self.replicas: List[Replica] = [Replica(b) for b in upstreams]
+        self.max_failures = max(1, int(max_failures))
+        self.health_interval = max(1.0, float(health_interval))
+        self.probe_timeout = probe_timeout
+        self.failovers = 0
+        ring: List[Tuple[int, int]] = []
+        for idx, rep in enumerate(self.replicas):
+            for v in range(max(1, int(vnodes))):
+                ring.append((_hash(f"{rep.base}#{v}"), idx))
+        ring.sort()
+        self._ring_hashes = [h for h, _ in ring]
+        self._ring_owners = [idx for _, idx in ring]
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    # ─────────────────────────────
+    # Anillo
+    # ─────────────────────────────
+    def preference(self, sender_id: str) -> List[Replica]:
+        """Réplicas en orden de preferencia para ``sender_id`` (dueña primero)."""
+        if not self.replicas:
+            return []
+        start = bisect.bisect(self._ring_hashes, _hash(sender_id))
+        order: List[Replica] = []
+        seen = set()
+        n = len(self._ring_owners)
+        for i in range(n):
+            idx = self._ring_owners[(start + i) % n]
+            if idx not in seen:
+                seen.add(idx)
+                order.append(self.replicas[idx])
+                if len(order) == len(self.replicas):
+                    break
+        return order
+
+    def candidates(self, sender_id: str) -> List[Replica]:
+        """Preferencia filtrada por salud; si todas están caídas se intenta igual con la dueña."""
+        order = self.preference(sender_id)
+        now = time.monotonic()
+        alive = [r for r in order if r.available(now)]
+        return alive or order[:1]
+
+    def rest_url(self, sender_id: str) -> str:
+        return self.candidates(sender_id)[0].base + REST_PATH
+
+    # ─────────────────────────────
+    # Salud
+    # ─────────────────────────────
+    def _record(self, rep: Replica, ok: bool, ms: Optional[float], error: Optional[str] = None) -> None:
+        if ms is not None:
+            rep.requests += 1
+            rep.total_ms += ms
+            rep.last_ms = ms
+        if ok:
+            if not rep.healthy:
+                log.info(f"[rasa_router] réplica {rep.base} recuperada")
+            rep.healthy = True
+            rep.consecutive_failures = 0
+            return
+        if ms is not None:
+            rep.errors += 1
+        rep.consecutive_failures += 1
+        rep.last_error = error
+        if rep.consecutive_failures >= self.max_failures:
+            if rep.healthy:
+                log.warning(f"[rasa_router] réplica {rep.base} fuera del anillo: {error}")
+            rep.healthy = False
+            rep.down_until = time.monotonic() + self.health_interval
+
+    async def probe(self, rep: Replica) -> bool:
+        t0 = time.perf_counter()
+        try:
+            r = await get_rasa_client().get(f"{rep.base}/status", timeout=self.probe_timeout)
+            ok = r.status_code == 200
+            error = None if ok else f"/status HTTP {r.status_code}"
+        except Exception as e:
+            ok, error = False, str(e) or type(e).__name__
+        rep.last_probe = time.time()
+        rep.last_ms = (time.perf_counter() - t0) * 1000
+        if ok:
+            self._record(rep, True, None)
+        else:
+            # un probe fallido basta para sacarla: no esperar max_failures mensajes perdidos
+            rep.consecutive_failures = max(rep.consecutive_failures, self.max_failures - 1)
+            self._record(rep, False, None, error)
+        return ok
+
+    async def probe_all(self) -> None:
+        await asyncio.gather(*(self.probe(r) for r in self.replicas))
+
+    async def _health_loop(self) -> None:
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:  # nunca matar el loop
+                log.warning(f"[rasa_router] error en health-check: {e}")
+            await asyncio.sleep(self.health_interval)
+
+    def start(self) -> None:
+        """Arranca el health-check activo (lifespan). Con una sola réplica no hace falta."""
+        if len(self.replicas) > 1 and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    # ─────────────────────────────
+    # Envío
+    # ─────────────────────────────
+    async def post(self, sender_id: str, fallback_url: str, **kwargs: Any) -> httpx.Response:
+        """
+        POST al webhook REST de la réplica de ``sender_id``. Sin réplicas
+        configuradas se usa ``fallback_url`` (comportamiento de siempre).
+        Lanza ``CircuitOpen`` si el breaker no deja pasar la llamada.
+        """
+        if self.breaker is None:
+            return await self._post(sender_id, fallback_url, **kwargs)
+
+        probe = self.breaker.before_call()
+        t0 = time.perf_counter()
+        recorded = False
+        try:
+            resp = await self._post(sender_id, fallback_url, **kwargs)
+            recorded = True
+            self.breaker.record(resp.status_code < 500, (time.perf_counter() - t0) * 1000, probe)
+            return resp
+        except Exception:
+            recorded = True
+            self.breaker.record(False, (time.perf_counter() - t0) * 1000, probe)
+            raise
+        finally:
+            if not recorded:
+                self.breaker.abandon(probe)
+
+    async def _post(self, sender_id: str, fallback_url: str, **kwargs: Any) -> httpx.Response:
+        client = get_rasa_client()
+        if not self.enabled:
+            return await client.post(fallback_url, **kwargs)
+
+        candidates = self.candidates(sender_id)
+        for i, rep in enumerate(candidates):
+            t0 = time.perf_counter()
+            log.debug(f"[rasa_router] POST {rep.base}{REST_PATH} sender={sender_id}")
+            try:
+                resp = await client.post(rep.base + REST_PATH, **kwargs)
+            except _FAILOVER_ERRORS as e:
+                self._record(rep, False, (time.perf_counter() - t0) * 1000, str(e) or type(e).__name__)
+                if i + 1 < len(candidates):
+                    self.failovers += 1
+                    log.warning(f"[rasa_router] {rep.base} no acepta conexión; sender={sender_id} → {candidates[i + 1].base}")
+                    continue
+                raise
+            except Exception as e:
+                self._record(rep, False, (time.perf_counter() - t0) * 1000, str(e) or type(e).__name__)
+                raise
+            ms = (time.perf_counter() - t0) * 1000
+            ok = resp.status_code < 500
+            self._record(rep, ok, ms, None if ok else f"HTTP {resp.status_code}")
+            return resp
+        raise RuntimeError("sin réplicas de Rasa")  # pragma: no cover
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "failovers": self.failovers,
+            "replicas": [r.stats() for r in self.replicas],
+        }
+
+
+rasa_router = RasaRouter(
+    parse_upstreams(settings.rasa_upstreams),
+    vnodes=settings.rasa_ring_vnodes,
+    max_failures=settings.rasa_replica_max_failures,
+    health_interval=settings.rasa_health_interval,
+    breaker=rasa_breaker,
+)
+
+
+def rasa_router_stats() -> Dict[str, Any]:
+    return rasa_router.stats()
+
+
+__all__ = ["RasaRouter", "Replica", "parse_upstreams", "rasa_router", "rasa_router_stats", "REST_PATH"]
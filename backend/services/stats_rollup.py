@@ -0,0 +1,257 @@
+# =====================================================
+# 🧩 backend/services/stats_rollup.py
+# =====================================================
+"""
+Compactación de ``logs`` en rollups diarios (colección ``stats_daily``).
+
+Cada día local (America/Bogota) cerrado se resume en un documento:
+
+    {
+      "_id": "YYYY-MM-DD",
+      "total": N,                      # logs del día
+      "descargas": N,                  # logs con tipo="descarga"
+      "intents":  [{"valor": "saludo", "total": N}, ...],
+      "origenes": [{"valor": "widget", "total": N}, ...],
+      "updated_at": datetime,
+    }
+
+y ``{_id: "_meta", cubierto_hasta: "YYYY-MM-DD"}`` marca el primer día aún
+no compactado. ``stats_service`` lee los rollups para los días cubiertos y
+solo agrega en vivo el resto (normalmente el día en curso), así que el costo
+del panel de administración ya no crece con el volumen de ``logs``.
+
+La compactación es idempotente (reemplaza el documento del día), corre en
+segundo plano desde el lifespan cada ``STATS_ROLLUP_INTERVAL_SECONDS`` y se
+puede lanzar a mano para reconstruir un rango:
+
+    python -m backend.services.stats_rollup --backfill [--desde YYYY-MM-DD] [--hasta YYYY-MM-DD]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReplaceOne
+
+from backend.config.settings import settings
+from backend.db.mongodb_async import get_async_logs_collection, get_async_stats_daily_collection
+from backend.services.stats_service import (
+    LOCAL_TZ,
+    ROLLUP_META_ID,
+    TZ_NAME,
+    local_day_bounds_utc,
+    obtener_cobertura_rollup,
+)
+from backend.utils.logging import get_logger
+
+log = get_logger(__name__)
+
+# Días por agregación durante un backfill (acota el tamaño del resultado de $facet)
+CHUNK_DAYS = 31
+
+
+def _ultimo_dia_cerrado(now: Optional[datetime] = None, grace_seconds: float = 0) -> date:
+    """Último día local cuyo fin ocurrió hace al menos ``grace_seconds``."""
+    now = now or datetime.now(timezone.utc)
+    return (now.astimezone(LOCAL_TZ) - timedelta(seconds=grace_seconds)).date() - timedelta(days=1)
+
+
+async def _primer_dia_con_logs() -> Optional[date]:
+    doc = await get_async_logs_collection().find_one(
+        {"timestamp": {"$type": "date"}}, {"timestamp": 1}, sort=[("timestamp", 1)]
+    )
+    if not doc:
+        return None
+    ts = doc["timestamp"]
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(LOCAL_TZ).date()
+
+
+def _pipeline(desde: date, hasta: date) -> List[Dict[str, Any]]:
+    start, _ = local_day_bounds_utc(desde)
+    _, end = local_day_bounds_utc(hasta)
+    dia = {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp", "timezone": TZ_NAME}}
+
+    def _por_campo(campo: str) -> List[Dict[str, Any]]:
+        return [
+            {"$match": {campo: {"$exists": True, "$nin": [None, ""]}}},
+            {"$group": {"_id": {"dia": "$dia", "valor": f"${campo}"}, "total": {"$sum": 1}}},
+        ]
+
+    return [
+        {"$match": {"timestamp": {"$gte": start, "$lt": end}}},
+        {"$project": {"dia": dia, "tipo": 1, "intent": 1, "origen": 1}},
+        {
+            "$facet": {
+                "totales": [
+                    {
+                        "$group": {
+                            "_id": "$dia",
+                            "total": {"$sum": 1},
+                            "descargas": {"$sum": {"$cond": [{"$eq": ["$tipo", "descarga"]}, 1, 0]}},
+                        }
+                    }
+                ],
+                "intents": _por_campo("intent"),
+                "origenes": _por_campo("origen"),
+            }
+        },
+    ]
+
+
+def _armar_documentos(facet: Dict[str, Any], now: datetime) -> Dict[str, Dict[str, Any]]:
+    docs: Dict[str, Dict[str, Any]] = {}
+    for r in facet.get("totales", []):
+        docs[r["_id"]] = {
+            "_id": r["_id"],
+            "total": r["total"],
+            "descargas": r["descargas"],
+            "intents": [],
+            "origenes": [],
+            "updated_at": now,
+        }
+    for clave in ("intents", "origenes"):
+        for r in facet.get(clave, []):
+            doc = docs.get(r["_id"]["dia"])
+            if doc is not None:
+                doc[clave].append({"valor": r["_id"]["valor"], "total": r["total"]})
+    for doc in docs.values():
+        for clave in ("intents", "origenes"):
+            doc[clave].sort(key=lambda x: x["total"], reverse=True)
+    return docs
+
+
+async def compactar_rango(desde: date, hasta: date) -> int:
+    """
+    Recalcula los rollups de [desde, hasta] (días locales, inclusive).
+    Devuelve el número de días con actividad escritos.
+    """
+    col = get_async_stats_daily_collection()
+    escritos = 0
+    inicio = desde
+    while inicio <= hasta:
+        fin = min(hasta, inicio + timedelta(days=CHUNK_DAYS - 1))
+        facet = await get_async_logs_collection().aggregate(_pipeline(inicio, fin)).to_list(length=1)
+        docs = _armar_documentos(facet[0] if facet else {}, datetime.now(timezone.utc))
+
+        # Días sin actividad en el rango: se eliminan (el recálculo es la verdad)
+        await col.delete_many({
+            "_id": {"$gte": inicio.strftime("%Y-%m-%d"), "$lte": fin.strftime("%Y-%m-%d"), "$nin": list(docs)},
+        })
+        if docs:
+            await col.bulk_write([ReplaceOne({"_id": k}, v, upsert=True) for k, v in docs.items()], ordered=False)
+        escritos += len(docs)
+        inicio = fin + timedelta(days=1)
+    return escritos
+
+
+async def _marcar_cobertura(hasta: date) -> None:
+    await get_async_stats_daily_collection().update_one(
+        {"_id": ROLLUP_META_ID},
+        {"$max": {"cubierto_hasta": (hasta + timedelta(days=1)).strftime("%Y-%m-%d")}},
+        upsert=True,
+    )
+
+
+async def compactar_pendientes(now: Optional[datetime] = None) -> int:
+    """Compacta los días cerrados que aún no estén cubiertos por el rollup."""
+    ultimo = _ultimo_dia_cerrado(now, settings.stats_rollup_grace_seconds)
+    desde = await obtener_cobertura_rollup() or await _primer_dia_con_logs()
+    if desde is None or desde > ultimo:
+        return 0
+    escritos = await compactar_rango(desde, ultimo)
+    await _marcar_cobertura(ultimo)
+    log.info(f"[stats_rollup] Compactados {desde} → {ultimo} ({escritos} días con actividad)")
+    return escritos
+
+
+async def backfill(desde: Optional[date] = None, hasta: Optional[date] = None) -> int:
+    """
+    Reconstruye los rollups de un rango (por defecto: desde el primer log hasta
+    ayer). Solo extiende la cobertura si el rango es contiguo con la actual.
+    """
+    ultimo = _ultimo_dia_cerrado(None, settings.stats_rollup_grace_seconds)
+    hasta = min(hasta or ultimo, ultimo)
+    desde = desde or await _primer_dia_con_logs()
+    if desde is None or desde > hasta:
+        return 0
+    escritos = await compactar_rango(desde, hasta)
+
+    # Sin huecos: el rango debe empalmar con la cobertura actual (o con el primer log)
+    cubierto = await obtener_cobertura_rollup()
+    primero = await _primer_dia_con_logs()
+    contiguo = desde <= cubierto if cubierto else (primero is None or desde <= primero)
+    if contiguo:
+        await _marcar_cobertura(hasta)
+    return escritos
+
+
+# ============================================================
+# ⏱️ TAREA PERIÓDICA (lifespan)
+# ============================================================
+class StatsRollupJob:
+    def __init__(self, interval: float) -> None:
+        self.interval = max(1.0, float(interval))
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.errors = 0
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await compactar_pendientes()
+                self.runs += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                log.warning(f"[stats_rollup] Compactación fallida: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Arranca la compactación periódica (idempotente)."""
+        if not settings.stats_rollup_enabled:
+            return
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="stats-rollup")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+stats_rollup_job = StatsRollupJob(settings.stats_rollup_interval_seconds)
+
+
+# ============================================================
+# 🖥️ CLI
+# ============================================================
+def _parse_day(value: Optional[str]) -> Optional[date]:
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rollups diarios de estadísticas (stats_daily)")
+    parser.add_argument("--backfill", action="store_true", help="Reconstruye el rango indicado")
+    parser.add_argument("--desde", help="Día inicial YYYY-MM-DD (default: primer log)")
+    parser.add_argument("--hasta", help="Día final YYYY-MM-DD (default: ayer)")
+    args = parser.parse_args()
+
+    if args.backfill:
+        escritos = asyncio.run(backfill(_parse_day(args.desde), _parse_day(args.hasta)))
+    else:
+        escritos = asyncio.run(compactar_pendientes())
+    print(f"✅ stats_daily: {escritos} días con actividad escritos")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,14 @@
 # =====================================================
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional, List, Dict, Tuple
 from pymongo import DESCENDING
-from backend.db.mongodb import get_logs_collection, get_users_collection
+from backend.db.mongodb_async import (
+    get_async_logs_collection,
+    get_async_stats_daily_collection,
+    get_async_users_collection,
+)
 from datetime import timezone
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 # Timezone used for day grouping and local range parsing
@@ -63,19 +67,118 @@ def build_date_filter(desde: Optional[str] = None, hasta: Optional[str] = None)
     return {"timestamp": ts_filter} if ts_filter else {}
 
 
+# =========================
+# Daily rollups (stats_daily)
+# =========================
+# Un documento por día local ({_id: "YYYY-MM-DD", total, descargas, intents,
+# origenes}) mantenido por backend/services/stats_rollup.py. El documento
+# "_meta" guarda ``cubierto_hasta``: primer día NO compactado. Los días
+# anteriores se leen del rollup; desde ese día en adelante (normalmente solo
+# hoy) se agrega en vivo sobre ``logs`` con un rango acotado por timestamp.
+
+ROLLUP_META_ID = "_meta"
+
+
+def _day_str(d: date) -> str:
+    return d.strftime("%Y-%m-%d")
+
+
+def local_day_bounds_utc(d: date) -> Tuple[datetime, datetime]:
+    """[00:00 local, 00:00 local del día siguiente) expresado en UTC."""
+    start = datetime(d.year, d.month, d.day, tzinfo=LOCAL_TZ)
+    return _local_to_utc(start), _local_to_utc(start + timedelta(days=1))
+
+
+async def obtener_cobertura_rollup() -> Optional[date]:
+    meta = await get_async_stats_daily_collection().find_one({"_id": ROLLUP_META_ID})
+    value = (meta or {}).get("cubierto_hasta")
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+
+async def _plan_rango(
+    desde: Optional[str], hasta: Optional[str]
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Divide [desde, hasta] en (filtro sobre stats_daily, filtro en vivo sobre logs).
+    Cualquiera de los dos puede ser None si esa parte del rango está vacía.
+    """
+    cubierto = await obtener_cobertura_rollup()
+    if cubierto is None:
+        return None, build_date_filter(desde, hasta)
+
+    d_desde = _parse_date_ymd(desde).date() if desde else None
+    d_hasta = _parse_date_ymd(hasta).date() if hasta else None
+    ultimo_cubierto = cubierto - timedelta(days=1)
+
+    rollup: Optional[Dict[str, Any]] = None
+    if d_desde is None or d_desde <= ultimo_cubierto:
+        fin = ultimo_cubierto if d_hasta is None else min(d_hasta, ultimo_cubierto)
+        rango: Dict[str, str] = {"$lte": _day_str(fin)}
+        if d_desde is not None:
+            rango["$gte"] = _day_str(d_desde)
+        rollup = {"_id": rango}
+
+    live: Optional[Dict[str, Any]] = None
+    if d_hasta is None or d_hasta >= cubierto:
+        inicio = cubierto if d_desde is None else max(d_desde, cubierto)
+        live = build_date_filter(_day_str(inicio), hasta)
+        if d_desde is None and d_hasta is None:
+            # sin filtro se cuenta todo, como antes del rollup: los logs sin
+            # ``timestamp`` de tipo fecha nunca se compactan, van en vivo
+            live = {"$or": [live, {"timestamp": {"$not": {"$type": "date"}}}]}
+
+    return rollup, live
+
+
+async def _leer_rollups(filtro: Optional[Dict[str, Any]], proyeccion: Dict[str, int]) -> List[Dict[str, Any]]:
+    if filtro is None:
+        return []
+    cursor = get_async_stats_daily_collection().find(filtro, proyeccion).sort("_id", 1)
+    return await cursor.to_list(length=None)
+
+
 # =========================
 # Counters and aggregations
 # =========================
 
 async def obtener_total_logs(desde: Optional[str] = None, hasta: Optional[str] = None) -> int:
-    filtro = build_date_filter(desde, hasta)
-    return get_logs_collection().count_documents(filtro)
+    rollup, live = await _plan_rango(desde, hasta)
+    total = sum(d.get("total", 0) for d in await _leer_rollups(rollup, {"total": 1}))
+    if live is not None:
+        total += await get_async_logs_collection().count_documents(live)
+    return total
 
 
 async def obtener_total_exportaciones_csv(desde: Optional[str] = None, hasta: Optional[str] = None) -> int:
-    filtro = build_date_filter(desde, hasta)
-    filtro["tipo"] = "descarga"
-    return get_logs_collection().count_documents(filtro)
+    rollup, live = await _plan_rango(desde, hasta)
+    total = sum(d.get("descargas", 0) for d in await _leer_rollups(rollup, {"descargas": 1}))
+    if live is not None:
+        live["tipo"] = "descarga"
+        total += await get_async_logs_collection().count_documents(live)
+    return total
+
+
+async def _contar_por_campo(
+    campo: str, desde: Optional[str], hasta: Optional[str]
+) -> Dict[str, int]:
+    """Suma los contadores ``intents``/``origenes`` del rollup más la parte en vivo."""
+    rollup_key = {"intent": "intents", "origen": "origenes"}[campo]
+    rollup, live = await _plan_rango(desde, hasta)
+
+    conteo: Dict[str, int] = {}
+    for doc in await _leer_rollups(rollup, {rollup_key: 1}):
+        for item in doc.get(rollup_key) or []:
+            conteo[item["valor"]] = conteo.get(item["valor"], 0) + int(item["total"])
+
+    if live is not None:
+        live[campo] = {"$exists": True, "$nin": [None, ""]}
+        pipeline = [
+            {"$match": live},
+            {"$group": {"_id": f"${campo}", "count": {"$sum": 1}}},
+        ]
+        for r in await get_async_logs_collection().aggregate(pipeline).to_list(length=None):
+            conteo[r["_id"]] = conteo.get(r["_id"], 0) + r["count"]
+    return conteo
 
 
 async def obtener_intents_mas_usados(
@@ -83,29 +186,27 @@ async def obtener_intents_mas_usados(
     desde: Optional[str] = None,
     hasta: Optional[str] = None,
 ) -> List[Dict[str, int]]:
-    filtro = build_date_filter(desde, hasta)
-    filtro["intent"] = {"$exists": True, "$ne": ""}
+    conteo = await _contar_por_campo("intent", desde, hasta)
+    top = sorted(conteo.items(), key=lambda kv: kv[1], reverse=True)[: int(limit)]
+    return [{"intent": k, "total": v} for k, v in top]
 
-    pipeline = [
-        {"$match": filtro},
-        {"$group": {"_id": "$intent", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": int(limit)},
-    ]
-    resultados = list(get_logs_collection().aggregate(pipeline))
-    return [{"intent": r["_id"], "total": r["count"]} for r in resultados]
+
+async def obtener_logs_por_origen(desde: Optional[str] = None, hasta: Optional[str] = None) -> List[Dict[str, int]]:
+    conteo = await _contar_por_campo("origen", desde, hasta)
+    return [{"origen": k, "total": v} for k, v in sorted(conteo.items(), key=lambda kv: kv[1], reverse=True)]
 
 
 async def obtener_total_usuarios() -> int:
-    return get_users_collection().count_documents({})
+    return await get_async_users_collection().count_documents({})
 
 
 async def obtener_ultimos_usuarios(limit: int = 5) -> List[Dict[str, str]]:
-    usuarios = (
-        get_users_collection()
+    usuarios = await (
+        get_async_users_collection()
         .find({}, {"password": 0})
         .sort("_id", DESCENDING)
         .limit(int(limit))
+        .to_list(length=int(limit))
     )
     return [
         {
@@ -123,30 +224,38 @@ async def obtener_usuarios_por_rol() -> List[Dict[str, int]]:
         {"$group": {"_id": "$rol", "total": {"$sum": 1}}},
         {"$sort": {"total": -1}},
     ]
-    resultados = list(get_users_collection().aggregate(pipeline))
+    resultados = await get_async_users_collection().aggregate(pipeline).to_list(length=None)
     return [{"rol": r["_id"], "total": r["total"]} for r in resultados]
 
 
 async def obtener_logs_por_dia(desde: Optional[str] = None, hasta: Optional[str] = None) -> List[Dict[str, int]]:
     """
-    Group logs per day using $dateToString with the local timezone.
+    Logs por día local: días compactados desde stats_daily y el resto
+    agrupando en vivo con $dateToString en la zona horaria local.
     """
-    filtro = build_date_filter(desde, hasta)
-    pipeline = [
-        {"$match": filtro},
-        {
-            "$group": {
-                "_id": {
-                    "$dateToString": {
-                        "format": "%Y-%m-%d",
-                        "date": "$timestamp",
-                        "timezone": TZ_NAME,
-                    }
-                },
-                "total": {"$sum": 1},
-            }
-        },
-        {"$sort": {"_id": 1}},
+    rollup, live = await _plan_rango(desde, hasta)
+    resultado = [
+        {"fecha": d["_id"], "total": d.get("total", 0)}
+        for d in await _leer_rollups(rollup, {"total": 1})
+        if d.get("total")
     ]
-    resultados = list(get_logs_collection().aggregate(pipeline))
-    return [{"fecha": r["_id"], "total": r["total"]} for r in resultados]
\ No newline at end of file
+    if live is not None:
+        pipeline = [
+            {"$match": live},
+            {
+                "$group": {
+                    "_id": {
+                        "$dateToString": {
+                            "format": "%Y-%m-%d",
+                            "date": "$timestamp",
+                            "timezone": TZ_NAME,
+                        }
+                    },
+                    "total": {"$sum": 1},
+                }
+            },
+            {"$sort": {"_id": 1}},
+        ]
+        resultados = await get_async_logs_collection().aggregate(pipeline).to_list(length=None)
+        resultado.extend({"fecha": r["_id"], "total": r["total"]} for r in resultados)
+    return resultado
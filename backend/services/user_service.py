@@ -5,20 +5,19 @@ from __future__ import annotations
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from io import StringIO
-import csv
 
 from bson import ObjectId
-from passlib.context import CryptContext
 from pymongo.errors import DuplicateKeyError
 from fastapi.responses import StreamingResponse
 
+from backend.config.settings import settings
 from backend.db.mongodb import get_users_collection
 from backend.schemas.user_schema import UserOut
+from backend.services.password_hasher import HashingOverloaded, password_hasher
+from backend.utils.csv_stream import iter_csv
 from backend.utils.logging import get_logger
 
 logger = get_logger(__name__)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 # =====================================================
@@ -146,7 +145,7 @@ def create_user(nombre: str, email: str, password: str, rol: str = "usuario") ->
             logger.warning(f"[users] Intento de registro duplicado: {email}")
             return None
 
-        hashed_password = pwd_context.hash(password)
+        hashed_password = password_hasher.hash(password)
         user_data: Dict[str, Any] = {
             "nombre": (nombre or "").strip(),
             "email": _norm_email(email),
@@ -164,6 +163,8 @@ def create_user(nombre: str, email: str, password: str, rol: str = "usuario") ->
     except DuplicateKeyError:
         logger.warning(f"[users] Correo duplicado detectado: {email}")
         return None
+    except HashingOverloaded:
+        raise
     except Exception as e:
         logger.error(f"[users] Error creando usuario {email}: {e}")
         return None
@@ -217,7 +218,7 @@ def update_user(user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
                 return None
 
         if "password" in payload and payload["password"]:
-            payload["password"] = pwd_context.hash(str(payload["password"]))
+            payload["password"] = password_hasher.hash(str(payload["password"]))
 
         col = get_users_collection()
         if not payload:
@@ -235,6 +236,8 @@ def update_user(user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         logger.info(f"[users] Usuario {user_id} actualizado correctamente")
         return pub
 
+    except HashingOverloaded:
+        raise
     except Exception as e:
         logger.error(f"[users] Error actualizando usuario {user_id}: {e}")
         return None
@@ -278,11 +281,18 @@ def verify_user_credentials(email: str, password: str) -> Optional[Dict[str, Any
         if not hashed:
             logger.warning(f"[auth] Usuario {email_norm} sin contraseña definida")
             return None
-        if pwd_context.verify(password, hashed):
+        ok, new_hash = password_hasher.verify_and_update(password, hashed)
+        if ok:
+            if new_hash:
+                # Rehash transparente al cambiar PASSWORD_BCRYPT_ROUNDS
+                col.update_one({"_id": user["_id"], "password": hashed}, {"$set": {"password": new_hash}})
+                hashed = new_hash
             logger.info(f"[auth] Usuario {email_norm} autenticado correctamente")
             return _to_public_user(user) | {"password": hashed}  # conservamos compat si alguien lee el hash
         logger.warning(f"[auth] Contraseña incorrecta para usuario {email_norm}")
         return None
+    except HashingOverloaded:
+        raise  # la app responde 503; no es un fallo de credenciales
     except Exception as e:
         logger.error(f"[auth] Error verificando credenciales de {email}: {e}")
         return None
@@ -292,35 +302,30 @@ def verify_user_credentials(email: str, password: str) -> Optional[Dict[str, Any
 # Exportación CSV
 # =====================================================
 def export_users_csv() -> StreamingResponse:
-    """Exporta los usuarios a CSV (sin contraseñas)."""
+    """Exporta los usuarios a CSV (sin contraseñas), leyendo el cursor por lotes."""
     try:
         col = get_users_collection()
-        users = col.find({}, {"password": 0})
+        users = col.find(
+            {},
+            {"_id": 1, "nombre": 1, "email": 1, "rol": 1},
+            batch_size=settings.export_batch_size,
+        )
 
-        rows: List[Dict[str, str]] = []
-        for u in users:
-            pub = _to_public_user(u)
-            rows.append({
-                "id": pub.get("id", ""),
-                "nombre": pub.get("nombre", "") or "",
-                "email": pub.get("email", "") or "",
-                "rol": pub.get("rol", "") or "",
-            })
-
-        output = StringIO()
-        # BOM para Excel UTF-8
-        output.write("\ufeff")
-        writer = csv.writer(output)
-        writer.writerow(["id", "nombre", "email", "rol"])
-        for r in rows:
-            writer.writerow([r["id"], r["nombre"], r["email"], r["rol"]])
-        output.seek(0)
+        def _rows():
+            for u in users:
+                pub = _to_public_user(u)
+                yield [
+                    pub.get("id", ""),
+                    pub.get("nombre", "") or "",
+                    pub.get("email", "") or "",
+                    pub.get("rol", "") or "",
+                ]
 
         filename = f"usuarios_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-        logger.info(f"[users] Usuarios exportados correctamente como {filename}")
+        logger.info(f"[users] Exportando usuarios como {filename}")
 
         return StreamingResponse(
-            output,
+            iter_csv(_rows(), ["id", "nombre", "email", "rol"], bom=True),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"},
         )
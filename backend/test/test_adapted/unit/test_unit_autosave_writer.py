@@ -0,0 +1,46 @@
+# backend/test/test_adapted/unit/test_unit_autosave_writer.py
+
+"""
+Pruebas unitarias del writer Mongo del motor de autosave (rasa/utils/autosave_engine.py).
+
+Objetivo:
+    Verificar que el registro de índices declara el índice único de
+    ``sender_id`` para los autosaves versionados, y que si el upsert de
+    ``create`` choca con ese índice (otro proceso creó el documento a la vez)
+    el writer lo reporta como ``VersionConflict``.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from backend.db import indexes
+
+# rasa/utils no es paquete importable desde el backend (choca con backend/utils)
+_PATH = Path(__file__).resolve().parents[4] / "rasa" / "utils" / "autosave_engine.py"
+_spec = importlib.util.spec_from_file_location("rasa_autosave_engine", _PATH)
+autosave_engine = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(autosave_engine)
+
+
+class _Carrera:
+    """Colección donde el documento lo insertó otro proceso entre find y upsert."""
+
+    def update_one(self, filtro, update, upsert=False):
+        raise DuplicateKeyError("E11000 duplicate key error index: sender_id_version")
+
+
+def test_registro_declara_sender_id_unico():
+    modelos = indexes.INDEX_REGISTRY[("autosave", indexes.settings.autosave_collection)]
+    doc = next(m.document for m in modelos if m.document["name"] == "sender_id_version")
+    assert list(doc["key"].items()) == [("sender_id", 1)]
+    assert doc["unique"] is True
+    assert doc["partialFilterExpression"] == {"version": {"$exists": True}}
+
+
+def test_create_duplicado_es_conflicto_de_version():
+    writer = autosave_engine.MongoAutosaveWriter(_Carrera())
+    with pytest.raises(autosave_engine.VersionConflict):
+        writer.create("u1", {"a": 1})
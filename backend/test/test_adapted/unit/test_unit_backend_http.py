@@ -0,0 +1,76 @@
+# backend/test/test_adapted/unit/test_unit_backend_http.py
+
+"""
+Pruebas unitarias del breaker por endpoint de rasa/utils/backend_http.py.
+
+Objetivo:
+    Verificar que la llamada de prueba en half-open libera su lugar aunque
+    se cancele (timeout de la acción) o falle con un error no httpx, de modo
+    que el breaker no quede rechazando todo hasta reiniciar el proceso.
+"""
+
+import asyncio
+import importlib.util
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+# rasa/utils no es paquete importable desde el backend (choca con backend/utils)
+_PATH = Path(__file__).resolve().parents[4] / "rasa" / "utils" / "backend_http.py"
+_spec = importlib.util.spec_from_file_location("rasa_backend_http", _PATH)
+backend_http = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(backend_http)
+
+
+def _half_open(http, endpoint):
+    breaker = http.breaker(endpoint)
+    breaker.failures = http.failure_threshold
+    breaker.opened_at = time.monotonic() - http.reset_timeout - 1
+    assert breaker.state == "half-open"
+    return breaker
+
+
+def _cliente(http, handler):
+    http._loop = asyncio.get_running_loop()
+    http._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_probe_cancelada_libera_half_open():
+    http = backend_http.BackendHttp(retries=0, reset_timeout=5)
+    breaker = _half_open(http, "estado")
+
+    async def lento(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    async def _run():
+        _cliente(http, lento)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(http.request("GET", "http://backend/estado", "estado"), 0.05)
+        assert breaker.state == "half-open"
+
+        # la siguiente llamada vuelve a ser la prueba y cierra el circuito
+        _cliente(http, lambda request: httpx.Response(200))
+        resp = await http.request("GET", "http://backend/estado", "estado")
+        assert resp.status_code == 200
+        assert breaker.state == "closed"
+
+    asyncio.run(_run())
+
+
+def test_probe_con_error_no_httpx_libera_half_open():
+    http = backend_http.BackendHttp(retries=0, reset_timeout=5)
+    breaker = _half_open(http, "tutor")
+
+    def roto(request):
+        raise ValueError("respuesta ilegible")
+
+    async def _run():
+        _cliente(http, roto)
+        with pytest.raises(ValueError):
+            await http.request("GET", "http://backend/tutor", "tutor")
+
+    asyncio.run(_run())
+    assert breaker.allow() is True
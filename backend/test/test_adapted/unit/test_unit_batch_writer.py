@@ -0,0 +1,101 @@
+# backend/test/test_adapted/unit/test_unit_batch_writer.py
+
+"""
+Pruebas unitarias del escritor en lote (access log write-behind).
+
+Objetivo:
+    Verificar que los documentos se vuelcan con insert_many por tamaño o
+    por tiempo, que la cola acotada descarta con contador cuando se satura
+    y que stop() drena lo pendiente.
+"""
+
+import asyncio
+
+from pymongo.errors import AutoReconnect
+
+from backend.services.batch_writer import BatchWriter
+from backend.services.log_service import debe_registrar_acceso
+
+
+class _FakeAsyncCollection:
+    def __init__(self):
+        self.lotes = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.lotes.append(list(docs))
+
+
+def test_vuelca_por_tamano_de_lote():
+    async def _run():
+        col = _FakeAsyncCollection()
+        w = BatchWriter("t", lambda: col, batch_size=3, flush_interval=10)
+        for i in range(3):
+            await w.put({"i": i})
+        await asyncio.sleep(0.01)
+        assert [len(b) for b in col.lotes] == [3]
+        await w.stop()
+        return w.stats()
+
+    stats = asyncio.run(_run())
+    assert stats["written"] == 3 and stats["flushes"] == 1
+
+
+def test_vuelca_por_tiempo_y_drena_en_stop():
+    async def _run():
+        col = _FakeAsyncCollection()
+        w = BatchWriter("t", lambda: col, batch_size=100, flush_interval=0.02)
+        await w.put({"i": 1})
+        await asyncio.sleep(0.05)
+        assert col.lotes == [[{"i": 1}]]
+        await w.put({"i": 2})
+        await w.stop()
+        return col
+
+    col = asyncio.run(_run())
+    assert col.lotes[-1] == [{"i": 2}]
+
+
+def test_descarta_con_contador_cuando_la_cola_esta_llena():
+    async def _run():
+        col = _FakeAsyncCollection()
+        w = BatchWriter("t", lambda: col, batch_size=100, flush_interval=10, max_queue=2)
+        resultados = [await w.put({"i": i}) for i in range(5)]
+        stats = w.stats()
+        await w.stop()
+        return resultados, stats
+
+    resultados, stats = asyncio.run(_run())
+    assert resultados.count(False) >= 2
+    assert stats["dropped"] == resultados.count(False)
+
+
+def test_rutas_de_ruido_no_se_registran():
+    assert debe_registrar_acceso("/api/health") is False
+    assert debe_registrar_acceso("/static/widget.js") is False
+    assert debe_registrar_acceso("/api/chat") is True
+
+
+def test_reintenta_errores_transitorios_y_mide_latencia():
+    class _Flaky(_FakeAsyncCollection):
+        def __init__(self):
+            super().__init__()
+            self.fallos = 2
+
+        async def insert_many(self, docs, ordered=True):
+            if self.fallos:
+                self.fallos -= 1
+                raise AutoReconnect("failover")
+            await super().insert_many(docs, ordered)
+
+    async def _run():
+        col = _Flaky()
+        w = BatchWriter("t", lambda: col, batch_size=1, flush_interval=0,
+                        max_retries=3, retry_backoff=0.001)
+        await w.put({"i": 1})
+        await w.stop()
+        return col, w.stats()
+
+    col, stats = asyncio.run(_run())
+    assert col.lotes == [[{"i": 1}]]
+    assert stats["retries"] == 2 and stats["failed"] == 0 and stats["written"] == 1
+    assert stats["flush_ms"]["max"] >= stats["flush_ms"]["last"] >= 0
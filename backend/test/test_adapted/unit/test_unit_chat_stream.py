@@ -0,0 +1,144 @@
+# backend/test/test_adapted/unit/test_unit_chat_stream.py
+
+"""
+Pruebas unitarias del streaming de respuestas del chat (SSE).
+
+Objetivo:
+    Verificar que los parciales publicados por el action server se reenvían
+    como eventos ``delta`` antes de la respuesta final de Rasa, que sin
+    Redis el flujo degrada a un único evento ``message`` con la lista, y que
+    el turno se registra aunque el cliente se desconecte o Rasa falle.
+"""
+
+import asyncio
+import inspect
+import json
+
+from starlette.requests import Request
+
+from backend.routes import chat
+from backend.services import chat_stream
+
+
+class _FakePubSub:
+    def __init__(self, bus):
+        self.bus = bus
+        self.channel = None
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.channel = channel
+        self.bus.subs[channel] = asyncio.Queue()
+
+    async def listen(self):
+        q = self.bus.subs[self.channel]
+        while True:
+            yield await q.get()
+
+    async def unsubscribe(self):
+        self.bus.subs.pop(self.channel, None)
+
+    async def aclose(self):
+        self.closed = True
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.subs = {}
+
+    def pubsub(self):
+        return _FakePubSub(self)
+
+    async def publish(self, channel, data):
+        if channel in self.subs:
+            await self.subs[channel].put({"type": "message", "data": data})
+
+
+async def _collect(gen):
+    return [item async for item in gen]
+
+
+def test_deltas_antes_de_la_respuesta_final(monkeypatch):
+    bus = _FakeRedis()
+    monkeypatch.setattr(chat_stream, "_get_redis", lambda: bus)
+
+    async def fake_rasa(message, sender_id, metadata=None):
+        canal = chat_stream.channel_for(sender_id)
+        for parte in ("Hola, ", "¿en qué ", "te ayudo?"):
+            await bus.publish(canal, json.dumps({"type": "delta", "text": parte}))
+            await asyncio.sleep(0)
+        await bus.publish(canal, json.dumps({"type": "end"}))
+        return [{"recipient_id": sender_id, "text": "Hola, ¿en qué te ayudo?"}]
+
+    monkeypatch.setattr(chat_stream, "process_user_message", fake_rasa)
+
+    eventos = asyncio.run(_collect(chat_stream.stream_chat_events("hola", "web-1")))
+
+    assert [e for e, _ in eventos] == ["delta", "delta", "delta", "message"]
+    assert "".join(d["text"] for e, d in eventos if e == "delta") == "Hola, ¿en qué te ayudo?"
+    assert eventos[-1][1][0]["text"] == "Hola, ¿en qué te ayudo?"
+    assert bus.subs == {}  # se desuscribe al terminar
+
+
+def test_sin_redis_degrada_a_lista(monkeypatch):
+    monkeypatch.setattr(chat_stream, "_get_redis", lambda: None)
+
+    async def fake_rasa(message, sender_id, metadata=None):
+        return [{"text": "ok"}]
+
+    monkeypatch.setattr(chat_stream, "process_user_message", fake_rasa)
+
+    eventos = asyncio.run(_collect(chat_stream.stream_chat_events("hola", "web-1")))
+    assert eventos == [("message", [{"text": "ok"}])]
+    assert chat_stream.sse_event("delta", {"text": "ñ"}) == 'event: delta\ndata: {"text": "ñ"}\n\n'.encode()
+
+
+def _turnos_registrados(monkeypatch, fake_stream, consumir):
+    registrados = []
+
+    async def fake_log_turn(data, request, meta, respuestas, latency_ms):
+        await asyncio.sleep(0)
+        registrados.append((data.message, respuestas, dict(meta)))
+
+    monkeypatch.setattr(chat, "stream_chat_events", fake_stream)
+    monkeypatch.setattr(chat, "_log_turn", fake_log_turn)
+    endpoint = inspect.unwrap(chat.send_message_to_bot_stream)
+    request = Request({"type": "http", "method": "POST", "path": "/chat/stream", "headers": [], "client": ("1.2.3.4", 1)})
+
+    async def _run():
+        resp = await endpoint(chat.ChatRequest(sender="web-1", message="hola"), request)
+        await consumir(resp.body_iterator)
+        await asyncio.gather(*chat._log_tasks)
+
+    asyncio.run(_run())
+    return registrados
+
+
+def test_desconexion_a_mitad_del_flujo_registra_el_turno(monkeypatch):
+    async def lento(message, sender_id, metadata=None):
+        yield "delta", {"text": "Hola"}
+        await asyncio.sleep(10)
+        yield "message", [{"text": "Hola"}]
+
+    async def desconectar(body):
+        await body.__anext__()  # llega el primer delta y el cliente se va
+        await body.aclose()
+
+    registrados = _turnos_registrados(monkeypatch, lento, desconectar)
+    assert len(registrados) == 1
+    mensaje, respuestas, meta = registrados[0]
+    assert mensaje == "hola" and respuestas == []
+    assert meta["stream_status"] == "disconnected" and meta["first_delta_ms"] is not None
+
+
+def test_error_de_rasa_registra_el_turno(monkeypatch):
+    async def roto(message, sender_id, metadata=None):
+        raise RuntimeError("rasa caído")
+        yield  # pragma: no cover
+
+    async def leer_todo(body):
+        eventos = [chunk async for chunk in body]
+        assert eventos[-1].startswith(b"event: done")
+
+    registrados = _turnos_registrados(monkeypatch, roto, leer_todo)
+    assert [meta["stream_status"] for _, _, meta in registrados] == ["error"]
@@ -0,0 +1,72 @@
+# backend/test/test_adapted/unit/test_unit_http_pipeline.py
+
+"""
+Pruebas unitarias del middleware ASGI consolidado (HttpPipelineMiddleware).
+
+Objetivo:
+    Verificar que en una sola pasada se pueblan request.state (ip, user_agent,
+    user), se propaga X-Request-ID, se agregan las cabeceras de seguridad y
+    que las respuestas streaming llegan completas.
+"""
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from backend.middleware.http_pipeline import DEFAULT_CSP, HttpPipelineMiddleware
+from backend.middleware.request_id import get_request_id
+
+
+async def _meta(request: Request):
+    user = getattr(request.state, "user", None) or {}
+    return JSONResponse({
+        "ip": request.state.ip,
+        "ua": request.state.user_agent,
+        "rid": get_request_id(),
+        "email": user.get("email"),
+    })
+
+
+async def _stream(request: Request):
+    async def gen():
+        for i in range(3):
+            yield f"chunk{i};".encode()
+    return StreamingResponse(gen(), media_type="text/plain")
+
+
+def _client() -> TestClient:
+    app = Starlette(routes=[Route("/meta", _meta), Route("/stream", _stream)])
+    app.add_middleware(HttpPipelineMiddleware)
+    return TestClient(app)
+
+
+def test_estado_request_id_y_cabeceras_en_una_pasada():
+    r = _client().get(
+        "/meta",
+        headers={
+            "X-Forwarded-For": "10.0.0.1, 10.0.0.2",
+            "User-Agent": "pytest-ua",
+            "X-Request-ID": "rid-123",
+            "Authorization": "Bearer FAKE_TOKEN_ZAJUNA",
+        },
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert body["ip"] == "10.0.0.1"
+    assert body["ua"] == "pytest-ua"
+    assert body["rid"] == "rid-123"
+    assert body["email"]  # claims de demo resueltos por el middleware
+
+    assert r.headers["x-request-id"] == "rid-123"
+    assert r.headers["content-security-policy"] == DEFAULT_CSP
+    assert r.headers["x-frame-options"] == "SAMEORIGIN"
+    assert r.headers["x-content-type-options"] == "nosniff"
+
+
+def test_genera_request_id_y_no_rompe_streaming():
+    r = _client().get("/stream")
+    assert r.status_code == 200
+    assert r.text == "chunk0;chunk1;chunk2;"
+    assert len(r.headers["x-request-id"]) == 36
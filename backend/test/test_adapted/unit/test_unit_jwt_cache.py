@@ -0,0 +1,102 @@
+# backend/test/test_adapted/unit/test_unit_jwt_cache.py
+
+"""
+Pruebas unitarias de la caché de verificación JWT.
+
+Objetivo:
+    Verificar que los claims verificados se reutilizan hasta ``exp`` (LRU
+    acotado) y solo para el mismo verificador, que un token repetido no
+    vuelve a verificar la firma y que un ``kid`` desconocido no descarga el
+    JWKS en la petición: despierta a la tarea de refresco, con límite de
+    frecuencia.
+"""
+
+import asyncio
+import time
+
+import httpx
+import jwt
+import respx
+
+from backend.services import jwt_service
+from backend.services.jwt_cache import JwksKeyStore, VerifiedTokenCache, token_cache
+
+JWKS_URL = "https://idp.test/.well-known/jwks.json"
+
+
+def test_cache_respeta_exp_y_tamano_maximo():
+    cache = VerifiedTokenCache(maxsize=2, max_ttl=60)
+    now = time.time()
+    cache.put("a", {"exp": now + 30})
+    cache.put("b", {"exp": now + 30})
+    cache.put("c", {"exp": now + 30})  # expulsa "a" (LRU)
+    cache.put("vencido", {"exp": now - 1})
+    cache.put("sin_exp", {"sub": "x"})
+
+    assert cache.get("a") is None
+    assert cache.get("b") and cache.get("c")
+    assert cache.get("vencido") is None and cache.get("sin_exp") is None
+
+
+def test_cache_separa_verificadores():
+    cache = VerifiedTokenCache(maxsize=8, max_ttl=60)
+    cache.put("t", {"exp": time.time() + 30, "aud": "app"}, "pyjwt|HS256|aud=|iss=")
+
+    assert cache.get("t", "pyjwt|HS256|aud=|iss=")["aud"] == "app"
+    assert cache.get("t", "jose|HS256|aud=app|iss=") is None
+    assert cache.get("t") is None
+
+
+def test_token_repetido_se_verifica_una_sola_vez(monkeypatch):
+    token = jwt.encode(
+        {"sub": "u1", "email": "u1@test.co", "exp": int(time.time()) + 120},
+        jwt_service.settings.secret_key,
+        algorithm="HS256",
+    )
+    llamadas = []
+    real_decode = jwt.decode
+
+    def _contar(*args, **kwargs):
+        llamadas.append(1)
+        return real_decode(*args, **kwargs)
+
+    token_cache.clear()
+    monkeypatch.setattr(jwt_service.jwt, "decode", _contar)
+    for _ in range(5):
+        ok, claims = jwt_service.decode_token(f"Bearer {token}")
+        assert ok and claims["email"] == "u1@test.co"
+    assert len(llamadas) == 1
+
+
+@respx.mock
+def test_jwks_kid_desconocido_no_descarga_en_la_peticion():
+    ruta = respx.get(JWKS_URL).mock(
+        return_value=httpx.Response(200, json={"keys": [{"kid": "k1", "kty": "oct", "k": "c2VjcmV0"}]})
+    )
+    store = JwksKeyStore(JWKS_URL, refresh_interval=3600, min_refetch_interval=60)
+
+    async def _esperar(cond):
+        for _ in range(200):
+            if cond():
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError("timeout")
+
+    async def _run():
+        store.start()
+        # ``fetches`` sube después de reemplazar las llaves (``call_count`` ya al enviar)
+        await _esperar(lambda: store.fetches == 1)  # descarga inicial de la tarea
+        assert store.get_jwk("k1")["kid"] == "k1"  # desde memoria
+        store._last_fetch -= 60  # pasó el intervalo mínimo desde la última descarga
+
+        ruta.mock(return_value=httpx.Response(200, json={"keys": [{"kid": "k2", "kty": "oct", "k": "c2VjcmV0"}]}))
+        assert store.get_jwk("k2") is None  # rotación: responde al instante, sin red
+        assert store.get_jwk("k2") is None  # dentro del límite: ni siquiera despierta a la tarea
+        assert store.stats()["refetch_throttled"] == 1
+
+        await _esperar(lambda: store.fetches == 2)  # la tarea de refresco descarga
+        assert store.get_jwk("k2")["kid"] == "k2"
+        await store.stop()
+
+    asyncio.run(_run())
+    assert ruta.call_count == 2
@@ -0,0 +1,67 @@
+# backend/test/test_adapted/unit/test_unit_login_lockout.py
+
+"""
+Pruebas unitarias del bloqueo por intentos fallidos de login.
+
+Objetivo:
+    Verificar la semántica de bloqueo (N fallos → bloqueo y contador a 0,
+    reset al acertar, expiración del bloqueo y de la ventana) con el backend
+    en memoria, y que ante un Redis caído se degrada a memoria sin romper.
+"""
+
+import time
+
+from backend.services.login_lockout import LoginLockout
+
+
+def test_bloquea_al_llegar_al_maximo_y_reinicia_contador():
+    lk = LoginLockout(window_sec=60, shards=4)
+    assert lk.register_failure("a@x.com", max_attempts=3, lock_minutes=15) is False
+    assert lk.register_failure("a@x.com", max_attempts=3, lock_minutes=15) is False
+    assert lk.is_locked("a@x.com") is False
+    assert lk.register_failure("a@x.com", max_attempts=3, lock_minutes=15) is True
+    assert lk.is_locked("a@x.com") is True
+    assert lk.is_locked("b@x.com") is False
+
+    lk.reset("a@x.com")
+    assert lk.is_locked("a@x.com") is False
+    # contador reiniciado: hacen falta otros 3 fallos
+    assert lk.register_failure("a@x.com", max_attempts=3, lock_minutes=15) is False
+
+
+def test_bloqueo_y_ventana_expiran(monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: reloj[0])
+    lk = LoginLockout(window_sec=60, shards=1)
+
+    lk.register_failure("a@x.com", max_attempts=2, lock_minutes=1)
+    reloj[0] += 61  # el primer fallo sale de la ventana
+    assert lk.register_failure("a@x.com", max_attempts=2, lock_minutes=1) is False
+
+    assert lk.register_failure("a@x.com", max_attempts=2, lock_minutes=1) is True
+    reloj[0] += 59
+    assert lk.is_locked("a@x.com") is True
+    reloj[0] += 2
+    assert lk.is_locked("a@x.com") is False
+
+
+class _RedisCaido:
+    def register_script(self, _src):
+        def _run(**_kw):
+            raise ConnectionError("down")
+        return _run
+
+    def exists(self, *_a):
+        raise ConnectionError("down")
+
+    def delete(self, *_a):
+        raise ConnectionError("down")
+
+
+def test_redis_caido_degrada_a_memoria():
+    lk = LoginLockout(window_sec=60, redis_client=_RedisCaido(), redis_retry_sec=30)
+    assert lk.backend == "redis"
+    assert lk.register_failure("a@x.com", max_attempts=2, lock_minutes=5) is False
+    assert lk.register_failure("a@x.com", max_attempts=2, lock_minutes=5) is True
+    assert lk.is_locked("a@x.com") is True
+    assert lk.stats()["redis_errors"] == 1  # luego no se reintenta durante redis_retry_sec
@@ -0,0 +1,103 @@
+# backend/test/test_adapted/unit/test_unit_mongo_indexes.py
+
+"""
+Pruebas unitarias del registro declarativo de índices.
+
+Objetivo:
+    Verificar que solo se crean los índices cuya clave falta (sin importar
+    el nombre con que existan), que un TTL distinto se ajusta con collMod y
+    que los índices sin accesos aparecen en el reporte.
+"""
+
+from backend.db import indexes
+
+
+class _FakeCollection:
+    def __init__(self, db, name):
+        self.database = db
+        self.name = name
+        self.info = {"_id_": {"key": [("_id", 1)]}}
+        self.creados = []
+        self.ops = {}
+
+    def index_information(self):
+        return self.info
+
+    def create_indexes(self, modelos):
+        for m in modelos:
+            doc = m.document
+            self.creados.append(doc["name"])
+            opciones = {k: v for k, v in doc.items() if k not in ("key", "name")}
+            self.info[doc["name"]] = {"key": list(doc["key"].items()), **opciones}
+
+    def aggregate(self, pipeline):
+        return [{"name": n, "accesses": {"ops": self.ops.get(n, 0)}} for n in self.info]
+
+
+class _FakeDatabase:
+    def __init__(self, name):
+        self.name = name
+        self.cols = {}
+        self.comandos = []
+
+    def __getitem__(self, name):
+        return self.cols.setdefault(name, _FakeCollection(self, name))
+
+    def command(self, cmd):
+        self.comandos.append(cmd)
+        return {}
+
+
+class _FakeClient:
+    def __init__(self):
+        self.dbs = {}
+
+    def __getitem__(self, name):
+        return self.dbs.setdefault(name, _FakeDatabase(name))
+
+
+def _app_db(client):
+    return indexes._database("app", client)
+
+
+def test_crea_solo_claves_faltantes():
+    client = _FakeClient()
+    users = _app_db(client)["users"]
+    users.info["uniq_email"] = {"key": [("email", 1)], "unique": True}  # creado antes con otro nombre
+
+    reporte = indexes.aplicar_indices(client)
+
+    assert users.creados == []
+    assert "tipo_timestamp" in _app_db(client)["logs"].creados
+    assert reporte["errors"] == []
+    assert indexes.planificar(client) == []  # idempotente
+
+
+def test_ttl_distinto_se_ajusta_con_collmod():
+    client = _FakeClient()
+    db = indexes._database("autosave", client)
+    autosaves = db[indexes.settings.autosave_collection]
+    autosaves.info["timestamp_1"] = {"key": [("timestamp", 1)], "expireAfterSeconds": 60}
+
+    reporte = indexes.aplicar_indices(client)
+
+    assert any(r.endswith(".ttl_timestamp") for r in reporte["ttl_updated"])
+    assert db.comandos[0]["index"] == {
+        "name": "timestamp_1",
+        "expireAfterSeconds": indexes.settings.autosave_ttl_days * indexes.DAY,
+    }
+
+
+def test_dry_run_no_crea_y_reporta_sin_uso():
+    client = _FakeClient()
+    reporte = indexes.aplicar_indices(client, dry_run=True)
+    assert reporte["created"] and _app_db(client)["logs"].creados == []
+
+    indexes.aplicar_indices(client)
+    logs = _app_db(client)["logs"]
+    logs.ops = {"tipo_timestamp": 12, "timestamp_-1": 3, "intent_timestamp": 1}
+
+    sin_uso = {(u["collection"], u["name"]) for u in indexes.indices_sin_uso(client)}
+    assert ("logs", "user_id_leido") in sin_uso
+    assert ("logs", "tipo_timestamp") not in sin_uso
+    assert not any(name.startswith("ttl_") for _, name in sin_uso)
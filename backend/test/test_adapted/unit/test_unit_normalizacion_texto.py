@@ -0,0 +1,91 @@
+# backend/test/test_adapted/unit/test_unit_normalizacion_texto.py
+
+"""
+Pruebas unitarias de rasa/actions/normalizacion_texto.py.
+
+Objetivo:
+    Verificar que ``detectar_materia`` elige la coincidencia más larga y solo
+    por palabras completas ("paredes" no es "redes"), y que
+    ``normalize_chat_text`` y ``anonymize_text`` devuelven exactamente lo
+    mismo que la implementación anterior (referencia copiada abajo).
+"""
+
+import importlib.util
+import re
+import unicodedata
+from pathlib import Path
+
+import pytest
+
+# rasa/actions no es paquete importable desde el backend (depende de rasa_sdk)
+_PATH = Path(__file__).resolve().parents[4] / "rasa" / "actions" / "normalizacion_texto.py"
+_spec = importlib.util.spec_from_file_location("rasa_normalizacion_texto", _PATH)
+nt = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(nt)
+
+MENSAJES = [
+    "Holaaaa kiero aprnder contabilidad básica xq tengo examen",
+    "Necesito mi sertificado de Gestión de Proyectos Ágiles, mi correo es ana.perez@mail.com",
+    "no puedo entrar a la platafroma, mi cédula es 1032456789 y vivo en Calle 45 # 12-30, Bogotá",
+    "q es marketing digital y como se relaciona con redes sociales?",
+    "Explícame ciencias administrativas y contables por favor",
+    "me ayudas con el taller de Inglés",
+    "quiero saber de robótica e internet de las cosas",
+    "Pagué con la tarjeta 4111 1111 1111 1111 en la av Boyacá, ÑANDÚ ñoño",
+    "k   xk  Muuuuy   bieeeen\tgracias",
+    "ok gracias",
+    "",
+]
+
+
+# ----------------- Implementación anterior (referencia) -----------------
+def _legacy_normalize(text):
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    return text.lower()
+
+
+def _legacy_normalize_chat_text(text):
+    if not text:
+        return ""
+    t = _legacy_normalize(text)
+    t = re.sub(r"(.)\1{2,}", r"\1\1", t)
+    tokens = t.split()
+    slang_map = {"k": "que", "xq": "porque", "xk": "porque", "kiero": "quiero", "aprnder": "aprender"}
+    for wrong, right in nt.COMMON_CHAT_CORRECTIONS.items():
+        if wrong not in slang_map:
+            slang_map[wrong] = right
+    t = " ".join(slang_map.get(tok, tok) for tok in tokens)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+def _legacy_anonymize_text(text):
+    if not text:
+        return text
+    text = re.sub(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", "[EMAIL]", text)
+    text = re.sub(r"\b\d{6,}\b", "[NUM]", text)
+    text = re.sub(r"\b(?:\d[ -]*?){13,19}\b", "[NUM]", text)
+    text = re.sub(r"\b[A-ZÁÉÍÓÚ][a-záéíóú]+(?:\s[A-ZÁÉÍÓÚ][a-záéíóú]+){0,2}\b", "[NAME]", text)
+    text = re.sub(r"\b(?:calle|cra|carrera|av|avenida|cll)\b[^\n,]{0,40}", "[ADDRESS]", text, flags=re.IGNORECASE)
+    return text
+
+
+@pytest.mark.parametrize("mensaje", MENSAJES)
+def test_normalize_y_anonymize_igual_que_antes(mensaje):
+    assert nt.normalize_chat_text(mensaje) == _legacy_normalize_chat_text(mensaje)
+    assert nt.anonymize_text(mensaje) == _legacy_anonymize_text(mensaje)
+
+
+def test_materia_coincidencia_mas_larga():
+    assert nt.buscar_materia("explicame ciencias administrativas y contables") == "ciencias administrativas y contables"
+    assert nt.buscar_materia("ciencias administrativas nada mas") == "ciencias administrativas"
+    assert nt.buscar_materia("curso de redes y telecomunicaciones") == "redes y telecomunicaciones"
+    assert nt.detectar_materia("Quiero saber de Realidad Aumentada y Virtual") == nt.MATERIAS["realidad aumentada y virtual"]
+
+
+def test_materia_solo_palabras_completas():
+    assert nt.buscar_materia("pinte las paredes") is None
+    assert nt.detectar_materia("pinté las paredes del taller") == nt.MATERIA_POR_DEFECTO
+    assert nt.buscar_materia("las redes sociales") == "redes"
@@ -0,0 +1,159 @@
+# backend/test/test_adapted/unit/test_unit_ollama_client.py
+
+"""
+Pruebas unitarias del cliente Ollama del action server (rasa/utils/ollama_client.py).
+
+Objetivo:
+    Verificar que la cola admite en orden FIFO respetando ``max_in_flight``,
+    que se lanza ``OllamaBusy`` al superar ``queue_timeout`` sin dejar el
+    cupo tomado, que un cupo transferido a un llamador cancelado pasa al
+    siguiente (también si se cancela antes de un ``release``), y que
+    prompts idénticos en curso comparten una sola llamada.
+"""
+
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+# rasa/utils no es paquete importable desde el backend (choca con backend/utils)
+_PATH = Path(__file__).resolve().parents[4] / "rasa" / "utils" / "ollama_client.py"
+_spec = importlib.util.spec_from_file_location("rasa_ollama_client", _PATH)
+ollama_client = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ollama_client)
+
+
+def _cliente(handler, **kw):
+    client = ollama_client.OllamaClient(base_url="http://ollama", **kw)
+    client._bind_loop()
+    client._client = httpx.AsyncClient(base_url="http://ollama", transport=httpx.MockTransport(handler))
+    return client
+
+
+async def _en_cola(client, n):
+    for _ in range(100):
+        if client._gate.queued == n:
+            return
+        await asyncio.sleep(0)
+    raise AssertionError(f"en cola: {client._gate.queued}")
+
+
+def _respuesta(request):
+    prompt = json.loads(request.content)["prompt"]
+    return httpx.Response(200, json={"response": f"r-{prompt}"})
+
+
+def test_admision_fifo_con_un_cupo():
+    orden = []
+
+    async def handler(request):
+        orden.append(json.loads(request.content)["prompt"])
+        await asyncio.sleep(0.01)
+        return _respuesta(request)
+
+    async def _run():
+        client = _cliente(handler, max_in_flight=1)
+        tareas = [asyncio.ensure_future(client.generate("a"))]
+        for i, p in enumerate("bcd"):
+            await _en_cola(client, i)  # cada una entra a la cola después de la anterior
+            tareas.append(asyncio.ensure_future(client.generate(p)))
+        await _en_cola(client, 3)
+        assert await asyncio.gather(*tareas) == ["r-a", "r-b", "r-c", "r-d"]
+        assert client.stats()["in_flight"] == 0
+        await client.aclose()
+
+    asyncio.run(_run())
+    assert orden == ["a", "b", "c", "d"]
+
+
+def test_ollama_busy_tras_queue_timeout_y_cupo_liberado():
+    liberar = None
+
+    async def handler(request):
+        if json.loads(request.content)["prompt"] == "lento":
+            await liberar.wait()
+        return _respuesta(request)
+
+    async def _run():
+        nonlocal liberar
+        liberar = asyncio.Event()
+        client = _cliente(handler, max_in_flight=1, queue_timeout=0.05)
+        lento = asyncio.ensure_future(client.generate("lento"))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert client._gate.active == 1
+        with pytest.raises(ollama_client.OllamaBusy):
+            await client.generate("rapido")
+        assert client._gate.queued == 0  # el que esperaba salió de la cola
+
+        liberar.set()
+        assert await lento == "r-lento"
+        assert await client.generate("rapido") == "r-rapido"
+        assert client.stats()["queue_timeouts"] == 1 and client._gate.active == 0
+        await client.aclose()
+
+    asyncio.run(_run())
+
+
+def test_cupo_transferido_a_un_cancelado_pasa_al_siguiente():
+    async def _run():
+        gate = ollama_client._FairGate(1)
+        await gate.acquire()
+        cancelado = asyncio.ensure_future(gate.acquire())
+        siguiente = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        assert gate.queued == 2
+
+        gate.release()  # el cupo se transfiere a ``cancelado``...
+        cancelado.cancel()  # ...que se cancela antes de retomarlo
+        with pytest.raises(asyncio.CancelledError):
+            await cancelado
+        await asyncio.wait_for(siguiente, 1)  # el cupo no se perdió
+        assert gate.active == 1 and gate.queued == 0
+
+        gate.release()
+        assert gate.active == 0
+
+    asyncio.run(_run())
+
+
+def test_cancelado_en_cola_antes_de_un_release():
+    async def _run():
+        gate = ollama_client._FairGate(1)
+        await gate.acquire()
+        esperando = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        esperando.cancel()
+        gate.release()  # corre antes de que ``esperando`` procese su cancelación
+        with pytest.raises(asyncio.CancelledError):
+            await esperando
+        assert gate.active == 0 and gate.queued == 0
+        await asyncio.wait_for(gate.acquire(), 1)
+
+    asyncio.run(_run())
+
+
+def test_payloads_identicos_comparten_la_llamada():
+    llamadas = []
+
+    async def handler(request):
+        llamadas.append(json.loads(request.content))
+        await asyncio.sleep(0.01)
+        return _respuesta(request)
+
+    async def _run():
+        client = _cliente(handler, max_in_flight=2)
+        iguales = [client.generate("hola", system="s", num_ctx=2048) for _ in range(3)]
+        otro = client.generate("hola", system="s", num_ctx=4096)  # otras opciones: otra llamada
+        resultados = await asyncio.gather(*iguales, otro)
+        assert resultados == ["r-hola"] * 4
+        stats = client.stats()
+        await client.aclose()
+        return stats
+
+    stats = asyncio.run(_run())
+    assert len(llamadas) == 2
+    assert stats["coalesced"] == 2 and stats["upstream_calls"] == 2 and stats["requests"] == 4
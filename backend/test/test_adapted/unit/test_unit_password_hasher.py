@@ -0,0 +1,67 @@
+# backend/test/test_adapted/unit/test_unit_password_hasher.py
+
+"""
+Pruebas unitarias del pool de hashing de contraseñas.
+
+Objetivo:
+    Verificar que hash/verify funcionan en el pool (sync y async), que con
+    el pool saturado se rechaza al instante con HashingOverloaded y que
+    verify_and_update devuelve un hash nuevo solo cuando cambia el costo.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from backend.services import password_hasher as ph
+from backend.services.password_hasher import HashingOverloaded, PasswordHasher, hash_cost
+
+
+def test_hash_y_verify_en_el_pool():
+    h = PasswordHasher(rounds=4, workers=1, max_queue=2)
+    try:
+        hashed = h.hash("secreta123")
+        assert hash_cost(hashed) == 4
+        assert h.verify("secreta123", hashed) is True
+        assert h.verify("otra", hashed) is False
+        assert h.verify("secreta123", "no-es-bcrypt") is False
+        assert asyncio.run(h.averify("secreta123", hashed)) is True
+        assert h.stats()["in_flight"] == 0
+    finally:
+        h.shutdown()
+
+
+def test_rechaza_al_saturarse(monkeypatch):
+    liberar = threading.Event()
+    monkeypatch.setattr(ph, "_do_verify", lambda pw, hashed: liberar.wait(5))
+
+    h = PasswordHasher(rounds=4, workers=1, max_queue=1)
+    try:
+        f1 = h._submit(ph._do_verify, "a", "x")
+        f2 = h._submit(ph._do_verify, "a", "x")
+        with pytest.raises(HashingOverloaded):
+            h.verify("a", "x")
+        assert h.stats()["shed"] == 1
+
+        liberar.set()
+        f1.result(5), f2.result(5)
+        assert h.stats()["in_flight"] == 0
+    finally:
+        liberar.set()
+        h.shutdown()
+
+
+def test_rehash_solo_si_cambia_el_costo():
+    h = PasswordHasher(rounds=5, workers=1)
+    try:
+        viejo = ph._do_hash("secreta123", 4)
+        ok, nuevo = h.verify_and_update("secreta123", viejo)
+        assert ok and hash_cost(nuevo) == 5
+        assert h.verify("secreta123", nuevo)
+
+        assert h.verify_and_update("secreta123", nuevo) == (True, None)
+        assert h.verify_and_update("mala", viejo) == (False, None)
+        assert h.stats()["rehashed"] == 1
+    finally:
+        h.shutdown()
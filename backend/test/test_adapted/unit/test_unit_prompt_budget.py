@@ -0,0 +1,85 @@
+# backend/test/test_adapted/unit/test_unit_prompt_budget.py
+
+"""
+Pruebas unitarias del presupuesto de prompts (rasa/utils/prompt_budget.py).
+
+Objetivo:
+    Verificar que ``PromptBudget.build`` descarta el historial de los turnos
+    más antiguos a los más recientes, que solo recorta el bloque más largo
+    cuando ya no queda historial, que ``tail`` nunca se recorta y que
+    ``history_used``/``history_dropped`` reflejan lo que entró.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+# rasa/utils no es paquete importable desde el backend (choca con backend/utils)
+_PATH = Path(__file__).resolve().parents[4] / "rasa" / "utils" / "prompt_budget.py"
+_spec = importlib.util.spec_from_file_location("rasa_prompt_budget", _PATH)
+prompt_budget = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = prompt_budget  # @dataclass lo busca por nombre
+_spec.loader.exec_module(prompt_budget)
+
+PromptBudget = prompt_budget.PromptBudget
+est = prompt_budget.estimate_tokens
+
+SYSTEM = "Eres un tutor del SENA.\n=====\n\nResponde en español."
+BLOQUES = [("Contexto:", "El aprendiz pregunta por su certificado."), ("Base:", "Texto base corto.")]
+TAIL = "Instrucciones: responde en máximo tres frases y sin inventar datos."
+TITULO = "Historial breve:"
+HISTORIAL = [f"usuario: turno numero {i} con algo de texto" for i in range(4)]
+
+
+def _base(budget_sin_sistema):
+    pb = PromptBudget(SYSTEM, budget=0, max_history=6)
+    pb.budget = pb.system_tokens + est(TAIL) + budget_sin_sistema
+    return pb
+
+
+def _costo_bloques(bloques=BLOQUES):
+    return sum(est(t) + est(b) for t, b in bloques)
+
+
+def test_historial_se_descarta_de_lo_mas_antiguo():
+    pb = _base(_costo_bloques() + est(TITULO) + est(HISTORIAL[2]) + est(HISTORIAL[3]))
+    r = pb.build(BLOQUES, HISTORIAL, tail=TAIL)
+
+    assert (r.history_used, r.history_dropped, r.clipped) == (2, 2, False)
+    assert HISTORIAL[2] in r.prompt and HISTORIAL[3] in r.prompt
+    assert HISTORIAL[0] not in r.prompt and HISTORIAL[1] not in r.prompt
+    assert r.system == "Eres un tutor del SENA.\n\nResponde en español."  # compactado
+    assert r.tokens <= pb.budget
+
+
+def test_max_history_cuenta_como_descartado():
+    pb = PromptBudget(SYSTEM, budget=10_000, max_history=3)
+    r = pb.build(BLOQUES, HISTORIAL)
+    assert (r.history_used, r.history_dropped) == (3, 1)
+    assert r.prompt.index(HISTORIAL[1]) < r.prompt.index(HISTORIAL[3])  # orden cronológico
+
+
+def test_bloque_mas_largo_se_recorta_solo_sin_historial_y_tail_intacto():
+    largo = "detalle " * 200
+    bloques = [("Contexto:", largo), ("Base:", "Texto base corto.")]
+
+    # alcanza para los bloques completos: se sacrifica todo el historial, nada se recorta
+    r = _base(_costo_bloques(bloques)).build(bloques, HISTORIAL, tail=TAIL)
+    assert (r.history_used, r.history_dropped, r.clipped) == (0, 4, False)
+    assert largo in r.prompt
+
+    # no alcanza: sin historial y recorte del bloque más largo (título y el otro bloque intactos)
+    pb = _base(_costo_bloques(bloques) // 2)
+    r = pb.build(bloques, HISTORIAL, tail=TAIL)
+    assert r.history_used == 0 and r.clipped
+    assert "Contexto:\ndetalle" in r.prompt and "…" in r.prompt and largo not in r.prompt
+    assert "Base:\nTexto base corto." in r.prompt
+    assert r.prompt.endswith(TAIL)
+    assert r.tokens <= pb.budget + 2  # estimación por partes
+
+
+def test_tail_nunca_se_recorta():
+    tail = "Formato: " + "regla " * 100
+    r = PromptBudget(SYSTEM, budget=10).build(BLOQUES, HISTORIAL, tail=tail)
+    assert r.prompt.endswith(tail)
+    assert r.history_used == 0
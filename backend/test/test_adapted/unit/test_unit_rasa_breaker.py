@@ -0,0 +1,119 @@
+# backend/test/test_adapted/unit/test_unit_rasa_breaker.py
+
+"""
+Pruebas unitarias del circuit breaker hacia Rasa.
+
+Objetivo:
+    Verificar que el circuito se abre por tasa de errores o de lentitud,
+    que abierto rechaza al instante sin llamar a Rasa, que en half-open un
+    mensaje de prueba lo cierra o lo reabre (una respuesta tardía previa a
+    la apertura no cuenta), y que el chat responde con la
+    respuesta degradada en lugar de un 502.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+import respx
+
+from backend.services import rasa_client as rc
+from backend.services.chat_service import degraded_responses
+from backend.services.rasa_breaker import CircuitBreaker, CircuitOpen
+from backend.services.rasa_router import RasaRouter
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: ahora[0])
+    return ahora
+
+
+def _llamar(cb, ok=True, ms=10.0):
+    probe = cb.before_call()
+    cb.record(ok, ms, probe)
+
+
+def test_abre_por_errores_y_cierra_tras_prueba(reloj):
+    cb = CircuitBreaker(failure_rate=0.5, min_calls=4, window_sec=30, open_sec=10)
+    for ok in (True, False, True):
+        _llamar(cb, ok)
+    assert cb.state == "closed"  # 3 < min_calls
+    _llamar(cb, False)
+    assert cb.state == "open"
+
+    with pytest.raises(CircuitOpen) as exc:
+        cb.before_call()
+    assert exc.value.retry_after == pytest.approx(10.0)
+
+    reloj[0] += 10
+    probe = cb.before_call()  # pasa el mensaje de prueba
+    assert cb.state == "half_open"
+    with pytest.raises(CircuitOpen):
+        cb.before_call()  # solo uno en vuelo
+    cb.record(True, 20.0, probe)
+    assert cb.state == "closed"
+    assert cb.stats()["times_opened"] == 1 and cb.stats()["rejected"] == 2
+
+
+def test_abre_por_lentitud_y_reabre_si_la_prueba_falla(reloj):
+    cb = CircuitBreaker(slow_call_ms=1000, slow_call_rate=0.5, min_calls=2, open_sec=5)
+    _llamar(cb, True, 1500)
+    _llamar(cb, True, 1500)
+    assert cb.state == "open"
+
+    reloj[0] += 5
+    probe = cb.before_call()
+    cb.record(False, 10.0, probe)
+    assert cb.state == "open"
+    assert cb.stats()["times_opened"] == 2
+
+
+def test_respuesta_tardia_no_cierra_el_circuito(reloj):
+    cb = CircuitBreaker(failure_rate=0.5, min_calls=2, open_sec=10)
+    lenta = cb.before_call()  # admitida con el circuito cerrado
+    assert lenta is None
+    _llamar(cb, False)
+    _llamar(cb, False)
+    assert cb.state == "open"
+
+    reloj[0] += 10
+    probe = cb.before_call()
+    cb.record(True, 10.0, lenta)  # llega tarde la llamada previa a la apertura
+    cb.abandon(lenta)
+    assert cb.state == "half_open"
+    with pytest.raises(CircuitOpen):
+        cb.before_call()  # la prueba sigue en vuelo
+
+    cb.record(True, 10.0, probe)
+    assert cb.state == "closed"
+
+
+def test_router_abierto_no_llama_a_rasa():
+    cb = CircuitBreaker(failure_rate=0.5, min_calls=2, open_sec=60)
+    router = RasaRouter([], breaker=cb)
+    url = "http://rasa:5005/webhooks/rest/webhook"
+
+    async def _run():
+        await rc.close_rasa_client()
+        with respx.mock() as mock:
+            ruta = mock.post(url).mock(return_value=httpx.Response(503))
+            for _ in range(2):
+                assert (await router.post("u1", url, json={})).status_code == 503
+            with pytest.raises(CircuitOpen):
+                await router.post("u1", url, json={})
+            assert ruta.call_count == 2
+        await rc.close_rasa_client()
+
+    asyncio.run(_run())
+    assert cb.stats()["state"] == "open"
+
+
+def test_respuesta_degradada(monkeypatch):
+    from backend.config.settings import settings
+
+    monkeypatch.setattr(settings, "rasa_degraded_reply", "fuera de servicio")
+    assert degraded_responses("hola!")[0]["text"].startswith("👋 ¡Hola!")
+    assert degraded_responses("necesito un certificado") == [{"text": "fuera de servicio"}]
@@ -0,0 +1,57 @@
+# backend/test/test_adapted/unit/test_unit_rasa_client.py
+
+"""
+Pruebas unitarias del cliente HTTP compartido hacia Rasa.
+
+Objetivo:
+    Verificar que el backend reutiliza un único pool de conexiones
+    (keep-alive) en lugar de crear un httpx.AsyncClient por mensaje,
+    y que las estadísticas del pool reflejan el uso.
+"""
+
+import asyncio
+
+import httpx
+import respx
+
+from backend.services import rasa_client as rc
+from backend.services.chat_service import process_user_message
+from backend.services.rasa_endpoint import rasa_rest_endpoint
+
+
+def test_cliente_compartido_se_reutiliza():
+    async def _run():
+        a = rc.get_rasa_client()
+        b = rc.get_rasa_client()
+        assert a is b
+        await rc.close_rasa_client()
+        c = rc.get_rasa_client()
+        assert c is not a
+        await rc.close_rasa_client()
+
+    asyncio.run(_run())
+
+
+def test_process_user_message_usa_pool_y_cuenta_stats():
+    async def _run():
+        await rc.close_rasa_client()
+        with respx.mock() as mock:
+            mock.post(rasa_rest_endpoint()).mock(
+                return_value=httpx.Response(200, json=[{"text": "hola"}])
+            )
+            first = await process_user_message("hola", "pytest-pool")
+            client = rc.get_rasa_client()
+            second = await process_user_message("otra vez", "pytest-pool")
+
+        assert first == second == [{"text": "hola"}]
+        assert rc.get_rasa_client() is client
+
+        stats = rc.rasa_client_stats()
+        assert stats["initialized"] is True
+        assert stats["requests"] == 2
+        assert stats["errors"] == 0
+        assert stats["in_flight"] == 0
+        await rc.close_rasa_client()
+
+    asyncio.run(_run())
+    assert rc.rasa_client_stats() == {"initialized": False}
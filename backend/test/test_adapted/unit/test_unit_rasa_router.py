@@ -0,0 +1,82 @@
+# backend/test/test_adapted/unit/test_unit_rasa_router.py
+
+"""
+Pruebas unitarias del enrutamiento por sender entre réplicas de Rasa.
+
+Objetivo:
+    Verificar que cada sender va siempre a la misma réplica, que los
+    senders se reparten entre réplicas, que ante una réplica que no acepta
+    conexiones el mensaje pasa a la siguiente del anillo y la réplica sale
+    del anillo, y que el probe de /status la devuelve al recuperarse.
+"""
+
+import asyncio
+
+import httpx
+import respx
+
+from backend.services import rasa_client as rc
+from backend.services.rasa_router import RasaRouter, parse_upstreams
+
+A, B, C = "http://rasa-a:5005", "http://rasa-b:5005", "http://rasa-c:5005"
+REST = "/webhooks/rest/webhook"
+
+
+def test_parse_upstreams():
+    assert parse_upstreams(f"{A}/, {B}{REST},{A}") == [A, B]
+    assert parse_upstreams(None) == []
+
+
+def test_afinidad_estable_y_reparto():
+    router = RasaRouter([A, B, C], max_failures=1)
+    dueños = {s: router.rest_url(s) for s in (f"user-{i}" for i in range(300))}
+    assert all(router.rest_url(s) == url for s, url in dueños.items())
+    por_replica = {b: sum(1 for u in dueños.values() if u.startswith(b)) for b in (A, B, C)}
+    assert all(n > 50 for n in por_replica.values()), por_replica
+
+    # quitar C solo mueve los senders que eran de C
+    sin_c = RasaRouter([A, B])
+    movidos = [s for s, url in dueños.items() if not url.startswith(C) and sin_c.rest_url(s) != url]
+    assert movidos == []
+
+
+def test_failover_y_recuperacion_por_probe():
+    router = RasaRouter([A, B], max_failures=1)
+    sender = next(s for s in (f"u{i}" for i in range(100)) if router.rest_url(s).startswith(A))
+
+    async def _run():
+        await rc.close_rasa_client()
+        with respx.mock() as mock:
+            mock.post(A + REST).mock(side_effect=httpx.ConnectError("refused"))
+            mock.post(B + REST).mock(return_value=httpx.Response(200, json=[{"text": "desde b"}]))
+            mock.get(A + "/status").mock(return_value=httpx.Response(200, json={}))
+
+            r = await router.post(sender, "http://no-usado", json={"sender": sender, "message": "hola"})
+            assert r.json() == [{"text": "desde b"}]
+            assert router.rest_url(sender) == B + REST  # A fuera del anillo
+
+            await router.probe_all()
+            assert router.rest_url(sender) == A + REST
+        await rc.close_rasa_client()
+
+    asyncio.run(_run())
+    stats = router.stats()
+    assert stats["failovers"] == 1
+    a, b = stats["replicas"]
+    assert a["errors"] == 1 and a["healthy"] is True
+    assert b["requests"] == 1 and b["errors"] == 0
+
+
+def test_deshabilitado_usa_url_de_siempre():
+    router = RasaRouter([])
+
+    async def _run():
+        await rc.close_rasa_client()
+        with respx.mock() as mock:
+            mock.post("http://rasa:5005" + REST).mock(return_value=httpx.Response(200, json=[]))
+            r = await router.post("u1", "http://rasa:5005" + REST, json={})
+            assert r.status_code == 200
+        await rc.close_rasa_client()
+
+    asyncio.run(_run())
+    assert router.stats() == {"enabled": False, "failovers": 0, "replicas": []}
@@ -0,0 +1,111 @@
+# backend/test/test_adapted/unit/test_unit_rate_limit_engine.py
+
+"""
+Pruebas unitarias del limitador nativo (GCRA).
+
+Objetivo:
+    Verificar el parseo de reglas, la ráfaga y el ritmo de GCRA en memoria,
+    que el decorador ``limit_decorator`` responde 429 con Retry-After y
+    separa claves por ruta y por cliente + sender (sin saltarse ``skip_admin``),
+    y que ante un Redis caído se
+    degrada a memoria en lugar de dejar pasar todo.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from backend.ext import rate_limit_engine as rle
+from backend.ext.rate_limit_engine import MemoryGCRA, RateLimitEngine, limit_decorator, parse_rule
+
+
+def test_parse_rule():
+    assert parse_rule("60/minute") == (60, 60.0)
+    assert parse_rule("10 per 5 seconds") == (10, 5.0)
+    with pytest.raises(ValueError):
+        parse_rule("muchas")
+
+
+def test_gcra_rafaga_y_ritmo():
+    mem = MemoryGCRA(shards=2)
+    # 3/minuto: ráfaga de 3, luego 1 cada 20 s
+    assert [mem.hit("k", 3, 60.0, now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert mem.hit("k", 3, 60.0, now=0.0) == pytest.approx(20.0)
+    assert mem.hit("otra", 3, 60.0, now=0.0) == 0.0
+    assert mem.hit("k", 3, 60.0, now=20.0) == 0.0
+    assert mem.hit("k", 3, 60.0, now=21.0) > 0
+
+
+class _Body(BaseModel):
+    sender: str
+
+
+def test_decorador_429_por_ruta_y_sender(monkeypatch):
+    monkeypatch.setattr(rle, "engine", RateLimitEngine())
+    app = FastAPI()
+
+    @app.post("/chat")
+    @limit_decorator("2/minute", per="sender")
+    async def chat(body: _Body):
+        return {"ok": body.sender}
+
+    @app.get("/ping")
+    @limit_decorator("1/minute")
+    def ping():
+        return "pong"
+
+    client = TestClient(app)
+    assert client.post("/chat", json={"sender": "a"}).json() == {"ok": "a"}
+    assert client.post("/chat", json={"sender": "a"}).status_code == 200
+    r = client.post("/chat", json={"sender": "a"})
+    assert r.status_code == 429 and int(r.headers["Retry-After"]) >= 1
+    assert client.post("/chat", json={"sender": "b"}).status_code == 200
+
+    assert client.get("/ping").json() == "pong"
+    assert client.get("/ping").status_code == 429
+    assert rle.engine.stats()["rejected"] == 2
+
+
+def test_decorador_sender_combina_cliente_y_respeta_skip_admin(monkeypatch):
+    monkeypatch.setattr(rle, "engine", RateLimitEngine())
+    monkeypatch.setattr(rle.settings, "rate_limit_key_strategy", "skip_admin")
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def _rol(request, call_next):
+        rol = request.headers.get("x-rol")
+        request.state.user = {"sub": request.headers.get("x-sub"), "rol": rol} if rol else None
+        return await call_next(request)
+
+    @app.post("/chat")
+    @limit_decorator("1/minute", per="sender")
+    async def chat(body: _Body):
+        return {"ok": body.sender}
+
+    client = TestClient(app)
+    alumno = {"x-rol": "alumno", "x-sub": "u1"}
+    assert client.post("/chat", json={"sender": "a"}, headers=alumno).status_code == 200
+    assert client.post("/chat", json={"sender": "a"}, headers=alumno).status_code == 429
+    # mismo sender desde otro cliente: otra clave
+    otro = {"x-rol": "alumno", "x-sub": "u2"}
+    assert client.post("/chat", json={"sender": "a"}, headers=otro).status_code == 200
+
+    admin = {"x-rol": "admin", "x-sub": "root"}
+    assert all(
+        client.post("/chat", json={"sender": "a"}, headers=admin).status_code == 200 for _ in range(3)
+    )
+
+
+async def _redis_caido():
+    raise ConnectionError("down")
+
+
+def test_redis_caido_degrada_a_memoria():
+    eng = RateLimitEngine(backend="redis", get_redis_client=_redis_caido)
+    assert asyncio.run(eng.hit("r", "ip:1", 1, 60.0)) == 0.0
+    assert asyncio.run(eng.hit("r", "ip:1", 1, 60.0)) > 0
+    stats = eng.stats()
+    assert stats["redis_errors"] == 1 and stats["rejected_by_route"] == {"r": 1}
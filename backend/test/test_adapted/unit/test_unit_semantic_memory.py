@@ -0,0 +1,104 @@
+# backend/test/test_adapted/unit/test_unit_semantic_memory.py
+
+"""
+Pruebas unitarias de la memoria semántica (rasa/actions/actions_semantic_memory.py).
+
+Objetivo:
+    Verificar el buffer circular por remitente, el límite global que
+    descarta las particiones menos usadas sin tocar la actual, la
+    reconstrucción desde el log JSONL (descartando líneas truncadas), que la
+    compactación conserva el orden de más antigua a más reciente y que una
+    búsqueda nunca devuelve mensajes de otro remitente.
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+# rasa/actions no es paquete importable desde el backend (depende de rasa_sdk)
+_PATH = Path(__file__).resolve().parents[4] / "rasa" / "actions" / "actions_semantic_memory.py"
+_spec = importlib.util.spec_from_file_location("rasa_semantic_memory", _PATH)
+memoria = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(memoria)
+
+
+def _indice(path=None, **kw):
+    kw.setdefault("dim", 64)
+    return memoria.SemanticMemoryIndex(path=path, **kw)
+
+
+def _textos(idx, sender):
+    return [e["text"] for e in idx._parts[sender].ordered()]
+
+
+def test_buffer_circular_reemplaza_la_mas_antigua():
+    idx = _indice(max_per_sender=3)
+    for i in range(5):
+        idx.add("u1", f"m{i}", f"mensaje numero {i}", ts=i)
+
+    assert len(idx) == 3
+    assert _textos(idx, "u1") == ["m2", "m3", "m4"]
+    assert idx.search("u1", "mensaje numero 0", threshold=0.99) is None
+    assert idx.search("u1", "mensaje numero 4", threshold=0.99)["text"] == "m4"
+
+
+def test_limite_global_descarta_lru_y_nunca_la_actual():
+    idx = _indice(max_per_sender=2, max_entries=4)
+    idx.add("a", "a1", "hola desde a")
+    idx.add("b", "b1", "hola desde b")
+    idx.add("a", "a2", "otra cosa de a")  # "a" pasa a ser la más reciente
+    idx.add("c", "c1", "hola desde c")
+    idx.add("c", "c2", "otra cosa de c")  # 5 > 4: cae "b" (la menos usada)
+
+    assert set(idx._parts) == {"a", "c"} and len(idx) == 4
+
+    # una sola partición por encima del límite global no se descarta a sí misma
+    sola = _indice(max_per_sender=5, max_entries=1)
+    sola.max_entries = 1
+    for i in range(3):
+        sola.add("x", f"x{i}", f"texto {i}")
+    assert _textos(sola, "x") == ["x0", "x1", "x2"]
+
+
+def test_reconstruye_desde_el_log_y_descarta_lineas_truncadas(tmp_path, monkeypatch):
+    monkeypatch.setattr(memoria, "EMBED_FILE", str(tmp_path / "sin_legacy.json"))
+    log = tmp_path / "memoria.jsonl"
+    idx = _indice(str(log))
+    idx.add("u1", "primero", "quiero mi certificado")
+    idx.add("u2", "segundo", "olvide la clave")
+    idx.close()
+    with open(log, "a", encoding="utf-8") as f:
+        f.write('{"sender_id": "u1", "text": "cort')  # corte a mitad de línea
+
+    otra = _indice(str(log))
+    assert len(otra) == 2 and otra.stats()["log_lines"] == 3
+    assert otra.search("u1", "quiero mi certificado")["text"] == "primero"
+    otra.close()
+
+
+def test_compactar_conserva_orden_de_antigua_a_reciente(tmp_path, monkeypatch):
+    monkeypatch.setattr(memoria, "EMBED_FILE", str(tmp_path / "sin_legacy.json"))
+    log = tmp_path / "memoria.jsonl"
+    idx = _indice(str(log), max_per_sender=3, compact_every=10**6)
+    for i in range(6):
+        idx.add("u1", f"m{i}", f"mensaje numero {i}", ts=i)
+    idx._compact()
+    idx.close()
+
+    lineas = [json.loads(l) for l in log.read_text(encoding="utf-8").splitlines()]
+    assert [e["text"] for e in lineas] == ["m3", "m4", "m5"]
+
+    recargado = _indice(str(log), max_per_sender=3)
+    assert _textos(recargado, "u1") == ["m3", "m4", "m5"]
+    recargado.close()
+
+
+def test_busqueda_sin_fuga_entre_remitentes():
+    idx = _indice()
+    idx.add("u1", "secreto de u1", "mi documento es uno dos tres")
+    idx.add(None, "global", "pregunta general")
+
+    assert idx.search("u2", "mi documento es uno dos tres") is None
+    assert idx.search(None, "mi documento es uno dos tres") is None
+    assert idx.search("u1", "mi documento es uno dos tres")["sender_id"] == "u1"
+    assert idx.search("u1", "pregunta general", threshold=0.99) is None
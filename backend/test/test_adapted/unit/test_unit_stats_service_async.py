@@ -0,0 +1,154 @@
+# backend/test/test_adapted/unit/test_unit_stats_service_async.py
+
+"""
+Pruebas unitarias de stats_service sobre la capa Mongo async.
+
+Objetivo:
+    Verificar que los contadores/agregaciones del dashboard se resuelven
+    con awaits sobre colecciones motor (sin llamadas bloqueantes a pymongo)
+    y que los días ya compactados se leen de stats_daily.
+"""
+
+import asyncio
+from datetime import date, datetime, timezone
+
+from backend.services import stats_rollup, stats_service
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._docs)
+
+
+class _FakeAsyncCollection:
+    def __init__(self, total=0, agg=None):
+        self.total = total
+        self.agg = agg or []
+        self.filtros = []
+
+    async def count_documents(self, filtro):
+        self.filtros.append(filtro)
+        return self.total
+
+    def aggregate(self, pipeline):
+        self.filtros.append(pipeline[0].get("$match"))
+        return _FakeCursor(self.agg)
+
+
+class _FakeStatsDaily:
+    """stats_daily en memoria: documento _meta + un documento por día."""
+
+    def __init__(self, cubierto_hasta=None, dias=None):
+        self.meta = {"_id": "_meta", "cubierto_hasta": cubierto_hasta} if cubierto_hasta else None
+        self.dias = dias or []
+        self.filtros = []
+
+    async def find_one(self, filtro):
+        return self.meta
+
+    def find(self, filtro, proyeccion=None):
+        self.filtros.append(filtro)
+        rango = filtro["_id"]
+        return _FakeCursor(
+            d for d in self.dias
+            if d["_id"] <= rango["$lte"] and d["_id"] >= rango.get("$gte", "")
+        )
+
+
+def _patch(monkeypatch, logs, daily=None):
+    monkeypatch.setattr(stats_service, "get_async_logs_collection", lambda: logs)
+    daily = daily or _FakeStatsDaily()
+    monkeypatch.setattr(stats_service, "get_async_stats_daily_collection", lambda: daily)
+    return daily
+
+
+def test_total_logs_usa_coleccion_async(monkeypatch):
+    fake = _FakeAsyncCollection(total=42)
+    _patch(monkeypatch, fake)
+
+    total = asyncio.run(stats_service.obtener_total_logs("2025-01-01", "2025-01-31"))
+
+    assert total == 42
+    assert "timestamp" in fake.filtros[0]
+
+
+def test_intents_mas_usados_mapea_resultado(monkeypatch):
+    fake = _FakeAsyncCollection(agg=[{"_id": "saludo", "count": 7}, {"_id": "faq", "count": 3}])
+    _patch(monkeypatch, fake)
+
+    out = asyncio.run(stats_service.obtener_intents_mas_usados(limit=2))
+
+    assert out == [{"intent": "saludo", "total": 7}, {"intent": "faq", "total": 3}]
+
+
+def test_dias_compactados_salen_del_rollup_y_hoy_en_vivo(monkeypatch):
+    logs = _FakeAsyncCollection(total=5, agg=[{"_id": "saludo", "count": 2}])
+    daily = _patch(monkeypatch, logs, _FakeStatsDaily(
+        cubierto_hasta="2025-01-03",
+        dias=[
+            {"_id": "2025-01-01", "total": 10, "intents": [{"valor": "saludo", "total": 4}]},
+            {"_id": "2025-01-02", "total": 20, "intents": [{"valor": "faq", "total": 9}]},
+        ],
+    ))
+
+    total = asyncio.run(stats_service.obtener_total_logs("2025-01-01", "2025-01-03"))
+    top = asyncio.run(stats_service.obtener_intents_mas_usados(desde="2025-01-01", hasta="2025-01-03"))
+
+    assert total == 10 + 20 + 5
+    assert daily.filtros[0] == {"_id": {"$gte": "2025-01-01", "$lte": "2025-01-02"}}
+    # la parte en vivo arranca en el primer día no compactado (00:00 Bogotá = 05:00 UTC)
+    assert logs.filtros[0]["timestamp"]["$gte"] == datetime(2025, 1, 3, 5, tzinfo=timezone.utc)
+    assert top == [{"intent": "faq", "total": 9}, {"intent": "saludo", "total": 6}]
+
+
+def test_sin_filtro_cuenta_en_vivo_los_logs_sin_fecha(monkeypatch):
+    logs = _FakeAsyncCollection(total=5)
+    _patch(monkeypatch, logs, _FakeStatsDaily(
+        cubierto_hasta="2025-01-03", dias=[{"_id": "2025-01-01", "total": 10}],
+    ))
+
+    total = asyncio.run(stats_service.obtener_total_logs())
+
+    assert total == 10 + 5
+    assert logs.filtros[0] == {"$or": [
+        {"timestamp": {"$gte": datetime(2025, 1, 3, 5, tzinfo=timezone.utc)}},
+        {"timestamp": {"$not": {"$type": "date"}}},
+    ]}
+
+
+def test_rango_totalmente_compactado_no_consulta_logs(monkeypatch):
+    logs = _FakeAsyncCollection(total=999)
+    _patch(monkeypatch, logs, _FakeStatsDaily(
+        cubierto_hasta="2025-02-01", dias=[{"_id": "2025-01-15", "total": 7}],
+    ))
+
+    total = asyncio.run(stats_service.obtener_total_logs("2025-01-01", "2025-01-31"))
+
+    assert total == 7 and logs.filtros == []
+
+
+def test_compactacion_arma_documentos_por_dia():
+    facet = {
+        "totales": [{"_id": "2025-01-01", "total": 3, "descargas": 1}],
+        "intents": [
+            {"_id": {"dia": "2025-01-01", "valor": "faq"}, "total": 1},
+            {"_id": {"dia": "2025-01-01", "valor": "saludo"}, "total": 2},
+        ],
+        "origenes": [{"_id": {"dia": "2025-01-01", "valor": "widget"}, "total": 3}],
+    }
+    docs = stats_rollup._armar_documentos(facet, datetime.now(timezone.utc))
+
+    doc = docs["2025-01-01"]
+    assert doc["total"] == 3 and doc["descargas"] == 1
+    assert [i["valor"] for i in doc["intents"]] == ["saludo", "faq"]
+    assert doc["origenes"] == [{"valor": "widget", "total": 3}]
+
+    # 2025-01-02 02:00 Bogotá: con 5 min de gracia el último día cerrado es el 01
+    ahora = datetime(2025, 1, 2, 7, tzinfo=timezone.utc)
+    assert stats_rollup._ultimo_dia_cerrado(ahora, 300) == date(2025, 1, 1)
@@ -0,0 +1,116 @@
+# backend/test/test_adapted/unit/test_unit_user_cache.py
+
+"""
+Pruebas unitarias de la cache por usuario del action server (rasa/utils/user_cache.py).
+
+Objetivo:
+    Verificar que dentro del TTL se sirve desde memoria, que un valor
+    vencido (stale) se sirve y dispara un único refresco en segundo plano,
+    que misses simultáneos comparten una sola llamada al loader, que None no
+    se guarda y que ``invalidate`` borra todos los recursos del usuario.
+"""
+
+import asyncio
+import importlib.util
+import time
+from pathlib import Path
+
+import pytest
+
+# rasa/utils no es paquete importable desde el backend (choca con backend/utils)
+_PATH = Path(__file__).resolve().parents[4] / "rasa" / "utils" / "user_cache.py"
+_spec = importlib.util.spec_from_file_location("rasa_user_cache", _PATH)
+user_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(user_cache)
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: ahora[0])
+    return ahora
+
+
+def _loader(valores, llamadas, espera=0.0):
+    async def cargar():
+        llamadas.append(1)
+        if espera:
+            await asyncio.sleep(espera)
+        return valores[min(len(llamadas), len(valores)) - 1]
+
+    return cargar
+
+
+def test_hit_dentro_del_ttl(reloj):
+    cache = user_cache.UserResourceCache({"estado": 60}, stale=30)
+    llamadas = []
+
+    async def _run():
+        assert await cache.get_or_load("u1", "estado", _loader(["v1", "v2"], llamadas)) == "v1"
+        reloj[0] += 59
+        assert await cache.get_or_load("u1", "estado", _loader(["v1", "v2"], llamadas)) == "v1"
+
+    asyncio.run(_run())
+    assert len(llamadas) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_stale_dispara_un_solo_refresco(reloj):
+    cache = user_cache.UserResourceCache({"estado": 60}, stale=30)
+    llamadas = []
+    cargar = _loader(["v1", "v2"], llamadas, espera=0.01)
+
+    async def _run():
+        await cache.get_or_load("u1", "estado", cargar)
+        reloj[0] += 70  # vencido, pero dentro de ``stale``
+        viejos = await asyncio.gather(*(cache.get_or_load("u1", "estado", cargar) for _ in range(5)))
+        assert viejos == ["v1"] * 5  # se sirve lo viejo sin esperar
+        await asyncio.gather(*cache._inflight.values())
+        assert await cache.get_or_load("u1", "estado", cargar) == "v2"
+
+    asyncio.run(_run())
+    assert len(llamadas) == 2
+    assert cache.stats()["refreshes"] == 1 and cache.stats()["stale_hits"] == 5
+
+
+def test_misses_simultaneos_comparten_el_loader(reloj):
+    cache = user_cache.UserResourceCache({"tutor": 60})
+    llamadas = []
+    cargar = _loader(["t1"], llamadas, espera=0.01)
+
+    async def _run():
+        return await asyncio.gather(*(cache.get_or_load("u1", "tutor", cargar) for _ in range(10)))
+
+    assert asyncio.run(_run()) == ["t1"] * 10
+    assert len(llamadas) == 1
+
+
+def test_none_no_se_guarda(reloj):
+    cache = user_cache.UserResourceCache({"certificados": 60})
+    llamadas = []
+    cargar = _loader([None, ["c1"]], llamadas)
+
+    async def _run():
+        assert await cache.get_or_load("u1", "certificados", cargar) is None
+        assert await cache.get_or_load("u1", "certificados", cargar) == ["c1"]
+
+    asyncio.run(_run())
+    assert len(llamadas) == 2
+
+
+def test_invalidate_borra_todos_los_recursos_del_usuario(reloj):
+    cache = user_cache.UserResourceCache({"estado": 60, "tutor": 60})
+    llamadas = []
+
+    async def _run():
+        for usuario in ("u1", "u2"):
+            for recurso in ("estado", "tutor"):
+                await cache.get_or_load(usuario, recurso, _loader([f"{usuario}-{recurso}"], []))
+        await cache.invalidate("u1")
+        assert await cache.get_or_load("u1", "estado", _loader(["nuevo"], llamadas)) == "nuevo"
+        assert await cache.get_or_load("u1", "tutor", _loader(["nuevo"], llamadas)) == "nuevo"
+        assert await cache.get_or_load("u2", "tutor", _loader(["otro"], llamadas)) == "u2-tutor"
+
+    asyncio.run(_run())
+    assert len(llamadas) == 2
+    assert cache.stats()["invalidations"] == 1
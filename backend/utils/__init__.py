@@ -4,6 +4,14 @@
 from .file_utils import (
     save_csv_s3_and_local,
     save_csv_to_s3_and_get_url,  # compat
+    open_export_writer,
+    tee_export,
+)
+
+# ── Archivo: csv_stream.py ────────────────────────────────
+from .csv_stream import (
+    iter_csv,
+    gzip_chunks,
 )
 
 # ── Archivo: logging.py ───────────────────────────────────
@@ -29,6 +37,11 @@ __all__ = [
     # file_utils
     "save_csv_s3_and_local",
     "save_csv_to_s3_and_get_url",
+    "open_export_writer",
+    "tee_export",
+    # csv_stream
+    "iter_csv",
+    "gzip_chunks",
     # logging
     "setup_logging",
     "get_logger",
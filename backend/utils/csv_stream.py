@@ -0,0 +1,57 @@
+# 📁 backend/utils/csv_stream.py
+"""
+Generadores de CSV por trozos para exportaciones grandes.
+
+Las filas se leen de un cursor Mongo (con ``batch_size`` y proyección) y se
+emiten en bloques de bytes, así que la memoria no crece con el número de
+filas. Los generadores son síncronos: ``StreamingResponse`` los itera en el
+threadpool, igual que un cursor pymongo.
+"""
+from __future__ import annotations
+
+import csv
+import zlib
+from io import StringIO
+from typing import Any, Iterable, Iterator, Sequence
+
+# Filas por bloque emitido (~decenas de KB por bloque en exportaciones típicas)
+CHUNK_ROWS = 500
+
+
+def iter_csv(
+    rows: Iterable[Sequence[Any]],
+    header: Sequence[str],
+    *,
+    bom: bool = False,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """Serializa ``rows`` a CSV UTF-8 y lo emite en bloques de ``chunk_rows`` filas."""
+    buf = StringIO()
+    writer = csv.writer(buf)
+    if bom:
+        buf.write("\ufeff")  # BOM para Excel UTF-8
+    writer.writerow(header)
+
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate(0)
+            pending = 0
+
+    tail = buf.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Comprime un flujo de bytes a formato gzip sin acumularlo en memoria."""
+    comp = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        out = comp.compress(chunk)
+        if out:
+            yield out
+    yield comp.flush()
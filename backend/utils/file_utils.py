@@ -2,7 +2,11 @@
 
 import os
 import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional
 from backend.config.settings import settings
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
@@ -72,3 +76,185 @@ def save_csv_to_s3_and_get_url(csv_text: str, filename_prefix: str = "export") -
     """
     _bytes, url = save_csv_s3_and_local(csv_text, filename_prefix=filename_prefix)
     return url
+
+
+# ─────────────────────────────────────────────────────────────
+# Exportaciones en streaming (sin armar el archivo en memoria)
+# ─────────────────────────────────────────────────────────────
+log = logging.getLogger(__name__)
+
+# S3 exige partes de al menos 5 MB (salvo la última)
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+def _export_filename(filename_prefix: str, gzip: bool) -> str:
+    fecha_actual = datetime.now().strftime("%Y%m%d_%H%M")
+    return f"{filename_prefix}_{fecha_actual}.csv" + (".gz" if gzip else "")
+
+
+class LocalExportWriter:
+    """Escribe la exportación en static/exports (modo sin S3)."""
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        local_dir = os.path.join(settings.static_dir, "exports")
+        os.makedirs(local_dir, exist_ok=True)
+        self.path = os.path.join(local_dir, filename)
+        self.url = f"/static/exports/{filename}"
+        self._fh = open(self.path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._fh.write(chunk)
+
+    def close(self) -> str:
+        self._fh.close()
+        return self.url
+
+    def abort(self) -> None:
+        try:
+            self._fh.close()
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class S3MultipartWriter:
+    """
+    Sube la exportación a S3 con multipart upload mientras se genera.
+    Las partes se suben en paralelo (hasta ``max_concurrency``); si todas las
+    ranuras están ocupadas ``write`` espera, así que la memoria queda acotada a
+    ~``part_size * (max_concurrency + 1)``.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        *,
+        content_type: str,
+        part_size: int,
+        max_concurrency: int,
+        client=None,
+    ) -> None:
+        self.filename = filename
+        self.bucket = settings.aws_s3_bucket_name
+        self.key = f"exports/{filename}"
+        self.url = f"https://{self.bucket}.s3.{settings.aws_s3_region}.amazonaws.com/{self.key}"
+        self.part_size = max(S3_MIN_PART_SIZE, int(part_size))
+        self._s3 = client or boto3.client(
+            "s3",
+            aws_access_key_id=settings.aws_access_key_id,
+            aws_secret_access_key=settings.aws_secret_access_key,
+            region_name=settings.aws_s3_region,
+            endpoint_url=settings.aws_s3_endpoint_url,
+        )
+        try:
+            resp = self._s3.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, ContentType=content_type, ACL="public-read"
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"❌ Error al subir a S3: {e}")
+        self._upload_id = resp["UploadId"]
+        self._buf = bytearray()
+        self._next_part = 1
+        self._futures: list = []
+        self._slots = threading.BoundedSemaphore(max(1, int(max_concurrency)))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_concurrency)), thread_name_prefix="s3-export")
+
+    def _upload_part(self, number: int, data: bytes) -> dict:
+        try:
+            resp = self._s3.upload_part(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id, PartNumber=number, Body=data
+            )
+            return {"PartNumber": number, "ETag": resp["ETag"]}
+        finally:
+            self._slots.release()
+
+    def _submit(self, data: bytes) -> None:
+        for f in self._futures:
+            if f.done() and f.exception() is not None:
+                raise RuntimeError(f"❌ Error al subir a S3: {f.exception()}")
+        self._slots.acquire()
+        self._futures.append(self._pool.submit(self._upload_part, self._next_part, data))
+        self._next_part += 1
+
+    def write(self, chunk: bytes) -> None:
+        self._buf += chunk
+        if len(self._buf) >= self.part_size:
+            data, self._buf = bytes(self._buf), bytearray()
+            self._submit(data)
+
+    def close(self) -> str:
+        try:
+            # dentro del try: ``_submit`` falla si una parte anterior falló
+            if self._buf or not self._futures:
+                data, self._buf = bytes(self._buf), bytearray()
+                self._submit(data)
+            parts = [f.result() for f in self._futures]
+            self._s3.complete_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id, MultipartUpload={"Parts": parts}
+            )
+        except Exception as e:
+            self.abort()
+            raise RuntimeError(f"❌ Error al subir a S3: {e}")
+        finally:
+            self._pool.shutdown(wait=False)
+        return self.url
+
+    def abort(self) -> None:
+        for f in self._futures:
+            f.cancel()
+        self._pool.shutdown(wait=True)
+        try:
+            self._s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+        except (BotoCoreError, ClientError):
+            pass
+
+
+def open_export_writer(filename_prefix: str = "export", *, gzip: bool = False):
+    """Destino de una exportación en streaming: S3 multipart si está configurado, o local."""
+    filename = _export_filename(filename_prefix, gzip)
+    if not getattr(settings, "s3_enabled", False):
+        return LocalExportWriter(filename)
+    return S3MultipartWriter(
+        filename,
+        content_type="application/gzip" if gzip else "text/csv",
+        part_size=int(settings.export_s3_part_mb) * 1024 * 1024,
+        max_concurrency=settings.export_s3_concurrency,
+    )
+
+
+def tee_export(
+    chunks: Iterable[bytes],
+    writer,
+    on_complete: Optional[Callable[[str], None]] = None,
+) -> Iterator[bytes]:
+    """
+    Reenvía ``chunks`` al cliente y, en paralelo, al ``writer`` (S3/local).
+    Si la subida falla se sigue entregando la descarga; ``on_complete(url)``
+    solo se llama si el archivo quedó completo en el destino.
+    """
+    upload_ok = True
+    finished = False
+    try:
+        for chunk in chunks:
+            if upload_ok:
+                try:
+                    writer.write(chunk)
+                except Exception as e:
+                    log.warning(f"⚠️ Exportación {writer.filename}: subida interrumpida ({e})")
+                    upload_ok = False
+                    writer.abort()
+            yield chunk
+        finished = True
+    finally:
+        if upload_ok and not finished:
+            writer.abort()  # cliente desconectado: no dejar archivos a medias
+
+    if upload_ok:
+        try:
+            url = writer.close()
+        except Exception as e:
+            log.warning(f"⚠️ Exportación {writer.filename}: {e}")
+            return
+        if on_complete is not None:
+            on_complete(url)
@@ -3,17 +3,29 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Text
 
+import asyncio
 import os
 import logging
-import requests
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.types import DomainDict
 from rasa_sdk.events import EventType
 
-from .common import _is_auth, _backend_base, _auth_headers, _has_auth
-from .acciones_llm import llm_summarize_with_ollama, build_auth_required_message_for_action
+from .common import (
+    _is_auth,
+    _has_auth,
+    fetch_certificados,
+    fetch_estado_estudiante,
+    fetch_tutor,
+)
+from .acciones_llm import (
+    ESTADO_ESTUDIANTE_DEMO,
+    ZAJUNA_BASE_URL_DEFAULT,
+    build_auth_required_message_for_action,
+    llm_summarize_with_ollama,
+    plantilla_estado_estudiante,
+)
 from .acciones_certificados import build_certificados_summary
 
 logger = logging.getLogger(__name__)
@@ -26,7 +38,7 @@ class ActionVerEstadoEstudiante(Action):
     def name(self) -> str:
         return "action_ver_estado_estudiante"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -34,32 +46,18 @@ class ActionVerEstadoEstudiante(Action):
     ) -> List[EventType]:
         # 1) Validar autenticación SIN LLM
         if not _is_auth(tracker):
-            base_url = tracker.get_slot("zajuna_base_url") or "https://zajuna.edu"
-            msg = build_auth_required_message_for_action(
+            base_url = tracker.get_slot("zajuna_base_url") or ZAJUNA_BASE_URL_DEFAULT
+            msg = await build_auth_required_message_for_action(
                 "consultar tu estado académico real",
                 base_url,
             )
             dispatcher.utter_message(text=msg)
             return []
 
-        estado: Optional[str] = None
-        base = _backend_base()
-
-        if base:
-            try:
-                resp = requests.get(
-                    f"{base}/api/estado-estudiante",
-                    headers=_auth_headers(tracker),
-                    timeout=8,
-                )
-                if resp.ok:
-                    estado = (resp.json() or {}).get("estado")
-            except Exception:
-                # Si la API falla, dejamos estado como None y usamos fallback
-                logger.exception("Error consultando estado del estudiante en el backend.")
-                pass
-
-        estado_final = estado or "Activo (demo)"
+        # Si la API falla, estado queda en None y usamos fallback
+        estado: Optional[str] = await fetch_estado_estudiante(tracker)
+
+        estado_final = estado or ESTADO_ESTUDIANTE_DEMO
 
         # 2) Mensaje factual directo (NO pasa por LLM)
         dispatcher.utter_message(
@@ -68,17 +66,8 @@ class ActionVerEstadoEstudiante(Action):
 
         # 3) Explicación adicional usando LLM (opcional, solo redacción)
         try:
-            texto_base = (
-                f"Tu estado académico actual en Zajuna es: {estado_final}. "
-                "Explica brevemente qué significa este estado para el estudiante "
-                "y menciona, de forma general, qué acciones podría tomar (por ejemplo, "
-                "revisar sus cursos, contactar a soporte si ve algo raro, etc.)."
-            )
-            contexto_llm = {
-                "flujo": "estado_estudiante",
-                "estado": estado_final,
-            }
-            explicacion = llm_summarize_with_ollama(texto_base, contexto_llm)
+            texto_base, contexto_llm = plantilla_estado_estudiante(estado_final)
+            explicacion = await llm_summarize_with_ollama(texto_base, contexto_llm)
 
             if explicacion and explicacion.strip() and explicacion.strip() != texto_base:
                 dispatcher.utter_message(text=explicacion.strip())
@@ -96,7 +85,7 @@ class ActionTutorAsignado(Action):
     def name(self) -> Text:
         return "action_tutor_asignado"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -107,25 +96,8 @@ class ActionTutorAsignado(Action):
             dispatcher.utter_message(response="utter_pedir_autenticacion")
             return []
 
-        base = _backend_base()
-        nombre, contacto = None, None
-
-        if base:
-            try:
-                resp = requests.get(
-                    f"{base}/api/tutor",
-                    headers=_auth_headers(tracker),
-                    timeout=8,
-                )
-                if resp.ok:
-                    data = resp.json()
-                    if isinstance(data, dict):
-                        nombre = data.get("nombre")
-                        contacto = data.get("contacto")
-            except Exception:
-                # Aquí podrías loguear el error si quieres
-                logger.exception("Error consultando tutor asignado en el backend.")
-                pass
+        data = await fetch_tutor(tracker) or {}
+        nombre, contacto = data.get("nombre"), data.get("contacto")
 
         # Valores por defecto si la API no devuelve nada
         nombre = nombre or "Ing. María Pérez (demo)"
@@ -145,7 +117,7 @@ class ActionListarCertificados(Action):
     def name(self) -> Text:
         return "action_listar_certificados"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -155,7 +127,7 @@ class ActionListarCertificados(Action):
         # 1) Revisar autenticación SIN LLM
         if not _is_auth(tracker):
             # Modo invitado: explicar cómo hacerlo desde la plataforma
-            base_url = tracker.get_slot("zajuna_base_url") or "https://zajuna.edu"
+            base_url = tracker.get_slot("zajuna_base_url") or ZAJUNA_BASE_URL_DEFAULT
             texto_base = (
                 "Esta acción requiere que tengas sesión iniciada en la plataforma Zajuna "
                 "para mostrarte tus certificados reales.\n\n"
@@ -172,34 +144,23 @@ class ActionListarCertificados(Action):
             contexto = {
                 "flujo": "certificados_modo_invitado",
             }
-            mensaje = llm_summarize_with_ollama(texto_base, contexto)
-            dispatcher.utter_message(text=mensaje)
-
-            # Mensaje estándar reutilizable de "requiere autenticación"
-            msg = build_auth_required_message_for_action(
-                "ver tus certificados personales",
-                base_url,
+            # Las dos redacciones son independientes: se generan en paralelo
+            mensaje, msg = await asyncio.gather(
+                llm_summarize_with_ollama(texto_base, contexto),
+                # Mensaje estándar reutilizable de "requiere autenticación"
+                build_auth_required_message_for_action(
+                    "ver tus certificados personales",
+                    base_url,
+                ),
             )
+            dispatcher.utter_message(text=mensaje)
             dispatcher.utter_message(text=msg)
             return []
 
         # 2) Usuario autenticado → llamar al backend
-        certificados: List[Dict[str, Any]] = []
-
-        try:
-            base_url = os.getenv("BACKEND_BASE_URL", "")
-            if base_url:
-                resp = requests.get(
-                    f"{base_url}/api/certificados",
-                    headers=_auth_headers(tracker),  # asumiendo que ya tienes este helper
-                    timeout=10,
-                )
-                if resp.ok:
-                    data = resp.json() or {}
-                    # AJUSTA A TU ESQUEMA REAL
-                    certificados = data.get("certificados", [])
-        except Exception:
-            logger.exception("Error al consultar certificados en el backend.")
+        certificados: List[Dict[str, Any]] = (
+            await fetch_certificados(tracker, base=os.getenv("BACKEND_BASE_URL", ""))
+        ) or []
 
         # Resumen técnico + mejora de redacción con LLM
         texto_base = build_certificados_summary(certificados)
@@ -208,7 +169,7 @@ class ActionListarCertificados(Action):
             "cantidad_certificados": len(certificados),
         }
 
-        mensaje = llm_summarize_with_ollama(texto_base, contexto_llm)
+        mensaje = await llm_summarize_with_ollama(texto_base, contexto_llm)
 
         dispatcher.utter_message(text=mensaje)
         return []
@@ -221,25 +182,25 @@ class ZajunaGetCertificados(Action):
     def name(self) -> Text:
         return "zajuna_get_certificados"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
         domain: Dict[Text, Any],
     ) -> List[Dict]:
         # Simplemente delega en ActionListarCertificados para mantener compatibilidad
-        return ActionListarCertificados().run(dispatcher, tracker, domain)
+        return await ActionListarCertificados().run(dispatcher, tracker, domain)
 
 
 class ZajunaGetEstadoEstudiante(Action):
     def name(self) -> Text:
         return "zajuna_get_estado_estudiante"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
         domain: Dict[Text, Any],
     ) -> List[Dict]:
         # Delegamos en ActionVerEstadoEstudiante (nombre correcto de la clase)
-        return ActionVerEstadoEstudiante().run(dispatcher, tracker, domain)
+        return await ActionVerEstadoEstudiante().run(dispatcher, tracker, domain)
@@ -8,12 +8,14 @@ from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet, EventType
 
+from .common import invalidate_user_cache
+
 
 class ActionReiniciarConversacion(Action):
     def name(self) -> Text:
         return "action_reiniciar_conversacion"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -23,7 +25,9 @@ class ActionReiniciarConversacion(Action):
         Reinicio "lógico" de la conversación:
         - Envía mensaje de confirmación.
         - Limpia slots básicos de estado y también el contador de turnos.
+        - Descarta los datos del backend cacheados para este usuario.
         """
+        await invalidate_user_cache(tracker)
         dispatcher.utter_message(response="utter_reinicio_confirmado")
 
         events: List[EventType] = [
@@ -4,13 +4,12 @@ from typing import Any, Dict, List, Text
 
 import os
 import logging
-import requests
 
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import EventType
 
-from .common import _is_auth, _has_auth, _auth_headers
+from .common import _is_auth, _has_auth, fetch_certificados
 from .acciones_llm import llm_summarize_with_ollama
 
 logger = logging.getLogger(__name__)
@@ -226,7 +225,7 @@ class ActionMostrarCertificadosCarousel(Action):
     def name(self) -> Text:
         return "action_mostrar_certificados_carousel"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -244,26 +243,14 @@ class ActionMostrarCertificadosCarousel(Action):
                 f"También puedes ir directamente a: {base_url}/login"
             )
             contexto = {"flujo": "certificados_modo_invitado"}
-            mensaje = llm_summarize_with_ollama(texto_base, contexto)
+            mensaje = await llm_summarize_with_ollama(texto_base, contexto)
             dispatcher.utter_message(text=mensaje)
             return []
 
         # 2) Usuario autenticado → obtenemos certificados del backend
-        certificados: List[Dict[str, Any]] = []
-
-        try:
-            base_url = os.getenv("BACKEND_BASE_URL", "")
-            if base_url:
-                resp = requests.get(
-                    f"{base_url}/api/certificados",
-                    headers=_auth_headers(tracker),
-                    timeout=10,
-                )
-                if resp.ok:
-                    data = resp.json() or {}
-                    certificados = data.get("certificados", [])
-        except Exception:
-            logger.exception("Error al consultar certificados para el carrusel.")
+        certificados: List[Dict[str, Any]] = (
+            await fetch_certificados(tracker, base=os.getenv("BACKEND_BASE_URL", ""))
+        ) or []
 
         # 3) Mensaje resumen textual con LLM (a partir de datos reales)
         texto_base = build_certificados_summary(certificados)
@@ -271,7 +258,7 @@ class ActionMostrarCertificadosCarousel(Action):
             "flujo": "certificados_carousel",
             "cantidad_certificados": len(certificados),
         }
-        mensaje = llm_summarize_with_ollama(texto_base, contexto_llm)
+        mensaje = await llm_summarize_with_ollama(texto_base, contexto_llm)
         dispatcher.utter_message(text=mensaje)
 
         # 4) Carrusel: mantenemos lógica de negocio (placeholder genérico,
@@ -11,7 +11,7 @@ from rasa_sdk.events import (
     EventType,
 )
 
-_INMEM_AUTOSAVE: Dict[str, Dict[str, Any]] = {}
+from utils.mongo_autosave import cargar_autosave, guardar_autosave
 
 
 def _sender_id(tracker: Tracker) -> str:
@@ -53,7 +53,7 @@ class ActionAutosaveEncuesta(Action):
 
 
 class ActionGuardarAutosaveMongo(Action):
-    """Simula guardar en Mongo. Cambia por tu integración real."""
+    """Guarda el progreso de la encuesta en Mongo (diferido y solo lo que cambió)."""
 
     def name(self) -> Text:
         return "action_guardar_autosave_mongo"
@@ -70,13 +70,15 @@ class ActionGuardarAutosaveMongo(Action):
             "encuesta_tipo": tracker.get_slot("encuesta_tipo"),
             "autosave_estado": tracker.get_slot("autosave_estado"),
         }
-        _INMEM_AUTOSAVE[sid] = data
-        dispatcher.utter_message(text="✅ Progreso guardado.")
+        if guardar_autosave(sid, data):
+            dispatcher.utter_message(text="✅ Progreso guardado.")
+        else:
+            dispatcher.utter_message(text="⚠️ No pude guardar tu progreso en este momento.")
         return []
 
 
 class ActionCargarAutosaveMongo(Action):
-    """Simula carga desde Mongo. Cambia por tu integración real."""
+    """Carga el último progreso guardado (pendiente en memoria o en Mongo)."""
 
     def name(self) -> Text:
         return "action_cargar_autosave_mongo"
@@ -88,7 +90,9 @@ class ActionCargarAutosaveMongo(Action):
         domain: Dict[Text, Any],
     ) -> List[EventType]:
         sid = _sender_id(tracker)
-        data = _INMEM_AUTOSAVE.get(sid) or {}
+        data = cargar_autosave(sid) or {}
+        if not data.get("encuesta_activa"):
+            data = {}  # estado limpiado por action_reset_conversacion_segura
         events: List[EventType] = []
 
         for k, v in data.items():
@@ -139,7 +143,12 @@ class ActionResetConversacionSegura(Action):
         domain: Dict[Text, Any],
     ) -> List[EventType]:
         sid = _sender_id(tracker)
-        _INMEM_AUTOSAVE.pop(sid, None)
+        # Se guarda el estado limpio para que una carga posterior no reanude nada
+        guardar_autosave(
+            sid,
+            {"encuesta_activa": False, "encuesta_tipo": None, "autosave_estado": None},
+            inmediato=True,
+        )
 
         dispatcher.utter_message(
             text="🧹 Se ha limpiado el estado de la conversación segura."
@@ -37,7 +37,7 @@ class ActionRegistrarEncuesta(Action):
     def name(self) -> str:
         return "action_registrar_encuesta"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -75,7 +75,7 @@ class ActionRegistrarEncuesta(Action):
             "tiene_comentario": bool(comentario and comentario.strip()),
         }
 
-        mensaje_final = llm_summarize_with_ollama(texto_base, contexto_llm)
+        mensaje_final = await llm_summarize_with_ollama(texto_base, contexto_llm)
 
         dispatcher.utter_message(text=mensaje_final)
 
@@ -29,7 +29,7 @@ class ActionEnviarSoporteDirecto(Action):
     def name(self) -> Text:
         return "action_enviar_soporte_directo"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -88,7 +88,7 @@ class ActionEnviarSoporteDirecto(Action):
 
             # ✨ Usamos el LLM solo para mejorar redacción y tono
             try:
-                mensaje_final = llm_summarize_with_ollama(texto_base, contexto_llm)
+                mensaje_final = await llm_summarize_with_ollama(texto_base, contexto_llm)
                 dispatcher.utter_message(text=mensaje_final)
             except Exception:
                 # Fallback si el LLM falla
@@ -13,8 +13,11 @@ from .common import (
     jlog,
     logger,
     ACTIONS_PING_HELPDESK,
+    ENDPOINT_TIMEOUTS,
     HELPDESK_WEBHOOK,
+    backend_http,
     send_email,
+    user_cache,
     RESET_URL_BASE,
 )
 
@@ -74,7 +77,7 @@ class ActionHealthCheck(Action):
     def name(self) -> str:
         return "action_health_check"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -84,15 +87,25 @@ class ActionHealthCheck(Action):
 
         if ACTIONS_PING_HELPDESK:
             try:
-                import requests
-
-                r = requests.options(HELPDESK_WEBHOOK, timeout=3)
+                r = await backend_http.request(
+                    "OPTIONS",
+                    HELPDESK_WEBHOOK,
+                    "helpdesk",
+                    timeout=ENDPOINT_TIMEOUTS["helpdesk"],
+                    retries=0,
+                )
                 status["helpdesk"] = f"ok ({r.status_code})"
             except Exception as e:
                 status["helpdesk"] = f"error: {e}"
         else:
             status["helpdesk"] = "skip"
 
+        breakers = backend_http.stats()
+        if breakers:
+            status["breakers"] = {k: v["state"] for k, v in breakers.items()}
+        if user_cache is not None:
+            status["cache"] = user_cache.stats()
+
         dispatcher.utter_message(
             text=f"health: {json.dumps(status, ensure_ascii=False)}"
         )
@@ -7,13 +7,22 @@ from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet, EventType, FollowupAction
 
-from utils.guardian_client import GuardianClient
+from utils.autosave_engine import AutosaveEngine
+from utils.guardian_client import AsyncGuardianClient, GuardianAutosaveWriter, GuardianClient
 from .acciones_llm import llm_summarize_with_ollama
 
 logger = logging.getLogger(__name__)
 
 MAX_INTENTOS_FORM = 3  # puedes moverlo a ENV si lo deseas
 
+# Clientes compartidos por todas las conversaciones (el token JWT se cachea
+# por proceso). El síncrono lo usa el motor de autosave desde su hilo: los
+# snapshots seguidos de un sender se agrupan y solo se envían los campos que
+# cambiaron. El asíncrono es para las acciones (eventos por lotes).
+guardian_client = GuardianClient(timeout=4.0, max_retries=2)
+guardian_async = AsyncGuardianClient(timeout=4.0, max_retries=2)
+snapshot_engine = AutosaveEngine(GuardianAutosaveWriter(guardian_client))
+
 
 # ======================================================
 # 🛡️ AUTOSAVE / SNAPSHOT para Guardian
@@ -22,28 +31,25 @@ class ActionAutosaveSnapshot(Action):
     def name(self) -> Text:
         return "action_autosave_snapshot"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
         domain: Dict[Text, Any],
     ) -> List[Dict[Text, Any]]:
 
-        gc = GuardianClient(
-            base_url="http://autosave-guardian:8080",
-            username="admin",
-            password="admin123",
-            timeout=4.0,
-            max_retries=2,
-        )
-
         data = {
             "latest_intent": tracker.latest_message.get("intent", {}).get("name"),
             "slots": tracker.current_slot_values(),
             "events_count": len(tracker.events) if tracker.events else 0,
         }
 
-        ok = gc.autosave_create(sender_id=tracker.sender_id, data=data)
+        try:
+            snapshot_engine.save(tracker.sender_id, data)
+            ok = True
+        except Exception:
+            logger.exception("Error programando snapshot en ActionAutosaveSnapshot")
+            ok = False
 
         if ok:
             # 🧾 Texto base técnico para el usuario
@@ -59,7 +65,7 @@ class ActionAutosaveSnapshot(Action):
             }
 
             try:
-                mensaje = llm_summarize_with_ollama(texto_base, contexto_llm)
+                mensaje = await llm_summarize_with_ollama(texto_base, contexto_llm)
                 dispatcher.utter_message(text=mensaje)
             except Exception:
                 # Fallback seguro si el LLM falla
@@ -70,7 +76,7 @@ class ActionAutosaveSnapshot(Action):
                 text="⚠️ No fue posible guardar el snapshot en este momento."
             )
 
-        gc.log_event(
+        guardian_async.enqueue_event(
             "action_autosave_snapshot_called",
             {"sender_id": tracker.sender_id},
         )
@@ -152,7 +152,7 @@ class ActionDerivarYRegistrarHumano(Action):
     def name(self) -> Text:
         return "action_derivar_y_registrar_humano"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -181,7 +181,7 @@ class ActionDerivarYRegistrarHumano(Action):
                 "flujo": "guardian_handoff",
                 "motivo_soporte": tracker.get_slot("motivo_soporte") or "soporte general",
             }
-            resumen = llm_summarize_with_ollama(texto_base, contexto_llm)
+            resumen = await llm_summarize_with_ollama(texto_base, contexto_llm)
             # Por ahora lo dejamos en logs; en tu proyecto de grado puedes mostrar
             # que este resumen se podría enviar a tu sistema de Helpdesk.
             logger.info("[HANDOFF_RESUMEN_LLM] sender_id=%s resumen=%s", tracker.sender_id, resumen)
@@ -2,17 +2,29 @@
 # actions/actions_llm.py  (VERSIÓN OPTIMIZADA + ROBUSTA)
 # ==========================================================
 
+import asyncio
 import os
 import re
 import logging
-import requests
 import json
-import unicodedata
-from typing import Any, Text, Dict, List
+from typing import Any, Dict, List, Optional, Text, Tuple
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet, FollowupAction
 from .actions_semantic_memory import store_message, retrieve_similar
+from .normalizacion_texto import (  # noqa: F401  (re-exportados para compatibilidad)
+    COMMON_CHAT_CORRECTIONS,
+    MATERIAS,
+    anonymize_text,
+    detectar_materia,
+    normalize,
+    normalize_chat_text,
+    strip_accents,
+)
+from utils.chat_stream import ChatStreamPublisher, LLMReplyStreamFilter
+from utils.llm_cache import LLMResponseCache, make_key
+from utils.ollama_client import OllamaBusy, OllamaClient
+from utils.prompt_budget import BuiltPrompt, PromptBudget
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -22,6 +34,63 @@ OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
 OLLAMA_MAX_TOKENS = int(os.getenv("OLLAMA_MAX_TOKENS", "350"))
 OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "60"))
+OLLAMA_MAX_IN_FLIGHT = int(os.getenv("OLLAMA_MAX_IN_FLIGHT", "2"))
+OLLAMA_QUEUE_TIMEOUT = float(os.getenv("OLLAMA_QUEUE_TIMEOUT", "30"))
+# Ventana de contexto del modelo: lo que no cabe Ollama lo descarta por el
+# inicio (el prompt de sistema), así que el prompt se arma dentro de un presupuesto
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "2048"))
+OLLAMA_PROMPT_BUDGET = int(os.getenv("OLLAMA_PROMPT_BUDGET", str(OLLAMA_NUM_CTX - OLLAMA_MAX_TOKENS)))
+OLLAMA_HISTORY_TURNS = int(os.getenv("OLLAMA_HISTORY_TURNS", "6"))
+
+# Opciones de generación (las mismas para la llamada normal y la de streaming).
+# num_ctx va explícito: sin él Ollama usa su propio default y el presupuesto
+# del prompt describiría una ventana que el modelo no está usando.
+OLLAMA_OPTIONS: Dict[str, Any] = {
+    "num_ctx": OLLAMA_NUM_CTX,
+    "num_predict": OLLAMA_MAX_TOKENS,
+    "temperature": 0.15,
+    "top_p": 0.9,
+    "repeat_penalty": 1.05,
+}
+
+# Cliente compartido por todas las acciones del proceso
+ollama_client = OllamaClient(
+    base_url=OLLAMA_URL,
+    model=OLLAMA_MODEL,
+    timeout=OLLAMA_TIMEOUT,
+    max_in_flight=OLLAMA_MAX_IN_FLIGHT,
+    queue_timeout=OLLAMA_QUEUE_TIMEOUT,
+)
+
+# Cache de reescrituras (plantillas fijas → respuesta del LLM)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_REDIS_URL = os.getenv("LLM_CACHE_REDIS_URL") or None
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR") or None
+LLM_CACHE_WARMUP = os.getenv("LLM_CACHE_WARMUP", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_WARMUP_DELAY = float(os.getenv("LLM_CACHE_WARMUP_DELAY", "5"))
+
+llm_cache: Optional[LLMResponseCache] = (
+    LLMResponseCache(
+        ttl=LLM_CACHE_TTL,
+        max_entries=LLM_CACHE_MAX_ENTRIES,
+        redis_url=LLM_CACHE_REDIS_URL,
+        disk_dir=LLM_CACHE_DIR,
+    )
+    if LLM_CACHE_ENABLED
+    else None
+)
+
+# Streaming de texto parcial al widget (Redis pub/sub → backend → SSE)
+CHAT_STREAM_ENABLED = os.getenv("CHAT_STREAM_ENABLED", "true").lower() in ("1", "true", "yes")
+chat_stream = ChatStreamPublisher(
+    redis_url=(os.getenv("CHAT_STREAM_REDIS_URL") or None) if CHAT_STREAM_ENABLED else None,
+    prefix=os.getenv("CHAT_STREAM_CHANNEL_PREFIX", "chat:stream:"),
+)
+
+ZAJUNA_BASE_URL_DEFAULT = "https://zajuna.edu"
+ESTADO_ESTUDIANTE_DEMO = "Activo (demo)"
 
 
 # ==========================================================
@@ -101,205 +170,10 @@ FIN DEL PROMPT SISTEMA
 ====================================================
 """
 
+# Prefijo de sistema compactado y medido una sola vez (se envía en ``system``)
+prompt_budget = PromptBudget(PROMPT_SYSTEM, budget=OLLAMA_PROMPT_BUDGET, max_history=OLLAMA_HISTORY_TURNS)
 
-# ==========================================================
-# 🧩 NORMALIZACIÓN DE TEXTO (SIN TILDES, MINÚSCULAS)
-# ==========================================================
-def normalize(text: str) -> str:
-    if not text:
-        return ""
-    text = unicodedata.normalize("NFD", text)
-    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
-    return text.lower()
-
-
-# ==========================================================
-# 🧹 NORMALIZACIÓN "DE CHAT": ERRORES TÍPICOS, TILDES, ETC.
-# ==========================================================
-COMMON_CHAT_CORRECTIONS = {
-    "kiero": "quiero",
-    "kiere": "quiere",
-    "kieres": "quieres",
-    "xq": "porque",
-    "xk": "porque",
-    "xk?": "porque",
-    "pa": "para",
-    "q": "que",
-    "qe": "que",
-    "qer": "querer",
-    "certifcado": "certificado",
-    "certifcados": "certificados",
-    "sertificado": "certificado",
-    "sertificados": "certificados",
-    "logaer": "lograr",
-    "loguearme": "loguearme",
-    "loguear": "loguear",
-    "contraseña": "contrasena",   # para que coincida sin tilde
-    "platafroma": "plataforma",
-    "platafomra": "plataforma",
-    "markeitng": "marketing",
-    "markting": "marketing",
-    "digitla": "digital",
-}
-
-def strip_accents(text: str) -> str:
-    return ''.join(
-        c for c in unicodedata.normalize('NFD', text)
-        if unicodedata.category(c) != 'Mn'
-    )
-def normalize_chat_text(text: str) -> str:
-    """
-    Normaliza texto de usuario para que el bot entienda aunque escriba
-    con errores:
-    - tildes
-    - letras repetidas
-    - abreviaturas típicas de chat
-    - SIN deformar palabras por reemplazos de caracteres sueltos
-    """
-    if not text:
-        return ""
-
-    # 1) Tu normalización base (minúsculas + quitar tildes, etc.)
-    t = normalize(text)
-
-    # 2) Colapsar letras repetidas: "holaaaa" -> "holaa" (o según tu criterio)
-    t = re.sub(r"(.)\1{2,}", r"\1\1", t)
-
-    # 3) Tokenizar por palabras
-    tokens = t.split()
-
-    # 4) Correcciones específicas por palabra (evita el problema "k" → "queuiero")
-    slang_map = {
-        "k": "que",
-        "xq": "porque",
-        "xk": "porque",
-        "kiero": "quiero",
-        "aprnder": "aprender",
-        # aquí puedes ir añadiendo más correcciones
-    }
 
-    # 5) Integramos también COMMON_CHAT_CORRECTIONS, pero por palabra
-    #    (si utiliza las mismas claves, slang_map tiene prioridad)
-    for wrong, right in COMMON_CHAT_CORRECTIONS.items():
-        if wrong not in slang_map:
-            slang_map[wrong] = right
-
-    normalized_tokens = [slang_map.get(tok, tok) for tok in tokens]
-
-    # 6) Reconstruir texto y limpiar espacios
-    t = " ".join(normalized_tokens)
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
-# ==========================================================
-# 🧩 CATEGORIZACIÓN DE MATERIAS (AMPLIADA)
-# ==========================================================
-# Nota: las llaves están en minúscula y sin tildes para facilitar el match.
-MATERIAS: Dict[str, str] = {
-    # --- Administración, RRHH, Finanzas, Contabilidad ---
-    "administracion de recursos humanos": "Tutor en Administración de Recursos Humanos → Enfatiza gestión de personal, selección, capacitación y clima organizacional.",
-    "gestion de recursos humanos": "Tutor en Gestión de Recursos Humanos → Procesos de talento humano, evaluación de desempeño y desarrollo organizacional.",
-    "recursos humanos": "Tutor en Recursos Humanos → Procesos de selección, contratación y bienestar laboral.",
-    "administracion financiera": "Tutor en Administración Financiera → Explica análisis financiero, presupuestos y toma de decisiones de inversión.",
-    "administracion de empresas": "Tutor en Administración de Empresas → Enfocado en planeación, organización, dirección y control.",
-    "finanzas y contabilidad": "Instructor de Finanzas y Contabilidad → Mezcla estados financieros, análisis y registros contables.",
-    "contabilidad basica": "Instructor de Contabilidad → Ejercicios con registros básicos, asientos y partida doble.",
-    "contabilidad": "Instructor de Contabilidad → Usa ejercicios con cifras y partida doble.",
-    "costos y presupuestos": "Tutor de Costos y Presupuestos → Cálculo de costos, punto de equilibrio y presupuestación.",
-    "servicio al cliente": "Tutor de Servicio al Cliente → Comunicación efectiva, manejo de quejas y experiencia del usuario.",
-    "emprendimiento": "Mentor de Emprendimiento → Diseño de modelo de negocio, propuesta de valor y validación de ideas.",
-
-    # --- Marketing, Comercio, Ventas ---
-    "marketing digital": "Tutor de Marketing Digital → Estrategias en redes sociales, SEO, SEM y contenido.",
-    "marketing": "Tutor de Marketing → Mezcla conceptos de mercado, mezcla de marketing y segmentación.",
-    "comercio internacional": "Tutor de Comercio Internacional → Explica importaciones, exportaciones y logística internacional.",
-
-    # --- Gestión de proyectos ---
-    "gerencia de proyectos": "Tutor en Gerencia de Proyectos → Planificación, ejecución y control de proyectos.",
-    "gestion de proyectos agiles": "Tutor en Gestión de Proyectos Ágiles → Scrum, Kanban y marcos adaptativos.",
-    "gestion de proyectos": "Tutor en Gestión de Proyectos → Enfoque en alcance, tiempo y costos.",
-
-    # --- Áreas administrativas y contables generales ---
-    "ciencias administrativas y contables": "Tutor en Ciencias Administrativas y Contables → Integra conceptos de administración y contabilidad.",
-    "ciencias administrativas": "Tutor en Ciencias Administrativas → Organización, dirección y control.",
-    "ciencias contables": "Tutor en Ciencias Contables → Principios contables y registros financieros.",
-
-    # --- Tecnología, desarrollo de software, TI ---
-    "desarrollo de software": "Instructor de Desarrollo de Software → Lógica, programación, pruebas y buenas prácticas.",
-    "desarrollo web": "Instructor de Desarrollo Web → HTML, CSS, JavaScript y frameworks.",
-    "bases de datos": "Tutor de Bases de Datos → Modelo relacional, SQL y diseño de esquemas.",
-    "ciberseguridad": "Tutor de Ciberseguridad → Buenas prácticas, amenazas comunes y controles básicos.",
-    "inteligencia artificial": "Tutor de Inteligencia Artificial → Conceptos de modelos, entrenamiento y aplicaciones.",
-    "analisis de datos": "Tutor de Análisis de Datos → Estadística básica, dashboards y toma de decisiones.",
-    "big data": "Tutor de Big Data → Procesamiento de grandes volúmenes de datos y ecosistema analítico.",
-    "machine learning": "Tutor de Machine Learning → Modelos supervisados, no supervisados y flujo de trabajo.",
-    "desarrollo movil": "Instructor de Desarrollo Móvil → Aplicaciones para Android/iOS y patrones de diseño.",
-    "cloud computing": "Tutor de Cloud Computing → Conceptos de IaaS, PaaS, SaaS y servicios en la nube.",
-    "internet de las cosas": "Tutor de IoT → Dispositivos conectados, sensores y automatización.",
-    "iot": "Tutor de IoT → Dispositivos conectados, sensores y automatización.",
-    "realidad aumentada y virtual": "Tutor de RA/RV → Conceptos de entornos inmersivos y aplicaciones prácticas.",
-    "realidad aumentada": "Tutor de Realidad Aumentada → Integración de elementos digitales en el mundo real.",
-    "realidad virtual": "Tutor de Realidad Virtual → Experiencias inmersivas y simulaciones.",
-    "blockchain": "Tutor de Blockchain → Explica bloques, cadenas, consensos y aplicaciones.",
-    "robotica": "Tutor de Robótica → Sensores, actuadores, control y aplicaciones industriales.",
-    "impresion 3d": "Tutor de Impresión 3D → Modelado básico y procesos de fabricación aditiva.",
-    "automatizacion industrial": "Tutor de Automatización Industrial → PLC, sensores y sistemas de control.",
-    "tecnologia": "Instructor Técnico → Procedimientos paso a paso con software y hardware.",
-    "desarrollo de software": "Instructor de Desarrollo de Software → Lógica, programación, pruebas y buenas prácticas.",
-
-    # --- Redes, telecomunicaciones, telemática ---
-    "redes y telecomunicaciones": "Instructor de Redes y Telecomunicaciones → Topologías, protocolos y configuración básica.",
-    "redes": "Instructor de Redes → Modelos OSI/TCP-IP, direccionamiento y configuración inicial.",
-    "ciencias de la telematica y la comunicacion": "Tutor de Telemática y Comunicación → Integración de redes, servicios y transmisión de datos.",
-    "telematica": "Tutor de Telemática → Redes avanzadas y servicios sobre IP.",
-    "telecomunicaciones": "Tutor de Telecomunicaciones → Sistemas de transmisión y medios físicos.",
-
-    # --- Diseño, UX/UI, creativas ---
-    "diseno grafico": "Tutor de Diseño Gráfico → Principios visuales, tipografía y herramientas de diseño.",
-    "ux/ui": "Tutor de UX/UI → Enfoque en experiencia de usuario e interfaces amigables.",
-    "diseno ux/ui": "Tutor de UX/UI → Investigación, prototipado y pruebas de usabilidad.",
-    "diseno ux": "Tutor de UX → Investigación con usuarios y arquitectura de información.",
-    "diseno ui": "Tutor de UI → Composición visual, componentes e interacción.",
-
-    # --- Logística, producción, mantenimiento, construcción ---
-    "logistica": "Tutor de Logística → Gestión de inventarios, transporte y cadena de suministro.",
-    "mantenimiento industrial": "Tutor de Mantenimiento Industrial → Tipos de mantenimiento y planificación.",
-    "construccion": "Tutor de Construcción → Procesos constructivos, materiales y seguridad en obra.",
-    "mantenimiento": "Tutor de Mantenimiento → Conceptos básicos de mantenimiento preventivo y correctivo.",
-
-    # --- Seguridad, salud, ambiente, calidad ---
-    "salud ocupacional": "Tutor de Salud Ocupacional → Riesgos laborales, prevención y normativa básica.",
-    "seguridad industrial": "Tutor de Seguridad Industrial → Identificación de peligros y controles.",
-    "gestion ambiental": "Tutor de Gestión Ambiental → Impacto ambiental, mitigación y normatividad básica.",
-    "ciencias de la salud": "Tutor de Ciencias de la Salud → Conceptos generales de bienestar y cuidado.",
-    "gestion de la calidad": "Tutor en Gestión de la Calidad → Enfoque en mejora continua y normas de calidad.",
-
-    # --- Energía, electrónica, electricidad ---
-    "energia renovable": "Tutor de Energías Renovables → Fuentes limpias, ventajas y aplicaciones.",
-    "energias alternativas": "Tutor de Energías Alternativas → Opciones distintas a los combustibles fósiles.",
-    "electronica": "Tutor de Electrónica → Circuitos básicos, componentes y mediciones.",
-    "electricidad industrial": "Tutor de Electricidad Industrial → Instalaciones, motores y protección eléctrica.",
-
-    # --- Mecánica, soldadura, automotriz, industrial ---
-    "mecanica automotriz": "Tutor de Mecánica Automotriz → Sistemas del vehículo y diagnóstico básico.",
-    "soldadura": "Tutor de Soldadura → Procesos, técnicas y seguridad.",
-    "mecanica": "Tutor de Mecánica → Conceptos de fuerza, movimiento y sistemas mecánicos.",
-
-    # --- Gastronomía, agricultura, turismo ---
-    "gastronomia": "Tutor de Gastronomía → Técnicas culinarias, higiene y preparación de platos.",
-    "agricultura": "Tutor de Agricultura → Cultivos, suelos y buenas prácticas agrícolas.",
-    "turismo y hoteleria": "Tutor de Turismo y Hotelería → Servicio al cliente, operación hotelera y destinos.",
-    "turismo": "Tutor de Turismo → Gestión de servicios turísticos y atención al visitante.",
-    "hoteleria": "Tutor de Hotelería → Operación de alojamientos y atención al huésped.",
-
-    # --- Ciencia básica, matemáticas, inglés ---
-    "matematicas": "Tutor de Matemáticas → Razonamiento lógico, pasos claros y ejemplos numéricos.",
-    "ciencias": "Tutor de Ciencias → Explica procesos naturales y experimentos simples.",
-    "ingles": "Tutor de Inglés → Gramática básica, vocabulario y frases útiles.",
-
-    # --- General / catch-all académico ---
-    "tema academico": "Tutor Académico General → Explica conceptos teóricos con ejemplos sencillos.",
-    "tema del sena": "Tutor General del SENA → Relaciona el tema con programas de formación.",
-}
 
 
 # ==========================================================
@@ -326,81 +200,62 @@ FORMATO DE SALIDA:
 """
 
 
-def detectar_materia(text: str) -> str:
-    t = normalize_chat_text(text)
-    for m, desc in MATERIAS.items():
-        if m in t:
-            return desc
-    return "Tutor General del SENA"
-
-
-# ==========================================================
-# 🔒 ANONIMIZACIÓN ROBUSTA
-# ==========================================================
-def anonymize_text(text: str) -> str:
-    if not text:
-        return text
-    text = re.sub(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", "[EMAIL]", text)
-    text = re.sub(r"\b\d{6,}\b", "[NUM]", text)
-    text = re.sub(r"\b(?:\d[ -]*?){13,19}\b", "[NUM]", text)
-    text = re.sub(
-        r"\b[A-ZÁÉÍÓÚ][a-záéíóú]+(?:\s[A-ZÁÉÍÓÚ][a-záéíóú]+){0,2}\b",
-        "[NAME]",
-        text,
-    )
-    text = re.sub(
-        r"\b(?:calle|cra|carrera|av|avenida|cll)\b[^\n,]{0,40}",
-        "[ADDRESS]",
-        text,
-        flags=re.IGNORECASE,
-    )
-    return text
-
-def call_ollama(prompt: str) -> str:
-    url = f"{OLLAMA_URL}/api/generate"
-    payload = {
-        "model": OLLAMA_MODEL,
-        "prompt": prompt,
-        "max_tokens": OLLAMA_MAX_TOKENS,
-        "temperature": 0.15,
-        "top_p": 0.9,
-        "repeat_penalty": 1.05,
-    }
-
+async def call_ollama(
+    prompt: str,
+    client: Optional[OllamaClient] = None,
+    system: Optional[str] = None,
+) -> str:
+    """
+    Genera con Ollama sin bloquear el event loop del action server.
+    Devuelve "" si Ollama falla o está saturado (cada acción tiene su texto de respaldo).
+    """
     try:
-        resp = requests.post(url, json=payload, timeout=OLLAMA_TIMEOUT)
-        resp.raise_for_status()
-        data = resp.json()
-
-        if isinstance(data, dict):
-            for key in ["response", "generated", "result"]:
-                if key in data and isinstance(data[key], str):
-                    return data[key].strip()
-
-            if "results" in data and isinstance(data["results"], list):
-                r0 = data["results"][0]
-                for key in ["content", "text", "output"]:
-                    if key in r0:
-                        return str(r0[key]).strip()
-
-        if isinstance(data, str):
-            return data.strip()
-
+        return await (client or ollama_client).generate(
+            prompt,
+            system=system,
+            **OLLAMA_OPTIONS,
+        )
+    except OllamaBusy as e:
+        logger.warning(f"⚠️ {e}")
         return ""
-
     except Exception:
         logger.exception("❌ Error llamando a Ollama")
         return ""
 
-def llm_summarize_with_ollama(texto_base: str, contexto: Dict[str, Any]) -> str:
+
+async def call_ollama_streaming(prompt: str, sender_id: str, system: Optional[str] = None) -> str:
     """
-    PERFIL:
-    - Usa Ollama SOLO para mejorar redacción / estructura.
-    - NO crea datos de negocio, NO decide autenticación, NO llama endpoints.
+    Como ``call_ollama`` pero publica el texto visible a medida que llega
+    (ver ``LLMReplyStreamFilter``). Devuelve la salida completa del LLM.
     """
-    if not texto_base:
-        return texto_base
+    filtro = LLMReplyStreamFilter()
+    partes: List[str] = []
+    try:
+        async for piece in ollama_client.generate_stream(
+            prompt,
+            system=system,
+            **OLLAMA_OPTIONS,
+        ):
+            partes.append(piece)
+            await chat_stream.delta(sender_id, filtro.feed(piece))
+    except OllamaBusy as e:
+        logger.warning(f"⚠️ {e}")
+        return ""
+    except Exception:
+        logger.exception("❌ Error llamando a Ollama (streaming)")
+        return ""
+    finally:
+        await chat_stream.end(sender_id)
+    return "".join(partes).strip()
+
 
+def _summarize_prompt(texto_base: str, contexto: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Prompt de reescritura + clave de cache. La clave cubre el prompt completo
+    (prompt de sistema, texto anonimizado, contexto e instrucciones), el modelo y
+    las opciones de generación: si cambia la plantilla no se sirven reescrituras viejas
+    desde el nivel compartido (Redis/disco).
+    """
     texto_anon = anonymize_text(texto_base)
 
     safe_pairs: List[str] = []
@@ -429,23 +284,45 @@ def llm_summarize_with_ollama(texto_base: str, contexto: Dict[str, Any]) -> str:
         + "- No agregues información nueva.\n"
         + "- Devuelve solo el texto final para el usuario.\n"
     )
+    return prompt, make_key(OLLAMA_MODEL, prompt, json.dumps(OLLAMA_OPTIONS, sort_keys=True))
+
 
-    raw = call_ollama(prompt)
+async def _summarize(texto_base: str, contexto: Dict[str, Any], client: OllamaClient) -> str:
+    if not texto_base:
+        return texto_base
+
+    prompt, key = _summarize_prompt(texto_base, contexto)
+    if llm_cache is not None:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    raw = await call_ollama(prompt, client)
     if not raw:
         return texto_base
 
     txt = raw.strip()
     txt = re.sub(r"^(RESPUESTA\s*:\s*)", "", txt, flags=re.IGNORECASE).strip()
+    if not txt:
+        return texto_base
 
-    return txt or texto_base
+    if llm_cache is not None:
+        await llm_cache.set(key, txt)
+    return txt
 
 
-def build_auth_required_message_for_action(nombre_proceso: str, base_url: str) -> str:
+async def llm_summarize_with_ollama(texto_base: str, contexto: Dict[str, Any]) -> str:
     """
-    Construye un mensaje estándar de "esta acción requiere autenticación",
-    con pasos claros para iniciar sesión en Zajuna, y lo pasa por el LLM
-    solo para mejorar redacción.
+    PERFIL:
+    - Usa Ollama SOLO para mejorar redacción / estructura.
+    - NO crea datos de negocio, NO decide autenticación, NO llama endpoints.
+    - Las reescrituras se cachean por contenido (ver LLM_CACHE_*).
     """
+    start_llm_cache_warmup()
+    return await _summarize(texto_base, contexto, ollama_client)
+
+
+def plantilla_auth_requerida(nombre_proceso: str, base_url: str) -> Tuple[str, Dict[str, Any]]:
     texto_base = (
         f"Esta acción requiere que inicies sesión en la plataforma Zajuna para poder {nombre_proceso} "
         "y mostrarte datos reales asociados a tu usuario.\n\n"
@@ -462,8 +339,81 @@ def build_auth_required_message_for_action(nombre_proceso: str, base_url: str) -
         "flujo": "autenticacion_requerida",
         "proceso": nombre_proceso,
     }
+    return texto_base, contexto
+
+
+def plantilla_estado_estudiante(estado: str) -> Tuple[str, Dict[str, Any]]:
+    texto_base = (
+        f"Tu estado académico actual en Zajuna es: {estado}. "
+        "Explica brevemente qué significa este estado para el estudiante "
+        "y menciona, de forma general, qué acciones podría tomar (por ejemplo, "
+        "revisar sus cursos, contactar a soporte si ve algo raro, etc.)."
+    )
+    contexto = {
+        "flujo": "estado_estudiante",
+        "estado": estado,
+    }
+    return texto_base, contexto
+
 
-    return llm_summarize_with_ollama(texto_base, contexto)
+async def build_auth_required_message_for_action(nombre_proceso: str, base_url: str) -> str:
+    """
+    Construye un mensaje estándar de "esta acción requiere autenticación",
+    con pasos claros para iniciar sesión en Zajuna, y lo pasa por el LLM
+    solo para mejorar redacción.
+    """
+    texto_base, contexto = plantilla_auth_requerida(nombre_proceso, base_url)
+    return await llm_summarize_with_ollama(texto_base, contexto)
+
+
+# ==========================================================
+# 🔥 PRECALENTAMIENTO DEL CACHE (plantillas conocidas)
+# ==========================================================
+PROCESOS_AUTH_REQUERIDA = [
+    "consultar tu estado académico real",
+    "ver tus certificados personales",
+]
+
+
+def _plantillas_warmup() -> List[Tuple[str, Dict[str, Any]]]:
+    plantillas = [plantilla_auth_requerida(p, ZAJUNA_BASE_URL_DEFAULT) for p in PROCESOS_AUTH_REQUERIDA]
+    plantillas.append(plantilla_estado_estudiante(ESTADO_ESTUDIANTE_DEMO))
+    return plantillas
+
+
+async def _warm_up_llm_cache() -> None:
+    """
+    Genera las reescrituras de plantillas fijas poco después del arranque.
+    Corre en el loop del action server con el ``ollama_client`` compartido:
+    espera en la misma cola FIFO que los turnos de usuario (respeta
+    ``OLLAMA_MAX_IN_FLIGHT``). Si el nivel compartido ya las tiene, no llama a Ollama.
+    """
+    try:
+        await asyncio.sleep(LLM_CACHE_WARMUP_DELAY)
+        for texto_base, contexto in _plantillas_warmup():
+            await _summarize(texto_base, contexto, ollama_client)
+        logger.info(f"[LLM-CACHE] Precalentamiento listo: {llm_cache.stats()}")
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("⚠️ Falló el precalentamiento del cache LLM")
+
+
+_warmup_task: Optional[asyncio.Task] = None
+
+
+def start_llm_cache_warmup() -> bool:
+    """
+    Programa el precalentamiento una sola vez por proceso (True si lo programó).
+    Debe llamarse dentro del loop del action server: rasa_sdk no ofrece hook de
+    arranque, así que lo dispara la primera reescritura; importar el módulo no
+    hace llamadas de red.
+    """
+    global _warmup_task
+    if llm_cache is None or not LLM_CACHE_WARMUP or _warmup_task is not None:
+        return False
+    _warmup_task = asyncio.get_running_loop().create_task(_warm_up_llm_cache(), name="llm-cache-warmup")
+    return True
 
 
 def parse_llm_response(text: str) -> Dict[str, str]:
@@ -515,37 +465,41 @@ class ActionHandleWithOllama(Action):
         tracker: Tracker,
         memoria: str,
         perfil: str,
-    ) -> str:
+    ) -> BuiltPrompt:
+        """
+        Prompt del turno (sin el prompt de sistema, que va en ``system``)
+        dentro de OLLAMA_PROMPT_BUDGET: si no cabe se recorta primero el
+        historial más antiguo (máx OLLAMA_HISTORY_TURNS turnos).
+        """
         raw_msg = tracker.latest_message.get("text", "")
         clean_msg = normalize_chat_text(raw_msg)
         user_msg = anonymize_text(clean_msg)
         intent_info = tracker.latest_message.get("intent", {})
 
-        # historial corto (máx 6 turnos)
+        # Historial (el presupuesto decide cuántos turnos entran)
         history: List[str] = []
-        for e in tracker.events[-12:]:
+        for e in tracker.events[-2 * prompt_budget.max_history:]:
             if e.get("event") == "user":
                 history.append("Usuario: " + anonymize_text(e.get("text", "")))
             elif e.get("event") == "bot":
                 history.append("Bot: " + str(e.get("text", "")))
 
-        hist_text = "\n".join(history[-6:])
-
-        prompt = (
-            PROMPT_SYSTEM
-            + f"\n\n=== PERFIL DETECTADO ===\n{perfil}\n"
-            + f"\n=== MEMORIA SEMÁNTICA ===\n{memoria}\n"
-            + "\n=== CONTEXTO DE LA CONVERSACIÓN ===\n"
-            + f"Último mensaje del usuario: {user_msg}\n"
-            + f"Intent detectado por Rasa: {intent_info.get('name')} "
-            + f"(conf={intent_info.get('confidence')})\n"
-            + f"Historial breve:\n{hist_text}\n"
-            + "\nResponde ÚNICAMENTE en formato:\n"
-            + "INTENT:<nombre_intent>  o  RESPUESTA:<texto>\n"
+        return prompt_budget.build(
+            blocks=[
+                ("=== PERFIL DETECTADO ===", perfil),
+                ("=== MEMORIA SEMÁNTICA ===", memoria),
+                (
+                    "=== CONTEXTO DE LA CONVERSACIÓN ===",
+                    f"Último mensaje del usuario: {user_msg}\n"
+                    f"Intent detectado por Rasa: {intent_info.get('name')} "
+                    f"(conf={intent_info.get('confidence')})",
+                ),
+            ],
+            history=history,
+            tail="\nResponde ÚNICAMENTE en formato:\nINTENT:<nombre_intent>  o  RESPUESTA:<texto>\n",
         )
-        return prompt
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -555,18 +509,25 @@ class ActionHandleWithOllama(Action):
         raw_msg = tracker.latest_message.get("text", "")
         clean_msg = normalize_chat_text(raw_msg)
 
-        prev = retrieve_similar(clean_msg)
+        prev = retrieve_similar(clean_msg, sender_id=tracker.sender_id)
         if prev:
             memoria = f"Continuación del tema anterior: {prev['text']}"
         else:
             memoria = "Nuevo tema."
 
-        store_message(clean_msg)
+        store_message(clean_msg, sender_id=tracker.sender_id)
         perfil = detectar_materia(clean_msg)
-        prompt = self.build_prompt(tracker, memoria, perfil)
-        logger.info(f"[LLM PROMPT] {prompt[:400]}...")
+        built = self.build_prompt(tracker, memoria, perfil)
+        logger.info(
+            f"[LLM PROMPT] ~{built.tokens} tokens (presupuesto {prompt_budget.budget}), "
+            f"historial {built.history_used}/{built.history_used + built.history_dropped}"
+            f"{', recortado' if built.clipped else ''}: {built.prompt[:400]}..."
+        )
 
-        raw = call_ollama(prompt)
+        if chat_stream.enabled:
+            raw = await call_ollama_streaming(built.prompt, tracker.sender_id, system=built.system)
+        else:
+            raw = await call_ollama(built.prompt, system=built.system)
 
         if not raw:
             dispatcher.utter_message(
@@ -706,7 +667,7 @@ class ActionMemoryWrapper(Action):
         if not user_msg:
             return []
 
-        prev = retrieve_similar(user_msg)
+        prev = retrieve_similar(user_msg, sender_id=tracker.sender_id)
 
         if prev:
             logger.info(f"[MEMORIA] Mensaje similar encontrado: {prev['text']}")
@@ -715,7 +676,7 @@ class ActionMemoryWrapper(Action):
             #     text=f"Veo que estás retomando un tema relacionado con: '{prev['text']}'"
             # )
 
-        store_message(user_msg)
+        store_message(user_msg, sender_id=tracker.sender_id)
         logger.info(f"[MEMORIA] Mensaje almacenado: {user_msg}")
 
         return []
@@ -731,7 +692,7 @@ class ActionResumenSesionLLM(Action):
     def name(self) -> Text:
         return "action_resumen_sesion_llm"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -809,7 +770,7 @@ class ActionResumenSesionLLM(Action):
         }
 
         try:
-            mensaje = llm_summarize_with_ollama(texto_base, contexto_llm)
+            mensaje = await llm_summarize_with_ollama(texto_base, contexto_llm)
         except Exception:
             logger.exception("Error generando resumen de sesión con LLM.")
             mensaje = texto_base
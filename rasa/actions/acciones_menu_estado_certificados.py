@@ -3,12 +3,11 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Text, Optional
 
-import requests
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import EventType
 
-from .common import _backend_base, _auth_headers, _has_auth
+from .common import _has_auth, fetch_certificados
 from .acciones_llm import llm_summarize_with_ollama
 
 
@@ -28,35 +27,14 @@ class ActionConsultarCertificados(Action):
     def name(self) -> Text:
         return "action_consultar_certificados"
 
-    def _obtener_certificados_backend(
+    async def _obtener_certificados_backend(
         self, tracker: Tracker
     ) -> Optional[List[Dict[str, Any]]]:
         """
         Intenta obtener certificados reales desde el backend.
         Retorna una lista de dicts o None si falla.
         """
-        base = _backend_base()
-        if not base:
-            return None
-
-        try:
-            resp = requests.get(
-                f"{base}/api/certificados",
-                headers=_auth_headers(tracker),
-                timeout=8,
-            )
-            if not resp.ok:
-                return None
-
-            data = resp.json()
-
-            if isinstance(data, dict):
-                return data.get("certificados") or []
-            if isinstance(data, list):
-                return data
-            return None
-        except Exception:
-            return None
+        return await fetch_certificados(tracker)
 
     def _certificados_demo(self) -> List[Dict[str, Any]]:
         """
@@ -131,7 +109,7 @@ class ActionConsultarCertificados(Action):
 
         return texto_base
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -143,7 +121,7 @@ class ActionConsultarCertificados(Action):
             dispatcher.utter_message(response="utter_login_requerido")
             return []
 
-        certificados = self._obtener_certificados_backend(tracker)
+        certificados = await self._obtener_certificados_backend(tracker)
         if certificados is None or len(certificados) == 0:
             certificados = self._certificados_demo()
 
@@ -155,7 +133,7 @@ class ActionConsultarCertificados(Action):
                 "flujo": "consultar_certificados_menu",
                 "cantidad_certificados": len(certificados),
             }
-            resumen_llm = llm_summarize_with_ollama(texto_base, contexto_llm)
+            resumen_llm = await llm_summarize_with_ollama(texto_base, contexto_llm)
 
             if resumen_llm and resumen_llm.strip():
                 dispatcher.utter_message(text=resumen_llm.strip())
@@ -5,7 +5,6 @@ import os
 import datetime
 from typing import Any, Dict, List, Text
 
-from pymongo import MongoClient
 from rasa_sdk import Action, Tracker
 from rasa_sdk.events import (
     SlotSet,
@@ -16,16 +15,16 @@ from rasa_sdk.events import (
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.types import DomainDict
 
-from utils.mongo_autosave import guardar_autosave, log_event  # ← tus utilidades
-from utils.guardian_client import GuardianClient  # 👈 necesario para ActionGuardarAutosave
+from utils.mongo_autosave import guardar_autosave, log_security_event  # ← tus utilidades
+from utils.mongo_pool import get_collection
+from .acciones_guardian import guardian_async  # 👈 cliente compartido para ActionGuardarAutosave
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 MONGO_DB = os.getenv("MONGO_DB", "chatbot_tutor_virtual")
 AUTOSAVE_COLLECTION = os.getenv("MONGO_AUTOSAVE_COLLECTION", "autosaves")
 
-_client = MongoClient(MONGO_URI)
-_db = _client[MONGO_DB]
-_autos = _db[AUTOSAVE_COLLECTION]
+# Cliente compartido del proceso (utils.mongo_pool)
+_autos = get_collection(AUTOSAVE_COLLECTION, db=MONGO_DB, uri=MONGO_URI)
 
 
 def _log(
@@ -34,7 +33,7 @@ def _log(
     estado: str,
     detalle: Dict[str, Any] | None = None,
 ):
-    log_event(usuario, evento, estado, detalle)
+    log_security_event(usuario, evento, estado, detalle)
 
 
 class ActionGuardianGuardarProgreso(Action):
@@ -181,25 +180,22 @@ class ActionGuardarAutosave(Action):
     def name(self) -> Text:
         return "action_guardar_autosave"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
         domain: Dict[Text, Any],
     ) -> List[EventType]:
-        client = GuardianClient(
-            base_url="http://autosave-guardian:8080",
-            username="admin",
-            password="admin123",
-        )
-
         payload = {
             "latest_intent": tracker.latest_message.get("intent", {}).get("name"),
             "latest_text": tracker.latest_message.get("text"),
             "slots": tracker.current_slot_values(),
         }
 
-        ok = client.autosave_create(tracker.sender_id, payload)
+        try:
+            ok = await guardian_async.autosave_create(tracker.sender_id, payload)
+        except Exception:
+            ok = False
         if ok:
             dispatcher.utter_message(text="Autosave guardado ✅")
         else:
@@ -4,12 +4,12 @@ from __future__ import annotations
 from typing import Any, Text, Dict, List
 import datetime
 
-from pymongo import MongoClient
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet, EventType
 
 from .acciones_llm import llm_summarize_with_ollama
+from utils.mongo_pool import get_collection
 
 # ==========================
 # ⚙️ Config Mongo
@@ -18,9 +18,8 @@ MONGO_URI = "mongodb://localhost:27017"
 DB_NAME = "rasa_autosave"
 COLLECTION = "seguridad_autosave"
 
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
-collection = db[COLLECTION]
+# Cliente compartido del proceso (utils.mongo_pool)
+collection = get_collection(COLLECTION, db=DB_NAME, uri=MONGO_URI)
 
 
 # =====================================================
@@ -80,7 +79,7 @@ class ActionNotificarReconexion(Action):
     def name(self) -> Text:
         return "action_notificar_reconexion"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -113,7 +112,7 @@ class ActionNotificarReconexion(Action):
                     "evento_prev": evento_prev,
                     "tiene_sesion_guardada": True,
                 }
-                mensaje_llm = llm_summarize_with_ollama(texto_base, contexto_llm)
+                mensaje_llm = await llm_summarize_with_ollama(texto_base, contexto_llm)
                 if mensaje_llm and mensaje_llm.strip():
                     dispatcher.utter_message(text=mensaje_llm.strip())
             except Exception:
@@ -157,7 +156,7 @@ class ActionRecuperarEstadoSeguridad(Action):
     def name(self) -> Text:
         return "action_recuperar_estado_seguridad"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -186,7 +185,7 @@ class ActionRecuperarEstadoSeguridad(Action):
                     "evento_prev": evento_prev,
                     "tiene_sesion_guardada": True,
                 }
-                mensaje_llm = llm_summarize_with_ollama(texto_base, contexto_llm)
+                mensaje_llm = await llm_summarize_with_ollama(texto_base, contexto_llm)
                 if mensaje_llm and mensaje_llm.strip():
                     dispatcher.utter_message(text=mensaje_llm.strip())
             except Exception:
@@ -105,7 +105,7 @@ class ActionEnviarSoporte(Action):
     def name(self) -> Text:
         return "action_enviar_soporte"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -203,7 +203,7 @@ class ActionEnviarSoporte(Action):
                 "tiene_correo_valido": bool(email),
             }
             try:
-                mensaje_llm = llm_summarize_with_ollama(texto_base, contexto_llm)
+                mensaje_llm = await llm_summarize_with_ollama(texto_base, contexto_llm)
                 if mensaje_llm and mensaje_llm.strip():
                     dispatcher.utter_message(text=mensaje_llm.strip())
                 else:
@@ -229,7 +229,7 @@ class ActionSoporteSubmit(Action):
     def name(self) -> Text:
         return "action_soporte_submit"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -339,7 +339,7 @@ class ActionSoporteSubmit(Action):
             }
 
             # ✨ Pasamos el texto por el LLM solo para mejorar redacción
-            mensaje_final = llm_summarize_with_ollama(texto_base, contexto_llm)
+            mensaje_final = await llm_summarize_with_ollama(texto_base, contexto_llm)
 
             dispatcher.utter_message(text=mensaje_final)
 
@@ -9,6 +9,7 @@ from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet, ConversationPaused, ConversationResumed
 from .acciones_llm import ActionResumenSesionLLM
 from .acciones_llm import llm_summarize_with_ollama
+from .common import invalidate_user_cache
 
 
 class ActionConfirmarCierre(Action):
@@ -29,7 +30,7 @@ class ActionFinalizarConversacion(Action):
     def name(self) -> Text:
         return "action_finalizar_conversacion"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -45,11 +46,14 @@ class ActionFinalizarConversacion(Action):
         sesion_larga = bool(tracker.get_slot("sesion_larga"))
         if sesion_larga:
             try:
-                ActionResumenSesionLLM().run(dispatcher, tracker, domain)
+                await ActionResumenSesionLLM().run(dispatcher, tracker, domain)
             except Exception:
                 # No rompemos el cierre si el resumen falla
                 pass
 
+        # Al cerrar la sesión no se reutilizan datos del backend cacheados
+        await invalidate_user_cache(tracker)
+
         # Mensaje de despedida profesional (ya lo tenías)
         dispatcher.utter_message(response="utter_despedida_profesional")
 
@@ -106,7 +110,7 @@ class ActionFinalizarConversacion(Action):
                 "ultimo_intent": ultimo_intent,
             }
 
-            resumen_llm = llm_summarize_with_ollama(texto_base, contexto_llm)
+            resumen_llm = await llm_summarize_with_ollama(texto_base, contexto_llm)
             if resumen_llm and resumen_llm.strip():
                 dispatcher.utter_message(text=resumen_llm.strip())
         except Exception:
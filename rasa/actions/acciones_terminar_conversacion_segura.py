@@ -9,6 +9,7 @@ from rasa_sdk.events import SlotSet, ConversationPaused, ConversationResumed
 from rasa_sdk.types import DomainDict
 from .acciones_llm import ActionResumenSesionLLM
 from .acciones_llm import llm_summarize_with_ollama
+from .common import invalidate_user_cache
 import json
 
 
@@ -42,7 +43,7 @@ class ActionConfirmarCierreSeguroFinal(Action):
     def name(self) -> Text:
         return "action_confirmar_cierre_seguro_final"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -53,7 +54,7 @@ class ActionConfirmarCierreSeguroFinal(Action):
         sesion_larga = bool(tracker.get_slot("sesion_larga"))
         if sesion_larga:
             try:
-                ActionResumenSesionLLM().run(dispatcher, tracker, domain)
+                await ActionResumenSesionLLM().run(dispatcher, tracker, domain)
             except Exception:
                 # No rompemos el flujo si falla el resumen
                 pass
@@ -98,13 +99,16 @@ class ActionConfirmarCierreSeguroFinal(Action):
                 "ultimo_intent": ultimo_intent,
             }
 
-            mensaje_llm = llm_summarize_with_ollama(texto_base, contexto_llm)
+            mensaje_llm = await llm_summarize_with_ollama(texto_base, contexto_llm)
             if mensaje_llm and mensaje_llm.strip():
                 dispatcher.utter_message(text=mensaje_llm.strip())
         except Exception:
            
             pass
 
+        # Al cerrar la sesión no se reutilizan datos del backend cacheados
+        await invalidate_user_cache(tracker)
+
         # 3) Tu utter final sigue igual
         dispatcher.utter_message(response="utter_despedida_final")
 
@@ -10,6 +10,7 @@ from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet, ConversationPaused, ConversationResumed
 from .acciones_llm import ActionResumenSesionLLM
 from .acciones_llm import llm_summarize_with_ollama
+from .common import invalidate_user_cache
 
 
 class ActionVerificarProcesoActivoAutosave(Action):
@@ -63,7 +64,7 @@ class ActionConfirmarCierreAutosave(Action):
     def name(self) -> Text:
         return "action_confirmar_cierre_autosave"
 
-    def run(
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -117,7 +118,7 @@ class ActionConfirmarCierreAutosave(Action):
                 "encuesta_incompleta": encuesta_incompleta,
             }
 
-            mensaje_llm = llm_summarize_with_ollama(texto_base, contexto_llm)
+            mensaje_llm = await llm_summarize_with_ollama(texto_base, contexto_llm)
             if mensaje_llm and mensaje_llm.strip():
                 dispatcher.utter_message(text=mensaje_llm.strip())
         except Exception:
@@ -129,11 +130,14 @@ class ActionConfirmarCierreAutosave(Action):
         # ================================
         if sesion_larga:
             try:
-                ActionResumenSesionLLM().run(dispatcher, tracker, domain)
+                await ActionResumenSesionLLM().run(dispatcher, tracker, domain)
             except Exception:
                 # No bloquea el cierre si el resumen falla
                 pass
 
+        # Al cerrar la sesión no se reutilizan datos del backend cacheados
+        await invalidate_user_cache(tracker)
+
         # ================================
         # 3) Mantener tu comportamiento original de cierre
         # ================================
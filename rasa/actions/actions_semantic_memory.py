@@ -1,104 +1,327 @@
-import os
+"""
+Memoria semántica de mensajes del usuario (usada por las acciones LLM).
+
+Índice en memoria con embeddings de dimensión fija (hashing de palabras):
+- Cada partición (un ``sender_id``) guarda sus vectores en una matriz float32
+  contigua de forma (dim, capacidad); una consulta se puntúa contra todas las
+  entradas con un solo producto, usando solo las filas de las palabras de la
+  consulta, así que el costo no depende de ``dim``.
+- Límite por remitente (buffer circular: se reemplaza la entrada más antigua)
+  y límite global (se descartan las particiones usadas hace más tiempo).
+- Persistencia en un log JSONL de solo-anexar (una línea por mensaje); al
+  arrancar se reconstruye el índice desde el log y cada cierto número de
+  líneas se compacta reescribiendo solo las entradas vivas.
+
+Si existe el ``semantic_memory.json`` anterior y aún no hay log, se importa
+una vez al cargar.
+"""
 import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
 import numpy as np
-from typing import List, Dict
 
-# Archivo de memoria semántica en disco
-EMBED_FILE = "semantic_memory.json"
+logger = logging.getLogger(__name__)
 
+# ----------------- CONFIG DESDE ENV -----------------
+MEMORY_LOG_FILE = os.getenv("SEMANTIC_MEMORY_FILE", "semantic_memory.jsonl")
+EMBED_FILE = "semantic_memory.json"  # formato anterior (solo lectura, migración)
+EMBED_DIM = int(os.getenv("SEMANTIC_MEMORY_DIM", "512"))
+MAX_PER_SENDER = int(os.getenv("SEMANTIC_MEMORY_MAX_PER_SENDER", "1000"))
+MAX_ENTRIES = int(os.getenv("SEMANTIC_MEMORY_MAX_ENTRIES", "100000"))
+COMPACT_EVERY = int(os.getenv("SEMANTIC_MEMORY_COMPACT_EVERY", "5000"))
 
-def load_memory() -> List[Dict]:
-    """Carga la memoria semántica desde semantic_memory.json."""
-    if not os.path.exists(EMBED_FILE):
-        return []
-    with open(EMBED_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+GLOBAL_SENDER = "_global"  # partición para llamadas sin sender_id
 
 
-def save_memory(mem: List[Dict]) -> None:
-    """Guarda la memoria semántica en semantic_memory.json."""
-    with open(EMBED_FILE, "w", encoding="utf-8") as f:
-        json.dump(mem, f, indent=2, ensure_ascii=False)
+# ==========================================================
+# Embedding (hashing de palabras, dimensión fija)
+# ==========================================================
+@lru_cache(maxsize=65536)
+def _feature(token: str, dim: int) -> Tuple[int, float]:
+    """Columna y signo de una palabra (crc32: estable entre procesos)."""
+    h = zlib.crc32(token.encode("utf-8"))
+    return h % dim, (1.0 if (h >> 31) & 1 else -1.0)
 
 
-def embed(text: str) -> np.ndarray:
+def _sparse(text: str, dim: int = EMBED_DIM) -> Tuple[np.ndarray, np.ndarray]:
+    """Embedding disperso normalizado: (índices, valores) sin repetidos."""
+    acc: Dict[int, float] = {}
+    for w in text.lower().split():
+        idx, sign = _feature(w, dim)
+        acc[idx] = acc.get(idx, 0.0) + sign
+    if not acc:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+    idx = np.fromiter(acc.keys(), dtype=np.intp, count=len(acc))
+    vals = np.fromiter(acc.values(), dtype=np.float32, count=len(acc))
+    norm = float(np.linalg.norm(vals))
+    if norm == 0.0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+    return idx, vals / norm
+
+
+def embed(text: str, dim: int = EMBED_DIM) -> np.ndarray:
     """
-    Embedding simple tipo bolsa de palabras normalizada.
+    Embedding denso de dimensión fija (hashing de bolsa de palabras, L2).
     NO es un modelo real, solo sirve como similitud básica.
     """
-    words = text.lower().split()
-    vec = {}
-    for w in words:
-        vec[w] = vec.get(w, 0) + 1
-    arr = np.array(list(vec.values()), dtype=float)
-    norm = np.linalg.norm(arr)
-    return arr / norm if norm else arr
+    vec = np.zeros(dim, dtype=np.float32)
+    idx, vals = _sparse(text, dim)
+    vec[idx] = vals
+    return vec
 
 
-def cosine(a: np.ndarray, b: np.ndarray) -> float:
-    """Similitud coseno entre dos vectores."""
-    if a.size == 0 or b.size == 0:
-        return 0.0
-    if len(a) != len(b):
-        return 0.0
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-9))
+# ==========================================================
+# Índice
+# ==========================================================
+class _Partition:
+    """Entradas de un remitente: matriz (dim, capacidad) + buffer circular."""
 
+    __slots__ = ("matrix", "entries", "size", "head", "cap")
 
-def store_message(text: str) -> None:
-    """
-    Guarda el mensaje en memoria semántica incluyendo:
-    - texto original
-    - texto normalizado
-    - embedding basado en el texto normalizado
+    def __init__(self, dim: int, cap: int):
+        self.cap = cap
+        self.matrix = np.zeros((dim, min(cap, 16)), dtype=np.float32)
+        self.entries: List[Optional[Dict]] = []
+        self.size = 0
+        self.head = 0  # próxima posición a reemplazar cuando está llena
+
+    def add(self, idx: np.ndarray, vals: np.ndarray, entry: Dict) -> bool:
+        """Agrega una entrada; devuelve True si reemplazó la más antigua."""
+        if self.size < self.cap:
+            if self.size == self.matrix.shape[1]:
+                grown = np.zeros((self.matrix.shape[0], min(self.cap, self.size * 2)), dtype=np.float32)
+                grown[:, : self.size] = self.matrix
+                self.matrix = grown
+            slot = self.size
+            self.size += 1
+            self.entries.append(entry)
+            evicted = False
+        else:
+            slot = self.head
+            self.head = (self.head + 1) % self.cap
+            self.entries[slot] = entry
+            self.matrix[:, slot] = 0.0
+            evicted = True
+        self.matrix[idx, slot] = vals
+        return evicted
 
-    Además mantiene el campo 'text' por compatibilidad hacia atrás.
+    def best(self, idx: np.ndarray, vals: np.ndarray) -> Tuple[int, float]:
+        scores = vals @ self.matrix[idx, : self.size]
+        i = int(np.argmax(scores))
+        return i, float(scores[i])
+
+    def ordered(self) -> List[Dict]:
+        """Entradas de la más antigua a la más reciente."""
+        return self.entries[self.head :] + self.entries[: self.head]
+
+
+class SemanticMemoryIndex:
     """
-    # Import perezoso para evitar import circular con acciones_llm
-    from .acciones_llm import normalize_chat_text
+    Índice de memoria semántica particionado por remitente.
 
-    mem = load_memory()
+    ``path=None`` deja el índice solo en memoria (sin log).
+    """
 
-    normalized = normalize_chat_text(text)
-    emb = embed(normalized)
+    def __init__(
+        self,
+        path: Optional[str] = MEMORY_LOG_FILE,
+        dim: int = EMBED_DIM,
+        max_per_sender: int = MAX_PER_SENDER,
+        max_entries: int = MAX_ENTRIES,
+        compact_every: int = COMPACT_EVERY,
+    ):
+        self.path = path
+        self.dim = dim
+        self.max_per_sender = max(1, max_per_sender)
+        self.max_entries = max(self.max_per_sender, max_entries)
+        self.compact_every = compact_every
+        self._parts: "OrderedDict[str, _Partition]" = OrderedDict()
+        self._total = 0
+        self._log_lines = 0
+        self._log = None
+        self._lock = threading.Lock()
+        if path:
+            self._load()
 
-    mem.append(
-        {
-            # Compatibilidad con código antiguo que espera m["text"]
+    # ---------- API ----------
+    def add(self, sender_id: Optional[str], text: str, normalized: str, ts: Optional[float] = None) -> None:
+        entry = {
+            "sender_id": sender_id or GLOBAL_SENDER,
             "text": text,
-            # Nuevo esquema enriquecido:
-            "text_original": text,
             "text_normalized": normalized,
-            "embedding": emb.tolist(),
+            "ts": ts if ts is not None else time.time(),
+        }
+        with self._lock:
+            if self._insert(entry):
+                self._append(entry)
+
+    def search(self, sender_id: Optional[str], normalized: str, threshold: float = 0.60) -> Optional[Dict]:
+        idx, vals = _sparse(normalized, self.dim)
+        if idx.size == 0:
+            return None
+        key = sender_id or GLOBAL_SENDER
+        with self._lock:
+            part = self._parts.get(key)
+            if part is None or part.size == 0:
+                return None
+            self._parts.move_to_end(key)
+            i, score = part.best(idx, vals)
+            entry = part.entries[i]
+        if score < threshold:
+            return None
+        return {
+            # Compatibilidad con código antiguo que espera m["text"]
+            "text": entry["text"],
+            "text_original": entry["text"],
+            "text_normalized": entry["text_normalized"],
+            "sender_id": entry["sender_id"],
+            "score": score,
+        }
+
+    def __len__(self) -> int:
+        return self._total
+
+    def stats(self) -> Dict:
+        return {
+            "entries": self._total,
+            "senders": len(self._parts),
+            "log_lines": self._log_lines,
+            "dim": self.dim,
         }
-    )
 
-    save_memory(mem)
+    def close(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    # ---------- Internos ----------
+    def _insert(self, entry: Dict) -> bool:
+        idx, vals = _sparse(entry["text_normalized"], self.dim)
+        if idx.size == 0:
+            return False
+        key = entry["sender_id"]
+        part = self._parts.get(key)
+        if part is None:
+            part = self._parts[key] = _Partition(self.dim, self.max_per_sender)
+        self._parts.move_to_end(key)
+        if not part.add(idx, vals, entry):
+            self._total += 1
+        # Límite global: se descartan las particiones menos usadas (nunca la actual)
+        while self._total > self.max_entries and len(self._parts) > 1:
+            old_key, old = next(iter(self._parts.items()))
+            if old_key == key:
+                break
+            del self._parts[old_key]
+            self._total -= old.size
+        return True
+
+    def _append(self, entry: Dict) -> None:
+        if not self.path:
+            return
+        try:
+            if self._log is None:
+                self._log = open(self.path, "a", encoding="utf-8")
+            self._log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._log.flush()
+            self._log_lines += 1
+        except OSError as e:
+            logger.warning(f"[MEMORIA] No se pudo escribir {self.path}: {e}")
+            return
+        if self._log_lines >= self.compact_every and self._log_lines > 2 * self._total:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Reescribe el log solo con las entradas vivas (escritura atómica)."""
+        tmp = f"{self.path}.tmp"
+        try:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            lines = 0
+            with open(tmp, "w", encoding="utf-8") as f:
+                for part in self._parts.values():
+                    for entry in part.ordered():
+                        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                        lines += 1
+            os.replace(tmp, self.path)
+            self._log_lines = lines
+        except OSError as e:
+            logger.warning(f"[MEMORIA] Falló la compactación de {self.path}: {e}")
+
+    def _load(self) -> None:
+        if os.path.exists(self.path):
+            lines = 0
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        self._insert(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        continue  # línea truncada por un corte: se descarta
+            self._log_lines = lines
+            if lines > 2 * self._total and lines >= self.compact_every:
+                self._compact()
+        elif os.path.exists(EMBED_FILE):
+            self._import_legacy()
+
+    def _import_legacy(self) -> None:
+        try:
+            with open(EMBED_FILE, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[MEMORIA] No se pudo leer {EMBED_FILE}: {e}")
+            return
+        for m in legacy:
+            text = m.get("text_original") or m.get("text") or ""
+            normalized = m.get("text_normalized") or text
+            self._insert({"sender_id": GLOBAL_SENDER, "text": text, "text_normalized": normalized, "ts": 0})
+        self._compact()
+        logger.info(f"[MEMORIA] Importadas {self._total} entradas desde {EMBED_FILE}")
+
+
+# ==========================================================
+# API usada por las acciones
+# ==========================================================
+_index: Optional[SemanticMemoryIndex] = None
+_index_lock = threading.Lock()
 
 
-def retrieve_similar(text: str, threshold: float = 0.60):
+def get_index() -> SemanticMemoryIndex:
+    """Índice compartido del proceso (se carga desde el log en el primer uso)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SemanticMemoryIndex()
+    return _index
+
+
+def store_message(text: str, sender_id: Optional[str] = None) -> None:
     """
-    Recupera el mensaje más similar al texto dado.
-    - Normaliza la query antes de hacer el embedding.
-    - Usa similitud coseno sobre los embeddings.
+    Guarda el mensaje en la memoria semántica del remitente.
+    El embedding se calcula sobre el texto normalizado.
     """
-    # Import perezoso para evitar import circular
-    from .acciones_llm import normalize_chat_text
-
-    mem = load_memory()
-    if not mem:
-        return None
+    # Import perezoso: el módulo también se carga suelto (tools/bench)
+    from .normalizacion_texto import normalize_chat_text
 
-    query_norm = normalize_chat_text(text)
-    query_emb = embed(query_norm)
+    get_index().add(sender_id, text, normalize_chat_text(text))
 
-    best = None
-    best_score = 0.0
 
-    for m in mem:
-        e = np.array(m["embedding"], dtype=float)
-        score = cosine(query_emb, e)
-        if score > best_score:
-            best = m
-            best_score = score
+def retrieve_similar(text: str, threshold: float = 0.60, sender_id: Optional[str] = None):
+    """
+    Recupera el mensaje más similar al texto dado (solo del mismo remitente).
+    - Normaliza la query antes de hacer el embedding.
+    - Usa similitud coseno sobre los embeddings.
+    """
+    # Import perezoso: el módulo también se carga suelto (tools/bench)
+    from .normalizacion_texto import normalize_chat_text
 
-    return best if best_score >= threshold else None
+    return get_index().search(sender_id, normalize_chat_text(text), threshold)
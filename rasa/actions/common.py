@@ -1,11 +1,13 @@
 # rasa/actions/common.py
 from __future__ import annotations
-import os, re, json, time, logging
-from typing import Any, Dict, Optional
+import os, re, json, time, logging, hashlib
+from typing import Any, Dict, List, Optional
 import requests
 from email.mime.text import MIMEText
 import smtplib
 from rasa_sdk import Tracker
+from utils.backend_http import BackendHttp
+from utils.user_cache import UserResourceCache
 
 # =========================
 #  Logging
@@ -59,6 +61,43 @@ BACKEND_URL    = (os.getenv("BACKEND_URL") or "").rstrip("/")
 
 ACTIONS_PING_HELPDESK = (os.getenv("ACTIONS_PING_HELPDESK") or "false").lower() == "true"
 
+# Cliente HTTP asíncrono compartido (backend Zajuna / helpdesk) con breaker por endpoint
+ACTIONS_BREAKER_FAILURES = int(os.getenv("ACTIONS_BREAKER_FAILURES", "5"))
+ACTIONS_BREAKER_RESET    = float(os.getenv("ACTIONS_BREAKER_RESET", "30"))
+ENDPOINT_TIMEOUTS: Dict[str, float] = {
+    "estado": 8,
+    "tutor": 8,
+    "certificados": 10,
+    "helpdesk": 3,
+}
+
+backend_http = BackendHttp(
+    timeout=REQUEST_TIMEOUT_SECS,
+    retries=MAX_RETRIES,
+    failure_threshold=ACTIONS_BREAKER_FAILURES,
+    reset_timeout=ACTIONS_BREAKER_RESET,
+)
+
+# Cache por usuario de las consultas al backend (las preguntas repetidas no llegan al backend)
+ACTIONS_CACHE_ENABLED = (os.getenv("ACTIONS_CACHE_ENABLED") or "true").lower() in ("1", "true", "yes")
+ACTIONS_CACHE_STALE   = float(os.getenv("ACTIONS_CACHE_STALE", "120"))
+CACHE_TTLS: Dict[str, float] = {
+    "estado": float(os.getenv("ACTIONS_CACHE_TTL_ESTADO", "60")),
+    "tutor": float(os.getenv("ACTIONS_CACHE_TTL_TUTOR", "600")),
+    "certificados": float(os.getenv("ACTIONS_CACHE_TTL_CERTIFICADOS", "300")),
+}
+
+user_cache: Optional[UserResourceCache] = (
+    UserResourceCache(
+        ttls=CACHE_TTLS,
+        stale=ACTIONS_CACHE_STALE,
+        max_entries=int(os.getenv("ACTIONS_CACHE_MAX_ENTRIES", "5000")),
+        redis_url=os.getenv("ACTIONS_CACHE_REDIS_URL") or None,
+    )
+    if ACTIONS_CACHE_ENABLED
+    else None
+)
+
 # =========================
 #  Utilidades HTTP / SMTP
 # =========================
@@ -94,6 +133,78 @@ def post_json_with_retries(url: str, payload: Dict[str, Any], headers: Optional[
             time.sleep(0.5 * attempt)
     return None
 
+def _cache_user(tracker: Tracker) -> Optional[str]:
+    """Identidad para el cache: hash del token de sesión (sin token no se cachea)."""
+    token = tracker.get_slot("auth_token")
+    return hashlib.sha256(str(token).encode("utf-8")).hexdigest()[:32] if token else None
+
+async def _cached(tracker: Tracker, resource: str, loader):
+    user = _cache_user(tracker) if user_cache is not None else None
+    if user is None:
+        return await loader()
+    return await user_cache.get_or_load(user, resource, loader)
+
+async def invalidate_user_cache(tracker: Tracker) -> None:
+    """Olvida lo cacheado del usuario (reinicio de conversación, cierre de sesión)."""
+    user = _cache_user(tracker) if user_cache is not None else None
+    if user is not None:
+        await user_cache.invalidate(user)
+
+async def fetch_estado_estudiante(tracker: Tracker) -> Optional[str]:
+    """Estado académico desde /api/estado-estudiante (None si no hay backend o falla)."""
+    base = _backend_base()
+    if not base:
+        return None
+
+    async def load() -> Optional[str]:
+        data = await backend_http.get_json(
+            f"{base}/api/estado-estudiante",
+            "estado",
+            headers=_auth_headers(tracker),
+            timeout=ENDPOINT_TIMEOUTS["estado"],
+        )
+        return data.get("estado") if isinstance(data, dict) else None
+
+    return await _cached(tracker, "estado", load)
+
+async def fetch_tutor(tracker: Tracker) -> Optional[Dict[str, Any]]:
+    """Tutor asignado desde /api/tutor ({"nombre", "contacto"}); None si falla."""
+    base = _backend_base()
+    if not base:
+        return None
+
+    async def load() -> Optional[Dict[str, Any]]:
+        data = await backend_http.get_json(
+            f"{base}/api/tutor",
+            "tutor",
+            headers=_auth_headers(tracker),
+            timeout=ENDPOINT_TIMEOUTS["tutor"],
+        )
+        return data if isinstance(data, dict) else None
+
+    return await _cached(tracker, "tutor", load)
+
+async def fetch_certificados(tracker: Tracker, base: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """Certificados desde /api/certificados (acepta lista o {"certificados": [...]}); None si falla."""
+    base = (base if base is not None else _backend_base()).rstrip("/")
+    if not base:
+        return None
+
+    async def load() -> Optional[List[Dict[str, Any]]]:
+        data = await backend_http.get_json(
+            f"{base}/api/certificados",
+            "certificados",
+            headers=_auth_headers(tracker),
+            timeout=ENDPOINT_TIMEOUTS["certificados"],
+        )
+        if isinstance(data, dict):
+            return data.get("certificados") or []
+        if isinstance(data, list):
+            return data
+        return None
+
+    return await _cached(tracker, "certificados", load)
+
 # =========================
 #  Helpers de tracker
 # =========================
@@ -0,0 +1,304 @@
+"""
+Normalización de texto y detección de materia para las acciones LLM.
+
+Todo lo costoso se prepara una sola vez al importar el módulo:
+- ``normalize``: tabla ``str.translate`` para las letras acentuadas latinas
+  (se recurre a NFD solo si queda algún carácter no ASCII).
+- ``normalize_chat_text``: un único diccionario de correcciones por palabra,
+  aplicado en una pasada sobre los tokens.
+- ``anonymize_text``: patrones precompilados, en el mismo orden de siempre.
+- ``detectar_materia``: trie por palabras con las llaves de ``MATERIAS``;
+  gana la coincidencia más larga (a igual longitud, la primera en el texto) y
+  solo cuenta si son palabras completas ("redes" no coincide en "paredes").
+
+Sin dependencias de rasa_sdk para poder usarse desde la memoria semántica y
+desde ``tools/bench/bench_normalizacion.py``.
+"""
+import re
+import unicodedata
+from typing import Dict, Optional
+
+
+# ==========================================================
+# 🧩 NORMALIZACIÓN DE TEXTO (SIN TILDES, MINÚSCULAS)
+# ==========================================================
+def _tabla_sin_tildes() -> Dict[int, str]:
+    tabla: Dict[int, str] = {}
+    for cp in range(0x00C0, 0x0250):  # Latin-1 Supplement + Latin Extended-A/B
+        ch = chr(cp)
+        base = "".join(c for c in unicodedata.normalize("NFD", ch) if unicodedata.category(c) != "Mn")
+        if base != ch:
+            tabla[cp] = base
+    return tabla
+
+
+_SIN_TILDES = _tabla_sin_tildes()
+
+
+def strip_accents(text: str) -> str:
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', text)
+        if unicodedata.category(c) != 'Mn'
+    )
+
+
+def normalize(text: str) -> str:
+    if not text:
+        return ""
+    if not text.isascii():
+        text = text.translate(_SIN_TILDES)
+        if not text.isascii():  # marcas combinantes sueltas u otros alfabetos
+            text = strip_accents(text)
+    return text.lower()
+
+
+# ==========================================================
+# 🧹 NORMALIZACIÓN "DE CHAT": ERRORES TÍPICOS, TILDES, ETC.
+# ==========================================================
+COMMON_CHAT_CORRECTIONS = {
+    "kiero": "quiero",
+    "kiere": "quiere",
+    "kieres": "quieres",
+    "xq": "porque",
+    "xk": "porque",
+    "xk?": "porque",
+    "pa": "para",
+    "q": "que",
+    "qe": "que",
+    "qer": "querer",
+    "certifcado": "certificado",
+    "certifcados": "certificados",
+    "sertificado": "certificado",
+    "sertificados": "certificados",
+    "logaer": "lograr",
+    "loguearme": "loguearme",
+    "loguear": "loguear",
+    "contraseña": "contrasena",   # para que coincida sin tilde
+    "platafroma": "plataforma",
+    "platafomra": "plataforma",
+    "markeitng": "marketing",
+    "markting": "marketing",
+    "digitla": "digital",
+}
+
+# Correcciones propias del chat; tienen prioridad sobre COMMON_CHAT_CORRECTIONS
+SLANG_MAP = {
+    "k": "que",
+    "xq": "porque",
+    "xk": "porque",
+    "kiero": "quiero",
+    "aprnder": "aprender",
+    # aquí puedes ir añadiendo más correcciones
+}
+
+# Tabla única por palabra (se arma una vez)
+_CORRECCIONES: Dict[str, str] = {**COMMON_CHAT_CORRECTIONS, **SLANG_MAP}
+
+_LETRAS_REPETIDAS = re.compile(r"(.)\1{2,}")
+
+
+def normalize_chat_text(text: str) -> str:
+    """
+    Normaliza texto de usuario para que el bot entienda aunque escriba
+    con errores:
+    - tildes
+    - letras repetidas
+    - abreviaturas típicas de chat
+    - SIN deformar palabras por reemplazos de caracteres sueltos
+    """
+    if not text:
+        return ""
+
+    # 1) Minúsculas + quitar tildes
+    t = normalize(text)
+
+    # 2) Colapsar letras repetidas: "holaaaa" -> "holaa"
+    t = _LETRAS_REPETIDAS.sub(r"\1\1", t)
+
+    # 3) Correcciones por palabra en una pasada; split/join también limpia espacios
+    get = _CORRECCIONES.get
+    return " ".join([get(tok, tok) for tok in t.split()])
+
+
+# ==========================================================
+# 🧩 CATEGORIZACIÓN DE MATERIAS (AMPLIADA)
+# ==========================================================
+# Nota: las llaves están en minúscula y sin tildes para facilitar el match.
+MATERIAS: Dict[str, str] = {
+    # --- Administración, RRHH, Finanzas, Contabilidad ---
+    "administracion de recursos humanos": "Tutor en Administración de Recursos Humanos → Enfatiza gestión de personal, selección, capacitación y clima organizacional.",
+    "gestion de recursos humanos": "Tutor en Gestión de Recursos Humanos → Procesos de talento humano, evaluación de desempeño y desarrollo organizacional.",
+    "recursos humanos": "Tutor en Recursos Humanos → Procesos de selección, contratación y bienestar laboral.",
+    "administracion financiera": "Tutor en Administración Financiera → Explica análisis financiero, presupuestos y toma de decisiones de inversión.",
+    "administracion de empresas": "Tutor en Administración de Empresas → Enfocado en planeación, organización, dirección y control.",
+    "finanzas y contabilidad": "Instructor de Finanzas y Contabilidad → Mezcla estados financieros, análisis y registros contables.",
+    "contabilidad basica": "Instructor de Contabilidad → Ejercicios con registros básicos, asientos y partida doble.",
+    "contabilidad": "Instructor de Contabilidad → Usa ejercicios con cifras y partida doble.",
+    "costos y presupuestos": "Tutor de Costos y Presupuestos → Cálculo de costos, punto de equilibrio y presupuestación.",
+    "servicio al cliente": "Tutor de Servicio al Cliente → Comunicación efectiva, manejo de quejas y experiencia del usuario.",
+    "emprendimiento": "Mentor de Emprendimiento → Diseño de modelo de negocio, propuesta de valor y validación de ideas.",
+
+    # --- Marketing, Comercio, Ventas ---
+    "marketing digital": "Tutor de Marketing Digital → Estrategias en redes sociales, SEO, SEM y contenido.",
+    "marketing": "Tutor de Marketing → Mezcla conceptos de mercado, mezcla de marketing y segmentación.",
+    "comercio internacional": "Tutor de Comercio Internacional → Explica importaciones, exportaciones y logística internacional.",
+
+    # --- Gestión de proyectos ---
+    "gerencia de proyectos": "Tutor en Gerencia de Proyectos → Planificación, ejecución y control de proyectos.",
+    "gestion de proyectos agiles": "Tutor en Gestión de Proyectos Ágiles → Scrum, Kanban y marcos adaptativos.",
+    "gestion de proyectos": "Tutor en Gestión de Proyectos → Enfoque en alcance, tiempo y costos.",
+
+    # --- Áreas administrativas y contables generales ---
+    "ciencias administrativas y contables": "Tutor en Ciencias Administrativas y Contables → Integra conceptos de administración y contabilidad.",
+    "ciencias administrativas": "Tutor en Ciencias Administrativas → Organización, dirección y control.",
+    "ciencias contables": "Tutor en Ciencias Contables → Principios contables y registros financieros.",
+
+    # --- Tecnología, desarrollo de software, TI ---
+    "desarrollo de software": "Instructor de Desarrollo de Software → Lógica, programación, pruebas y buenas prácticas.",
+    "desarrollo web": "Instructor de Desarrollo Web → HTML, CSS, JavaScript y frameworks.",
+    "bases de datos": "Tutor de Bases de Datos → Modelo relacional, SQL y diseño de esquemas.",
+    "ciberseguridad": "Tutor de Ciberseguridad → Buenas prácticas, amenazas comunes y controles básicos.",
+    "inteligencia artificial": "Tutor de Inteligencia Artificial → Conceptos de modelos, entrenamiento y aplicaciones.",
+    "analisis de datos": "Tutor de Análisis de Datos → Estadística básica, dashboards y toma de decisiones.",
+    "big data": "Tutor de Big Data → Procesamiento de grandes volúmenes de datos y ecosistema analítico.",
+    "machine learning": "Tutor de Machine Learning → Modelos supervisados, no supervisados y flujo de trabajo.",
+    "desarrollo movil": "Instructor de Desarrollo Móvil → Aplicaciones para Android/iOS y patrones de diseño.",
+    "cloud computing": "Tutor de Cloud Computing → Conceptos de IaaS, PaaS, SaaS y servicios en la nube.",
+    "internet de las cosas": "Tutor de IoT → Dispositivos conectados, sensores y automatización.",
+    "iot": "Tutor de IoT → Dispositivos conectados, sensores y automatización.",
+    "realidad aumentada y virtual": "Tutor de RA/RV → Conceptos de entornos inmersivos y aplicaciones prácticas.",
+    "realidad aumentada": "Tutor de Realidad Aumentada → Integración de elementos digitales en el mundo real.",
+    "realidad virtual": "Tutor de Realidad Virtual → Experiencias inmersivas y simulaciones.",
+    "blockchain": "Tutor de Blockchain → Explica bloques, cadenas, consensos y aplicaciones.",
+    "robotica": "Tutor de Robótica → Sensores, actuadores, control y aplicaciones industriales.",
+    "impresion 3d": "Tutor de Impresión 3D → Modelado básico y procesos de fabricación aditiva.",
+    "automatizacion industrial": "Tutor de Automatización Industrial → PLC, sensores y sistemas de control.",
+    "tecnologia": "Instructor Técnico → Procedimientos paso a paso con software y hardware.",
+    "desarrollo de software": "Instructor de Desarrollo de Software → Lógica, programación, pruebas y buenas prácticas.",
+
+    # --- Redes, telecomunicaciones, telemática ---
+    "redes y telecomunicaciones": "Instructor de Redes y Telecomunicaciones → Topologías, protocolos y configuración básica.",
+    "redes": "Instructor de Redes → Modelos OSI/TCP-IP, direccionamiento y configuración inicial.",
+    "ciencias de la telematica y la comunicacion": "Tutor de Telemática y Comunicación → Integración de redes, servicios y transmisión de datos.",
+    "telematica": "Tutor de Telemática → Redes avanzadas y servicios sobre IP.",
+    "telecomunicaciones": "Tutor de Telecomunicaciones → Sistemas de transmisión y medios físicos.",
+
+    # --- Diseño, UX/UI, creativas ---
+    "diseno grafico": "Tutor de Diseño Gráfico → Principios visuales, tipografía y herramientas de diseño.",
+    "ux/ui": "Tutor de UX/UI → Enfoque en experiencia de usuario e interfaces amigables.",
+    "diseno ux/ui": "Tutor de UX/UI → Investigación, prototipado y pruebas de usabilidad.",
+    "diseno ux": "Tutor de UX → Investigación con usuarios y arquitectura de información.",
+    "diseno ui": "Tutor de UI → Composición visual, componentes e interacción.",
+
+    # --- Logística, producción, mantenimiento, construcción ---
+    "logistica": "Tutor de Logística → Gestión de inventarios, transporte y cadena de suministro.",
+    "mantenimiento industrial": "Tutor de Mantenimiento Industrial → Tipos de mantenimiento y planificación.",
+    "construccion": "Tutor de Construcción → Procesos constructivos, materiales y seguridad en obra.",
+    "mantenimiento": "Tutor de Mantenimiento → Conceptos básicos de mantenimiento preventivo y correctivo.",
+
+    # --- Seguridad, salud, ambiente, calidad ---
+    "salud ocupacional": "Tutor de Salud Ocupacional → Riesgos laborales, prevención y normativa básica.",
+    "seguridad industrial": "Tutor de Seguridad Industrial → Identificación de peligros y controles.",
+    "gestion ambiental": "Tutor de Gestión Ambiental → Impacto ambiental, mitigación y normatividad básica.",
+    "ciencias de la salud": "Tutor de Ciencias de la Salud → Conceptos generales de bienestar y cuidado.",
+    "gestion de la calidad": "Tutor en Gestión de la Calidad → Enfoque en mejora continua y normas de calidad.",
+
+    # --- Energía, electrónica, electricidad ---
+    "energia renovable": "Tutor de Energías Renovables → Fuentes limpias, ventajas y aplicaciones.",
+    "energias alternativas": "Tutor de Energías Alternativas → Opciones distintas a los combustibles fósiles.",
+    "electronica": "Tutor de Electrónica → Circuitos básicos, componentes y mediciones.",
+    "electricidad industrial": "Tutor de Electricidad Industrial → Instalaciones, motores y protección eléctrica.",
+
+    # --- Mecánica, soldadura, automotriz, industrial ---
+    "mecanica automotriz": "Tutor de Mecánica Automotriz → Sistemas del vehículo y diagnóstico básico.",
+    "soldadura": "Tutor de Soldadura → Procesos, técnicas y seguridad.",
+    "mecanica": "Tutor de Mecánica → Conceptos de fuerza, movimiento y sistemas mecánicos.",
+
+    # --- Gastronomía, agricultura, turismo ---
+    "gastronomia": "Tutor de Gastronomía → Técnicas culinarias, higiene y preparación de platos.",
+    "agricultura": "Tutor de Agricultura → Cultivos, suelos y buenas prácticas agrícolas.",
+    "turismo y hoteleria": "Tutor de Turismo y Hotelería → Servicio al cliente, operación hotelera y destinos.",
+    "turismo": "Tutor de Turismo → Gestión de servicios turísticos y atención al visitante.",
+    "hoteleria": "Tutor de Hotelería → Operación de alojamientos y atención al huésped.",
+
+    # --- Ciencia básica, matemáticas, inglés ---
+    "matematicas": "Tutor de Matemáticas → Razonamiento lógico, pasos claros y ejemplos numéricos.",
+    "ciencias": "Tutor de Ciencias → Explica procesos naturales y experimentos simples.",
+    "ingles": "Tutor de Inglés → Gramática básica, vocabulario y frases útiles.",
+
+    # --- General / catch-all académico ---
+    "tema academico": "Tutor Académico General → Explica conceptos teóricos con ejemplos sencillos.",
+    "tema del sena": "Tutor General del SENA → Relaciona el tema con programas de formación.",
+}
+
+
+# ==========================================================
+# 🔎 DETECCIÓN DE MATERIA (trie de palabras, coincidencia más larga)
+# ==========================================================
+_FIN = ""  # marca de frase completa dentro del trie
+_PALABRAS = re.compile(r"[a-z0-9/]+")
+
+
+def _armar_trie(frases) -> Dict[str, dict]:
+    raiz: Dict[str, dict] = {}
+    for frase in frases:
+        nodo = raiz
+        for palabra in frase.split():
+            nodo = nodo.setdefault(palabra, {})
+        nodo[_FIN] = frase
+    return raiz
+
+
+_TRIE_MATERIAS = _armar_trie(MATERIAS)
+MATERIA_POR_DEFECTO = "Tutor General del SENA"
+
+
+def buscar_materia(texto_normalizado: str) -> Optional[str]:
+    """
+    Llave de ``MATERIAS`` más larga presente como palabras completas en el
+    texto (a igual longitud, la que aparece primero), o None.
+    """
+    palabras = _PALABRAS.findall(texto_normalizado)
+    mejor: Optional[str] = None
+    for i in range(len(palabras)):
+        nodo = _TRIE_MATERIAS.get(palabras[i])
+        j = i + 1
+        while nodo is not None:
+            frase = nodo.get(_FIN)
+            if frase is not None and (mejor is None or len(frase) > len(mejor)):
+                mejor = frase
+            if j >= len(palabras):
+                break
+            nodo = nodo.get(palabras[j])
+            j += 1
+    return mejor
+
+
+def detectar_materia(text: str) -> str:
+    clave = buscar_materia(normalize_chat_text(text))
+    return MATERIAS[clave] if clave else MATERIA_POR_DEFECTO
+
+
+# ==========================================================
+# 🔒 ANONIMIZACIÓN ROBUSTA
+# ==========================================================
+# Mismo orden que siempre: los nombres se reemplazan antes que las direcciones.
+_RE_EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+_RE_NUM_LARGO = re.compile(r"\b\d{6,}\b")
+_RE_TARJETA = re.compile(r"\b(?:\d[ -]*?){13,19}\b")
+_RE_NOMBRE = re.compile(r"\b[A-ZÁÉÍÓÚ][a-záéíóú]+(?:\s[A-ZÁÉÍÓÚ][a-záéíóú]+){0,2}\b")
+_RE_DIRECCION = re.compile(r"\b(?:calle|cra|carrera|av|avenida|cll)\b[^\n,]{0,40}", re.IGNORECASE)
+_RE_DIGITO = re.compile(r"\d")
+
+
+def anonymize_text(text: str) -> str:
+    if not text:
+        return text
+    if "@" in text:
+        text = _RE_EMAIL.sub("[EMAIL]", text)
+    if _RE_DIGITO.search(text):
+        text = _RE_NUM_LARGO.sub("[NUM]", text)
+        text = _RE_TARJETA.sub("[NUM]", text)
+    text = _RE_NOMBRE.sub("[NAME]", text)
+    text = _RE_DIRECCION.sub("[ADDRESS]", text)
+    return text
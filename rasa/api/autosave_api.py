@@ -2,24 +2,24 @@
 from __future__ import annotations
 import os, datetime
 from typing import Any, Dict
-from pymongo import MongoClient
+
+from utils.mongo_pool import get_collection, get_event_sink
 
 MONGO_URI  = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 MONGO_DB   = os.getenv("MONGO_DB", "chatbot_tutor_virtual")
 COLL_NAME  = os.getenv("MONGO_AUTOSAVE_COLLECTION", "autosaves")
 LOGS_NAME  = os.getenv("MONGO_SECURITY_LOGS_COLLECTION", "seguridad_logs")
 
-_client = MongoClient(MONGO_URI)
-_db     = _client[MONGO_DB]
-_autos  = _db[COLL_NAME]
-_logs   = _db[LOGS_NAME]
+# Cliente compartido del proceso; los logs van al sink por lotes (sin 2º round trip)
+_autos  = get_collection(COLL_NAME, db=MONGO_DB, uri=MONGO_URI)
+_logs   = get_event_sink(LOGS_NAME, db=MONGO_DB, uri=MONGO_URI)
 
 def log_event(usuario: str, evento: str, estado: str, detalle: Dict[str, Any] | None = None) -> None:
-    _logs.insert_one({
+    _logs.emit({
         "usuario": usuario,
         "evento": evento,
         "estado": estado,
-        "fecha_hora": datetime.datetime.utcnow(),
+        "ts": datetime.datetime.utcnow(),  # campo del índice TTL (backend/db/indexes.py)
         "detalle": detalle or {}
     })
 
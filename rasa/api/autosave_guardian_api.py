@@ -37,7 +37,7 @@ def log_event(usuario: str, evento: str, estado: str, detail: Dict[str, Any] | N
         "usuario": usuario,
         "evento": evento,
         "ip": _client_ip(),
-        "fecha_hora": datetime.datetime.utcnow(),
+        "ts": datetime.datetime.utcnow(),  # campo del índice TTL (backend/db/indexes.py)
         "estado": estado,
         "detalle": detail or {}
     })
@@ -0,0 +1,296 @@
+# rasa/utils/autosave_engine.py
+"""
+Motor de autosave por remitente: agrupa, difiere y escribe solo lo que cambió.
+
+- ``save(sender_id, data)`` solo deja el snapshot pendiente; un hilo en segundo
+  plano lo escribe cuando pasan ``window`` segundos sin un guardado nuevo del
+  mismo remitente (debounce), y como máximo ``max_wait`` segundos después del
+  primer guardado pendiente. Varios guardados seguidos terminan en una escritura.
+- Se recuerda el último snapshot escrito de cada remitente; la escritura manda
+  solo las rutas que cambiaron (``$set`` / ``$unset`` sobre ``data.a.b``).
+- Cada documento lleva ``version``: una actualización solo aplica si la versión
+  no cambió (concurrencia optimista). Si otro proceso escribió antes, se relee
+  el documento y se recalcula el diff.
+
+El almacenamiento lo pone un *writer* (``MongoAutosaveWriter`` o el de la API
+autosave-guardian) con ``load``/``create``/``update``.
+"""
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from pymongo.errors import DuplicateKeyError
+except Exception:  # pragma: no cover - pymongo no instalado (solo writer de la API)
+    class DuplicateKeyError(Exception):  # type: ignore[no-redef]
+        pass
+
+logger = logging.getLogger(__name__)
+
+AUTOSAVE_DEBOUNCE_SECONDS = float(os.getenv("AUTOSAVE_DEBOUNCE_SECONDS", "2"))
+AUTOSAVE_MAX_WAIT_SECONDS = float(os.getenv("AUTOSAVE_MAX_WAIT_SECONDS", "10"))
+
+ROOT = "data"
+
+
+class VersionConflict(Exception):
+    """El documento cambió (o ya existía) desde la versión que se tenía."""
+
+
+# ==========================================================
+# Diff por rutas
+# ==========================================================
+def _expandable(value: Any) -> bool:
+    return (
+        isinstance(value, dict)
+        and bool(value)
+        and all(isinstance(k, str) and k and "." not in k and not k.startswith("$") for k in value)
+    )
+
+
+def flatten(value: Any, prefix: str = ROOT) -> Dict[str, Any]:
+    """{'a': {'b': 1}} -> {'data.a.b': 1}. Listas, dicts vacíos y claves no aptas para rutas quedan como hoja."""
+    if not _expandable(value):
+        return {prefix: value}
+    out: Dict[str, Any] = {}
+    for k, v in value.items():
+        out.update(flatten(v, f"{prefix}.{k}"))
+    return out
+
+
+def _subtree(flat: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """Reconstruye el dict que cuelga de ``path`` a partir de las hojas."""
+    out: Dict[str, Any] = {}
+    start = len(path) + 1
+    for key, v in flat.items():
+        if not key.startswith(path + "."):
+            continue
+        node = out
+        parts = key[start:].split(".")
+        for p in parts[:-1]:
+            node = node.setdefault(p, {})
+        node[parts[-1]] = v
+    return out
+
+
+def diff(prev: Dict[str, Any], new: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """Rutas a fijar y rutas a quitar para pasar de ``prev`` a ``new`` (ambos aplanados)."""
+    sets = {k: v for k, v in new.items() if k not in prev or prev[k] != v}
+    unsets = [k for k in prev if k not in new]
+
+    # Una hoja que ahora es un dict (p. ej. None -> {...}): se fija el dict completo
+    for u in list(unsets):
+        if any(k.startswith(u + ".") for k in sets):
+            sets = {k: v for k, v in sets.items() if not k.startswith(u + ".")}
+            sets[u] = _subtree(new, u)
+            unsets.remove(u)
+    # Un dict que ahora es hoja: fijar la hoja ya reemplaza lo de abajo
+    unsets = [u for u in unsets if not any(u.startswith(k + ".") for k in sets)]
+    return sets, unsets
+
+
+# ==========================================================
+# Motor
+# ==========================================================
+class _Pending:
+    __slots__ = ("data", "deadline", "first", "attempts")
+
+    def __init__(self, data: Dict[str, Any], deadline: float, first: float, attempts: int = 0) -> None:
+        self.data = data
+        self.deadline = deadline
+        self.first = first
+        self.attempts = attempts
+
+
+class AutosaveEngine:
+    def __init__(
+        self,
+        writer: Any,
+        window: float = AUTOSAVE_DEBOUNCE_SECONDS,
+        max_wait: float = AUTOSAVE_MAX_WAIT_SECONDS,
+        max_attempts: int = 3,
+        max_known: int = 10000,
+    ) -> None:
+        self.writer = writer
+        self.window = max(0.0, window)
+        self.max_wait = max(self.window, max_wait)
+        self.max_attempts = max(1, max_attempts)
+        self.max_known = max(1, max_known)
+        self._pending: Dict[str, _Pending] = {}
+        # sender -> (versión, hojas, data) del último snapshot escrito
+        self._known: "OrderedDict[str, Tuple[int, Dict[str, Any], Dict[str, Any]]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"saves": 0, "coalesced": 0, "writes": 0, "unchanged": 0, "conflicts": 0, "errors": 0, "dropped": 0}
+
+    # ---------- API ----------
+    def save(self, sender_id: str, data: Dict[str, Any], immediate: bool = False) -> None:
+        snapshot = copy.deepcopy(data or {})
+        now = time.monotonic()
+        with self._cond:
+            prev = self._pending.get(sender_id)
+            first = prev.first if prev else now
+            deadline = now if immediate else min(now + self.window, first + self.max_wait)
+            self._pending[sender_id] = _Pending(snapshot, deadline, first)
+            self._stats["saves"] += 1
+            if prev is not None:
+                self._stats["coalesced"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="autosave-engine", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def latest(self, sender_id: str) -> Optional[Dict[str, Any]]:
+        """Último snapshot conocido en este proceso (pendiente o ya escrito)."""
+        with self._cond:
+            p = self._pending.get(sender_id)
+            if p is not None:
+                return copy.deepcopy(p.data)
+            known = self._known.get(sender_id)
+        return copy.deepcopy(known[2]) if known else None
+
+    def flush(self, sender_id: Optional[str] = None) -> None:
+        """Escribe ya lo pendiente (de un remitente o de todos)."""
+        with self._cond:
+            keys = [sender_id] if sender_id is not None else list(self._pending)
+            due = [(k, self._pending.pop(k)) for k in keys if k in self._pending]
+        for key, p in due:
+            self._write_pending(key, p)
+
+    def forget(self, sender_id: str) -> None:
+        with self._cond:
+            self._pending.pop(sender_id, None)
+            self._known.pop(sender_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "pending": len(self._pending), "known": len(self._known)}
+
+    # ---------- Internos ----------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                now = time.monotonic()
+                next_deadline = min(p.deadline for p in self._pending.values())
+                if next_deadline > now:
+                    self._cond.wait(timeout=next_deadline - now)
+                    continue
+                due = [(k, p) for k, p in self._pending.items() if p.deadline <= now]
+                for k, _ in due:
+                    del self._pending[k]
+            for key, p in due:
+                self._write_pending(key, p)
+
+    def _write_pending(self, sender_id: str, p: _Pending) -> None:
+        try:
+            with self._write_lock:
+                self._write(sender_id, p.data)
+        except Exception as e:
+            self._stats["errors"] += 1
+            with self._cond:
+                if sender_id in self._pending:
+                    return  # llegó un snapshot más nuevo: ese reemplaza al que falló
+                if p.attempts + 1 >= self.max_attempts:
+                    self._stats["dropped"] += 1
+                    logger.warning(f"[AUTOSAVE] Se descarta el autosave de {sender_id}: {e}")
+                    return
+                p.attempts += 1
+                p.deadline = time.monotonic() + max(self.window, 1.0) * (2 ** p.attempts)
+                self._pending[sender_id] = p
+                self._cond.notify()
+            logger.warning(f"[AUTOSAVE] Falló el autosave de {sender_id} (reintento {p.attempts}): {e}")
+
+    def _remember(self, sender_id: str, version: int, flat: Dict[str, Any], data: Dict[str, Any]) -> None:
+        with self._cond:
+            self._known[sender_id] = (version, flat, data)
+            self._known.move_to_end(sender_id)
+            while len(self._known) > self.max_known:
+                self._known.popitem(last=False)
+
+    def _write(self, sender_id: str, data: Dict[str, Any]) -> None:
+        flat = flatten(data)
+        for _ in range(2):
+            known = self._known.get(sender_id)
+            if known is None:
+                loaded = self.writer.load(sender_id)
+                if loaded is not None:
+                    known = (loaded[0], flatten(loaded[1]), loaded[1])
+            try:
+                if known is None:
+                    version = self.writer.create(sender_id, data)
+                else:
+                    sets, unsets = diff(known[1], flat)
+                    if not sets and not unsets:
+                        self._stats["unchanged"] += 1
+                        self._remember(sender_id, known[0], flat, data)
+                        return
+                    version = self.writer.update(sender_id, known[0], sets, unsets)
+            except VersionConflict:
+                self._stats["conflicts"] += 1
+                with self._cond:
+                    self._known.pop(sender_id, None)
+                continue
+            self._stats["writes"] += 1
+            self._remember(sender_id, version, flat, data)
+            return
+        raise VersionConflict(f"{sender_id}: conflicto de versión persistente")
+
+
+# ==========================================================
+# Writer Mongo (pymongo)
+# ==========================================================
+class MongoAutosaveWriter:
+    """
+    Un documento por remitente: ``{sender_id, data, version, timestamp}``.
+    Los autosaves antiguos sin ``version`` (uno por llamada) se ignoran.
+
+    La unicidad la garantiza el índice único parcial ``sender_id_version``
+    (``backend/db/indexes.py``): si dos procesos crean a la vez el documento
+    de un remitente, el upsert perdedor choca con el índice y se trata como
+    conflicto de versión (se relee y se recalcula el diff).
+    """
+
+    def __init__(self, collection: Any) -> None:
+        self.collection = collection
+
+    def load(self, sender_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        doc = self.collection.find_one(
+            {"sender_id": sender_id, "version": {"$gte": 1}}, {"_id": 0, "version": 1, "data": 1}
+        )
+        if not doc:
+            return None
+        return int(doc["version"]), doc.get("data") or {}
+
+    def create(self, sender_id: str, data: Dict[str, Any]) -> int:
+        try:
+            res = self.collection.update_one(
+                {"sender_id": sender_id, "version": {"$gte": 1}},
+                {"$setOnInsert": {"sender_id": sender_id, "data": data, "version": 1, "timestamp": datetime.utcnow()}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            raise VersionConflict(sender_id) from None
+        if res.upserted_id is None:
+            raise VersionConflict(sender_id)
+        return 1
+
+    def update(self, sender_id: str, version: int, sets: Dict[str, Any], unsets: List[str]) -> int:
+        update: Dict[str, Any] = {
+            "$set": {**sets, "timestamp": datetime.utcnow()},
+            "$inc": {"version": 1},
+        }
+        if unsets:
+            update["$unset"] = {u: "" for u in unsets}
+        res = self.collection.update_one({"sender_id": sender_id, "version": version}, update)
+        if res.matched_count == 0:
+            raise VersionConflict(sender_id)
+        return version + 1
@@ -0,0 +1,203 @@
+# rasa/utils/backend_http.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUS = {502, 503, 504}
+
+
+class CircuitOpen(Exception):
+    """El endpoint falló demasiadas veces seguidas; se omite la llamada."""
+
+
+class CircuitBreaker:
+    """
+    Breaker por endpoint:
+      - closed: deja pasar; ``failure_threshold`` fallos seguidos lo abren
+      - open: rechaza sin llamar durante ``reset_timeout`` segundos
+      - half-open: deja pasar una sola prueba; si sale bien se cierra
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """Libera la prueba de half-open si terminó sin resultado (cancelada o error no HTTP)."""
+        self._probing = False
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class BackendHttp:
+    """
+    Cliente HTTP asíncrono compartido por las acciones que llaman al backend
+    de Zajuna o al helpdesk:
+      - Un httpx.AsyncClient por event loop (pool de conexiones keep-alive)
+      - Timeout por llamada (cada endpoint pasa el suyo)
+      - Reintentos con backoff exponencial + jitter ante errores de red y 502/503/504
+      - Un CircuitBreaker por nombre de endpoint
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.25,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_connections: int = 20,
+    ) -> None:
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        b = self._breakers.get(endpoint)
+        if b is None:
+            b = self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return b
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    # ---------- API ----------
+    async def request(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Llama a ``url`` y devuelve la respuesta (cualquier código HTTP).
+        Lanza ``CircuitOpen`` si el breaker de ``endpoint`` está abierto y
+        errores httpx si se agotan los reintentos.
+        """
+        breaker = self.breaker(endpoint)
+        probe = breaker.state == "half-open"
+        if not breaker.allow():
+            raise CircuitOpen(f"{endpoint}: circuito abierto")
+
+        try:
+            client = self._get_client()
+            intentos = self.retries if retries is None else max(0, retries)
+            for attempt in range(intentos + 1):
+                try:
+                    resp = await client.request(
+                        method, url, headers=headers, timeout=timeout or self.timeout, **kwargs
+                    )
+                except httpx.TransportError as e:
+                    if attempt >= intentos:
+                        breaker.failure()
+                        raise
+                    logger.warning(f"[HTTP] {endpoint} intento {attempt + 1} falló: {e!r}")
+                else:
+                    if resp.status_code not in _RETRY_STATUS:
+                        breaker.success()
+                        return resp
+                    if attempt >= intentos:
+                        breaker.failure()
+                        return resp
+                    logger.warning(f"[HTTP] {endpoint} intento {attempt + 1}: HTTP {resp.status_code}")
+                await asyncio.sleep(self._delay(attempt))
+            raise AssertionError("unreachable")  # pragma: no cover
+        finally:
+            # Cancelación (timeout de la acción) o error no httpx: sin esto el
+            # breaker quedaría en half-open rechazando todo hasta reiniciar
+            if probe:
+                breaker.release()
+
+    async def get_json(
+        self,
+        url: str,
+        endpoint: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[Any]:
+        """GET que devuelve el JSON de una respuesta 2xx, o None ante cualquier fallo."""
+        try:
+            resp = await self.request("GET", url, endpoint, headers=headers, timeout=timeout)
+        except CircuitOpen as e:
+            logger.info(f"[HTTP] {e}; se usa el valor de respaldo")
+            return None
+        except httpx.HTTPError as e:
+            logger.warning(f"[HTTP] {endpoint} no disponible: {e!r}")
+            return None
+        if not resp.is_success:
+            return None
+        try:
+            return resp.json()
+        except ValueError:
+            logger.warning(f"[HTTP] {endpoint}: respuesta no es JSON")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: {"state": b.state, "failures": b.failures} for name, b in self._breakers.items()}
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
@@ -0,0 +1,95 @@
+# rasa/utils/chat_stream.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:  # opcional: sin redis no hay streaming (el backend responde con la lista completa)
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover
+    aioredis = None
+
+
+class ChatStreamPublisher:
+    """
+    Publica texto parcial del LLM en Redis pub/sub para que el backend lo
+    reenvíe al widget por SSE (``POST /api/chat/stream``).
+
+    Canal: ``<prefix><sender_id>`` (mismo prefijo que CHAT_STREAM_CHANNEL_PREFIX
+    del backend). Mensajes JSON: ``{"type": "delta", "text": ...}`` y
+    ``{"type": "end"}``. Los errores de Redis se registran y no afectan la acción.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, prefix: str = "chat:stream:") -> None:
+        self.redis_url = redis_url or None
+        self.prefix = prefix
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.redis_url and aioredis is not None)
+
+    def _get_client(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._client = aioredis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._client
+
+    async def publish(self, sender_id: str, event: Dict[str, Any]) -> None:
+        if not self.enabled or not sender_id:
+            return
+        try:
+            await self._get_client().publish(self.prefix + sender_id, json.dumps(event, ensure_ascii=False))
+        except Exception as e:
+            logger.warning(f"[STREAM] No se pudo publicar en Redis: {e}")
+
+    async def delta(self, sender_id: str, text: str) -> None:
+        if text:
+            await self.publish(sender_id, {"type": "delta", "text": text})
+
+    async def end(self, sender_id: str) -> None:
+        await self.publish(sender_id, {"type": "end"})
+
+
+class LLMReplyStreamFilter:
+    """
+    Decide qué parte de la salida del LLM se puede mostrar mientras se genera.
+
+    El prompt pide ``INTENT:<nombre>`` o ``RESPUESTA:<texto>``: un INTENT nunca
+    se muestra; de una RESPUESTA se muestra lo que sigue a la etiqueta. Si tras
+    ``decide_after`` caracteres no aparece ninguna etiqueta, se muestra todo.
+    """
+
+    _INTENT = re.compile(r"INTENT\s*:", re.I)
+    _RESP = re.compile(r"RESPUESTA\s*:\s*", re.I)
+
+    def __init__(self, decide_after: int = 40) -> None:
+        self.decide_after = decide_after
+        self.mode: Optional[str] = None  # None | "intent" | "text"
+        self._buf = ""
+
+    def feed(self, piece: str) -> str:
+        """Devuelve el texto nuevo que se puede mostrar ('' si aún no)."""
+        if self.mode == "text":
+            return piece
+        if self.mode == "intent":
+            return ""
+        self._buf += piece
+        if self._INTENT.search(self._buf):
+            self.mode = "intent"
+            return ""
+        m = self._RESP.search(self._buf)
+        if m and m.end() < len(self._buf):
+            self.mode = "text"
+            return self._buf[m.end():]
+        if not m and len(self._buf.strip()) >= self.decide_after:
+            self.mode = "text"
+            return self._buf.lstrip()
+        return ""
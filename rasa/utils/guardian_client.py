@@ -1,25 +1,84 @@
 # rasa/utils/guardian_client.py
 from __future__ import annotations
 
+import asyncio
+import atexit
+import os
+import random
+import threading
 import time
-from typing import Any, Dict, Optional
+import weakref
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+import httpx
 import requests
 
+from utils.autosave_engine import ROOT, VersionConflict
+
+GUARDIAN_BASE_URL = os.getenv("GUARDIAN_BASE_URL", "http://autosave-guardian:8080")
+GUARDIAN_USER = os.getenv("GUARDIAN_ADMIN_USER", "admin")
+GUARDIAN_PASS = os.getenv("GUARDIAN_ADMIN_PASS", "admin123")
+# Fracción del TTL del token tras la cual se renueva por adelantado
+GUARDIAN_TOKEN_REFRESH_AT = float(os.getenv("GUARDIAN_TOKEN_REFRESH_AT", "0.8"))
+GUARDIAN_EVENT_BATCH_SIZE = int(os.getenv("GUARDIAN_EVENT_BATCH_SIZE", "50"))
+GUARDIAN_EVENT_FLUSH_INTERVAL = float(os.getenv("GUARDIAN_EVENT_FLUSH_INTERVAL", "2.0"))
+
+
+# ==========================================================
+# Cache de tokens del proceso
+#  - Una entrada por (base_url, usuario), compartida por todos los clientes
+#    (síncronos y asíncronos): crear un cliente nuevo no vuelve a hacer login.
+# ==========================================================
+class _Token:
+    __slots__ = ("value", "expires_at", "refresh_at")
+
+    def __init__(self, value: str, ttl_seconds: float) -> None:
+        now = time.time()
+        self.value = value
+        # margen de seguridad de 30s para evitar token justo-expirado
+        self.expires_at = now + max(0.0, ttl_seconds - 30)
+        self.refresh_at = now + ttl_seconds * GUARDIAN_TOKEN_REFRESH_AT
+
+    def valid(self) -> bool:
+        return time.time() < self.expires_at
+
+    def fresh(self) -> bool:
+        return time.time() < min(self.refresh_at, self.expires_at)
+
+
+_TOKENS: Dict[Tuple[str, str], _Token] = {}
+_TOKENS_LOCK = threading.Lock()
+
+
+def _parse_login(data: Dict[str, Any]) -> _Token:
+    token = data.get("access_token")
+    if not token:
+        raise RuntimeError("No se recibió access_token en /auth/login")
+    return _Token(token, float(data.get("expires_in_minutes", 60)) * 60)
+
+
+def _forget_token(key: Tuple[str, str], value: Optional[str]) -> None:
+    with _TOKENS_LOCK:
+        current = _TOKENS.get(key)
+        if current is not None and current.value == value:
+            del _TOKENS[key]
+
 
 class GuardianClient:
     """
     Cliente para la API autosave-guardian:
-      - Login JWT con cache y renovación automática
+      - Login JWT con cache compartida del proceso y renovación anticipada
+      - ``requests.Session``: conexiones keep-alive reutilizadas
       - Reintentos simples con backoff
-      - Métodos: ping, autosave_create, autosave_latest, log_event
+      - Métodos: ping, autosave_create, autosave_get, autosave_patch,
+        autosave_bulk, autosave_latest, log_event, log_events
     """
 
     def __init__(
         self,
-        base_url: str = "http://autosave-guardian:8080",
-        username: str = "admin",
-        password: str = "admin123",
+        base_url: str = GUARDIAN_BASE_URL,
+        username: str = GUARDIAN_USER,
+        password: str = GUARDIAN_PASS,
         timeout: float = 5.0,
         max_retries: int = 2,
     ) -> None:
@@ -28,36 +87,39 @@ class GuardianClient:
         self.password = password
         self.timeout = timeout
         self.max_retries = max_retries
-
-        self._token: Optional[str] = None
-        self._token_exp: float = 0.0  # epoch seconds
+        self._key = (self.base_url, self.username)
+        self._session = requests.Session()
+        self._login_lock = threading.Lock()
 
     # ---------- internos ----------
-    def _login(self) -> None:
-        """Hace login y cachea token + expiración (si el API devuelve expires_in_minutes)."""
-        url = f"{self.base_url}/auth/login"
-        r = requests.post(
-            url,
+    def _login(self) -> _Token:
+        """Hace login y guarda el token en la cache del proceso."""
+        r = self._session.post(
+            f"{self.base_url}/auth/login",
             json={"username": self.username, "password": self.password},
             timeout=self.timeout,
             headers={"Content-Type": "application/json"},
         )
         r.raise_for_status()
-        data = r.json()
-        self._token = data.get("access_token")
-        if not self._token:
-            raise RuntimeError("No se recibió access_token en /auth/login")
-
-        ttl_min = data.get("expires_in_minutes", 60)
-        # margen de seguridad de 30s para evitar token justo-expirado
-        self._token_exp = time.time() + (ttl_min * 60) - 30
+        token = _parse_login(r.json())
+        with _TOKENS_LOCK:
+            _TOKENS[self._key] = token
+        return token
 
     def _auth_header(self) -> Dict[str, str]:
-        """Asegura token válido, renueva si expirado."""
-        now = time.time()
-        if not self._token or now >= self._token_exp:
-            self._login()
-        return {"Authorization": f"Bearer {self._token}"}
+        """Asegura token válido; lo renueva antes de que venza."""
+        token = _TOKENS.get(self._key)
+        if token is None or not token.fresh():
+            with self._login_lock:
+                token = _TOKENS.get(self._key)
+                if token is None or not token.fresh():
+                    try:
+                        token = self._login()
+                    except Exception:
+                        # Renovación anticipada fallida: se sigue con el token vigente
+                        if token is None or not token.valid():
+                            raise
+        return {"Authorization": f"Bearer {token.value}"}
 
     def _request(
         self,
@@ -77,7 +139,7 @@ class GuardianClient:
                 if auth:
                     headers.update(self._auth_header())
 
-                resp = requests.request(
+                resp = self._session.request(
                     method=method.upper(),
                     url=url,
                     headers=headers,
@@ -86,9 +148,9 @@ class GuardianClient:
                     timeout=self.timeout,
                 )
 
-                # Si 401 y tenemos intentos, forzamos relogin y reintentamos una vez
+                # Si 401 y tenemos intentos, descartamos el token y reintentamos
                 if resp.status_code == 401 and auth and attempt < self.max_retries:
-                    self._login()
+                    _forget_token(self._key, headers["Authorization"][7:])
                     continue
 
                 return resp
@@ -120,6 +182,45 @@ class GuardianClient:
         )
         return r.ok and r.json().get("ok") is True
 
+    def autosave_get(self, sender_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """(versión, data) del autosave de ``sender_id``; None si no existe."""
+        r = self._request("GET", f"/autosaves/by-sender/{sender_id}", auth=True)
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        body = r.json()
+        return int(body["version"]), body.get("data") or {}
+
+    def autosave_patch(
+        self,
+        sender_id: str,
+        expected_version: int,
+        data: Dict[str, Any] | None = None,
+        changes: Dict[str, Any] | None = None,
+        removed: List[str] | None = None,
+    ) -> int:
+        """
+        Escritura versionada (``expected_version`` 0 = crear). Devuelve la nueva
+        versión; lanza ``VersionConflict`` si el documento cambió (HTTP 409).
+        """
+        r = self._request(
+            "POST",
+            "/autosaves",
+            json=_patch_body(sender_id, expected_version, data, changes, removed),
+            auth=True,
+        )
+        if r.status_code == 409:
+            raise VersionConflict(sender_id)
+        r.raise_for_status()
+        return int(r.json()["version"])
+
+    def autosave_bulk(self, items: List[Dict[str, Any]]) -> bool:
+        """Varios snapshots completos (``{"sender_id", "data"}``) en una sola petición."""
+        if not items:
+            return True
+        r = self._request("POST", "/autosaves", json=items, auth=True)
+        return r.ok and r.json().get("ok") is True
+
     def autosave_latest(self, limit: int = 5) -> Dict[str, Any]:
         r = self._request(
             "GET", "/autosaves/latest", params={"limit": limit}, auth=True
@@ -134,3 +235,284 @@ class GuardianClient:
             auth=True,
         )
         return r.ok and r.json().get("ok") is True
+
+    def log_events(self, events: List[Dict[str, Any]]) -> bool:
+        """Varios eventos (``{"event_type", "payload"}``) en una sola petición."""
+        if not events:
+            return True
+        r = self._request("POST", "/events/log", json=events, auth=True)
+        return r.ok and r.json().get("ok") is True
+
+    def close(self) -> None:
+        self._session.close()
+
+
+def _patch_body(
+    sender_id: str,
+    expected_version: int,
+    data: Dict[str, Any] | None,
+    changes: Dict[str, Any] | None,
+    removed: List[str] | None,
+) -> Dict[str, Any]:
+    return {
+        "sender_id": sender_id,
+        "data": data or {},
+        "changes": changes or {},
+        "removed": removed or [],
+        "expected_version": expected_version,
+    }
+
+
+# ==========================================================
+# Cliente asíncrono (para acciones async)
+# ==========================================================
+class AsyncGuardianClient:
+    """
+    Variante asíncrona de ``GuardianClient`` para acciones ``async def run``:
+      - Un httpx.AsyncClient por event loop (pool keep-alive)
+      - Backoff con ``asyncio.sleep`` (no bloquea el loop)
+      - Misma cache de tokens del proceso; si el token está por vencer se
+        renueva en segundo plano y mientras tanto se sigue usando el vigente
+      - ``enqueue_event``: acumula eventos y los envía por lotes a
+        ``POST /events/log`` (``GUARDIAN_EVENT_BATCH_SIZE`` o cada
+        ``GUARDIAN_EVENT_FLUSH_INTERVAL`` segundos); lo que quede en cola al
+        salir del proceso se envía con ``flush_events_sync`` (atexit)
+    """
+
+    def __init__(
+        self,
+        base_url: str = GUARDIAN_BASE_URL,
+        username: str = GUARDIAN_USER,
+        password: str = GUARDIAN_PASS,
+        timeout: float = 5.0,
+        max_retries: int = 2,
+        backoff: float = 0.4,
+        batch_size: int = GUARDIAN_EVENT_BATCH_SIZE,
+        flush_interval: float = GUARDIAN_EVENT_FLUSH_INTERVAL,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._key = (self.base_url, self.username)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._login_task: Optional[asyncio.Task] = None
+        self._events: List[Dict[str, Any]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Future] = set()  # flushes en vuelo (referencia fuerte)
+        _ASYNC_CLIENTS.add(self)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._login_task = None
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        return self._client
+
+    # ---------- token ----------
+    async def _do_login(self) -> _Token:
+        r = await self._get_client().post(
+            "/auth/login", json={"username": self.username, "password": self.password}
+        )
+        r.raise_for_status()
+        token = _parse_login(r.json())
+        with _TOKENS_LOCK:
+            _TOKENS[self._key] = token
+        return token
+
+    def _start_login(self) -> asyncio.Task:
+        # Logins simultáneos del mismo loop se unen en una sola llamada
+        if self._login_task is None or self._login_task.done():
+            self._login_task = asyncio.ensure_future(self._do_login())
+            self._login_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self._login_task
+
+    async def _auth_header(self) -> Dict[str, str]:
+        token = _TOKENS.get(self._key)
+        if token is None or not token.valid():
+            token = await asyncio.shield(self._start_login())
+        elif not token.fresh():
+            self._start_login()  # renovación anticipada sin esperar
+        return {"Authorization": f"Bearer {token.value}"}
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        auth: bool = True,
+        json: Any = None,
+        params: Dict[str, Any] | None = None,
+    ) -> httpx.Response:
+        client = self._get_client()
+        for attempt in range(self.max_retries + 1):
+            try:
+                headers = await self._auth_header() if auth else {}
+                resp = await client.request(method.upper(), path, headers=headers, json=json, params=params)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if resp.status_code == 401 and auth and attempt < self.max_retries:
+                    _forget_token(self._key, headers["Authorization"][7:])
+                    continue
+                return resp
+            await asyncio.sleep(self._delay(attempt))
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    # ---------- endpoints públicos ----------
+    async def ping(self) -> bool:
+        try:
+            r = await self._request("GET", "/ping", auth=False)
+            return r.is_success and r.json().get("ok", False) is not False
+        except Exception:
+            return False
+
+    async def autosave_create(self, sender_id: str, data: Dict[str, Any]) -> bool:
+        r = await self._request("POST", "/autosaves", json={"sender_id": sender_id, "data": data})
+        return r.is_success and r.json().get("ok") is True
+
+    async def autosave_get(self, sender_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        r = await self._request("GET", f"/autosaves/by-sender/{sender_id}")
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        body = r.json()
+        return int(body["version"]), body.get("data") or {}
+
+    async def autosave_patch(
+        self,
+        sender_id: str,
+        expected_version: int,
+        data: Dict[str, Any] | None = None,
+        changes: Dict[str, Any] | None = None,
+        removed: List[str] | None = None,
+    ) -> int:
+        r = await self._request(
+            "POST", "/autosaves", json=_patch_body(sender_id, expected_version, data, changes, removed)
+        )
+        if r.status_code == 409:
+            raise VersionConflict(sender_id)
+        r.raise_for_status()
+        return int(r.json()["version"])
+
+    async def autosave_bulk(self, items: List[Dict[str, Any]]) -> bool:
+        if not items:
+            return True
+        r = await self._request("POST", "/autosaves", json=items)
+        return r.is_success and r.json().get("ok") is True
+
+    async def autosave_latest(self, limit: int = 5) -> Dict[str, Any]:
+        r = await self._request("GET", "/autosaves/latest", params={"limit": limit})
+        return r.json() if r.is_success else {"ok": False, "items": []}
+
+    async def log_event(self, event_type: str, payload: Dict[str, Any] | None = None) -> bool:
+        r = await self._request("POST", "/events/log", json={"event_type": event_type, "payload": payload or {}})
+        return r.is_success and r.json().get("ok") is True
+
+    async def log_events(self, events: List[Dict[str, Any]]) -> bool:
+        if not events:
+            return True
+        r = await self._request("POST", "/events/log", json=events)
+        return r.is_success and r.json().get("ok") is True
+
+    # ---------- eventos por lotes ----------
+    def enqueue_event(self, event_type: str, payload: Dict[str, Any] | None = None) -> None:
+        """Encola un evento sin esperar la red (debe llamarse dentro del loop)."""
+        self._events.append({"event_type": event_type, "payload": payload or {}})
+        if len(self._events) >= self.batch_size:
+            self._spawn_flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.flush_interval, self._spawn_flush)
+
+    def _spawn_flush(self) -> None:
+        # el loop solo guarda referencias débiles a las tareas: sin este set
+        # un flush en vuelo puede ser recolectado antes de terminar
+        task = asyncio.ensure_future(self.flush_events())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush_events(self) -> bool:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._events = self._events, []
+        if not batch:
+            return True
+        try:
+            return await self.log_events(batch)
+        except Exception:
+            return False
+
+    def flush_events_sync(self) -> bool:
+        """Envía los eventos pendientes sin event loop (al apagar el proceso)."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._events = self._events, []
+        if not batch:
+            return True
+        client = GuardianClient(
+            self.base_url, self.username, self.password, timeout=self.timeout, max_retries=0
+        )
+        try:
+            return client.log_events(batch)
+        except Exception:
+            return False
+        finally:
+            client.close()
+
+    async def aclose(self) -> None:
+        await self.flush_events()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+_ASYNC_CLIENTS: "weakref.WeakSet[AsyncGuardianClient]" = weakref.WeakSet()
+
+
+def _flush_async_clients() -> None:
+    # rasa_sdk no expone hook de apagado: al salir, el loop de Sanic ya está
+    # detenido, así que la cola de cada cliente se envía por la vía síncrona
+    for client in list(_ASYNC_CLIENTS):
+        client.flush_events_sync()
+
+
+atexit.register(_flush_async_clients)
+
+
+class GuardianAutosaveWriter:
+    """Writer de ``AutosaveEngine`` sobre la API autosave-guardian."""
+
+    def __init__(self, client: GuardianClient) -> None:
+        self.client = client
+
+    def load(self, sender_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        return self.client.autosave_get(sender_id)
+
+    def create(self, sender_id: str, data: Dict[str, Any]) -> int:
+        return self.client.autosave_patch(sender_id, 0, data=data)
+
+    def update(self, sender_id: str, version: int, sets: Dict[str, Any], unsets: List[str]) -> int:
+        if ROOT in sets:
+            # ``data`` dejó de tener campos: se reemplaza completo
+            return self.client.autosave_patch(sender_id, version, data=sets[ROOT])
+        strip = len(ROOT) + 1
+        return self.client.autosave_patch(
+            sender_id,
+            version,
+            changes={k[strip:]: v for k, v in sets.items()},
+            removed=[k[strip:] for k in unsets],
+        )
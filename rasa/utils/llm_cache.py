@@ -0,0 +1,164 @@
+# rasa/utils/llm_cache.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:  # opcional: solo si se configura el nivel Redis
+    import redis as _redis
+except ImportError:  # pragma: no cover
+    _redis = None
+
+
+def make_key(model: str, *parts: str) -> str:
+    """Clave por contenido: mismo modelo + mismas partes (prompt completo, opciones...)."""
+    raw = "\x1f".join((model, *parts)).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Cache de respuestas del LLM para reescrituras de plantillas fijas:
+      - Nivel 1 en memoria: LRU acotado por ``max_entries`` + TTL
+      - Nivel 2 opcional compartido entre réplicas: Redis (``redis_url``)
+        o disco (``disk_dir``, un archivo JSON por clave)
+
+    El nivel 2 usa clientes síncronos en ``asyncio.to_thread``, así sirve
+    desde cualquier event loop o hilo. Sus errores nunca llegan al llamador.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 86400.0,
+        max_entries: int = 2048,
+        redis_url: Optional[str] = None,
+        disk_dir: Optional[str] = None,
+        prefix: str = "llmcache:",
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.prefix = prefix
+        self.disk_dir = disk_dir or None
+        self._mem: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        if redis_url:
+            if _redis is None:
+                logger.warning("[LLM-CACHE] LLM_CACHE_REDIS_URL definido pero falta el paquete redis")
+            else:
+                self._redis = _redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._stats = {"hits_memory": 0, "hits_shared": 0, "misses": 0, "sets": 0, "shared_errors": 0}
+
+    @property
+    def shared_tier(self) -> Optional[str]:
+        if self._redis is not None:
+            return "redis"
+        if self.disk_dir:
+            return "disk"
+        return None
+
+    # ---------- Nivel 1 ----------
+    def _mem_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._mem.get(key)
+            if item is None:
+                return None
+            exp, text = item
+            if exp <= time.time():
+                del self._mem[key]
+                return None
+            self._mem.move_to_end(key)
+            return text
+
+    def _mem_set(self, key: str, text: str, exp: float) -> None:
+        with self._lock:
+            self._mem[key] = (exp, text)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    # ---------- Nivel 2 (síncrono, corre en un hilo) ----------
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _shared_get(self, key: str) -> Optional[Tuple[float, str]]:
+        if self._redis is not None:
+            pipe = self._redis.pipeline()
+            pipe.get(self.prefix + key)
+            pipe.pttl(self.prefix + key)
+            raw, pttl = pipe.execute()
+            if raw is None:
+                return None
+            exp = time.time() + (pttl / 1000 if pttl and pttl > 0 else self.ttl)
+            return exp, raw.decode("utf-8")
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        if float(data.get("exp", 0)) <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return float(data["exp"]), str(data["text"])
+
+    def _shared_set(self, key: str, text: str, exp: float) -> None:
+        if self._redis is not None:
+            self._redis.set(self.prefix + key, text.encode("utf-8"), px=max(1, int((exp - time.time()) * 1000)))
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"exp": exp, "text": text}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    async def _shared(self, fn, *args) -> Any:
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except Exception as e:
+            self._stats["shared_errors"] += 1
+            logger.warning(f"[LLM-CACHE] Nivel compartido no disponible: {e}")
+            return None
+
+    # ---------- API ----------
+    async def get(self, key: str) -> Optional[str]:
+        text = self._mem_get(key)
+        if text is not None:
+            self._stats["hits_memory"] += 1
+            return text
+        if self.shared_tier:
+            item = await self._shared(self._shared_get, key)
+            if item is not None:
+                exp, text = item
+                self._mem_set(key, text, exp)
+                self._stats["hits_shared"] += 1
+                return text
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, text: str) -> None:
+        exp = time.time() + self.ttl
+        self._mem_set(key, text, exp)
+        self._stats["sets"] += 1
+        if self.shared_tier:
+            await self._shared(self._shared_set, key, text, exp)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "entries": len(self._mem), "shared_tier": self.shared_tier}
@@ -13,14 +13,12 @@ from typing import Any, Dict, List, Optional
 # =========================================
 # 🧩 Dependencias de Mongo (tolerante a fallos)
 # =========================================
-try:
-    from pymongo import MongoClient, errors
-    _PYMONGO_OK = True
-except Exception as _e:
-    logging.warning(f"[mongo_autosave] pymongo no disponible en import-time: {_e}")
-    MongoClient = None  # type: ignore
-    errors = None       # type: ignore
-    _PYMONGO_OK = False
+from utils.mongo_pool import MongoClient, get_client, get_event_sink
+from utils.autosave_engine import AutosaveEngine, MongoAutosaveWriter
+
+_PYMONGO_OK = MongoClient is not None
+if not _PYMONGO_OK:
+    logging.warning("[mongo_autosave] pymongo no disponible en import-time")
 
 # =========================================================
 # 🔧 Configuración dinámica (segura y compatible con Docker)
@@ -28,63 +26,71 @@ except Exception as _e:
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://mongo:27017")  # 'mongo' = nombre del servicio en docker-compose
 DB_NAME = os.getenv("MONGO_DB", "chatbot_tutor_virtual")
 AUTOSAVE_COLLECTION = os.getenv("MONGO_AUTOSAVE_COLLECTION", "autosaves")
-SECURITY_LOGS_COLLECTION = os.getenv("MONGO_SECURITY_LOGS_COLLECTION", "security_logs")
+SECURITY_LOGS_COLLECTION = os.getenv("MONGO_SECURITY_LOGS_COLLECTION", "seguridad_logs")
 
 # =========================================================
-# 🧠 Inicialización del cliente (seguro)
-#  - No rompe el servidor si Mongo no está accesible.
+# 🧠 Cliente compartido del proceso (utils.mongo_pool)
+#  - Conecta en la primera operación: importar no espera a Mongo.
 #  - Si no hay pymongo, se degrada de forma segura.
 # =========================================================
-client: Optional[MongoClient] = None
-db = None
-autosave_collection = None
+client = get_client(MONGO_URI)
+db = client[DB_NAME] if client is not None else None
+autosave_collection = db[AUTOSAVE_COLLECTION] if db is not None else None
 
-if _PYMONGO_OK:
-    try:
-        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-        db = client[DB_NAME]
-        autosave_collection = db[AUTOSAVE_COLLECTION]
-        # Verifica conexión
-        client.admin.command("ping")
-        print(f"✅ Conectado correctamente a MongoDB: {MONGO_URI}")
-    except Exception as e:
-        logging.error(f"❌ Error de conexión con MongoDB: {e}")
-        client = None
-        db = None
-        autosave_collection = None
-else:
+if client is None:
     logging.info("ℹ️ pymongo no instalado; utilidades de Mongo quedan en modo no-op.")
 
 # =========================================================
 # 💾 Función: guardar snapshot o autosave
+#  - Un documento versionado por sender_id (utils.autosave_engine).
+#  - Los guardados seguidos se agrupan (AUTOSAVE_DEBOUNCE_SECONDS) y solo se
+#    escriben los campos que cambiaron.
 # =========================================================
-def guardar_autosave(sender_id: str, data: dict) -> bool:
+autosave_engine = (
+    AutosaveEngine(MongoAutosaveWriter(autosave_collection))
+    if autosave_collection is not None
+    else None
+)
+
+
+def guardar_autosave(sender_id: str, data: dict, inmediato: bool = False) -> bool:
     """
-    Guarda un snapshot automático de una conversación en MongoDB.
+    Programa el guardado del snapshot de una conversación en MongoDB.
 
     Args:
         sender_id (str): ID único de la conversación (por ejemplo, tracker.sender_id)
         data (dict): Datos del estado o contenido a guardar.
+        inmediato (bool): Escribir sin esperar la ventana de agrupación.
 
     Returns:
-        bool: True si se guardó, False si no.
+        bool: True si quedó programado, False si no hay Mongo.
     """
-    if not autosave_collection:
+    if autosave_engine is None:
         logging.warning("⚠️ No hay conexión activa con MongoDB. No se guardó el autosave.")
         return False
 
+    autosave_engine.save(sender_id, data, immediate=inmediato)
+    logging.debug(f"💾 Autosave programado para {sender_id}")
+    return True
+
+
+def cargar_autosave(sender_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Último snapshot de ``sender_id``: el pendiente en este proceso si lo hay,
+    si no el guardado en MongoDB. None si no existe.
+    """
+    if autosave_engine is None:
+        return None
+
+    data = autosave_engine.latest(sender_id)
+    if data is not None:
+        return data
     try:
-        registro = {
-            "sender_id": sender_id,
-            "data": data,
-            "timestamp": datetime.utcnow(),
-        }
-        autosave_collection.insert_one(registro)
-        logging.info(f"💾 Autosave guardado para {sender_id}")
-        return True
+        loaded = autosave_engine.writer.load(sender_id)
     except Exception as e:
-        logging.error(f"❌ Error guardando autosave para {sender_id}: {e}")
-        return False
+        logging.error(f"❌ Error cargando autosave para {sender_id}: {e}")
+        return None
+    return loaded[1] if loaded else None
 
 # =========================================================
 # 💡 Función: obtener últimos autosaves
@@ -99,7 +105,7 @@ def obtener_autosaves(limit: int = 5) -> List[Dict[str, Any]]:
     Returns:
         list[dict]: Lista de documentos.
     """
-    if not autosave_collection:
+    if autosave_collection is None:
         logging.warning("⚠️ No hay conexión activa con MongoDB.")
         return []
 
@@ -117,13 +123,16 @@ def limpiar_autosaves(dias: int = 30) -> int:
     """
     Elimina autosaves más antiguos que el número de días especificado.
 
+    La retención normal la hace el índice TTL ``ttl_timestamp`` (AUTOSAVE_TTL_DAYS,
+    ver backend/db/indexes.py); esta función queda para limpiezas manuales.
+
     Args:
         dias (int): Antigüedad en días.
 
     Returns:
         int: Cantidad eliminada.
     """
-    if not autosave_collection:
+    if autosave_collection is None:
         logging.warning("⚠️ No hay conexión activa con MongoDB.")
         return 0
 
@@ -149,6 +158,7 @@ def log_event(
 ) -> bool:
     """
     Registra un evento simple en MongoDB. Si no hay Mongo/pymongo o falla, no rompe el servidor.
+    El documento se encola en el sink por lotes (``insert_many`` en segundo plano).
 
     Variables de entorno por defecto:
       • MONGO_URI
@@ -161,29 +171,25 @@ def log_event(
         mongo_uri, db_name, collection_name (opcionales): overrides puntuales.
 
     Returns:
-        bool: True si se registró, False si no.
+        bool: True si se encoló, False si no.
     """
     try:
         _mongo_uri = mongo_uri or os.getenv("MONGO_URI") or "mongodb://mongo:27017"
         _db = db_name or os.getenv("MONGO_DB") or "rasa"
-        _col = collection_name or os.getenv("MONGO_SECURITY_LOGS_COLLECTION") or "security_logs"
+        _col = collection_name or SECURITY_LOGS_COLLECTION
 
         if not _PYMONGO_OK:
             # pymongo no instalado o no disponible en import-time
             logging.debug("[log_event] pymongo no disponible → no-op")
             return False
 
-        # Import en runtime para evitar fallas en import-time si falta pymongo al construir imagen
-        from pymongo import MongoClient as _RuntimeMongoClient  # type: ignore
-
-        _client = _RuntimeMongoClient(_mongo_uri, serverSelectionTimeoutMS=1500)
-        _col_ref = _client[_db][_col]
-        doc = {
-            "event_type": event_type,
-            "payload": payload or {},
-            "ts": datetime.utcnow(),
-        }
-        _col_ref.insert_one(doc)
+        get_event_sink(_col, db=_db, uri=_mongo_uri).emit(
+            {
+                "event_type": event_type,
+                "payload": payload or {},
+                "ts": datetime.utcnow(),
+            }
+        )
         return True
     except Exception as e:
         # No romper el servidor por fallar el logging
@@ -191,9 +197,36 @@ def log_event(
         return False
 
 
+def log_security_event(
+    usuario: str,
+    evento: str,
+    estado: str,
+    detalle: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """
+    Evento de seguridad/auditoría con el esquema de ``seguridad_logs``
+    (usuario, evento, estado, ts, detalle), encolado en el sink por lotes.
+    ``ts`` es el mismo campo que usa ``log_event`` y el que cubre el índice TTL.
+    """
+    if not _PYMONGO_OK:
+        return False
+    get_event_sink(SECURITY_LOGS_COLLECTION, db=DB_NAME, uri=MONGO_URI).emit(
+        {
+            "usuario": usuario,
+            "evento": evento,
+            "estado": estado,
+            "ts": datetime.utcnow(),
+            "detalle": detalle or {},
+        }
+    )
+    return True
+
+
 __all__ = [
     "guardar_autosave",
+    "cargar_autosave",
     "obtener_autosaves",
     "limpiar_autosaves",
     "log_event",
+    "log_security_event",
 ]
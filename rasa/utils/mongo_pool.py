@@ -0,0 +1,166 @@
+# rasa/utils/mongo_pool.py
+"""
+Cliente Mongo compartido por todo el action server + sink de eventos por lotes.
+
+- ``get_client(uri)``: un solo ``MongoClient`` por URI en el proceso (pymongo ya
+  mantiene su propio pool de conexiones y es seguro entre hilos). Se crea en el
+  primer uso, sin ping al importar.
+- ``EventSink``: cola en memoria para logs de seguridad/auditoría; un hilo en
+  segundo plano la vacía con ``insert_many`` cada ``flush_interval`` segundos o
+  al llegar a ``batch_size`` documentos. Las acciones solo encolan (no esperan
+  a Mongo). Si Mongo no responde los eventos se descartan con un aviso: el log
+  nunca debe romper una acción.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pymongo import MongoClient
+except Exception:  # pragma: no cover - pymongo no instalado
+    MongoClient = None  # type: ignore
+
+DEFAULT_URI = os.getenv("MONGO_URI", "mongodb://mongo:27017")
+DEFAULT_DB = os.getenv("MONGO_DB", "chatbot_tutor_virtual")
+SERVER_SELECTION_MS = int(os.getenv("MONGO_SERVER_SELECTION_MS", "3000"))
+MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+
+EVENT_BATCH_SIZE = int(os.getenv("MONGO_EVENT_BATCH_SIZE", "100"))
+EVENT_FLUSH_INTERVAL = float(os.getenv("MONGO_EVENT_FLUSH_INTERVAL", "1.0"))
+EVENT_MAX_QUEUE = int(os.getenv("MONGO_EVENT_MAX_QUEUE", "10000"))
+
+_clients: Dict[str, Any] = {}
+_sinks: Dict[Tuple[str, str, str], "EventSink"] = {}
+_lock = threading.Lock()
+
+
+# ==========================================================
+# Registro de clientes
+# ==========================================================
+def get_client(uri: Optional[str] = None):
+    """``MongoClient`` compartido para ``uri`` (None si pymongo no está instalado)."""
+    if MongoClient is None:
+        return None
+    uri = uri or DEFAULT_URI
+    client = _clients.get(uri)
+    if client is None:
+        with _lock:
+            client = _clients.get(uri)
+            if client is None:
+                client = MongoClient(
+                    uri,
+                    serverSelectionTimeoutMS=SERVER_SELECTION_MS,
+                    maxPoolSize=MAX_POOL_SIZE,
+                )
+                _clients[uri] = client
+    return client
+
+
+def get_collection(name: str, db: Optional[str] = None, uri: Optional[str] = None):
+    client = get_client(uri)
+    if client is None:
+        return None
+    return client[db or DEFAULT_DB][name]
+
+
+# ==========================================================
+# Sink de eventos por lotes
+# ==========================================================
+class EventSink:
+    def __init__(
+        self,
+        collection_name: str,
+        db: Optional[str] = None,
+        uri: Optional[str] = None,
+        batch_size: int = EVENT_BATCH_SIZE,
+        flush_interval: float = EVENT_FLUSH_INTERVAL,
+        max_queue: int = EVENT_MAX_QUEUE,
+    ) -> None:
+        self.collection_name = collection_name
+        self.db = db
+        self.uri = uri
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: Deque[Dict[str, Any]] = deque(maxlen=max(1, max_queue))
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0}
+
+    def emit(self, doc: Dict[str, Any]) -> None:
+        """Encola un documento (no bloquea)."""
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self._stats["dropped"] += 1  # se pierde el más antiguo
+            self._queue.append(doc)
+            self._stats["enqueued"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"event-sink-{self.collection_name}", daemon=True)
+                self._thread.start()
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+
+    def _take(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+        return batch
+
+    def flush(self) -> int:
+        """Escribe todo lo encolado; devuelve cuántos documentos se insertaron."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    return written
+                col = get_collection(self.collection_name, self.db, self.uri)
+                if col is None:
+                    self._stats["dropped"] += len(batch)
+                    continue
+                try:
+                    col.insert_many(batch, ordered=False)
+                    written += len(batch)
+                    self._stats["written"] += len(batch)
+                    self._stats["batches"] += 1
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    self._stats["dropped"] += len(batch)
+                    logger.warning(f"[EVENT-SINK] No se pudieron escribir {len(batch)} eventos en {self.collection_name}: {e}")
+                    return written
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if len(self._queue) < self.batch_size:
+                    self._cond.wait(timeout=self.flush_interval)
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "queued": len(self._queue)}
+
+
+def get_event_sink(collection_name: str, db: Optional[str] = None, uri: Optional[str] = None) -> EventSink:
+    """Sink compartido por (uri, db, colección)."""
+    key = (uri or DEFAULT_URI, db or DEFAULT_DB, collection_name)
+    sink = _sinks.get(key)
+    if sink is None:
+        with _lock:
+            sink = _sinks.get(key)
+            if sink is None:
+                sink = _sinks[key] = EventSink(collection_name, db=key[1], uri=key[0])
+    return sink
+
+
+def flush_all() -> None:
+    for sink in list(_sinks.values()):
+        sink.flush()
+
+
+atexit.register(flush_all)
@@ -0,0 +1,277 @@
+# rasa/utils/ollama_client.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaBusy(Exception):
+    """La petición esperó en cola más de ``queue_timeout``."""
+
+
+class _FairGate:
+    """
+    Semáforo FIFO: los cupos liberados pasan al primero en la cola, así una
+    petición nueva no puede adelantarse a las que ya están esperando.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # el cupo ya era nuestro: se pasa al siguiente
+            else:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass  # ``release`` ya lo descartó mientras se cancelaba
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)  # el cupo se transfiere sin bajar ``active``
+                return
+        self.active -= 1
+
+
+class OllamaClient:
+    """
+    Cliente asíncrono para ``/api/generate`` de Ollama:
+      - Un solo httpx.AsyncClient compartido (pool de conexiones)
+      - Máximo ``max_in_flight`` generaciones simultáneas, con cola FIFO
+      - Prompts idénticos en curso se unen a la misma llamada (coalescing)
+      - Métricas separadas de espera en cola y de generación
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://ollama:11434",
+        model: str = "llama3",
+        timeout: float = 60.0,
+        max_in_flight: int = 2,
+        queue_timeout: float = 30.0,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.max_in_flight = max(1, max_in_flight)
+        self.queue_timeout = queue_timeout
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._gate: Optional[_FairGate] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "upstream_calls": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "queue_timeouts": 0,
+            "queue_ms_total": 0.0,
+            "queue_ms_max": 0.0,
+            "generation_ms_total": 0.0,
+            "generation_ms_max": 0.0,
+        }
+
+    # ---------- internos ----------
+    def _bind_loop(self) -> None:
+        """El cliente y la cola pertenecen al event loop que los usa (uno por proceso en rasa_sdk)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._gate = _FairGate(self.max_in_flight)
+        self._inflight = {}
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(self.timeout, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=self.max_in_flight,
+                max_keepalive_connections=self.max_in_flight,
+            ),
+        )
+
+    def _payload(
+        self, prompt: str, system: Optional[str], options: Dict[str, Any], stream: bool
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": options,
+        }
+        if system:
+            payload["system"] = system
+        return payload
+
+    @staticmethod
+    def _key(payload: Dict[str, Any]) -> str:
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    @staticmethod
+    def _extract_text(data: Any) -> str:
+        if isinstance(data, dict):
+            for key in ["response", "generated", "result"]:
+                if key in data and isinstance(data[key], str):
+                    return data[key].strip()
+
+            if "results" in data and isinstance(data["results"], list) and data["results"]:
+                r0 = data["results"][0]
+                for key in ["content", "text", "output"]:
+                    if key in r0:
+                        return str(r0[key]).strip()
+
+        if isinstance(data, str):
+            return data.strip()
+
+        return ""
+
+    async def _run(self, payload: Dict[str, Any]) -> str:
+        gate = self._gate
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(gate.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._stats["queue_timeouts"] += 1
+            raise OllamaBusy(f"Ollama ocupado: {gate.queued} en cola")
+
+        queue_ms = (time.perf_counter() - t0) * 1000
+        t1 = time.perf_counter()
+        try:
+            self._stats["upstream_calls"] += 1
+            resp = await self._client.post("/api/generate", json=payload)
+            resp.raise_for_status()
+            return self._extract_text(resp.json())
+        except (httpx.HTTPError, ValueError):
+            self._stats["errors"] += 1
+            raise
+        finally:
+            gate.release()
+            gen_ms = (time.perf_counter() - t1) * 1000
+            self._record(queue_ms, gen_ms)
+            logger.info(f"[OLLAMA] cola={queue_ms:.0f}ms generación={gen_ms:.0f}ms en_cola={gate.queued}")
+
+    def _record(self, queue_ms: float, gen_ms: float) -> None:
+        s = self._stats
+        s["queue_ms_total"] += queue_ms
+        s["queue_ms_max"] = max(s["queue_ms_max"], queue_ms)
+        s["generation_ms_total"] += gen_ms
+        s["generation_ms_max"] = max(s["generation_ms_max"], gen_ms)
+
+    # ---------- API ----------
+    async def generate(self, prompt: str, system: Optional[str] = None, **options: Any) -> str:
+        """
+        Genera la respuesta completa para ``prompt`` (sin streaming).
+        ``system`` va en su propio campo: un prefijo idéntico entre peticiones
+        que Ollama no necesita volver a procesar en cada turno.
+        Lanza ``OllamaBusy`` si la cola no avanza a tiempo y errores httpx
+        si Ollama falla.
+        """
+        self._bind_loop()
+        payload = self._payload(prompt, system, options, stream=False)
+        key = self._key(payload)
+        self._stats["requests"] += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(payload))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        else:
+            self._stats["coalesced"] += 1
+
+        # shield: si un llamador se cancela, los demás siguen esperando la misma llamada
+        return await asyncio.shield(task)
+
+    async def generate_stream(
+        self, prompt: str, system: Optional[str] = None, **options: Any
+    ) -> AsyncIterator[str]:
+        """
+        Igual que ``generate`` pero entrega los fragmentos de texto a medida que
+        Ollama los produce (NDJSON de ``/api/generate`` con ``stream: true``).
+        Ocupa un cupo de la cola durante toda la generación y no se une a otras
+        llamadas idénticas.
+        """
+        self._bind_loop()
+        payload = self._payload(prompt, system, options, stream=True)
+        gate = self._gate
+        self._stats["requests"] += 1
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(gate.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._stats["queue_timeouts"] += 1
+            raise OllamaBusy(f"Ollama ocupado: {gate.queued} en cola")
+
+        queue_ms = (time.perf_counter() - t0) * 1000
+        t1 = time.perf_counter()
+        first_ms: Optional[float] = None
+        try:
+            self._stats["upstream_calls"] += 1
+            async with self._client.stream("POST", "/api/generate", json=payload) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    piece = data.get("response") or ""
+                    if piece:
+                        if first_ms is None:
+                            first_ms = (time.perf_counter() - t1) * 1000
+                        yield piece
+                    if data.get("done"):
+                        break
+        except (httpx.HTTPError, ValueError):
+            self._stats["errors"] += 1
+            raise
+        finally:
+            gate.release()
+            gen_ms = (time.perf_counter() - t1) * 1000
+            self._record(queue_ms, gen_ms)
+            logger.info(
+                f"[OLLAMA] stream cola={queue_ms:.0f}ms primer_token={first_ms or 0:.0f}ms "
+                f"generación={gen_ms:.0f}ms en_cola={gate.queued}"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        s = dict(self._stats)
+        calls = max(1, int(s["upstream_calls"]))
+        s["queue_ms_avg"] = round(s.pop("queue_ms_total") / calls, 2)
+        s["generation_ms_avg"] = round(s.pop("generation_ms_total") / calls, 2)
+        s["in_flight"] = self._gate.active if self._gate else 0
+        s["queued"] = self._gate.queued if self._gate else 0
+        s["max_in_flight"] = self.max_in_flight
+        return s
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
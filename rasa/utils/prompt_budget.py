@@ -0,0 +1,125 @@
+# rasa/utils/prompt_budget.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+_SEPARADOR = re.compile(r"^\s*=+\s*$")
+_CHARS_POR_TOKEN = 3.5  # español con tokenizadores tipo llama: ~3-4 caracteres por token
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación barata (sin tokenizador) del número de tokens de ``text``."""
+    if not text:
+        return 0
+    return int(len(text) / _CHARS_POR_TOKEN) + 1
+
+
+def compact_prompt(text: str) -> str:
+    """Quita líneas decorativas (``=====``) y líneas en blanco repetidas."""
+    lines: List[str] = []
+    for line in text.strip().splitlines():
+        line = line.rstrip()
+        if _SEPARADOR.match(line):
+            continue
+        if not line and (not lines or not lines[-1]):
+            continue
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _clip(text: str, tokens: int) -> str:
+    if tokens <= 0:
+        return ""
+    max_chars = int((tokens - 1) * _CHARS_POR_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    return text[: max(0, max_chars - 1)].rstrip() + "…"
+
+
+@dataclass
+class BuiltPrompt:
+    system: str
+    prompt: str
+    tokens: int  # system + prompt (estimado)
+    history_used: int
+    history_dropped: int
+    clipped: bool
+
+
+class PromptBudget:
+    """
+    Arma prompts para Ollama dentro de un presupuesto de tokens.
+
+    El prompt de sistema se compacta y se mide una sola vez; se envía aparte
+    (campo ``system`` de ``/api/generate``) para que todas las peticiones
+    compartan el mismo prefijo y Ollama pueda reutilizarlo.
+
+    Si no cabe todo, se recorta en este orden:
+      1) historial, de los turnos más antiguos a los más recientes
+      2) el contenido del bloque más largo (``blocks``: pares título/texto;
+         el título se conserva)
+    ``tail`` (instrucciones de formato) nunca se recorta.
+    """
+
+    def __init__(self, system: str, budget: int, max_history: int = 6) -> None:
+        self.system = compact_prompt(system)
+        self.system_tokens = estimate_tokens(self.system)
+        self.budget = budget
+        self.max_history = max(0, max_history)
+
+    def build(
+        self,
+        blocks: Sequence[Tuple[str, str]],
+        history: Sequence[str],
+        tail: str = "",
+        history_title: str = "Historial breve:",
+    ) -> BuiltPrompt:
+        available = self.budget - self.system_tokens - estimate_tokens(tail)
+        titles = [t for t, _ in blocks]
+        bodies = [b for _, b in blocks]
+        used = sum(estimate_tokens(t) + estimate_tokens(b) for t, b in blocks)
+
+        # 1) Historial: del más reciente hacia atrás mientras quepa
+        candidates = list(history)[-self.max_history:] if self.max_history else []
+        kept: List[str] = []
+        room = available - used - estimate_tokens(history_title)
+        for line in reversed(candidates):
+            cost = estimate_tokens(line)
+            if cost > room:
+                break
+            kept.append(line)
+            room -= cost
+        kept.reverse()
+        if kept:
+            used += estimate_tokens(history_title) + sum(estimate_tokens(h) for h in kept)
+
+        # 2) Sin historial y aún excedido: truncar el bloque más largo
+        clipped = False
+        while used > available and bodies:
+            i = max(range(len(bodies)), key=lambda j: len(bodies[j]))
+            cost = estimate_tokens(bodies[i])
+            if cost <= 1:
+                break
+            recortado = _clip(bodies[i], cost - (used - available))
+            if estimate_tokens(recortado) >= cost:
+                break
+            bodies[i] = recortado
+            used += estimate_tokens(recortado) - cost
+            clipped = True
+
+        parts = [f"{t}\n{b}\n" for t, b in zip(titles, bodies)]
+        if kept:
+            parts.append(history_title + "\n" + "\n".join(kept))
+        if tail:
+            parts.append(tail)
+        prompt = "\n".join(parts)
+        return BuiltPrompt(
+            system=self.system,
+            prompt=prompt,
+            tokens=self.system_tokens + estimate_tokens(prompt),
+            history_used=len(kept),
+            history_dropped=len(history) - len(kept),
+            clipped=clipped,
+        )
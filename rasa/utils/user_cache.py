@@ -0,0 +1,161 @@
+# rasa/utils/user_cache.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:  # opcional: solo si se configura el nivel Redis
+    import redis as _redis
+except ImportError:  # pragma: no cover
+    _redis = None
+
+
+class UserResourceCache:
+    """
+    Cache por usuario y recurso (estado académico, tutor, certificados):
+      - TTL por recurso (``ttls``); vencido el TTL el valor se sigue sirviendo
+        ``stale`` segundos más mientras se refresca en segundo plano
+        (stale-while-revalidate)
+      - Nivel 1 en memoria (LRU acotado); nivel 2 opcional en Redis
+        (``redis_url``) compartido entre réplicas del action server
+      - Cargas simultáneas de la misma clave se unen en una sola llamada
+      - ``invalidate(user)`` borra todos los recursos del usuario
+
+    Un ``loader`` que devuelve None (backend caído, sin datos) no se guarda.
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, float],
+        stale: float = 120.0,
+        max_entries: int = 5000,
+        redis_url: Optional[str] = None,
+        prefix: str = "usercache:",
+    ) -> None:
+        self.ttls = dict(ttls)
+        self.stale = max(0.0, stale)
+        self.max_entries = max(1, max_entries)
+        self.prefix = prefix
+        self._mem: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()  # clave -> (guardado_en, valor)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._redis = None
+        if redis_url:
+            if _redis is None:
+                logger.warning("[USER-CACHE] ACTIONS_CACHE_REDIS_URL definido pero falta el paquete redis")
+            else:
+                self._redis = _redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "invalidations": 0, "shared_errors": 0}
+
+    @staticmethod
+    def _key(user: str, resource: str) -> str:
+        return f"{user}:{resource}"
+
+    # ---------- Nivel 1 ----------
+    def _mem_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                self._mem.move_to_end(key)
+            return item
+
+    def _mem_set(self, key: str, stored_at: float, value: Any) -> None:
+        with self._lock:
+            self._mem[key] = (stored_at, value)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    # ---------- Nivel 2 (síncrono, corre en un hilo) ----------
+    def _shared_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        raw = self._redis.get(self.prefix + key)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return float(data["t"]), data["v"]
+
+    def _shared_set(self, key: str, stored_at: float, value: Any, ttl: float) -> None:
+        payload = json.dumps({"t": stored_at, "v": value}, ensure_ascii=False, default=str)
+        self._redis.set(self.prefix + key, payload.encode("utf-8"), px=max(1, int((ttl + self.stale) * 1000)))
+
+    def _shared_delete(self, keys: Iterable[str]) -> None:
+        self._redis.delete(*[self.prefix + k for k in keys])
+
+    async def _shared(self, fn, *args) -> Any:
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except Exception as e:
+            self._stats["shared_errors"] += 1
+            logger.warning(f"[USER-CACHE] Nivel compartido no disponible: {e}")
+            return None
+
+    # ---------- Carga ----------
+    async def _load(self, key: str, resource: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        if value is not None:
+            now = time.time()
+            self._mem_set(key, now, value)
+            if self._redis is not None:
+                await self._shared(self._shared_set, key, now, value, self.ttls.get(resource, 60.0))
+        return value
+
+    def _start_load(self, key: str, resource: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, resource, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        return task
+
+    # ---------- API ----------
+    async def get_or_load(self, user: str, resource: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        key = self._key(user, resource)
+        ttl = self.ttls.get(resource, 60.0)
+
+        item = self._mem_get(key)
+        if item is None and self._redis is not None:
+            item = await self._shared(self._shared_get, key)
+            if item is not None:
+                self._mem_set(key, *item)
+
+        if item is not None:
+            age = time.time() - item[0]
+            if age < ttl:
+                self._stats["hits"] += 1
+                return item[1]
+            if age < ttl + self.stale:
+                self._stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._stats["refreshes"] += 1
+                    self._start_load(key, resource, loader)
+                return item[1]
+
+        self._stats["misses"] += 1
+        # shield: si la acción se cancela, la carga sigue para los demás
+        return await asyncio.shield(self._start_load(key, resource, loader))
+
+    async def invalidate(self, user: str) -> None:
+        keys = [self._key(user, r) for r in self.ttls]
+        with self._lock:
+            for k in keys:
+                self._mem.pop(k, None)
+        self._stats["invalidations"] += 1
+        if self._redis is not None:
+            await self._shared(self._shared_delete, keys)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+        hit_rate = (self._stats["hits"] + self._stats["stale_hits"]) / lookups if lookups else 0.0
+        return {
+            **self._stats,
+            "hit_rate": round(hit_rate, 3),
+            "entries": len(self._mem),
+            "shared_tier": "redis" if self._redis is not None else None,
+        }
@@ -0,0 +1,154 @@
+# tools/bench/bench_middleware.py
+"""
+Benchmark: overhead por request del stack de middlewares.
+
+Compara el stack anterior (cadena de BaseHTTPMiddleware + funciones
+@app.middleware("http")) con HttpPipelineMiddleware (ASGI puro) sobre un
+endpoint trivial, sin red (httpx.ASGITransport). El access log se reemplaza
+por un no-op en ambos casos para medir solo el middleware.
+
+Uso (desde la raíz del repo):
+    python tools/bench/bench_middleware.py --requests 3000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault("SECRET_KEY", "bench-secret-key-bench-secret-key")
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+import httpx  # noqa: E402
+
+from backend.config.settings import settings  # noqa: E402
+from backend.middleware.access_log_middleware import AccessLogMiddleware  # noqa: E402
+from backend.middleware.auth_middleware import AuthMiddleware  # noqa: E402
+from backend.middleware.cors_csp import add_cors_and_csp  # noqa: E402
+from backend.middleware.http_pipeline import DEFAULT_CSP, HttpPipelineMiddleware  # noqa: E402
+from backend.middleware.log_middleware import LoggingMiddleware  # noqa: E402
+from backend.middleware.permissions_policy import add_permissions_policy  # noqa: E402
+from backend.middleware.request_id import RequestIdMiddleware  # noqa: E402
+from backend.middleware.request_meta_middleware import request_meta_middleware  # noqa: E402
+from backend.services.log_service import access_log_sink  # noqa: E402
+
+
+async def _noop_put(doc):
+    return True
+
+
+access_log_sink.put = _noop_put  # type: ignore[assignment]
+
+
+def _endpoint(app: FastAPI) -> FastAPI:
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+    return app
+
+
+def legacy_app() -> FastAPI:
+    """Réplica del stack previo de create_app (mismo orden de registro)."""
+    app = FastAPI()
+
+    class CSPMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            response = await call_next(request)
+            response.headers["Content-Security-Policy"] = DEFAULT_CSP
+            return response
+
+    add_permissions_policy(app, preset="strict")
+    add_permissions_policy(app, policy=settings.permissions_policy_effective, add_legacy_feature_policy=True)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.allowed_origins_list,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    add_cors_and_csp(app)
+    app.add_middleware(CSPMiddleware)
+    app.add_middleware(RequestIdMiddleware, header_name="X-Request-ID")
+    app.middleware("http")(request_meta_middleware)
+    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(AccessLogMiddleware)
+    app.add_middleware(AuthMiddleware)
+
+    @app.middleware("http")
+    async def _csp_headers(request: Request, call_next):
+        resp = await call_next(request)
+        if "Content-Security-Policy" not in resp.headers:
+            resp.headers["Content-Security-Policy"] = "frame-ancestors 'self';"
+        return resp
+
+    return _endpoint(app)
+
+
+def pipeline_app() -> FastAPI:
+    """Stack actual: CORS + HttpPipelineMiddleware."""
+    app = FastAPI()
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.allowed_origins_list or ["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Request-ID"],
+        max_age=86400,
+    )
+    app.add_middleware(HttpPipelineMiddleware, header_name="X-Request-ID")
+    return _endpoint(app)
+
+
+def bare_app() -> FastAPI:
+    return _endpoint(FastAPI())
+
+
+async def _measure(app: FastAPI, n: int, headers: dict) -> list:
+    transport = httpx.ASGITransport(app=app)
+    samples = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(200, n)):  # warm-up
+            await client.get("/ping", headers=headers)
+        for _ in range(n):
+            t0 = time.perf_counter()
+            r = await client.get("/ping", headers=headers)
+            samples.append((time.perf_counter() - t0) * 1e6)
+            assert r.status_code == 200
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)  # el costo de escribir logs no es parte de la comparación
+
+    headers = {
+        "Origin": "http://localhost:5173",
+        "User-Agent": "bench",
+        "Authorization": "Bearer FAKE_TOKEN_ZAJUNA",
+    }
+    results = {}
+    for name, factory in (("sin middleware", bare_app), ("stack anterior", legacy_app), ("http_pipeline", pipeline_app)):
+        samples = asyncio.run(_measure(factory(), args.requests, headers))
+        samples.sort()
+        results[name] = (statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.99) - 1])
+
+    base = results["sin middleware"][0]
+    print(f"{'stack':<16}{'media µs':>10}{'p50 µs':>10}{'p99 µs':>10}{'overhead µs':>13}")
+    for name, (mean, p50, p99) in results.items():
+        print(f"{name:<16}{mean:>10.1f}{p50:>10.1f}{p99:>10.1f}{mean - base:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
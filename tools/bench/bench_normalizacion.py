@@ -0,0 +1,117 @@
+# tools/bench/bench_normalizacion.py
+"""
+Benchmark: normalize_chat_text, anonymize_text y detectar_materia.
+
+Compara la versión anterior (diccionario de correcciones rearmado en cada
+llamada, regex sin compilar, recorrido lineal de MATERIAS) con la de
+``rasa/actions/normalizacion_texto.py``, sobre mensajes de chat típicos.
+El módulo se carga por ruta para no importar el paquete ``actions`` (que
+requiere rasa_sdk).
+
+Uso (desde la raíz del repo):
+    python tools/bench/bench_normalizacion.py --loops 20000
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import re
+import time
+import unicodedata
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+_spec = importlib.util.spec_from_file_location(
+    "normalizacion_texto", ROOT / "rasa" / "actions" / "normalizacion_texto.py"
+)
+nt = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(nt)
+
+MENSAJES = [
+    "Holaaaa kiero aprnder contabilidad básica xq tengo examen",
+    "Necesito mi sertificado de Gestión de Proyectos Ágiles, mi correo es ana.perez@mail.com",
+    "no puedo entrar a la platafroma, mi cédula es 1032456789 y vivo en Calle 45 # 12-30, Bogotá",
+    "q es marketing digital y como se relaciona con redes sociales?",
+    "Explícame ciencias administrativas y contables por favor",
+    "me ayudas con el taller de Inglés",
+    "quiero saber de robótica e internet de las cosas",
+    "ok gracias",
+]
+
+
+# ----------------- Versión anterior (referencia) -----------------
+def _legacy_normalize(text):
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    return text.lower()
+
+
+def _legacy_normalize_chat_text(text):
+    if not text:
+        return ""
+    t = _legacy_normalize(text)
+    t = re.sub(r"(.)\1{2,}", r"\1\1", t)
+    tokens = t.split()
+    slang_map = {"k": "que", "xq": "porque", "xk": "porque", "kiero": "quiero", "aprnder": "aprender"}
+    for wrong, right in nt.COMMON_CHAT_CORRECTIONS.items():
+        if wrong not in slang_map:
+            slang_map[wrong] = right
+    t = " ".join(slang_map.get(tok, tok) for tok in tokens)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+def _legacy_detectar_materia(text):
+    t = _legacy_normalize_chat_text(text)
+    for m, desc in nt.MATERIAS.items():
+        if m in t:
+            return desc
+    return "Tutor General del SENA"
+
+
+def _legacy_anonymize_text(text):
+    if not text:
+        return text
+    text = re.sub(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", "[EMAIL]", text)
+    text = re.sub(r"\b\d{6,}\b", "[NUM]", text)
+    text = re.sub(r"\b(?:\d[ -]*?){13,19}\b", "[NUM]", text)
+    text = re.sub(r"\b[A-ZÁÉÍÓÚ][a-záéíóú]+(?:\s[A-ZÁÉÍÓÚ][a-záéíóú]+){0,2}\b", "[NAME]", text)
+    text = re.sub(r"\b(?:calle|cra|carrera|av|avenida|cll)\b[^\n,]{0,40}", "[ADDRESS]", text, flags=re.IGNORECASE)
+    return text
+
+
+def _medir(fn, loops: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(loops):
+        for m in MENSAJES:
+            fn(m)
+    return (time.perf_counter() - t0) * 1e6 / (loops * len(MENSAJES))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loops", type=int, default=20000)
+    args = parser.parse_args()
+
+    for m in MENSAJES:
+        assert nt.normalize_chat_text(m) == _legacy_normalize_chat_text(m), m
+        assert nt.anonymize_text(m) == _legacy_anonymize_text(m), m
+
+    casos = [
+        ("normalize_chat_text", _legacy_normalize_chat_text, nt.normalize_chat_text),
+        ("anonymize_text", _legacy_anonymize_text, nt.anonymize_text),
+        ("detectar_materia", _legacy_detectar_materia, nt.detectar_materia),
+    ]
+    for nombre, antes, ahora in casos:
+        a = _medir(antes, args.loops)
+        b = _medir(ahora, args.loops)
+        print(f"{nombre:<22} antes={a:7.2f} µs  ahora={b:7.2f} µs  x{a / b:.1f}")
+
+    print("\ndetectar_materia (coincidencia más larga):")
+    for m in MENSAJES:
+        print(f"  {m[:48]:<48} -> {nt.detectar_materia(m).split(' →')[0]}")
+
+
+if __name__ == "__main__":
+    main()
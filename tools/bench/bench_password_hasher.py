@@ -0,0 +1,89 @@
+# tools/bench/bench_password_hasher.py
+"""
+Benchmark: logins sostenidos por segundo con el pool de hashing.
+
+Lanza ``--clients`` logins concurrentes (hilos, como el threadpool de
+Starlette) que verifican una contraseña bcrypt durante ``--seconds``
+segundos, para cada combinación de costo y número de workers. Reporta
+logins/s totales, logins/s por worker, p50/p99 de latencia y cuántos
+intentos se rechazaron (503) por cola llena.
+
+Uso (desde la raíz del repo):
+    python tools/bench/bench_password_hasher.py --rounds 10 12 --workers 1 2 4
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault("SECRET_KEY", "bench-secret-key-bench-secret-key")
+
+from backend.services.password_hasher import HashingOverloaded, PasswordHasher, _do_hash  # noqa: E402
+
+PASSWORD = "Cl4ve-Segura!2024"
+
+
+def _run(hasher: PasswordHasher, hashed: str, clients: int, seconds: float):
+    latencies: list = []
+    shed = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def client() -> None:
+        while time.perf_counter() < stop_at:
+            t0 = time.perf_counter()
+            try:
+                ok = hasher.verify(PASSWORD, hashed)
+            except HashingOverloaded:
+                with lock:
+                    shed[0] += 1
+                time.sleep(0.005)  # el cliente reintenta tras el 503
+                continue
+            assert ok
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, shed[0], time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 12])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--max-queue", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()} · clientes: {args.clients} · cola: {args.max_queue} · executor: {args.executor}")
+    print(f"{'costo':>6}{'workers':>9}{'logins/s':>10}{'/worker':>9}{'p50 ms':>9}{'p99 ms':>9}{'503':>7}")
+    for rounds in args.rounds:
+        hashed = _do_hash(PASSWORD, rounds)
+        for workers in args.workers:
+            hasher = PasswordHasher(
+                rounds=rounds, workers=workers, max_queue=args.max_queue, executor=args.executor
+            )
+            hasher.verify(PASSWORD, hashed)  # arranca el pool fuera de la medición
+            latencies, shed, elapsed = _run(hasher, hashed, args.clients, args.seconds)
+            hasher.shutdown()
+            latencies.sort()
+            rate = len(latencies) / elapsed
+            p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+            p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000 if latencies else 0.0
+            print(f"{rounds:>6}{workers:>9}{rate:>10.1f}{rate / workers:>9.1f}{p50:>9.1f}{p99:>9.1f}{shed:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# tools/bench/bench_semantic_memory.py
+"""
+Benchmark: latencia de retrieve_similar / store_message de la memoria semántica.
+
+Llena el índice con N entradas (por defecto 100k) en una sola partición (peor
+caso: un remitente con todo el historial) y en muchas particiones, y mide la
+búsqueda y la inserción. El módulo se carga por ruta para no importar el
+paquete ``actions`` (que requiere rasa_sdk).
+
+Uso (desde la raíz del repo):
+    python tools/bench/bench_semantic_memory.py --entries 100000
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+_spec = importlib.util.spec_from_file_location(
+    "actions_semantic_memory", ROOT / "rasa" / "actions" / "actions_semantic_memory.py"
+)
+sm = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sm)
+
+VOCAB = [
+    "quiero", "aprender", "contabilidad", "basica", "curso", "certificado", "sena", "programa",
+    "inscripcion", "horario", "instructor", "tutor", "examen", "nota", "modulo", "virtual",
+    "plataforma", "zajuna", "clave", "usuario", "ayuda", "como", "donde", "cuando", "tengo",
+    "problema", "con", "el", "la", "mi", "de", "en", "para", "que", "no", "puedo", "ver",
+    "descargar", "ficha", "competencia", "resultado", "evidencia", "entrega", "foro", "taller",
+]
+
+
+def _frase(rnd: random.Random) -> str:
+    return " ".join(rnd.choice(VOCAB) + str(rnd.randint(0, 300)) for _ in range(rnd.randint(4, 12)))
+
+
+def _medir(fn, n: int) -> list:
+    tiempos = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - t0) * 1e3)
+    return tiempos
+
+
+def _reporte(nombre: str, tiempos: list) -> None:
+    tiempos = sorted(tiempos)
+    p99 = tiempos[int(len(tiempos) * 0.99) - 1]
+    print(f"{nombre:<34} mediana={statistics.median(tiempos):.4f} ms  p99={p99:.4f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--senders", type=int, default=500)
+    args = parser.parse_args()
+    rnd = random.Random(7)
+    frases = [_frase(rnd) for _ in range(args.entries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Una partición con todas las entradas
+        idx = sm.SemanticMemoryIndex(
+            path=str(Path(tmp) / "uno.jsonl"), max_per_sender=args.entries, max_entries=args.entries
+        )
+        t0 = time.perf_counter()
+        for f in frases:
+            idx.add("u1", f, f)
+        print(f"carga {args.entries} entradas: {time.perf_counter() - t0:.2f} s  {idx.stats()}")
+        _reporte("search (1 partición)", _medir(lambda: idx.search("u1", _frase(rnd)), args.queries))
+        _reporte("add (1 partición, con log)", _medir(lambda: idx.add("u1", "x y z", "x y z"), args.queries))
+        idx.close()
+
+        t0 = time.perf_counter()
+        recargado = sm.SemanticMemoryIndex(path=str(Path(tmp) / "uno.jsonl"), max_per_sender=args.entries)
+        print(f"recarga desde log: {time.perf_counter() - t0:.2f} s  {recargado.stats()}")
+        recargado.close()
+
+        # Muchos remitentes
+        multi = sm.SemanticMemoryIndex(path=str(Path(tmp) / "multi.jsonl"), max_entries=args.entries)
+        for i, f in enumerate(frases):
+            multi.add(f"s{i % args.senders}", f, f)
+        _reporte(
+            f"search ({args.senders} remitentes)",
+            _medir(lambda: multi.search(f"s{rnd.randrange(args.senders)}", _frase(rnd)), args.queries),
+        )
+        multi.close()
+
+
+if __name__ == "__main__":
+    main()